@@ -16,21 +16,38 @@
 
 """Access Control API server."""
 
-from keystonemiddleware import auth_token
 from oslo.config import cfg
 
+from highlander.api import token_cache
+from highlander import utils
+
 
 _ENFORCER = None
 
+# Imports keystoneclient, needed only when authentication is enabled.
+auth_token = utils.lazy_import('keystonemiddleware.auth_token')
+
 
 def setup(app):
     if cfg.CONF.pecan.auth_enable:
+        # Imports the middleware, which registers [keystone_authtoken].
+        auth_protocol = auth_token.AuthProtocol
+
         conf = dict(cfg.CONF.keystone_authtoken)
 
         # Change auth decisions of requests to the app itself.
         conf.update({'delay_auth_decision': True})
 
-        return auth_token.AuthProtocol(app, conf)
+        if conf.get('cache'):
+            # A cache of the WSGI pipeline, e.g. the one of swift.
+            return auth_protocol(app, conf)
+
+        conf['cache'] = token_cache.ENV_KEY
+
+        return token_cache.TokenCacheMiddleware(
+            auth_protocol(app, conf),
+            token_cache.TokenCache(conf.get('memcached_servers'))
+        )
     else:
         return app
 
@@ -18,6 +18,11 @@ from oslo.config import cfg
 import pecan
 
 from highlander.api import access_control
+from highlander.api import compression
+from highlander.api.hooks import profile
+from highlander.api.hooks import query_budget
+from highlander.api.hooks import rate_limit
+from highlander.api.hooks import timing
 from highlander import context as ctx
 from highlander.db.v1 import api as db_api_v1
 
@@ -45,19 +50,40 @@ def setup_app(config=None):
 
     app_conf = dict(config.app)
 
-    db_api_v1.setup_db()
-    
+    # The schema is created and upgraded by highlander-db-manage.
+    db_api_v1.check_db()
+
+    app_hooks = [ctx.ContextHook(), ctx.AuthHook()]
+
+    if cfg.CONF.rate_limit.enabled:
+        app_hooks.append(rate_limit.RateLimitHook())
+
+    renderers = {}
+
+    if cfg.CONF.metrics.enabled:
+        app_hooks.append(timing.TimingHook())
+        renderers.update(timing.RENDERERS)
+
+    if app_conf.get('debug'):
+        app_hooks.append(query_budget.QueryBudgetHook())
+
+    if cfg.CONF.profiler.enabled:
+        app_hooks.append(profile.ProfileHook())
 
     app = pecan.make_app(
         app_conf.pop('root'),
-        hooks=lambda: [ctx.ContextHook(), ctx.AuthHook()],
+        hooks=lambda: app_hooks,
         logging=getattr(config, 'logging', {}),
+        custom_renderers=renderers,
         **app_conf
     )
 
     # Set up access control.
     app = access_control.setup(app)
 
+    # Outermost, errors of the authentication are compressed too.
+    app = compression.setup(app)
+
     return app
 
 
@@ -0,0 +1,243 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Compression of API responses negotiated with Accept-Encoding.
+
+Bodies are compressed chunk by chunk as the application produces them,
+only the first [api] compression_min_size bytes are buffered to tell
+small responses, sent as they are, from the others.
+"""
+
+import itertools
+import zlib
+
+from oslo.config import cfg
+import six
+import webob
+
+from highlander.openstack.common import importutils
+
+
+CONF = cfg.CONF
+CONF.import_group('api', 'highlander.config')
+
+brotli = importutils.try_import('brotli')
+
+_NOT_COMPRESSED_STATUSES = ('204', '304')
+
+
+class _BrotliCompressor(object):
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def _compressor(encoding):
+    if encoding == 'br':
+        return _BrotliCompressor(CONF.api.brotli_quality)
+
+    if encoding == 'gzip':
+        window_bits = 16 + zlib.MAX_WBITS
+    else:
+        # 'deflate' is the zlib format, see RFC 7230.
+        window_bits = zlib.MAX_WBITS
+
+    return zlib.compressobj(
+        CONF.api.compression_level,
+        zlib.DEFLATED,
+        window_bits
+    )
+
+
+def _encodings():
+    # Preferred first when the client has no preference.
+    if brotli:
+        return ['br', 'gzip', 'deflate']
+
+    return ['gzip', 'deflate']
+
+
+def _header(headers, name):
+    name = name.lower()
+
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+
+    return None
+
+
+def _is_compressible(status, headers):
+    if status[:3] in _NOT_COMPRESSED_STATUSES:
+        return False
+
+    if _header(headers, 'Content-Encoding'):
+        return False
+
+    content_type = (_header(headers, 'Content-Type') or '').split(';')[0]
+
+    return content_type.strip().lower() in CONF.api.compression_types
+
+
+def _add_vary(headers):
+    vary = _header(headers, 'Vary')
+
+    if vary is None:
+        return headers + [('Vary', 'Accept-Encoding')]
+
+    if 'accept-encoding' in vary.lower():
+        return headers
+
+    return [(k, v) for k, v in headers if k.lower() != 'vary'] + [
+        ('Vary', '%s, Accept-Encoding' % vary)
+    ]
+
+
+class CompressionMiddleware(object):
+    """Compresses the responses of an application.
+
+    Responses are compressed if the client accepts gzip, deflate or, with
+    the brotli module installed, br, their type is one of [api]
+    compression_types and they have at least [api] compression_min_size
+    bytes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        if (environ['REQUEST_METHOD'] == 'HEAD'
+                or 'HTTP_ACCEPT_ENCODING' not in environ):
+            return self.app(environ, start_response)
+
+        encoding = webob.Request(environ).accept_encoding.best_match(
+            _encodings()
+        )
+
+        if not encoding:
+            return self.app(environ, start_response)
+
+        response = {}
+
+        def _start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                # Too late to send the error, the server handles it.
+                six.reraise(*exc_info)
+
+            response['status'] = status
+            response['headers'] = headers
+
+            # The body is written through the iterable only.
+            return None
+
+        def _start(size):
+            response['started'] = True
+
+            status, headers = response['status'], response['headers']
+
+            if not _is_compressible(status, headers):
+                start_response(status, headers)
+
+                return None
+
+            if size < CONF.api.compression_min_size:
+                start_response(status, _add_vary(headers))
+
+                return None
+
+            start_response(status, _compressed_headers(headers, encoding))
+
+            return _compressor(encoding)
+
+        app_iter = self.app(environ, _start_response)
+
+        try:
+            chunks = iter(app_iter)
+            head = []
+            size = 0
+
+            # Buffers the start of the body, the size tells if it's worth
+            # compressing.
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+
+                if size >= CONF.api.compression_min_size:
+                    break
+
+            compressor = _start(size)
+
+            if compressor is None:
+                return _ClosingIterator(itertools.chain(head, chunks),
+                                        app_iter)
+        except Exception:
+            _close(app_iter)
+
+            raise
+
+        return _ClosingIterator(
+            _compress(compressor, itertools.chain(head, chunks)),
+            app_iter
+        )
+
+
+def _close(app_iter):
+    if hasattr(app_iter, 'close'):
+        app_iter.close()
+
+
+class _ClosingIterator(object):
+    """Iterates over a body, closes the one of the application at last."""
+
+    def __init__(self, body, app_iter):
+        self._body = body
+        self._app_iter = app_iter
+
+    def __iter__(self):
+        return self._body
+
+    def close(self):
+        _close(self._app_iter)
+
+
+def _compress(compressor, chunks):
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def _compressed_headers(headers, encoding):
+    # ETags name versions of the objects rather than bytes, so they stay
+    # the same: If-Match compares them strongly.
+    headers = [
+        (k, v) for k, v in headers if k.lower() != 'content-length'
+    ]
+
+    return _add_vary(headers) + [('Content-Encoding', encoding)]
+
+
+def setup(app):
+    if not CONF.api.compression:
+        return app
+
+    return CompressionMiddleware(app)
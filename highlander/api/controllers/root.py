@@ -14,6 +14,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from oslo.config import cfg
 import pecan
 from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
@@ -21,9 +22,12 @@ import wsmeext.pecan as wsme_pecan
 from highlander.api.controllers import resource
 from highlander.api.controllers.v1 import root as v1_root
 from highlander.openstack.common import log as logging
+from highlander.utils import metrics as metrics_utils
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 API_STATUS = wtypes.Enum(str, 'SUPPORTED', 'CURRENT', 'DEPRECATED')
 
 
@@ -66,3 +70,11 @@ class RootController(object):
         )
 
         return [api_v1]
+
+    @pecan.expose(content_type='text/plain')
+    def metrics(self):
+        """Return API and database metrics in the Prometheus format."""
+        if not CONF.metrics.enabled:
+            pecan.abort(404)
+
+        return metrics_utils.render()
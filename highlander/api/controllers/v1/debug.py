@@ -0,0 +1,70 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo.config import cfg
+import pecan
+from pecan import rest
+
+from highlander import context as auth_ctx
+from highlander import exceptions as exc
+from highlander.openstack.common import log as logging
+from highlander.utils import profiler
+from highlander.utils import rest_utils
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('profiler', 'highlander.config')
+
+
+def _check_allowed():
+    if not CONF.profiler.enabled:
+        raise exc.NotFoundException("Profiling is disabled.")
+
+    if not auth_ctx.ctx().is_admin:
+        raise exc.NotAllowedException("Profiling is allowed to admins only.")
+
+
+class ProfileController(rest.RestController):
+    @rest_utils.wrap_pecan_controller_exception
+    @pecan.expose(content_type="text/plain")
+    def post(self, seconds='10'):
+        """Record a CPU profile of the API process.
+
+        Returns the sampled stacks in the collapsed format of flamegraph.pl.
+        :param seconds: Duration of the profile, at most
+            [profiler] max_seconds.
+        """
+        _check_allowed()
+
+        try:
+            seconds = float(seconds)
+        except ValueError:
+            raise exc.InputException("Invalid seconds: %s" % seconds)
+
+        if seconds <= 0:
+            raise exc.InputException("Invalid seconds: %s" % seconds)
+
+        LOG.info("Record CPU profile [seconds=%s]" % seconds)
+
+        result = profiler.profile(seconds)
+
+        pecan.response.headers['X-Profile-Samples'] = str(result.samples)
+        pecan.response.headers['X-Profile-Idle-Samples'] = str(result.idle)
+
+        return result.collapsed()
+
+
+class DebugController(object):
+    profile = ProfileController()
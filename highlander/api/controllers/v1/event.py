@@ -0,0 +1,79 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from pecan import rest
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from highlander.api.controllers import resource
+from highlander.api.hooks import rate_limit
+from highlander.openstack.common import log as logging
+from highlander.services import events
+from highlander.utils import rest_utils
+
+LOG = logging.getLogger(__name__)
+
+ACTIONS = wtypes.Enum(str, 'create', 'update', 'delete')
+
+
+class Event(resource.Resource):
+    """Change of a resiliency or FT object."""
+
+    id = int
+    entity_type = wtypes.text
+    entity_id = wtypes.text
+    action = ACTIONS
+    created_at = wtypes.text
+
+    @classmethod
+    def sample(cls):
+        return cls(id=42,
+                   entity_type='resiliency_server',
+                   entity_id='123e4567-e89b-12d3-a456-426655440000',
+                   action='update',
+                   created_at='1970-01-01T00:00:00.000000')
+
+
+class Events(resource.Resource):
+    """Events after a cursor and the cursor to continue from."""
+
+    events = [Event]
+    cursor = int
+
+    @classmethod
+    def sample(cls):
+        return cls(events=[Event.sample()], cursor=42)
+
+
+class EventsController(rest.RestController):
+    # Long-polls wait for up to 'timeout' seconds, they would use up the
+    # in-flight slots of listings.
+    @rate_limit.route_class('watch')
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(Events, int, int, int)
+    def get_all(self, since=0, limit=100, timeout=0):
+        """Return the events after a cursor.
+
+        :param since: Cursor returned by the previous call, 0 at first.
+        :param limit: Maximum number of returned events.
+        :param timeout: Seconds to wait for new events if there are none.
+        """
+        LOG.debug("Fetch events [since=%s, timeout=%s]" % (since, timeout))
+
+        db_models = events.get_events_v1(since, limit, timeout)
+
+        return Events(
+            events=[Event.from_dict(events.to_dict(e)) for e in db_models],
+            cursor=db_models[-1].seq if db_models else since
+        )
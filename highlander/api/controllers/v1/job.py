@@ -0,0 +1,108 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import pecan
+from pecan import hooks
+from pecan import rest
+from wsme import types as wtypes
+
+from highlander.api.controllers import resource
+from highlander.api.hooks import content_type as ct_hook
+from highlander.openstack.common import log as logging
+from highlander.services import jobs
+from highlander.utils import rest_utils
+
+LOG = logging.getLogger(__name__)
+
+STATES = wtypes.Enum(str, 'PENDING', 'RUNNING', 'SUCCESS', 'ERROR')
+
+
+class Job(resource.Resource):
+    """Operation run in the background, polled until it is finished."""
+
+    id = wtypes.text
+    type = wtypes.text
+
+    # JSON objects, serialized by rest_utils.to_json().
+    params = {wtypes.text: wtypes.text}
+    result = {wtypes.text: wtypes.text}
+
+    state = STATES
+    error = wtypes.text
+    created_at = wtypes.text
+    updated_at = wtypes.text
+    started_at = wtypes.text
+    finished_at = wtypes.text
+
+    @classmethod
+    def sample(cls):
+        return cls(id='123e4567-e89b-12d3-a456-426655440000',
+                   type='delete_resiliency_group',
+                   params={'id': '123e4567-e89b-12d3-a456-426655440001'},
+                   state='PENDING',
+                   created_at='1970-01-01T00:00:00.000000')
+
+
+# Body of POST requests.
+CREATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": {
+        "type": {"enum": sorted(jobs.JOB_TYPES)},
+        "params": {"type": "object"}
+    },
+    "required": ["type"]
+})
+
+
+class JobsController(rest.RestController, hooks.HookController):
+    __hooks__ = [ct_hook.ContentTypeHook("application/json", ['POST'])]
+
+    @rest_utils.wrap_pecan_controller_exception
+    @pecan.expose(content_type="application/json")
+    def get(self, id):
+        """Return the id-referenced job."""
+        LOG.debug("Fetch Job [id=%s]" % id)
+
+        return rest_utils.to_json(jobs.get_job(id), Job)
+
+    @rest_utils.wrap_pecan_controller_exception
+    @pecan.expose(content_type="application/json")
+    def post(self):
+        """Start a job.
+
+        The job runs in the background, the response is 202 Accepted with
+        the job, PENDING, and its URL in the Location header.
+        """
+        data = rest_utils.load_json_body(CREATE_SCHEMA)
+        LOG.info("Submit job [data=%s]" % data)
+
+        job_db = jobs.submit(data['type'], data.get('params', {}))
+
+        pecan.response.status = 202
+        pecan.response.location = '%s/v1/jobs/%s' % (
+            pecan.request.host_url,
+            job_db.id
+        )
+
+        return rest_utils.to_json(job_db, Job)
+
+    @rest_utils.wrap_pecan_controller_exception
+    @pecan.expose(content_type="application/json")
+    def get_all(self):
+        """Return all jobs, oldest first."""
+        LOG.debug("Fetch jobs.")
+
+        return '{"jobs": [%s]}' % ', '.join(
+            rest_utils.to_json(job_db, Job) for job_db in jobs.list_jobs()
+        )
@@ -12,8 +12,6 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-import json
-
 import pecan
 import wsmeext.pecan as wsme_pecan
 from pecan import hooks
@@ -38,6 +36,7 @@ class ResiliencyGroup(resource.Resource):
     desc = wtypes.text
     created_at = wtypes.text
     updated_at = wtypes.text
+    deleted_at = wtypes.text
     resiliency_strategy_type = RESILIENCY_STRATEGY_TYPES
 
     @classmethod
@@ -60,6 +59,26 @@ class ResiliencyGroups(resource.Resource):
         return cls(resiliency_groups=[ResiliencyGroup.sample()])
 
 
+_PROPERTIES = {
+    "id": {"type": "string", "maxLength": 36},
+    "name": {"type": ["string", "null"], "maxLength": 80},
+    "desc": {"type": ["string", "null"], "maxLength": 255},
+    "resiliency_strategy_type": {"enum": ["ufr", "ft", "nm"]}
+}
+
+# Bodies of POST and PUT requests.
+CREATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": _PROPERTIES
+})
+
+UPDATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": _PROPERTIES,
+    "required": ["id"]
+})
+
+
 class ResiliencyGroupsController(rest.RestController, hooks.HookController):
     __hooks__ = [ct_hook.ContentTypeHook("application/json", ['POST', 'PUT'])]
 
@@ -71,31 +90,38 @@ class ResiliencyGroupsController(rest.RestController, hooks.HookController):
 
         db_model = resiliency_groups.get_resiliency_group_v1(id)
 
+        if rest_utils.not_modified([db_model]):
+            return rest_utils.not_modified_response()
+
         return ResiliencyGroup.from_dict(db_model.to_dict())
 
     @rest_utils.wrap_pecan_controller_exception
     @pecan.expose(content_type="text/plain")
     def put(self):
         """Update a resiliency group."""
-        data = pecan.request.text
+        data = rest_utils.load_json_body(UPDATE_SCHEMA)
         LOG.info("Update Resiliency Group [data=%s]" % data)
 
-        rg_db = resiliency_groups.update_resiliency_group_v1(data)
+        rg_db = resiliency_groups.update_resiliency_group_v1(
+            data,
+            precondition=rest_utils.check_if_match
+        )
+
+        pecan.response.etag = rest_utils.etag([rg_db])
 
-        return ResiliencyGroup.from_dict(rg_db.to_dict()).to_string()
+        return rest_utils.to_json(rg_db, ResiliencyGroup)
 
     @rest_utils.wrap_pecan_controller_exception
     @pecan.expose(content_type="application/json")
     def post(self):
         """Create a new resiliency groups."""
-        data = pecan.request.text
+        data = rest_utils.load_json_body(CREATE_SCHEMA)
         LOG.info("Create resiliency group [data=%s]" % data)
-        data = json.loads(data)
 
         rg_db = resiliency_groups.create_resiliency_group_v1(data)
         pecan.response.status = 201
 
-        return ResiliencyGroup.from_dict(rg_db.to_dict()).to_string()
+        return rest_utils.to_json(rg_db, ResiliencyGroup)
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(None, wtypes.text, status_code=204)
@@ -105,12 +131,24 @@ class ResiliencyGroupsController(rest.RestController, hooks.HookController):
 
         resiliency_groups.delete_resiliency_group_v1(id)
 
-    @wsme_pecan.wsexpose(ResiliencyGroups)
-    def get_all(self):
-        """Return all resiliency groups."""
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(ResiliencyGroups, wtypes.text)
+    def get_all(self, changes_since=None):
+        """Return all resiliency groups.
+
+        :param changes_since: ISO 8601 time, only the objects changed
+            since then are returned, deleted ones included.
+        """
         LOG.info("Fetch resiliency groups.")
 
-        resiliency_group_list = [ResiliencyGroups.from_dict(db_model.to_dict())
-                                 for db_model in resiliency_groups.list_resiliency_groups_v1()]
+        db_models = resiliency_groups.list_resiliency_groups_v1(
+            changes_since=rest_utils.parse_changes_since(changes_since)
+        )
+
+        if rest_utils.not_modified(db_models, collection=True):
+            return rest_utils.not_modified_response()
 
-        return ResiliencyGroups(resiliency_groups=resiliency_group_list)
+        return ResiliencyGroups(resiliency_groups=[
+            ResiliencyGroup.from_dict(db_model.to_dict())
+            for db_model in db_models
+        ])
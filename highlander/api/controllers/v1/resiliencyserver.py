@@ -26,7 +26,6 @@ from highlander.openstack.common import log as logging
 from highlander.utils import rest_utils
 from highlander.services import resiliency_servers
 
-import json
 LOG = logging.getLogger(__name__)
 RESILIENCY_STRATEGY_TYPES = wtypes.Enum(str, 'ufr', 'ft', 'nm')
 
@@ -38,6 +37,7 @@ class ResiliencyServer(resource.Resource):
     desc = wtypes.text
     created_at = wtypes.text
     updated_at = wtypes.text
+    deleted_at = wtypes.text
     resiliency_strategy_type = RESILIENCY_STRATEGY_TYPES
     instance_id = wtypes.text
 
@@ -62,6 +62,30 @@ class ResiliencyServers(resource.Resource):
         return cls(resiliency_servers=[ResiliencyServer.sample()])
 
 
+_PROPERTIES = {
+    "id": {"type": "string", "maxLength": 36},
+    "name": {"type": ["string", "null"], "maxLength": 80},
+    "desc": {"type": ["string", "null"], "maxLength": 255},
+    "resiliency_strategy_type": {"enum": ["ufr", "ft", "nm"]},
+    "instance_id": {
+        "type": ["string", "null"],
+        "pattern": "^[0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}$"
+    }
+}
+
+# Bodies of POST and PUT requests.
+CREATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": _PROPERTIES
+})
+
+UPDATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": _PROPERTIES,
+    "required": ["id"]
+})
+
+
 class ResiliencyServersController(rest.RestController, hooks.HookController):
     __hooks__ = [ct_hook.ContentTypeHook("application/json", ['POST', 'PUT'])]
 
@@ -73,31 +97,37 @@ class ResiliencyServersController(rest.RestController, hooks.HookController):
 
         db_model = resiliency_servers.get_resiliency_server_v1(id)
 
+        if rest_utils.not_modified([db_model]):
+            return rest_utils.not_modified_response()
+
         return ResiliencyServer.from_dict(db_model.to_dict())
 
     @rest_utils.wrap_pecan_controller_exception
     @pecan.expose(content_type="application/json")
     def put(self):
         """Update a resiliency server."""
-        data = pecan.request.text
+        data = rest_utils.load_json_body(UPDATE_SCHEMA)
         LOG.info("Update Resiliency Server [data=%s]" % data)
-        data = json.loads(data)
         
-        rg_db = resiliency_servers.update_resiliency_server_v1(data)
+        rg_db = resiliency_servers.update_resiliency_server_v1(
+            data,
+            precondition=rest_utils.check_if_match
+        )
+
+        pecan.response.etag = rest_utils.etag([rg_db])
         
-        return ResiliencyServer.from_dict(rg_db.to_dict()).to_string()
+        return rest_utils.to_json(rg_db, ResiliencyServer)
 
     @rest_utils.wrap_pecan_controller_exception
     @pecan.expose(content_type="application/json")
     def post(self):
         """Create a new resiliency servers."""
-        data = pecan.request.text
+        data = rest_utils.load_json_body(CREATE_SCHEMA)
         LOG.info("Create resiliency server [data=%s]" % data)
-        data = json.loads(data)
         rg_db = resiliency_servers.create_resiliency_server_v1(data)
         pecan.response.status = 201
 
-        return ResiliencyServer.from_dict(rg_db.to_dict()).to_string()
+        return rest_utils.to_json(rg_db, ResiliencyServer)
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(None, wtypes.text, status_code=204)
@@ -107,12 +137,24 @@ class ResiliencyServersController(rest.RestController, hooks.HookController):
 
         resiliency_servers.delete_resiliency_server_v1(id)
 
-    @wsme_pecan.wsexpose(ResiliencyServers)
-    def get_all(self):
-        """Return all resiliency servers."""
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(ResiliencyServers, wtypes.text)
+    def get_all(self, changes_since=None):
+        """Return all resiliency servers.
+
+        :param changes_since: ISO 8601 time, only the objects changed
+            since then are returned, deleted ones included.
+        """
         LOG.info("Fetch resiliency servers.")
 
-        resiliency_server_list = [ResiliencyServers.from_dict(db_model.to_dict())
-                          for db_model in resiliency_servers.list_resiliency_servers_v1()]
+        db_models = resiliency_servers.list_resiliency_servers_v1(
+            changes_since=rest_utils.parse_changes_since(changes_since)
+        )
+
+        if rest_utils.not_modified(db_models, collection=True):
+            return rest_utils.not_modified_response()
 
-        return ResiliencyServers(resiliency_servers=resiliency_server_list)
+        return ResiliencyServers(resiliency_servers=[
+            ResiliencyServer.from_dict(db_model.to_dict())
+            for db_model in db_models
+        ])
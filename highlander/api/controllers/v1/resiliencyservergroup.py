@@ -26,7 +26,6 @@ from highlander.openstack.common import log as logging
 from highlander.utils import rest_utils
 from highlander.services import resiliency_server_groups
 
-import json
 LOG = logging.getLogger(__name__)
 RESILIENCY_STRATEGY_TYPES = wtypes.Enum(str, 'ufr', 'ft', 'nm')
 
@@ -38,6 +37,7 @@ class ResiliencyServerGroup(resource.Resource):
     desc = wtypes.text
     created_at = wtypes.text
     updated_at = wtypes.text
+    deleted_at = wtypes.text
     resiliency_group_id = wtypes.text
     instance_id = wtypes.text
 
@@ -62,6 +62,27 @@ class ResiliencyServerGroups(resource.Resource):
         return cls(resiliency_server_groups=[ResiliencyServerGroup.sample()])
 
 
+_PROPERTIES = {
+    "id": {"type": "string", "maxLength": 36},
+    "name": {"type": ["string", "null"], "maxLength": 80},
+    "desc": {"type": ["string", "null"], "maxLength": 255},
+    "resiliency_strategy_type": {"enum": ["ufr", "ft", "nm"]},
+    "resiliency_group_id": {"type": "string", "maxLength": 36}
+}
+
+# Bodies of POST and PUT requests.
+CREATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": _PROPERTIES
+})
+
+UPDATE_SCHEMA = rest_utils.JsonSchema({
+    "type": "object",
+    "properties": _PROPERTIES,
+    "required": ["id"]
+})
+
+
 class ResiliencyServerGroupsController(rest.RestController, hooks.HookController):
     __hooks__ = [ct_hook.ContentTypeHook("application/json", ['POST', 'PUT'])]
 
@@ -73,32 +94,38 @@ class ResiliencyServerGroupsController(rest.RestController, hooks.HookController
 
         db_model = resiliency_server_groups.get_resiliency_server_group_v1(id)
 
+        if rest_utils.not_modified([db_model]):
+            return rest_utils.not_modified_response()
+
         return ResiliencyServerGroup.from_dict(db_model.to_dict())
 
     @rest_utils.wrap_pecan_controller_exception
     @pecan.expose(content_type="application/json")
     def put(self):
         """Update a resiliency server."""
-        data = pecan.request.text
+        data = rest_utils.load_json_body(UPDATE_SCHEMA)
         LOG.info("Update Resiliency Server Group [data=%s]" % data)
-        data = json.loads(data)
         
-        rg_db = resiliency_server_groups.update_resiliency_server_group_v1(data)
+        rg_db = resiliency_server_groups.update_resiliency_server_group_v1(
+            data,
+            precondition=rest_utils.check_if_match
+        )
+
+        pecan.response.etag = rest_utils.etag([rg_db])
         
-        return ResiliencyServerGroup.from_dict(rg_db.to_dict()).to_string()
+        return rest_utils.to_json(rg_db, ResiliencyServerGroup)
 
     @rest_utils.wrap_pecan_controller_exception
     @pecan.expose(content_type="application/json")
     def post(self):
         """Create a new resiliency server groups."""
-        data = pecan.request.text
+        data = rest_utils.load_json_body(CREATE_SCHEMA)
         LOG.info("Create resiliency server group [data=%s]" % data)
-        data = json.loads(data)
 
         rg_db = resiliency_server_groups.create_resiliency_server_group_v1(data)
         pecan.response.status = 201
 
-        return ResiliencyServerGroup.from_dict(rg_db.to_dict()).to_string()
+        return rest_utils.to_json(rg_db, ResiliencyServerGroup)
 
     @rest_utils.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(None, wtypes.text, status_code=204)
@@ -108,12 +135,24 @@ class ResiliencyServerGroupsController(rest.RestController, hooks.HookController
 
         resiliency_server_groups.delete_resiliency_server_group_v1(id)
 
-    @wsme_pecan.wsexpose(ResiliencyServerGroups)
-    def get_all(self):
-        """Return all resiliency servers."""
-        LOG.info("Fetch resiliency server groupss.")
-
-        resiliency_server_group_list = [ResiliencyServerGroups.from_dict(db_model.to_dict())
-                          for db_model in resiliency_server_groups.list_resiliency_server_groups_v1()]
-
-        return ResiliencyServerGroups(resiliency_servers=resiliency_server_group_list)
+    @rest_utils.wrap_wsme_controller_exception
+    @wsme_pecan.wsexpose(ResiliencyServerGroups, wtypes.text)
+    def get_all(self, changes_since=None):
+        """Return all resiliency server groups.
+
+        :param changes_since: ISO 8601 time, only the objects changed
+            since then are returned, deleted ones included.
+        """
+        LOG.info("Fetch resiliency server groups.")
+
+        db_models = resiliency_server_groups.list_resiliency_server_groups_v1(
+            changes_since=rest_utils.parse_changes_since(changes_since)
+        )
+
+        if rest_utils.not_modified(db_models, collection=True):
+            return rest_utils.not_modified_response()
+
+        return ResiliencyServerGroups(resiliency_server_groups=[
+            ResiliencyServerGroup.from_dict(db_model.to_dict())
+            for db_model in db_models
+        ])
@@ -18,6 +18,9 @@ import wsmeext.pecan as wsme_pecan
 from wsme import types as wtypes
 
 from highlander.api.controllers import resource
+from highlander.api.controllers.v1 import debug
+from highlander.api.controllers.v1 import event
+from highlander.api.controllers.v1 import job
 from highlander.api.controllers.v1 import resiliencygroup
 from highlander.api.controllers.v1 import resiliencyserver
 from highlander.api.controllers.v1 import resiliencyservergroup
@@ -43,6 +46,9 @@ class Controller(object):
     resiliencygroups = resiliencygroup.ResiliencyGroupsController()
     resiliencyservers = resiliencyserver.ResiliencyServersController()
     resiliencyservergroups = resiliencyservergroup.ResiliencyServerGroupsController()
+    events = event.EventsController()
+    jobs = job.JobsController()
+    debug = debug.DebugController()
 
     @wsme_pecan.wsexpose(RootResource)
     def index(self):
@@ -0,0 +1,70 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import cProfile
+
+from pecan import hooks
+
+from highlander import context as auth_ctx
+from highlander.openstack.common import log as logging
+from highlander.utils import profiler
+
+
+LOG = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Highlander-Profile'
+
+_ENVIRON_KEY = 'highlander.profile'
+
+
+class ProfileHook(hooks.PecanHook):
+    """Profiles requests of admins carrying an X-Highlander-Profile header.
+
+    The profile is saved in [profiler] output_dir, in the format of
+    pstats, and its path returned in the header of the response. cProfile
+    profiles the native thread: greenlets running while the request waits
+    are part of the profile too.
+    """
+
+    # After ContextHook, admins are told apart by the context.
+    priority = 110
+
+    def before(self, state):
+        if PROFILE_HEADER not in state.request.headers:
+            return
+
+        if not auth_ctx.ctx().is_admin:
+            LOG.warning("Profile of a request by a non admin user ignored.")
+
+            return
+
+        profile = cProfile.Profile()
+
+        state.request.environ[_ENVIRON_KEY] = profile
+
+        profile.enable()
+
+    def after(self, state):
+        profile = state.request.environ.pop(_ENVIRON_KEY, None)
+
+        if not profile:
+            return
+
+        profile.disable()
+
+        path = profiler.output_path('request', 'prof')
+
+        profile.dump_stats(path)
+
+        state.response.headers[PROFILE_HEADER] = path
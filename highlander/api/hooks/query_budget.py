@@ -0,0 +1,57 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import traceback
+
+from oslo.config import cfg
+from pecan import hooks
+
+from highlander.db.sqlalchemy import query_counter
+from highlander.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+_ENVIRON_KEY = 'highlander.query_counter'
+
+
+class QueryBudgetHook(hooks.PecanHook):
+    """Warns about requests executing too many statements.
+
+    Used in debug mode, see [pecan] query_budget and query_repeat_budget.
+    """
+
+    def on_route(self, state):
+        request = state.request
+
+        def _warn(message):
+            LOG.warning(
+                "%s [method=%s, path=%s]\n%s"
+                % (message, request.method, request.path,
+                   ''.join(traceback.format_stack()))
+            )
+
+        request.environ[_ENVIRON_KEY] = query_counter.QueryCounter(
+            limit=CONF.pecan.query_budget,
+            repeat_limit=CONF.pecan.query_repeat_budget,
+            on_violation=_warn
+        ).start()
+
+    def after(self, state):
+        counter = state.request.environ.pop(_ENVIRON_KEY, None)
+
+        if counter:
+            counter.stop()
@@ -0,0 +1,253 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Admission control of API requests, see [rate_limit].
+
+Every project has a token bucket: it holds up to 'burst' tokens, refilled
+at 'rate' tokens per second, and every request takes one. Independently,
+every class of routes has a maximum number of requests in flight, so that
+slow listings can't use up the workers reads and writes need.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from oslo.config import cfg
+import pecan
+from pecan import hooks
+
+from highlander.openstack.common import log as logging
+from highlander.services import security
+from highlander import utils
+from highlander.utils import cache
+from highlander.utils import metrics
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('rate_limit', 'highlander.config')
+
+# python-memcached, needed by the memcache backend only.
+memcache = utils.lazy_import('memcache')
+
+_ENVIRON_KEY = 'highlander.route_class'
+
+_ROUTE_CLASSES = {
+    'get_all': 'list',
+    'get': 'read'
+}
+
+
+def route_class(name):
+    """Puts the requests of a controller method in a route class of its own.
+
+    E.g. long-polls, which would hold the in-flight slots of their method's
+    class for the whole wait.
+    """
+    def _decorator(func):
+        func.route_class = name
+
+        return func
+
+    return _decorator
+
+
+class MemoryBackend(object):
+    """Token buckets of the projects, in the API process.
+
+    A bucket is forgotten once it would be full again, a new one is the
+    same.
+    """
+
+    def __init__(self, timer=time.time):
+        self._timer = timer
+        self._buckets = cache.TTLCache(CONF.rate_limit.max_projects, 0)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Takes a token from a bucket.
+
+        :return: 0 if there was one, the number of seconds until there is
+            one otherwise.
+        """
+        with self._lock:
+            now = self._timer()
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+            if tokens < 1:
+                return (1 - tokens) / rate
+
+            tokens -= 1
+
+            self._buckets.put(key, (tokens, now), ttl=(burst - tokens) / rate)
+
+            return 0
+
+
+class MemcacheBackend(object):
+    """Request counters of the projects, shared by the API processes.
+
+    Approximates the buckets with fixed windows of burst / rate seconds,
+    every window lets 'burst' requests in.
+    """
+
+    def __init__(self, timer=time.time):
+        self._timer = timer
+        self._client = memcache.Client(CONF.rate_limit.memcached_servers)
+
+    def take(self, key, rate, burst):
+        now = self._timer()
+        period = burst / rate
+        window = int(now / period)
+
+        counter_key = 'highlander-rate-%s-%s' % (
+            hashlib.sha1(key.encode('utf-8')).hexdigest(),
+            window
+        )
+
+        if self._client.add(counter_key, 1, time=int(math.ceil(period)) + 1):
+            count = 1
+        else:
+            # None if memcached is unavailable, requests are let in then.
+            count = self._client.incr(counter_key) or 1
+
+        if count > burst:
+            return (window + 1) * period - now
+
+        return 0
+
+
+_BACKENDS = {
+    'memory': MemoryBackend,
+    'memcache': MemcacheBackend
+}
+
+
+def _parse_project_limits(project_limits):
+    limits = {}
+
+    for project_id, value in project_limits.items():
+        rate, _, burst = value.partition('/')
+
+        try:
+            limits[project_id] = (
+                float(rate),
+                int(burst) if burst else CONF.rate_limit.burst
+            )
+        except ValueError:
+            raise ValueError(
+                "Invalid [rate_limit] project_limits of project %s: %s"
+                % (project_id, value)
+            )
+
+    return limits
+
+
+def _route_class(state):
+    controller = getattr(state, 'controller', None)
+
+    return getattr(controller, 'route_class', None) or _ROUTE_CLASSES.get(
+        getattr(controller, '__name__', None),
+        'write'
+    )
+
+
+def _too_many_requests(reason, route_class, retry_after, message):
+    metrics.REJECTED_REQUESTS.inc(1, reason, route_class)
+
+    pecan.abort(
+        429,
+        message,
+        headers={'Retry-After': str(int(math.ceil(retry_after)))}
+    )
+
+
+class RateLimitHook(hooks.PecanHook):
+    """Rejects requests over the limits of [rate_limit] with 429."""
+
+    # After ContextHook and AuthHook, requests belong to a project then.
+    priority = 105
+
+    def __init__(self, backend=None):
+        self.backend = backend or _BACKENDS[CONF.rate_limit.backend]()
+        self.project_limits = _parse_project_limits(
+            CONF.rate_limit.project_limits
+        )
+        self.max_in_flight = dict(
+            (route_class, int(value))
+            for route_class, value in CONF.rate_limit.max_in_flight.items()
+        )
+
+        self._in_flight = dict((k, 0) for k in self.max_in_flight)
+        self._lock = threading.Lock()
+
+    def before(self, state):
+        route_class = _route_class(state)
+        project_id = security.get_project_id() or security.DEFAULT_PROJECT_ID
+
+        rate, burst = self.project_limits.get(
+            project_id,
+            (CONF.rate_limit.rate, CONF.rate_limit.burst)
+        )
+
+        if rate > 0:
+            retry_after = self.backend.take(project_id, rate, burst)
+
+            if retry_after:
+                LOG.debug("Rate limit of project %s exceeded." % project_id)
+
+                _too_many_requests(
+                    'rate',
+                    route_class,
+                    retry_after,
+                    "Rate limit exceeded, retry in %.1f seconds." % retry_after
+                )
+
+        max_in_flight = self.max_in_flight.get(route_class, 0)
+
+        if max_in_flight <= 0:
+            return
+
+        with self._lock:
+            if self._in_flight[route_class] >= max_in_flight:
+                full = True
+            else:
+                full = False
+
+                self._in_flight[route_class] += 1
+
+        if full:
+            _too_many_requests(
+                'in_flight',
+                route_class,
+                1,
+                "Too many requests in progress, retry later."
+            )
+
+        state.request.environ[_ENVIRON_KEY] = route_class
+
+    def after(self, state):
+        route_class = state.request.environ.pop(_ENVIRON_KEY, None)
+
+        if route_class:
+            with self._lock:
+                self._in_flight[route_class] -= 1
@@ -0,0 +1,102 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+from oslo.config import cfg
+from pecan import hooks
+import wsmeext.pecan as wsme_pecan
+
+from highlander.utils import metrics
+
+
+CONF = cfg.CONF
+CONF.import_group('metrics', 'highlander.config')
+
+TIMING_HEADER = 'X-Highlander-Timing'
+
+
+def _route(state):
+    # Routes are named after controller methods, URLs would make a series
+    # of every object.
+    controller = getattr(state, 'controller', None)
+    owner = getattr(controller, '__self__', None)
+
+    if owner is None:
+        return 'unrouted'
+
+    return '%s.%s' % (owner.__class__.__name__, controller.__name__)
+
+
+class TimingHook(hooks.PecanHook):
+    """Records the latency of requests and the parts it is made of."""
+
+    # Runs first and finishes last so that other hooks are measured too.
+    priority = 1
+
+    def on_route(self, state):
+        metrics.start_request()
+
+    def after(self, state):
+        request_metrics = metrics.end_request()
+
+        if not request_metrics:
+            return
+
+        elapsed = request_metrics.elapsed()
+        route = _route(state)
+
+        metrics.REQUEST_DURATION.observe(
+            elapsed,
+            state.request.method,
+            route,
+            state.response.status_int
+        )
+        metrics.REQUEST_STATEMENTS.observe(request_metrics.statements, route)
+        metrics.REQUEST_DB_DURATION.observe(request_metrics.db_time, route)
+        metrics.SERIALIZATION_DURATION.observe(
+            request_metrics.serialization,
+            route
+        )
+
+        if CONF.metrics.timing_header:
+            state.response.headers[TIMING_HEADER] = (
+                'total=%.2fms; db=%.2fms; db_statements=%d; '
+                'pool_wait=%.2fms; serialization=%.2fms' % (
+                    elapsed * 1000,
+                    request_metrics.db_time * 1000,
+                    request_metrics.statements,
+                    request_metrics.pool_wait * 1000,
+                    request_metrics.serialization * 1000
+                )
+            )
+
+
+class TimedJSonRenderer(object):
+    """Renders WSME results as JSON, measures how long it takes."""
+
+    def __init__(self, path, extra_vars):
+        pass
+
+    def render(self, template_path, namespace):
+        started = time.time()
+
+        try:
+            return wsme_pecan.JSonRenderer.render(template_path, namespace)
+        finally:
+            metrics.add_serialization_time(time.time() - started)
+
+
+# Replace the renderers of wsexpose().
+RENDERERS = {'wsmejson': TimedJSonRenderer}
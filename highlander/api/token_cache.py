@@ -0,0 +1,105 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Cache of the token validations of keystonemiddleware.
+
+auth_token looks tokens up in the cache it finds in the WSGI environment,
+under the key of its 'cache' option, before asking keystone to validate
+them. The API puts a TokenCache there: an LRU of the process, or memcached
+when [keystone_authtoken] memcached_servers is set. With
+memcache_security_strategy set, auth_token authenticates or encrypts the
+entries before they get to the cache.
+"""
+
+from oslo.config import cfg
+
+from highlander import utils
+from highlander.utils import cache
+from highlander.utils import metrics
+
+
+CONF = cfg.CONF
+CONF.import_group('keystone', 'highlander.config')
+
+ENV_KEY = 'highlander.token_cache'
+
+# What auth_token caches, in JSON, for the tokens keystone rejected.
+INVALID = '"invalid"'
+
+# python-memcached, needed only for shared caches.
+memcache = utils.lazy_import('memcache')
+
+
+class TokenCache(object):
+    """Memcache client interface over an LRU or memcached.
+
+    Tokens keystone rejected are cached for [keystone]
+    invalid_token_cache_ttl seconds at most, a burst of requests with a bad
+    token costs a single validation.
+    """
+
+    def __init__(self, memcached_servers=None):
+        if memcached_servers:
+            self._memcache = memcache.Client(memcached_servers)
+            self._lru = None
+        else:
+            self._memcache = None
+            self._lru = cache.TTLCache(
+                CONF.keystone.auth_token_cache_size,
+                CONF.keystone.token_cache_ttl
+            )
+
+    def get(self, key):
+        if self._memcache:
+            value = self._memcache.get(key)
+        else:
+            value = self._lru.get(key)
+
+        if value is None:
+            result = 'miss'
+        elif value == INVALID:
+            result = 'invalid'
+        else:
+            result = 'hit'
+
+        metrics.TOKEN_CACHE_LOOKUPS.inc(1, result)
+
+        return value
+
+    def set(self, key, value, time=0):
+        if value == INVALID:
+            negative_ttl = CONF.keystone.invalid_token_cache_ttl
+
+            if negative_ttl <= 0:
+                return
+
+            time = min(time or negative_ttl, negative_ttl)
+
+        if self._memcache:
+            self._memcache.set(key, value, time=time)
+        else:
+            self._lru.put(key, value, ttl=time or None)
+
+
+class TokenCacheMiddleware(object):
+    """Hands the token cache to auth_token."""
+
+    def __init__(self, app, token_cache):
+        self.app = app
+        self.token_cache = token_cache
+
+    def __call__(self, environ, start_response):
+        environ[ENV_KEY] = self.token_cache
+
+        return self.app(environ, start_response)
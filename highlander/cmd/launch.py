@@ -41,39 +41,80 @@ if os.path.exists(os.path.join(POSSIBLE_TOPDIR, 'highlander', '__init__.py')):
     sys.path.insert(0, POSSIBLE_TOPDIR)
 
 
+from eventlet import wsgi
 from oslo.config import cfg
-from oslo import messaging
-from wsgiref import simple_server
 
-from highlander.api import app
 from highlander import config
-from highlander import context as ctx
-from highlander.db.v1 import api as db_api
-
-from highlander.engine import rpc
 from highlander.openstack.common import log as logging
+from highlander import utils
+from highlander.utils import profiler
 from highlander import version
 
 
 LOG = logging.getLogger(__name__)
 
+# Components import what only they need when they are launched: an API
+# worker doesn't load the engine, the health probes or oslo.messaging.
+app = utils.lazy_import('highlander.api.app')
+db_api = utils.lazy_import('highlander.db.v1.api')
+def_eng = utils.lazy_import('highlander.engine.default_engine')
+events = utils.lazy_import('highlander.services.events')
+jobs = utils.lazy_import('highlander.services.jobs')
+monitor = utils.lazy_import('highlander.health.monitor')
+rpc = utils.lazy_import('highlander.engine.rpc')
+
+
+def launch_engine(transport):
+    engine = def_eng.DefaultEngine(rpc.get_engine_client())
+
+    db_api.check_db()
+
+    server = rpc.get_engine_server(transport, engine)
+
+    # Change events go out as notifications of the engine.
+    dispatcher = events.EventDispatcher(transport)
+    dispatcher.start()
+
+    LOG.info("Highlander engine is listening on topic '%s' (PID=%s)" %
+             (cfg.CONF.engine.topic, os.getpid()))
+
+    server.start()
+    server.wait()
 
 
+def launch_health(transport):
+    health_monitor = monitor.HealthMonitor()
+
+    health_monitor.start()
+
+    LOG.info("Highlander health monitor is checking %s servers (PID=%s)" %
+             (len(health_monitor), os.getpid()))
+
+    health_monitor.wait()
+
 
 def launch_api(transport):
     host = cfg.CONF.api.host
     port = cfg.CONF.api.port
 
-    server = simple_server.make_server(
-        host,
-        port,
-        app.setup_app()
-    )
+    # Requests are served concurrently, GET /v1/events may wait for a
+    # while before it responds.
+    sock = eventlet.listen((host, port))
+
+    application = app.setup_app()
+
+    # Fails the jobs of the API processes that ran before, after the
+    # database was checked by setup_app().
+    jobs.start()
 
     LOG.info("Highlander API is serving on http://%s:%s (PID=%s)" %
              (host, port, os.getpid()))
 
-    server.serve_forever()
+    wsgi.server(
+        sock,
+        application,
+        log=logging.WritableLogger(LOG)
+    )
 
 
 def launch_any(transport, options):
@@ -89,8 +130,9 @@ def launch_any(transport, options):
 # Map cli options to appropriate functions. The cli options are
 # registered in highlander's config.py.
 LAUNCH_OPTIONS = {
-    'api': launch_api
-
+    'api': launch_api,
+    'engine': launch_engine,
+    'health': launch_health
 }
 
 
@@ -123,6 +165,19 @@ def main():
 
         logging.setup('Highlander')
 
+        # kill -USR2 <pid> saves a CPU profile, see [profiler].
+        profiler.install_signal_handler()
+
+        if cfg.CONF.server == ['all']:
+            options = LAUNCH_OPTIONS.keys()
+        else:
+            # Validate launch option.
+            if set(cfg.CONF.server) - set(LAUNCH_OPTIONS.keys()):
+                raise Exception('Valid options are all or any combination of '
+                                'api, engine, and health.')
+
+            options = set(cfg.CONF.server)
+
         # Please refer to the oslo.messaging documentation for transport
         # configuration. The default transport for oslo.messaging is
         # rabbitMQ. The available transport drivers are listed in the
@@ -138,19 +193,14 @@ def main():
         # servers are launched on the same process. Otherwise, messages do not
         # get delivered if the Highlander servers are launched on different
         # processes because the "fake" transport is using an in process queue.
-        transport = rpc.get_transport()
-
-        if cfg.CONF.server == ['all']:
-            # Launch all servers.
-            launch_any(transport, LAUNCH_OPTIONS.keys())
+        # The API alone doesn't send messages.
+        if set(options) - set(['api']):
+            transport = rpc.get_transport()
         else:
-            # Validate launch option.
-            if set(cfg.CONF.server) - set(LAUNCH_OPTIONS.keys()):
-                raise Exception('Valid options are all or any combination of '
-                                'api, engine, and executor.')
+            transport = None
 
-            # Launch distinct set of server(s).
-            launch_any(transport, set(cfg.CONF.server))
+        # Launch all or a distinct set of server(s).
+        launch_any(transport, options)
 
     except RuntimeError as excp:
         sys.stderr.write("ERROR: %s\n" % excp)
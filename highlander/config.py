@@ -29,12 +29,28 @@ launch_opt = cfg.ListOpt(
     default=['all'],
     help='Specifies which highlander server to start by the launch script. '
          'Valid options are all or any combination of '
-         'api, engine, and executor.'
+         'api, engine, and health.'
 )
 
 api_opts = [
     cfg.StrOpt('host', default='0.0.0.0', help='Highlander API server host'),
-    cfg.IntOpt('port', default=8989, help='Highlander API server port')
+    cfg.IntOpt('port', default=8989, help='Highlander API server port'),
+    cfg.BoolOpt('compression', default=True,
+                help='Compresses responses for clients accepting gzip, '
+                     'deflate or, if the brotli module is installed, br.'),
+    cfg.IntOpt('compression_min_size', default=1024,
+               help='Minimum number of bytes of a response body worth '
+                    'compressing.'),
+    cfg.IntOpt('compression_level', default=6,
+               help='Level of gzip and deflate compression, from 1 (fast) '
+                    'to 9 (small).'),
+    cfg.IntOpt('brotli_quality', default=4,
+               help='Quality of brotli compression, from 0 (fast) to 11 '
+                    '(small).'),
+    cfg.ListOpt('compression_types',
+                default=['application/json', 'application/xml',
+                         'text/html', 'text/plain'],
+                help='Content types of the responses that are compressed.')
 ]
 
 pecan_opts = [
@@ -48,7 +64,16 @@ pecan_opts = [
                      'browser and interactively debug during '
                      'development.'),
     cfg.BoolOpt('auth_enable', default=True,
-                help='Enables user authentication in pecan.')
+                help='Enables user authentication in pecan.'),
+    cfg.IntOpt('query_budget', default=50,
+               help='Number of database statements a request may execute '
+                    'in debug mode before a warning with the stack trace '
+                    'of the next one is logged.'),
+    cfg.IntOpt('query_repeat_budget', default=5,
+               help='Number of times a request may execute the same SELECT '
+                    'statement in debug mode before a warning with a stack '
+                    'trace is logged, objects are then usually loaded one '
+                    'by one.')
 ]
 
 use_debugger = cfg.BoolOpt(
@@ -70,7 +95,20 @@ engine_opts = [
     cfg.StrOpt('topic', default='engine',
                help='The message topic that the engine listens on.'),
     cfg.StrOpt('version', default='1.0',
-               help='The version of the engine.')
+               help='The version of the engine.'),
+    cfg.IntOpt('batch_size', default=100,
+               help='Maximum number of state changes the engine client '
+                    'sends in one RPC message.'),
+    cfg.FloatOpt('batch_interval', default=0.05,
+                 help='Seconds the engine client waits for more state '
+                      'changes before sending the ones it has.'),
+    cfg.IntOpt('max_in_flight', default=10,
+               help='Maximum number of RPC messages the engine client '
+                    'sends concurrently. Callers block once it is '
+                    'reached.'),
+    cfg.IntOpt('expression_cache_size', default=1000,
+               help='Maximum number of compiled expressions kept in '
+                    'memory.')
 ]
 
 executor_opts = [
@@ -84,6 +122,224 @@ executor_opts = [
                help='The version of the executor.')
 ]
 
+migration_opts = [
+    cfg.IntOpt('backfill_batch_size', default=1000,
+               help='Number of rows updated per transaction by online data '
+                    'migrations.'),
+    cfg.FloatOpt('backfill_sleep', default=0.1,
+                 help='Seconds to pause between two batches of an online '
+                      'data migration to leave room for regular load.'),
+    cfg.IntOpt('backfill_rows_per_second', default=2000,
+               help='Expected throughput of batched data migrations, '
+                    'used for runtime estimates.'),
+    cfg.IntOpt('index_rows_per_second', default=50000,
+               help='Expected throughput of online index builds, used for '
+                    'runtime estimates.'),
+    cfg.IntOpt('rewrite_rows_per_second', default=20000,
+               help='Expected throughput of schema changes that copy the '
+                    'whole table, used for runtime estimates.')
+]
+
+keystone_opts = [
+    cfg.IntOpt('client_cache_size', default=100,
+               help='Maximum number of authenticated keystone clients kept '
+                    'for reuse.'),
+    cfg.IntOpt('token_expiry_margin', default=60,
+               help='Cached keystone clients and tokens are dropped this '
+                    'number of seconds before their token expires.'),
+    cfg.IntOpt('catalog_cache_ttl', default=300,
+               help='Number of seconds service endpoints are cached.'),
+    cfg.IntOpt('token_cache_ttl', default=300,
+               help='Maximum number of seconds the result of a token '
+                    'validation is cached.'),
+    cfg.IntOpt('auth_token_cache_size', default=10000,
+               help='Maximum number of token validations the API caches '
+                    'in-process, when [keystone_authtoken] '
+                    'memcached_servers is not set.'),
+    cfg.IntOpt('invalid_token_cache_ttl', default=60,
+               help='Number of seconds tokens rejected by keystone are '
+                    'remembered as invalid by the API.')
+]
+
+trust_opts = [
+    cfg.IntOpt('delete_batch_size', default=20,
+               help='Maximum number of unused trusts deleted concurrently.'),
+    cfg.FloatOpt('delete_interval', default=1.0,
+                 help='Seconds between two rounds of deleting unused '
+                      'trusts.')
+]
+
+ssh_opts = [
+    cfg.IntOpt('max_connections_per_host', default=4,
+               help='Maximum number of pooled SSH connections to the same '
+                    'host and user.'),
+    cfg.IntOpt('max_channels_per_connection', default=8,
+               help='Maximum number of commands run concurrently over one '
+                    'SSH connection. Must not exceed MaxSessions of sshd.'),
+    cfg.IntOpt('idle_timeout', default=300,
+               help='Seconds after which an unused pooled SSH connection is '
+                    'closed.'),
+    cfg.IntOpt('health_check_interval', default=30,
+               help='Pooled SSH connections idle for more than this number '
+                    'of seconds are probed before being reused.'),
+    cfg.IntOpt('connect_timeout', default=10,
+               help='Timeout in seconds for establishing SSH connections.'),
+    cfg.IntOpt('acquire_timeout', default=60,
+               help='Seconds a command waits for a free channel when all '
+                    'SSH connections to its host are busy.')
+]
+
+javascript_opts = [
+    cfg.StrOpt('evaluator', default='auto',
+               choices=['auto', 'pyv8', 'nodejs'],
+               help='JavaScript engine. "auto" uses PyV8 when it is '
+                    'installed and falls back to Node.js otherwise.'),
+    cfg.StrOpt('node_executable', default='node',
+               help='Path to the Node.js executable used by the nodejs '
+                    'evaluator.'),
+    cfg.IntOpt('pool_size', default=4,
+               help='Maximum number of warm JavaScript contexts.'),
+    cfg.IntOpt('script_cache_size', default=128,
+               help='Maximum number of compiled scripts cached per '
+                    'JavaScript context.'),
+    cfg.IntOpt('timeout', default=30,
+               help='Seconds after which a Node.js evaluation is aborted '
+                    'and its worker process killed.')
+]
+
+provisioning_opts = [
+    cfg.IntOpt('max_workers', default=16,
+               help='Maximum number of objects of a resiliency group '
+                    'created concurrently.'),
+    cfg.StrOpt('driver',
+               default='highlander.tasks.resiliency.NoopDriver',
+               help='Class creating the cloud resources (instances, '
+                    'volumes, ports) of provisioned resiliency objects.')
+]
+
+health_opts = [
+    cfg.StrOpt('probe', default='highlander.health.probes.NovaProbe',
+               help='Class checking the liveness of resiliency servers.'),
+    cfg.FloatOpt('interval', default=30.0,
+                 help='Seconds between two checks of a healthy server.'),
+    cfg.FloatOpt('degraded_interval', default=5.0,
+                 help='Seconds between two checks of a server that is '
+                      'degraded, failed or could not be checked.'),
+    cfg.IntOpt('concurrency', default=100,
+               help='Maximum number of servers checked at the same time.'),
+    cfg.FloatOpt('probe_timeout', default=10.0,
+                 help='Seconds after which a check is abandoned and the '
+                      'server is considered unknown.'),
+    cfg.IntOpt('batch_size', default=500,
+               help='Maximum number of health state changes written to '
+                    'the database at once.'),
+    cfg.FloatOpt('batch_interval', default=2.0,
+                 help='Seconds health state changes are buffered before '
+                      'being written.'),
+    cfg.FloatOpt('changes_interval', default=10.0,
+                 help='Seconds between two reads of the servers created, '
+                      'moved or deleted by other services.'),
+    cfg.StrOpt('ssh_username', default='root',
+               help='User the SSH probe logs into hypervisors as.'),
+    cfg.StrOpt('ssh_password', secret=True,
+               help='Password of the SSH probe user.'),
+    cfg.StrOpt('ssh_command', default='virsh domstate %(instance_id)s',
+               help='Command the SSH probe runs on the hypervisor of a '
+                    'server, its output is the state of the instance.')
+]
+
+events_opts = [
+    cfg.IntOpt('batch_size', default=500,
+               help='Maximum number of change events sent as notifications '
+                    'in one round.'),
+    cfg.FloatOpt('dispatch_interval', default=1.0,
+                 help='Seconds the dispatcher waits when it has sent all '
+                      'change events. New events are returned by GET '
+                      '/v1/events once the dispatcher numbered them.'),
+    cfg.IntOpt('retention', default=86400,
+               help='Seconds sent change events are kept for clients '
+                    'reading GET /v1/events.'),
+    cfg.FloatOpt('poll_interval', default=0.5,
+                 help='Seconds between two reads of a GET /v1/events '
+                      'request waiting for new events.'),
+    cfg.IntOpt('max_poll_timeout', default=30,
+               help='Maximum number of seconds a GET /v1/events request '
+                    'waits for new events.')
+]
+
+metrics_opts = [
+    cfg.BoolOpt('enabled', default=False,
+                help='Measures API requests and database statements and '
+                     'exposes the results on GET /metrics, in the '
+                     'Prometheus text format and without authentication.'),
+    cfg.BoolOpt('timing_header', default=False,
+                help='Breaks the time of each API request down in an '
+                     'X-Highlander-Timing response header, requires '
+                     'enabled.')
+]
+
+profiler_opts = [
+    cfg.BoolOpt('enabled', default=False,
+                help='Lets admins record CPU profiles: POST '
+                     '/v1/debug/profile samples the stacks of the API '
+                     'process, requests with an X-Highlander-Profile header '
+                     'are profiled with cProfile. SIGUSR2 records a profile '
+                     'of any Highlander process regardless.'),
+    cfg.FloatOpt('interval', default=0.005,
+                 help='Seconds between two samples of the stacks.'),
+    cfg.IntOpt('max_seconds', default=60,
+               help='Maximum duration of a sampled profile.'),
+    cfg.IntOpt('signal_seconds', default=30,
+               help='Duration of the profile SIGUSR2 records.'),
+    cfg.StrOpt('output_dir',
+               help='Directory profiles are saved in, the temporary '
+                    'directory by default.')
+]
+
+rate_limit_opts = [
+    cfg.BoolOpt('enabled', default=False,
+                help='Limits the rate of the API requests of every project '
+                     'and the number of requests the API handles at once. '
+                     'Requests over the limits get 429 Too Many Requests.'),
+    cfg.FloatOpt('rate', default=20.0,
+                 help='Requests per second a project may send on average.'),
+    cfg.IntOpt('burst', default=40,
+               help='Requests a project may send at once after being idle.'),
+    cfg.DictOpt('project_limits', default={},
+                help='Limits of particular projects, as '
+                     '<project id>:<rate>/<burst>, the burst is optional.'),
+    cfg.DictOpt('max_in_flight',
+                default={'list': '10', 'read': '50', 'write': '20',
+                         'watch': '100'},
+                help='Requests handled at once per API process, by class of '
+                     'route: list (get_all), read (get), watch (long-polls '
+                     'of GET /v1/events) and write (any other method). 0, '
+                     'or a missing class, is unlimited.'),
+    cfg.StrOpt('backend', default='memory', choices=['memory', 'memcache'],
+               help='Where the rates of projects are counted: memory, per '
+                    'API process, or memcache, shared by all of them.'),
+    cfg.ListOpt('memcached_servers', default=[],
+                help='Memcached servers of the memcache backend.'),
+    cfg.IntOpt('max_projects', default=10000,
+               help='Maximum number of projects the memory backend tracks '
+                    'at once.')
+]
+
+jobs_opts = [
+    cfg.IntOpt('workers', default=4,
+               help='Jobs run at once per API process.'),
+    cfg.IntOpt('max_pending', default=100,
+               help='Jobs waiting for a worker per API process, further '
+                    'jobs are rejected with 503 Service Unavailable.'),
+    cfg.IntOpt('heartbeat_interval', default=10,
+               help='Seconds between heartbeats of the pending and running '
+                    'jobs of an API process.'),
+    cfg.IntOpt('lease_timeout', default=60,
+               help='Seconds without a heartbeat after which pending and '
+                    'running jobs are failed, their API process is '
+                    'considered dead.')
+]
+
 wf_trace_log_name_opt = cfg.StrOpt(
     'workflow_trace_log_name',
     default='workflow_trace',
@@ -97,6 +353,18 @@ CONF.register_opts(api_opts, group='api')
 CONF.register_opts(engine_opts, group='engine')
 CONF.register_opts(pecan_opts, group='pecan')
 CONF.register_opts(executor_opts, group='executor')
+CONF.register_opts(migration_opts, group='migration')
+CONF.register_opts(keystone_opts, group='keystone')
+CONF.register_opts(trust_opts, group='trusts')
+CONF.register_opts(ssh_opts, group='ssh')
+CONF.register_opts(javascript_opts, group='javascript')
+CONF.register_opts(provisioning_opts, group='provisioning')
+CONF.register_opts(health_opts, group='health')
+CONF.register_opts(events_opts, group='events')
+CONF.register_opts(metrics_opts, group='metrics')
+CONF.register_opts(profiler_opts, group='profiler')
+CONF.register_opts(rate_limit_opts, group='rate_limit')
+CONF.register_opts(jobs_opts, group='jobs')
 CONF.register_opt(wf_trace_log_name_opt)
 
 CONF.register_cli_opt(use_debugger)
@@ -14,21 +14,20 @@
 #    limitations under the License.
 
 import eventlet
-from keystoneclient.v3 import client as keystone_client
 from oslo.config import cfg
-import oslo.messaging as messaging
 import pecan
 from pecan import hooks
 
 from highlander import exceptions as exc
-from highlander.openstack.common import jsonutils
 from highlander import utils
 
 
 CONF = cfg.CONF
 
+keystone_client = utils.lazy_import('keystoneclient.v3.client')
+
 _CTX_THREAD_LOCAL_NAME = "HIGHLANDER_APP_CTX_THREAD_LOCAL"
-ALLOWED_WITHOUT_AUTH = ['/', '/v1/']
+ALLOWED_WITHOUT_AUTH = ['/', '/v1/', '/metrics']
 
 
 class BaseContext(object):
@@ -118,6 +117,8 @@ def spawn(thread_description, func, *args, **kwargs):
 
 
 def context_from_headers(headers):
+    roles = headers.get('X-Roles', "").split(",")
+
     return HighlanderContext(
         user_id=headers.get('X-User-Id'),
         project_id=headers.get('X-Project-Id'),
@@ -125,12 +126,15 @@ def context_from_headers(headers):
         service_catalog=headers.get('X-Service-Catalog'),
         user_name=headers.get('X-User-Name'),
         project_name=headers.get('X-Project-Name'),
-        roles=headers.get('X-Roles', "").split(","),
+        roles=roles,
+        is_admin='admin' in roles,
         is_trust_scoped=False,
     )
 
 
 def context_from_config():
+    CONF.import_group('keystone_authtoken', 'keystonemiddleware.auth_token')
+
     keystone = keystone_client.Client(
         username=CONF.keystone_authtoken.admin_user,
         password=CONF.keystone_authtoken.admin_password,
@@ -151,38 +155,6 @@ def context_from_config():
     )
 
 
-class JsonPayloadSerializer(messaging.NoOpSerializer):
-    @staticmethod
-    def serialize_entity(context, entity):
-        return jsonutils.to_primitive(entity, convert_instances=True)
-
-
-class RpcContextSerializer(messaging.Serializer):
-    def __init__(self, base=None):
-        self._base = base or messaging.NoOpSerializer()
-
-    def serialize_entity(self, context, entity):
-        if not self._base:
-            return entity
-
-        return self._base.serialize_entity(context, entity)
-
-    def deserialize_entity(self, context, entity):
-        if not self._base:
-            return entity
-
-        return self._base.deserialize_entity(context, entity)
-
-    def serialize_context(self, context):
-        return context.to_dict()
-
-    def deserialize_context(self, context):
-        ctx = HighlanderContext(**context)
-        set_ctx(ctx)
-
-        return ctx
-
-
 class AuthHook(hooks.PecanHook):
     def before(self, state):
         if state.request.path in ALLOWED_WITHOUT_AUTH:
@@ -22,6 +22,7 @@ from highlander.db.sqlalchemy import sqlite_lock
 from highlander import exceptions as exc
 from highlander.openstack.common import log as logging
 from highlander import utils
+from highlander.utils import metrics
 
 
 LOG = logging.getLogger(__name__)
@@ -45,6 +46,9 @@ def _get_facade():
             **dict(cfg.CONF.database.iteritems())
         )
 
+        if cfg.CONF.metrics.enabled:
+            metrics.instrument_engine(_facade.get_engine())
+
     return _facade
 
 
@@ -76,6 +80,18 @@ def _set_thread_local_session(session):
     utils.set_thread_local(_DB_SESSION_THREAD_LOCAL_NAME, session)
 
 
+def get_session():
+    """Returns the session of the transaction started within this thread."""
+    ses = _get_thread_local_session()
+
+    if not ses:
+        raise exc.DataAccessException(
+            "Database transaction has not been started."
+        )
+
+    return ses
+
+
 def session_aware(param_name="session"):
     """Decorator for methods working within db session."""
 
@@ -113,6 +129,11 @@ def session_aware(param_name="session"):
 # Transaction management.
 
 
+def in_tx():
+    """Tells whether a session is open within this thread."""
+    return _get_thread_local_session() is not None
+
+
 def start_tx():
     """Opens new database session and starts new transaction assuming
         there wasn't any opened sessions within the same thread.
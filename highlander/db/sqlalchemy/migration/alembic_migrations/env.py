@@ -0,0 +1,90 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import with_statement
+
+from alembic import context
+from logging import config as log_config
+import sqlalchemy as sa
+from sqlalchemy import pool
+
+from highlander.db.sqlalchemy import model_base
+from highlander.db.v1.sqlalchemy import models  # noqa
+
+
+# This is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+highlander_config = config.highlander_config
+
+# Interpret the config file for Python logging unless the caller (e.g. a
+# test) has its own logging set up.
+if config.attributes.get('configure_logger', True):
+    log_config.fileConfig(config.config_file_name)
+
+target_metadata = model_base.HighlanderModelBase.metadata
+
+
+def run_migrations_offline():
+    """Run migrations in 'offline' mode.
+
+    Only the URL is needed, statements are emitted to the script output
+    instead of being executed.
+    """
+    context.configure(url=highlander_config.database.connection)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations in 'online' mode.
+
+    Every revision is committed on its own so that long running online
+    migrations don't keep a single transaction open for the whole upgrade.
+    """
+    connection = config.attributes.get('connection')
+
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
+    engine = sa.create_engine(
+        highlander_config.database.connection,
+        poolclass=pool.NullPool
+    )
+
+    connection = engine.connect()
+
+    try:
+        _run_migrations(connection)
+    finally:
+        connection.close()
+
+
+def _run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
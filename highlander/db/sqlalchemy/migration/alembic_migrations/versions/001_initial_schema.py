@@ -0,0 +1,647 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Initial schema
+
+Revision ID: 001
+Revises: None
+Create Date: 2026-10-19 16:30:07.383080
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'resiliency_group',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column(
+            'resiliency_strategy_type',
+            sa.Enum('ufr', 'ft', 'nm'),
+            nullable=False
+        ),
+        sa.Column('stack_id', sa.String(length=36), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name', 'project_id')
+    )
+    op.create_table(
+        'resiliency_server_group',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column(
+            'resiliency_strategy_type',
+            sa.Enum('ufr', 'ft', 'nm'),
+            nullable=False
+        ),
+        sa.Column('resiliency_group_id', sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['resiliency_group_id'],
+            ['resiliency_group.id']
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name', 'project_id')
+    )
+    op.create_table(
+        'resiliency_server',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column(
+            'resiliency_strategy_type',
+            sa.Enum('ufr', 'ft', 'nm'),
+            nullable=False
+        ),
+        sa.Column('instance_id', sa.String(length=36), nullable=True),
+        sa.Column('resiliency_id', sa.Integer(), nullable=True),
+        sa.Column('is_recovery', sa.Boolean(), nullable=True),
+        sa.Column(
+            'target_recovery_hypervisor_id',
+            sa.String(length=255),
+            nullable=True
+        ),
+        sa.Column('was_relocated', sa.Boolean(), nullable=True),
+        sa.Column('affinity', sa.String(length=80), nullable=True),
+        sa.Column(
+            'replacement_resiliency_server_id',
+            sa.String(length=36),
+            nullable=True
+        ),
+        sa.Column(
+            'resiliency_server_group_id',
+            sa.String(length=36),
+            nullable=True
+        ),
+        sa.ForeignKeyConstraint(
+            ['replacement_resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_group_id'],
+            ['resiliency_server_group.id']
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name', 'project_id')
+    )
+    op.create_table(
+        'resiliency_nic_logical',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column('type', sa.String(length=40), nullable=True),
+        sa.Column('nic_id', sa.Integer(), nullable=True),
+        sa.Column('port_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_group_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_group_id'],
+            ['resiliency_server_group.id']
+        ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'resiliency_disk_logical',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column('disk_id', sa.Integer(), nullable=True),
+        sa.Column('disk_size', sa.String(length=40), nullable=True),
+        sa.Column('type', sa.String(length=40), nullable=True),
+        sa.Column(
+            'resiliency_server_group_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_group_id'],
+            ['resiliency_server_group.id']
+        ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'ft_pvm',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('ax_removal_pending', sa.Boolean(), nullable=True),
+        sa.Column('device_affinity', sa.Boolean(), nullable=True),
+        sa.Column('force_boot_override', sa.Boolean(), nullable=True),
+        sa.Column('ft_protected', sa.Boolean(), nullable=True),
+        sa.Column('host1_version', sa.String(length=20), nullable=True),
+        sa.Column('host2_version', sa.String(length=20), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('preferred_ax', sa.Integer(), nullable=True),
+        sa.Column('product_name', sa.String(length=255), nullable=True),
+        sa.Column('protection_mode', sa.String(length=20), nullable=True),
+        sa.Column('remote_ax_visible', sa.Boolean(), nullable=True),
+        sa.Column('version', sa.String(length=20), nullable=True),
+        sa.Column(
+            'previous_state_change_date_time',
+            sa.DateTime(),
+            nullable=True
+        ),
+        sa.Column('automated_recovery', sa.Boolean(), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'resiliency_disk',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column('disk_size', sa.String(length=40), nullable=True),
+        sa.Column('type', sa.String(length=40), nullable=True),
+        sa.Column('volume_id', sa.String(length=36), nullable=True),
+        sa.Column('resiliency_id', sa.Integer(), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'resiliency_nic',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('desc', sa.String(length=255), nullable=True),
+        sa.Column('port_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'ft_ax',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('auto_start', sa.Boolean(), nullable=True),
+        sa.Column('ax_id', sa.Integer(), nullable=True),
+        sa.Column('init_interval', sa.Integer(), nullable=True),
+        sa.Column('offline_mode', sa.Boolean(), nullable=True),
+        sa.Column('remote_ax_status', sa.String(length=20), nullable=True),
+        sa.Column('scrub_interval', sa.Integer(), nullable=True),
+        sa.Column('scrub_switch', sa.Boolean(), nullable=True),
+        sa.Column('sw_revision', sa.String(length=20), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_alink',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_quorum',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('quorum_service_enabled', sa.Boolean(), nullable=True),
+        sa.Column('boot_blocked', sa.Boolean(), nullable=True),
+        sa.Column('boot_blocked_reason', sa.String(length=255), nullable=True),
+        sa.Column('join_blocked', sa.Boolean(), nullable=True),
+        sa.Column('join_blocked_reason', sa.String(length=255), nullable=True),
+        sa.Column('elected_host_name', sa.String(length=255), nullable=True),
+        sa.Column(
+            'elected_host_ip_address',
+            sa.String(length=255),
+            nullable=True
+        ),
+        sa.Column('preferred_host_name', sa.String(length=255), nullable=True),
+        sa.Column(
+            'preferred_host_ip_address',
+            sa.String(length=255),
+            nullable=True
+        ),
+        sa.Column('alternate_host_name', sa.String(length=255), nullable=True),
+        sa.Column(
+            'alternate_host_ip_address',
+            sa.String(length=255),
+            nullable=True
+        ),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.Column('preferred_host_port', sa.Integer(), nullable=True),
+        sa.Column('alternate_host_port', sa.Integer(), nullable=True),
+        sa.Column('suppress_degraded_pvm', sa.Boolean(), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_guest_os',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('auto_resynch', sa.Boolean(), nullable=True),
+        sa.Column('auto_start', sa.Boolean(), nullable=True),
+        sa.Column(
+            'currently_capable_of_online_migration',
+            sa.Boolean(),
+            nullable=True
+        ),
+        sa.Column('synch_idle_timer', sa.Integer(), nullable=True),
+        sa.Column('synch_idle_timer_limits', sa.Text(), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_ldisk',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('pci_bus', sa.String(length=20), nullable=True),
+        sa.Column('pci_domain', sa.String(length=20), nullable=True),
+        sa.Column('pci_function', sa.String(length=20), nullable=True),
+        sa.Column('pci_slot', sa.String(length=20), nullable=True),
+        sa.Column('boot_device', sa.Boolean(), nullable=True),
+        sa.Column('sector_size', sa.Integer(), nullable=True),
+        sa.Column('total_num_sectors', sa.Integer(), nullable=True),
+        sa.Column('mirror_copy_state', sa.String(length=20), nullable=True),
+        sa.Column('mirror_copy_source', sa.Integer(), nullable=True),
+        sa.Column('mirror_copy_target', sa.Integer(), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('percent_complete', sa.Integer(), nullable=True),
+        sa.Column('mirror_copy_rate', sa.Integer(), nullable=True),
+        sa.Column('mirror_copy_type', sa.String(length=20), nullable=True),
+        sa.Column('ldisk_id', sa.Integer(), nullable=True),
+        sa.Column('ldisk_type', sa.String(length=20), nullable=True),
+        sa.Column('ft_guest_os_id', sa.String(length=36), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.Column('resiliency_disk_id', sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(['ft_guest_os_id'], ['ft_guest_os.id'], ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_disk_id'],
+            ['resiliency_disk.id']
+        ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_qlink',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('qlink_id', sa.Integer(), nullable=True),
+        sa.Column('which', sa.String(length=20), nullable=True),
+        sa.Column('ft_quorum_id', sa.String(length=36), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(['ft_quorum_id'], ['ft_quorum.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id'),
+        sa.UniqueConstraint('ft_quorum_id', 'qlink_id', 'which')
+    )
+    op.create_table(
+        'ft_path',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('path_id', sa.Integer(), nullable=True),
+        sa.Column('ft_alink_id', sa.String(length=36), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_alink_id'], ['ft_alink.id'], ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_guest',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('autoSynch', sa.Boolean(), nullable=True),
+        sa.Column('autoBoot', sa.Boolean(), nullable=True),
+        sa.Column('ft_ax_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_ax_id'], ['ft_ax.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_lnic',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('pci_bus', sa.String(length=20), nullable=True),
+        sa.Column('pci_domain', sa.String(length=20), nullable=True),
+        sa.Column('pci_function', sa.String(length=20), nullable=True),
+        sa.Column('pci_slot', sa.String(length=20), nullable=True),
+        sa.Column('lnic_id', sa.Integer(), nullable=True),
+        sa.Column('desired_ip', sa.String(length=15), nullable=True),
+        sa.Column('ft_guest_os_id', sa.String(length=36), nullable=True),
+        sa.Column('ft_pvm_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.Column('resiliency_nic_id', sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(['ft_guest_os_id'], ['ft_guest_os.id'], ),
+        sa.ForeignKeyConstraint(['ft_pvm_id'], ['ft_pvm.id'], ),
+        sa.ForeignKeyConstraint(['resiliency_nic_id'], ['resiliency_nic.id']),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_linka',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('adapter_id', sa.Integer(), nullable=True),
+        sa.Column('adapter_name', sa.String(length=255), nullable=True),
+        sa.Column('ft_ip_config', sa.Text(), nullable=True),
+        sa.Column('ft_remote_ip_config', sa.Text(), nullable=True),
+        sa.Column('ft_ax_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_ax_id'], ['ft_ax.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_disk',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('mirrored', sa.Boolean(), nullable=True),
+        sa.Column('virtual_disk', sa.Boolean(), nullable=True),
+        sa.Column('ax_access', sa.Boolean(), nullable=True),
+        sa.Column('sector_size', sa.Integer(), nullable=True),
+        sa.Column('number_of_sectors', sa.Integer(), nullable=True),
+        sa.Column('immigrant', sa.Boolean(), nullable=True),
+        sa.Column('scrub_switch', sa.Boolean(), nullable=True),
+        sa.Column('ft_scrub_status', sa.Text(), nullable=True),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.Column('zbc_switch', sa.Boolean(), nullable=True),
+        sa.Column('ft_zbc_status', sa.Text(), nullable=True),
+        sa.Column('type', sa.String(length=20), nullable=True),
+        sa.Column(
+            'previous_state_change_date_time',
+            sa.DateTime(),
+            nullable=True
+        ),
+        sa.Column('ft_ldisk_id', sa.String(length=36), nullable=True),
+        sa.Column('ft_ax_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_ax_id'], ['ft_ax.id'], ),
+        sa.ForeignKeyConstraint(['ft_ldisk_id'], ['ft_ldisk.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+    op.create_table(
+        'ft_nic',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('state', sa.Text(), nullable=True),
+        sa.Column('ft_ip_config', sa.Text(), nullable=True),
+        sa.Column('ft_remote_ip_config', sa.Text(), nullable=True),
+        sa.Column('device_name', sa.String(length=255), nullable=True),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.Column('mac', sa.String(length=17), nullable=True),
+        sa.Column('network_bridge', sa.String(length=255), nullable=True),
+        sa.Column('ft_lnic_id', sa.String(length=36), nullable=True),
+        sa.Column('ft_ax_id', sa.String(length=36), nullable=True),
+        sa.Column(
+            'resiliency_server_id',
+            sa.String(length=36),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['ft_ax_id'], ['ft_ax.id'], ),
+        sa.ForeignKeyConstraint(['ft_lnic_id'], ['ft_lnic.id'], ),
+        sa.ForeignKeyConstraint(
+            ['resiliency_server_id'],
+            ['resiliency_server.id']
+        ),
+        sa.PrimaryKeyConstraint('id', 'resiliency_server_id')
+    )
+
+
+def downgrade():
+    op.drop_table('ft_nic')
+    op.drop_table('ft_disk')
+    op.drop_table('ft_linka')
+    op.drop_table('ft_lnic')
+    op.drop_table('ft_guest')
+    op.drop_table('ft_path')
+    op.drop_table('ft_qlink')
+    op.drop_table('ft_ldisk')
+    op.drop_table('ft_guest_os')
+    op.drop_table('ft_quorum')
+    op.drop_table('ft_alink')
+    op.drop_table('ft_ax')
+    op.drop_table('resiliency_nic')
+    op.drop_table('resiliency_disk')
+    op.drop_table('ft_pvm')
+    op.drop_table('resiliency_disk_logical')
+    op.drop_table('resiliency_nic_logical')
+    op.drop_table('resiliency_server')
+    op.drop_table('resiliency_server_group')
+    op.drop_table('resiliency_group')
@@ -0,0 +1,38 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Start of the expand branch
+
+Migrations of this branch only add to the schema and backfill data so they
+can be applied while the services are running.
+
+Revision ID: 002_expand
+Revises: 001
+Create Date: 2026-10-19 16:45:00.000000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '002_expand'
+down_revision = '001'
+branch_labels = ('expand',)
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,61 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Drop unique constraints of names covering soft deleted objects
+
+Names of live objects are unique by the indexes of 016_expand, contract
+migrations run once the expand ones are applied.
+
+Revision ID: 003_contract
+Revises: 002_contract
+Create Date: 2026-10-20 00:31:10.266058
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '003_contract'
+down_revision = '002_contract'
+branch_labels = None
+depends_on = '016_expand'
+
+from alembic import op
+import sqlalchemy as sa
+
+_TABLES = ('resiliency_group', 'resiliency_server_group', 'resiliency_server')
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'sqlite':
+        # The constraints are unnamed and can't be dropped without copying
+        # the tables, SQLite databases of the tests are made from the models.
+        return
+
+    for table_name in _TABLES:
+        for uc in sa.inspect(bind).get_unique_constraints(table_name):
+            if set(uc['column_names']) == set(['name', 'project_id']):
+                op.drop_constraint(uc['name'], table_name, type_='unique')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+
+    for table_name in _TABLES:
+        op.create_unique_constraint(
+            'uq_%s_name_project_id' % table_name,
+            table_name,
+            ['name', 'project_id']
+        )
@@ -0,0 +1,50 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add trust table
+
+Revision ID: 003_expand
+Revises: 002_expand
+Create Date: 2026-10-19 16:34:51.586343
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '003_expand'
+down_revision = '002_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'trust',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.String(length=64), nullable=False),
+        sa.Column('scope_key', sa.String(length=40), nullable=False),
+        sa.Column('user_id', sa.String(length=64), nullable=False),
+        sa.Column('project_id', sa.String(length=80), nullable=False),
+        sa.Column('roles', sa.Text(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scope_key')
+    )
+
+
+def downgrade():
+    op.drop_table('trust')
@@ -0,0 +1,65 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add provisioning tables
+
+Revision ID: 004_expand
+Revises: 003_expand
+Create Date: 2026-10-19 16:56:55.189300
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '004_expand'
+down_revision = '003_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'provisioning_job',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('spec', sa.Text(), nullable=True),
+        sa.Column('state', sa.String(length=20), nullable=True),
+        sa.Column('resiliency_group_id', sa.String(length=36), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'provisioning_step',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('job_id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['job_id'], ['provisioning_job.id'],
+            ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'name')
+    )
+
+
+def downgrade():
+    op.drop_table('provisioning_step')
+    op.drop_table('provisioning_job')
@@ -0,0 +1,57 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add hypervisor of resiliency servers
+
+Revision ID: 005_expand
+Revises: 004_expand
+Create Date: 2026-10-19 17:03:37.502633
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '005_expand'
+down_revision = '004_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from highlander.db.sqlalchemy.migration import online
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = {'resiliency_server': online.INDEX}
+
+
+def upgrade():
+    op.add_column(
+        'resiliency_server',
+        sa.Column('hypervisor_id', sa.String(length=255), nullable=True)
+    )
+    op.create_index(
+        'ix_resiliency_server_hypervisor_id',
+        'resiliency_server',
+        ['hypervisor_id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_resiliency_server_hypervisor_id',
+        table_name='resiliency_server'
+    )
+    op.drop_column('resiliency_server', 'hypervisor_id')
@@ -0,0 +1,46 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add health state of resiliency servers
+
+Revision ID: 006_expand
+Revises: 005_expand
+Create Date: 2026-10-19 17:41:12.318204
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '006_expand'
+down_revision = '005_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column(
+        'resiliency_server',
+        sa.Column('health_state', sa.String(length=20), nullable=True)
+    )
+    op.add_column(
+        'resiliency_server',
+        sa.Column('health_changed_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column('resiliency_server', 'health_changed_at')
+    op.drop_column('resiliency_server', 'health_state')
@@ -0,0 +1,57 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add change events
+
+Revision ID: 007_expand
+Revises: 006_expand
+Create Date: 2026-10-19 18:32:47.502113
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '007_expand'
+down_revision = '006_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'change_event',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=40), nullable=False),
+        sa.Column('entity_id', sa.String(length=36), nullable=False),
+        sa.Column('action', sa.String(length=8), nullable=False),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('dispatched', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_change_event_dispatched_id',
+        'change_event',
+        ['dispatched', 'id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_change_event_dispatched_id', table_name='change_event')
+    op.drop_table('change_event')
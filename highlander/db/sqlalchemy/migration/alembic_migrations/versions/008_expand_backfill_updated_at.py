@@ -0,0 +1,59 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Set updated_at of objects never updated
+
+Revision ID: 008_expand
+Revises: 007_expand
+Create Date: 2026-10-19 19:05:13.840211
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '008_expand'
+down_revision = '007_expand'
+branch_labels = None
+depends_on = None
+
+from sqlalchemy import sql
+
+from highlander.db.sqlalchemy.migration import online
+
+_TABLES = ('resiliency_group', 'resiliency_server_group', 'resiliency_server')
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = dict((t, online.BACKFILL) for t in _TABLES)
+
+
+def upgrade():
+    # 'changes-since' queries only look at updated_at, which is now set on
+    # creation as well.
+    for table_name in _TABLES:
+        table = sql.table(
+            table_name,
+            sql.column('id'),
+            sql.column('created_at'),
+            sql.column('updated_at')
+        )
+
+        online.backfill(
+            table,
+            {'updated_at': table.c.created_at},
+            where=table.c.updated_at.is_(None)
+        )
+
+
+def downgrade():
+    pass
@@ -0,0 +1,54 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add indexes for changes-since queries
+
+Revision ID: 009_expand
+Revises: 008_expand
+Create Date: 2026-10-19 19:06:40.117535
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '009_expand'
+down_revision = '008_expand'
+branch_labels = None
+depends_on = None
+
+from highlander.db.sqlalchemy.migration import online
+
+_TABLES = ('resiliency_group', 'resiliency_server_group', 'resiliency_server')
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = dict((t, online.INDEX) for t in _TABLES)
+
+
+def upgrade():
+    for table_name in _TABLES:
+        for column in ('project_id', 'scope'):
+            online.create_index(
+                'ix_%s_%s_updated_at' % (table_name, column),
+                table_name,
+                [column, 'updated_at']
+            )
+
+
+def downgrade():
+    for table_name in _TABLES:
+        for column in ('project_id', 'scope'):
+            online.drop_index(
+                'ix_%s_%s_updated_at' % (table_name, column),
+                table_name
+            )
@@ -0,0 +1,64 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add versions of resiliency and FT objects
+
+Revision ID: 010_expand
+Revises: 009_expand
+Create Date: 2026-10-19 20:12:47.503816
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '010_expand'
+down_revision = '009_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from highlander.db.sqlalchemy.migration import online
+
+_TABLES = (
+    'resiliency_group', 'resiliency_server_group', 'resiliency_server',
+    'resiliency_disk_logical', 'resiliency_disk', 'resiliency_nic_logical',
+    'resiliency_nic', 'ft_pvm', 'ft_guest_os', 'ft_ldisk', 'ft_lnic',
+    'ft_alink', 'ft_path', 'ft_quorum', 'ft_qlink', 'ft_ax', 'ft_guest',
+    'ft_disk', 'ft_nic', 'ft_linka'
+)
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+# Adding a NOT NULL column with a default rewrites the table on MySQL.
+affected_tables = dict((t, online.REWRITE) for t in _TABLES)
+
+
+def upgrade():
+    # The default keeps inserts of services not upgraded yet working.
+    for table_name in _TABLES:
+        op.add_column(
+            table_name,
+            sa.Column(
+                'version_id',
+                sa.Integer(),
+                server_default='1',
+                nullable=False
+            )
+        )
+
+
+def downgrade():
+    for table_name in _TABLES:
+        op.drop_column(table_name, 'version_id')
@@ -0,0 +1,60 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add async jobs
+
+Revision ID: 011_expand
+Revises: 010_expand
+Create Date: 2026-10-19 22:41:08.310562
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '011_expand'
+down_revision = '010_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'async_job',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('scope', sa.String(length=8), nullable=True),
+        sa.Column('project_id', sa.String(length=80), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('type', sa.String(length=80), nullable=False),
+        sa.Column('params', sa.Text(), nullable=True),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_async_job_project_id_created_at',
+        'async_job',
+        ['project_id', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_async_job_project_id_created_at', table_name='async_job')
+    op.drop_table('async_job')
@@ -0,0 +1,49 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add sequence numbers of change events
+
+Revision ID: 012_expand
+Revises: 011_expand
+Create Date: 2026-10-19 23:12:40.118265
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '012_expand'
+down_revision = '011_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # Existing events are numbered by the dispatcher, in the order of ids.
+    op.add_column(
+        'change_event',
+        sa.Column('seq', sa.BigInteger(), nullable=True)
+    )
+    op.create_index(
+        'ix_change_event_seq',
+        'change_event',
+        ['seq'],
+        unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_change_event_seq', table_name='change_event')
+    op.drop_column('change_event', 'seq')
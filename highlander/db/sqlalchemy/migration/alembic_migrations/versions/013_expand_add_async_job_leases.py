@@ -0,0 +1,55 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add owners and heartbeats of async jobs
+
+Revision ID: 013_expand
+Revises: 012_expand
+Create Date: 2026-10-19 23:48:52.604117
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '013_expand'
+down_revision = '012_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # Jobs without a heartbeat are failed by the next API process that
+    # starts, they were left by a process that ran before the upgrade.
+    op.add_column(
+        'async_job',
+        sa.Column('owner', sa.String(length=255), nullable=True)
+    )
+    op.add_column(
+        'async_job',
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True)
+    )
+    op.create_index(
+        'ix_async_job_state_heartbeat_at',
+        'async_job',
+        ['state', 'heartbeat_at'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_async_job_state_heartbeat_at', table_name='async_job')
+    op.drop_column('async_job', 'heartbeat_at')
+    op.drop_column('async_job', 'owner')
@@ -0,0 +1,64 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Clear live flags of soft deleted objects
+
+Revision ID: 015_expand
+Revises: 014_expand
+Create Date: 2026-10-20 00:24:02.117436
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '015_expand'
+down_revision = '014_expand'
+branch_labels = None
+depends_on = None
+
+from sqlalchemy import sql
+
+from highlander.db.sqlalchemy.migration import online
+
+_TABLES = (
+    'resiliency_group', 'resiliency_server_group', 'resiliency_server',
+    'resiliency_disk_logical', 'resiliency_disk', 'resiliency_nic_logical',
+    'resiliency_nic'
+)
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = dict((t, online.BACKFILL) for t in _TABLES)
+
+
+def upgrade():
+    for table_name in _TABLES:
+        table = sql.table(
+            table_name,
+            sql.column('id'),
+            sql.column('deleted_at'),
+            sql.column('live')
+        )
+
+        online.backfill(
+            table,
+            {'live': None},
+            where=sql.and_(
+                table.c.deleted_at.isnot(None),
+                table.c.live.isnot(None)
+            )
+        )
+
+
+def downgrade():
+    pass
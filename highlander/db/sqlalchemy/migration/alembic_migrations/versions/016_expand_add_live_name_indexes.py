@@ -0,0 +1,55 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add unique indexes of the names of live objects
+
+Revision ID: 016_expand
+Revises: 015_expand
+Create Date: 2026-10-20 00:26:45.902113
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '016_expand'
+down_revision = '015_expand'
+branch_labels = None
+depends_on = None
+
+from highlander.db.sqlalchemy.migration import online
+
+_TABLES = ('resiliency_group', 'resiliency_server_group', 'resiliency_server')
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = dict((t, online.INDEX) for t in _TABLES)
+
+
+def upgrade():
+    # The (name, project_id) unique constraints covering tombstones too are
+    # dropped by 003_contract.
+    for table_name in _TABLES:
+        online.create_index(
+            'ix_%s_project_id_name_live' % table_name,
+            table_name,
+            ['project_id', 'name', 'live'],
+            unique=True
+        )
+
+
+def downgrade():
+    for table_name in _TABLES:
+        online.drop_index(
+            'ix_%s_project_id_name_live' % table_name,
+            table_name
+        )
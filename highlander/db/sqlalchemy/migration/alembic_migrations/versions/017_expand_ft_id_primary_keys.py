@@ -0,0 +1,78 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Make 'id' alone the primary key of FT tables
+
+Other FT tables reference these ids, the (id, resiliency_server_id) keys
+made those foreign keys invalid.
+
+Revision ID: 017_expand
+Revises: 016_expand
+Create Date: 2026-10-20 09:12:31.480217
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '017_expand'
+down_revision = '016_expand'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from highlander.db.sqlalchemy.migration import online
+
+_TABLES = (
+    'ft_pvm', 'ft_ax', 'ft_alink', 'ft_quorum', 'ft_guest_os', 'ft_ldisk',
+    'ft_qlink', 'ft_path', 'ft_guest', 'ft_lnic', 'ft_linka', 'ft_disk',
+    'ft_nic'
+)
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = dict((t, online.REWRITE) for t in _TABLES)
+
+
+def _set_primary_key(table_name, columns):
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'sqlite':
+        # The primary key can't be altered without copying the table,
+        # SQLite databases of the tests are made from the models.
+        return
+
+    if dialect == 'mysql':
+        # Foreign keys of the other FT tables need an index on 'id' at
+        # all times, so the key is swapped by a single statement.
+        op.execute('ALTER TABLE %s DROP PRIMARY KEY, ADD PRIMARY KEY (%s)' % (
+            online._quote(bind, table_name),
+            online._columns(bind, columns)
+        ))
+    else:
+        pk = sa.inspect(bind).get_pk_constraint(table_name)
+
+        op.drop_constraint(pk['name'], table_name, type_='primary')
+        op.create_primary_key('%s_pkey' % table_name, table_name, columns)
+
+
+def upgrade():
+    for table_name in _TABLES:
+        _set_primary_key(table_name, ['id'])
+
+
+def downgrade():
+    for table_name in _TABLES:
+        _set_primary_key(table_name, ['id', 'resiliency_server_id'])
@@ -0,0 +1,119 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Add indexes of secure list queries and foreign keys
+
+Revision ID: 018_expand
+Revises: 017_expand
+Create Date: 2026-10-20 09:14:02.915336
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '018_expand'
+down_revision = '017_expand'
+branch_labels = None
+depends_on = None
+
+from highlander.db.sqlalchemy.migration import online
+
+_RESILIENCY_TABLES = (
+    'resiliency_group', 'resiliency_server_group', 'resiliency_server',
+    'resiliency_nic_logical', 'resiliency_disk_logical', 'resiliency_disk',
+    'resiliency_nic'
+)
+
+_FOREIGN_KEYS = {
+    'resiliency_server_group': ['resiliency_group_id'],
+    'resiliency_server': [
+        'instance_id',
+        'replacement_resiliency_server_id',
+        'resiliency_server_group_id'
+    ],
+    'resiliency_nic_logical': ['resiliency_server_group_id'],
+    'resiliency_disk_logical': ['resiliency_server_group_id'],
+    'resiliency_disk': ['resiliency_server_id'],
+    'resiliency_nic': ['resiliency_server_id'],
+    'ft_pvm': ['resiliency_server_id'],
+    'ft_ax': ['ft_pvm_id', 'resiliency_server_id'],
+    'ft_alink': ['ft_pvm_id', 'resiliency_server_id'],
+    'ft_quorum': ['ft_pvm_id', 'resiliency_server_id'],
+    'ft_guest_os': ['ft_pvm_id', 'resiliency_server_id'],
+    'ft_ldisk': [
+        'ft_guest_os_id',
+        'ft_pvm_id',
+        'resiliency_disk_id',
+        'resiliency_server_id'
+    ],
+    'ft_qlink': ['ft_pvm_id', 'ft_quorum_id', 'resiliency_server_id'],
+    'ft_path': ['ft_alink_id', 'ft_pvm_id', 'resiliency_server_id'],
+    'ft_guest': ['ft_ax_id', 'resiliency_server_id'],
+    'ft_lnic': [
+        'ft_guest_os_id',
+        'ft_pvm_id',
+        'resiliency_nic_id',
+        'resiliency_server_id'
+    ],
+    'ft_linka': ['ft_ax_id', 'resiliency_server_id'],
+    'ft_disk': ['ft_ax_id', 'ft_ldisk_id', 'resiliency_server_id'],
+    'ft_nic': ['ft_ax_id', 'ft_lnic_id', 'resiliency_server_id']
+}
+
+# Tables rewritten, indexed or backfilled by this migration, e.g.
+# {'ft_disk': online.INDEX}. Used by 'highlander-db-manage estimate'.
+affected_tables = dict(
+    (t, online.INDEX) for t in set(_RESILIENCY_TABLES) | set(_FOREIGN_KEYS)
+)
+
+
+def _indexes():
+    for table_name in _RESILIENCY_TABLES:
+        for column in ('project_id', 'scope'):
+            yield (
+                'ix_%s_%s_deleted_at_name' % (table_name, column),
+                table_name,
+                [column, 'deleted_at', 'name'],
+                None
+            )
+
+        yield (
+            'ix_%s_deleted_at' % table_name,
+            table_name,
+            ['deleted_at'],
+            'deleted_at IS NOT NULL'
+        )
+
+    for table_name, columns in sorted(_FOREIGN_KEYS.items()):
+        for column in columns:
+            yield (
+                'ix_%s_%s' % (table_name, column),
+                table_name,
+                [column],
+                None
+            )
+
+
+def upgrade():
+    for name, table_name, columns, where in _indexes():
+        online.create_index(
+            name,
+            table_name,
+            columns,
+            postgresql_where=where
+        )
+
+
+def downgrade():
+    for name, table_name, _, _ in _indexes():
+        online.drop_index(name, table_name)
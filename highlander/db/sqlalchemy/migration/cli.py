@@ -0,0 +1,228 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""CLI interface for highlander management tasks.
+
+Regular deployments run 'highlander-db-manage upgrade head'. Rolling
+upgrades run 'upgrade --expand' before the new code is deployed and
+'upgrade --contract' once no service of the old version is left.
+"""
+
+import sys
+
+from alembic import command as alembic_cmd
+from alembic import migration as alembic_migration
+from alembic import script as alembic_script
+from alembic import util as alembic_u
+from oslo.config import cfg
+import six
+import sqlalchemy as sa
+
+from highlander import config
+from highlander.db.sqlalchemy import base  # noqa
+from highlander.db.sqlalchemy.migration import online
+from highlander.db.sqlalchemy.migration import schema
+
+
+CONF = cfg.CONF
+
+EXPAND_BRANCH = schema.EXPAND_BRANCH
+CONTRACT_BRANCH = 'contract'
+
+
+def do_alembic_command(config, cmd, *args, **kwargs):
+    try:
+        getattr(alembic_cmd, cmd)(config, *args, **kwargs)
+    except alembic_u.CommandError as e:
+        alembic_u.err(six.text_type(e))
+
+
+def do_check_migration(config, cmd):
+    do_alembic_command(config, 'branches')
+
+
+def _branch_target(default):
+    if CONF.command.expand:
+        return '%s@head' % EXPAND_BRANCH
+
+    if CONF.command.contract:
+        return '%s@head' % CONTRACT_BRANCH
+
+    return default
+
+
+def do_upgrade(config, cmd):
+    revision = CONF.command.revision
+
+    if CONF.command.delta:
+        if revision:
+            raise SystemExit('Revision and delta are mutually exclusive.')
+
+        revision = '+%d' % CONF.command.delta
+
+    if cmd == 'upgrade':
+        # 'head' is ambiguous with the expand and contract branches.
+        if not revision or revision == 'head':
+            revision = 'heads'
+
+        revision = _branch_target(revision)
+
+    if not revision:
+        raise SystemExit('You must provide a revision or relative delta.')
+
+    do_alembic_command(config, cmd, revision, sql=CONF.command.sql)
+
+
+def do_downgrade(config, cmd):
+    revision = CONF.command.revision
+
+    if CONF.command.delta:
+        revision = '-%d' % CONF.command.delta
+
+    if not revision:
+        raise SystemExit('You must provide a revision or relative delta.')
+
+    do_alembic_command(config, cmd, revision, sql=CONF.command.sql)
+
+
+def do_stamp(config, cmd):
+    do_alembic_command(
+        config,
+        cmd,
+        CONF.command.revision,
+        sql=CONF.command.sql
+    )
+
+
+def do_revision(config, cmd):
+    head = _branch_target(None)
+
+    if not head:
+        raise SystemExit(
+            'New migrations go either to the --expand or to the --contract '
+            'branch.'
+        )
+
+    do_alembic_command(
+        config,
+        cmd,
+        message=CONF.command.message,
+        autogenerate=CONF.command.autogenerate,
+        sql=CONF.command.sql,
+        head=head
+    )
+
+
+def _pending_revisions(script, connection, target):
+    context = alembic_migration.MigrationContext.configure(connection)
+
+    current = context.get_current_heads() or 'base'
+
+    revisions = script.revision_map.iterate_revisions(target, current)
+
+    return reversed(list(revisions))
+
+
+def do_estimate(config, cmd):
+    script = alembic_script.ScriptDirectory.from_config(config)
+
+    engine = sa.create_engine(CONF.database.connection)
+
+    total = 0.0
+
+    with engine.connect() as conn:
+        for rev in _pending_revisions(script, conn, _branch_target('heads')):
+            affected_tables = getattr(rev.module, 'affected_tables', {})
+
+            print('%s: %s' % (rev.revision, rev.doc))
+
+            for table, kind, rows, seconds in online.estimate(
+                    conn, affected_tables):
+                print('    %-32s %-9s %12d rows  ~%ds' % (
+                    table, kind, rows, seconds
+                ))
+
+                total += seconds
+
+    print('Estimated total: ~%ds' % total)
+
+
+def add_command_parsers(subparsers):
+    for name in ['current', 'history', 'branches', 'heads']:
+        parser = subparsers.add_parser(name)
+        parser.set_defaults(func=do_alembic_command)
+
+    parser = subparsers.add_parser('check_migration')
+    parser.set_defaults(func=do_check_migration)
+
+    parser = subparsers.add_parser('upgrade')
+    parser.add_argument('--delta', type=int)
+    parser.add_argument('--sql', action='store_true')
+    _add_branch_options(parser)
+    parser.add_argument('revision', nargs='?')
+    parser.set_defaults(func=do_upgrade)
+
+    parser = subparsers.add_parser('downgrade')
+    parser.add_argument('--delta', type=int)
+    parser.add_argument('--sql', action='store_true')
+    parser.add_argument('revision', nargs='?')
+    parser.set_defaults(func=do_downgrade)
+
+    parser = subparsers.add_parser('stamp')
+    parser.add_argument('--sql', action='store_true')
+    parser.add_argument('revision')
+    parser.set_defaults(func=do_stamp)
+
+    parser = subparsers.add_parser('revision')
+    parser.add_argument('-m', '--message')
+    parser.add_argument('--autogenerate', action='store_true')
+    parser.add_argument('--sql', action='store_true')
+    _add_branch_options(parser)
+    parser.set_defaults(func=do_revision)
+
+    parser = subparsers.add_parser('estimate')
+    _add_branch_options(parser)
+    parser.set_defaults(func=do_estimate)
+
+
+def _add_branch_options(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--expand', action='store_true')
+    group.add_argument('--contract', action='store_true')
+
+
+command_opt = cfg.SubCommandOpt(
+    'command',
+    title='Command',
+    help='Available commands',
+    handler=add_command_parsers
+)
+
+CONF.register_cli_opt(command_opt)
+
+
+def get_alembic_config():
+    return schema.get_alembic_config()
+
+
+def main():
+    alembic_config = get_alembic_config()
+
+    config.parse_args(args=sys.argv[1:])
+
+    CONF.command.func(alembic_config, CONF.command.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Helpers for migrations running against a live database.
+
+Schema changes are split in two branches. 'expand' migrations only add
+things (tables, nullable columns, indexes) and backfill data, so they can
+run while the services are up. 'contract' migrations remove what is no
+longer used and run once every service has been upgraded.
+
+Backfills and index builds should be the only operation of their revision:
+they use their own connections, which would otherwise wait on the locks
+held by the migration transaction.
+"""
+
+import contextlib
+import time
+
+from alembic import op
+from oslo.config import cfg
+import sqlalchemy as sa
+from sqlalchemy import sql
+
+from highlander.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('migration', 'highlander.config')
+
+# Kinds of work a migration does on a table, see 'affected_tables'.
+REWRITE = 'rewrite'
+INDEX = 'index'
+BACKFILL = 'backfill'
+
+
+def _quote(bind, name):
+    return bind.dialect.identifier_preparer.quote(name)
+
+
+def _columns(bind, columns):
+    return ', '.join(_quote(bind, c) for c in columns)
+
+
+@contextlib.contextmanager
+def _autocommit_connection(bind):
+    conn = bind.engine.connect().execution_options(
+        isolation_level='AUTOCOMMIT'
+    )
+
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def create_index(name, table_name, columns, unique=False,
+                 postgresql_where=None):
+    """Builds an index without blocking writes to the table.
+
+    On PostgreSQL the index is built concurrently. If it fails an INVALID
+    index is left behind and has to be dropped before retrying. On MySQL
+    the index is built in place. Other databases lock the table.
+
+    :param postgresql_where: Optional SQL condition making the index
+        partial on PostgreSQL, other databases index every row.
+    """
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    unique = 'UNIQUE ' if unique else ''
+
+    if dialect == 'postgresql':
+        where = ''
+
+        if postgresql_where is not None:
+            where = ' WHERE %s' % postgresql_where
+
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+        with _autocommit_connection(bind) as conn:
+            conn.execute('CREATE %sINDEX CONCURRENTLY %s ON %s (%s)%s' % (
+                unique,
+                _quote(bind, name),
+                _quote(bind, table_name),
+                _columns(bind, columns),
+                where
+            ))
+    elif dialect == 'mysql':
+        op.execute(
+            'ALTER TABLE %s ADD %sINDEX %s (%s), '
+            'ALGORITHM=INPLACE, LOCK=NONE' % (
+                _quote(bind, table_name),
+                unique,
+                _quote(bind, name),
+                _columns(bind, columns)
+            )
+        )
+    else:
+        op.create_index(name, table_name, columns, unique=unique != '')
+
+
+def drop_index(name, table_name):
+    """Drops an index without blocking writes to the table."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'postgresql':
+        with _autocommit_connection(bind) as conn:
+            conn.execute(
+                'DROP INDEX CONCURRENTLY IF EXISTS %s' % _quote(bind, name)
+            )
+    elif dialect == 'mysql':
+        op.execute(
+            'ALTER TABLE %s DROP INDEX %s, ALGORITHM=INPLACE, LOCK=NONE' % (
+                _quote(bind, table_name),
+                _quote(bind, name)
+            )
+        )
+    else:
+        op.drop_index(name, table_name)
+
+
+@contextlib.contextmanager
+def _batch_transaction(bind):
+    if bind.dialect.name == 'sqlite':
+        # A second connection would wait on the migration transaction.
+        yield bind
+    else:
+        with bind.engine.begin() as conn:
+            yield conn
+
+
+def backfill(table, values, where=None, key='id', batch_size=None,
+             sleep=None):
+    """Updates the rows of a table in batches, each one in its own
+    transaction, pausing between batches.
+
+    Rows are walked in 'key' order so every row is visited exactly once
+    even if 'values' doesn't make it stop matching 'where'.
+
+    :param table: Table or lightweight sql.table() construct.
+    :param values: Dictionary of column names to values or SQL
+        expressions.
+    :param where: Optional criterion selecting the rows to update.
+    :param key: Name of a unique column used to walk the table.
+    :return: Number of updated rows.
+    """
+    bind = op.get_bind()
+
+    if batch_size is None:
+        batch_size = CONF.migration.backfill_batch_size
+
+    if sleep is None:
+        sleep = CONF.migration.backfill_sleep
+
+    key_col = table.c[key]
+    last = None
+    total = 0
+
+    while True:
+        with _batch_transaction(bind) as conn:
+            query = sa.select([key_col]).order_by(key_col).limit(batch_size)
+
+            if where is not None:
+                query = query.where(where)
+
+            if last is not None:
+                query = query.where(key_col > last)
+
+            keys = [row[0] for row in conn.execute(query)]
+
+            if keys:
+                conn.execute(
+                    table.update().where(key_col.in_(keys)).values(values)
+                )
+
+        total += len(keys)
+
+        if len(keys) < batch_size:
+            break
+
+        last = keys[-1]
+
+        LOG.info("Backfilled %s rows of table %s." % (total, table.name))
+
+        time.sleep(sleep)
+
+    return total
+
+
+def table_rows(bind, table_name):
+    """Returns the number of rows of a table.
+
+    Table statistics are used where available since counting rows of a
+    large table takes a while.
+    """
+    dialect = bind.dialect.name
+
+    if not bind.dialect.has_table(bind, table_name):
+        return 0
+
+    if dialect == 'mysql':
+        rows = bind.execute(
+            sa.text(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = :name'
+            ),
+            name=table_name
+        ).scalar()
+    elif dialect == 'postgresql':
+        rows = bind.execute(
+            sa.text(
+                "SELECT reltuples FROM pg_class "
+                "WHERE relname = :name AND relkind = 'r'"
+            ),
+            name=table_name
+        ).scalar()
+    else:
+        rows = bind.execute(
+            sa.select([sa.func.count()]).select_from(sql.table(table_name))
+        ).scalar()
+
+    return max(int(rows or 0), 0)
+
+
+def estimate(bind, affected_tables):
+    """Estimates how long the work on the given tables takes.
+
+    :param affected_tables: Dictionary of table names to the kind of work
+        (REWRITE, INDEX or BACKFILL).
+    :return: List of (table name, kind, rows, seconds) tuples.
+    """
+    rates = {
+        REWRITE: CONF.migration.rewrite_rows_per_second,
+        INDEX: CONF.migration.index_rows_per_second,
+        BACKFILL: CONF.migration.backfill_rows_per_second
+    }
+
+    result = []
+
+    for table_name, kind in sorted(affected_tables.items()):
+        rows = table_rows(bind, table_name)
+        seconds = rows / float(rates[kind])
+
+        if kind == BACKFILL:
+            batches = rows // CONF.migration.backfill_batch_size
+            seconds += batches * CONF.migration.backfill_sleep
+
+        result.append((table_name, kind, rows, seconds))
+
+    return result
@@ -0,0 +1,122 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Version of the database schema.
+
+Services don't create or change the schema, they only check that the
+revisions they need were applied by highlander-db-manage.
+"""
+
+import os
+
+from alembic import command as alembic_cmd
+from alembic import config as alembic_cfg
+from alembic import migration as alembic_migration
+from alembic import script as alembic_script
+from alembic import util as alembic_u
+from oslo.config import cfg
+
+from highlander import exceptions as exc
+
+
+CONF = cfg.CONF
+
+EXPAND_BRANCH = 'expand'
+
+
+def get_alembic_config(connection=None):
+    alembic_config = alembic_cfg.Config(
+        os.path.join(os.path.dirname(__file__), 'alembic.ini')
+    )
+    alembic_config.set_main_option(
+        'script_location',
+        'highlander.db.sqlalchemy.migration:alembic_migrations'
+    )
+
+    # Attach the Highlander conf to the Alembic conf.
+    alembic_config.highlander_config = CONF
+
+    if connection is not None:
+        # Migrations run on the connection, with the logging of the caller.
+        alembic_config.attributes['connection'] = connection
+        alembic_config.attributes['configure_logger'] = False
+
+    return alembic_config
+
+
+def get_current_heads(connection):
+    """Returns the revisions applied to a database, none if it's new."""
+    context = alembic_migration.MigrationContext.configure(connection)
+
+    return context.get_current_heads()
+
+
+def stamp_heads(connection):
+    """Records that a schema created from the models is the latest one."""
+    alembic_cmd.stamp(get_alembic_config(connection), 'heads')
+
+
+def _applied_revisions(script, heads):
+    """Returns the revisions applied to a schema having the given heads.
+
+    Alembic doesn't record a head that another recorded revision depends
+    on, e.g. 016_expand once 003_contract is applied, so the dependencies
+    of the heads count as applied as well as their ancestors.
+    """
+    applied = set()
+    todo = list(heads)
+
+    while todo:
+        revision = script.get_revision(todo.pop())
+
+        if revision is None or revision.revision in applied:
+            continue
+
+        applied.add(revision.revision)
+
+        todo.extend(alembic_u.to_tuple(revision.down_revision, default=()))
+        todo.extend(alembic_u.to_tuple(revision.dependencies, default=()))
+
+    return applied
+
+
+def check_version(connection):
+    """Fails unless the schema has the revisions of the code.
+
+    The code needs the latest revision of the expand branch only: the
+    contract branch is applied after all services were upgraded. A schema
+    newer than the code, during a rolling upgrade, is fine too.
+    """
+    script = alembic_script.ScriptDirectory.from_config(get_alembic_config())
+
+    required = script.get_revision('%s@head' % EXPAND_BRANCH).revision
+    current = get_current_heads(connection)
+
+    for revision in current:
+        try:
+            script.get_revision(revision)
+        except alembic_u.CommandError:
+            # Unknown, written by a newer version of the code.
+            return
+
+    if required in _applied_revisions(script, current):
+        return
+
+    raise exc.DBException(
+        "Database schema is at revision(s) %s, revision %s is required. "
+        "Run 'highlander-db-manage upgrade --expand' (or 'stamp 001' then "
+        "'upgrade --expand' if the schema was created by an older "
+        "tools/sync_db.py)."
+        % (', '.join(current) or 'none', required)
+    )
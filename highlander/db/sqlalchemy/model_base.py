@@ -23,6 +23,7 @@ from sqlalchemy.ext import declarative
 from sqlalchemy.orm import attributes
 from sqlalchemy.orm import session as orm_session
 
+from highlander.db.sqlalchemy import base as db_base
 from highlander import utils
 from highlander.services import security
 
@@ -35,9 +36,13 @@ def id_column():
     )
 
 
+def version_column():
+    # Rows existing before the column was added start at version 1 too.
+    return sa.Column(sa.Integer, nullable=False, server_default='1')
+
+
 def get_session():
-    from heat.db.sqlalchemy import api as db_api
-    return db_api.get_session()
+    return db_base.get_session()
 
 
 class _HighlanderModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
@@ -79,6 +84,7 @@ class _HighlanderModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
 
         datetime_to_str(d, 'created_at')
         datetime_to_str(d, 'updated_at')
+        datetime_to_str(d, 'deleted_at')
 
         return d
 
@@ -100,10 +106,14 @@ class _HighlanderModelBase(oslo_models.ModelBase, oslo_models.TimestampMixin):
             session = orm_session.Session.object_session(self)
             if not session:
                 session = get_session()
-        session.begin()
-        for k, v in six.iteritems(values):
-            setattr(self, k, v)
-        session.commit()
+
+        # Join the transaction the session is already in (if any) instead
+        # of committing it on behalf of the caller.
+        with session.begin(subtransactions=True):
+            for k, v in six.iteritems(values):
+                setattr(self, k, v)
+
+            session.add(self)
 
     def __repr__(self):
         return '%s %s' % (type(self).__name__, self.to_dict().__repr__())
@@ -115,11 +125,25 @@ def datetime_to_str(dct, attr_name):
 
 
 class SoftDelete(object):
+    """Mixin for models whose rows are marked as deleted instead of removed.
+
+    Rows with 'deleted_at' set (tombstones) are hidden from the secured DB
+    API queries and get physically removed later by the purge job.
+    """
+
     deleted_at = sa.Column(sa.DateTime)
+    # True for live rows and NULL for tombstones. NULLs are distinct in
+    # unique indexes, so an index including it only covers live rows.
+    live = sa.Column(sa.Boolean, default=True, server_default='1')
 
     def soft_delete(self, session=None):
-        """Mark this object as deleted."""
-        self.update_and_save({'deleted_at': timeutils.utcnow()},
+        """Mark this object as deleted.
+
+        The change is flushed within the current transaction, it's up to the
+        caller to commit it. Unlike the soft_delete_* functions of the DB
+        API it doesn't cascade to the children of the object.
+        """
+        self.update_and_save({'deleted_at': timeutils.utcnow(), 'live': None},
                              session=session)
 
 
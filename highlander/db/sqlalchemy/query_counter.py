@@ -0,0 +1,177 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Counting of the statements a block of code executes.
+
+Relationships of the models are loaded lazily, an innocent loop over
+objects reading one of them executes a SELECT per object (N+1 queries).
+QueryCounter makes these loops visible: the same SELECT executed over and
+over with different parameters.
+"""
+
+import collections
+import functools
+import re
+
+from sqlalchemy import engine
+from sqlalchemy import event
+
+from highlander import utils
+
+
+_COUNTERS_THREAD_LOCAL_NAME = 'highlander_query_counters'
+
+_SELECT_TABLE = re.compile(
+    r'^\s*SELECT\b.*?\bFROM\s+["`]?(\w+)',
+    re.IGNORECASE | re.DOTALL
+)
+
+_installed = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    counters = utils.get_thread_local(_COUNTERS_THREAD_LOCAL_NAME)
+
+    if counters:
+        for counter in counters:
+            counter._record(statement)
+
+
+def _install():
+    global _installed
+
+    if not _installed:
+        # Listening on the class covers every engine, existing ones too.
+        event.listen(
+            engine.Engine,
+            'before_cursor_execute',
+            _before_cursor_execute
+        )
+
+        _installed = True
+
+
+class QueryCounter(object):
+    """Records the statements executed by the current thread.
+
+    Usable as a context manager or a decorator. Statements executed by
+    other threads, e.g. greenlets spawned meanwhile, aren't recorded.
+
+    :param limit: Maximum number of statements.
+    :param repeat_limit: Maximum number of executions of the same SELECT
+        statement, parameters aside.
+    :param on_violation: Called with a message while the statement going
+        over a limit executes, e.g. to log where it comes from. Without
+        it QueryBudgetExceeded is raised when the block ends.
+    """
+
+    def __init__(self, limit=None, repeat_limit=None, on_violation=None):
+        self.limit = limit
+        self.repeat_limit = repeat_limit
+        self.on_violation = on_violation
+
+        self.statements = []
+        self.violations = []
+
+        self._selects = collections.Counter()
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _violate(self, message):
+        self.violations.append(message)
+
+        if self.on_violation:
+            self.on_violation(message)
+
+    def _record(self, statement):
+        self.statements.append(statement)
+
+        if self.limit is not None and self.count == self.limit + 1:
+            self._violate(
+                "More than %s statements executed" % self.limit
+            )
+
+        match = _SELECT_TABLE.match(statement)
+
+        if not match:
+            return
+
+        self._selects[statement] += 1
+
+        if (self.repeat_limit is not None and
+                self._selects[statement] == self.repeat_limit + 1):
+            self._violate(
+                "Same SELECT on table '%s' executed more than %s times, "
+                "objects are probably loaded one by one: %s"
+                % (match.group(1), self.repeat_limit, statement)
+            )
+
+    def repeated_selects(self):
+        """Returns (table, statement, count) of SELECTs executed twice+."""
+        return [
+            (_SELECT_TABLE.match(statement).group(1), statement, count)
+            for statement, count in self._selects.most_common()
+            if count > 1
+        ]
+
+    def start(self):
+        _install()
+
+        counters = utils.get_thread_local(_COUNTERS_THREAD_LOCAL_NAME)
+
+        if counters:
+            counters.append(self)
+        else:
+            utils.set_thread_local(_COUNTERS_THREAD_LOCAL_NAME, [self])
+
+        return self
+
+    def stop(self):
+        counters = utils.get_thread_local(_COUNTERS_THREAD_LOCAL_NAME)
+
+        counters.remove(self)
+
+        if not counters:
+            utils.set_thread_local(_COUNTERS_THREAD_LOCAL_NAME, None)
+
+    def check(self):
+        if self.violations:
+            raise QueryBudgetExceeded('\n'.join(self.violations))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+        if exc_type is None and not self.on_violation:
+            self.check()
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def _counted(*args, **kwargs):
+            # A new counter per call, the decorator may be used
+            # concurrently.
+            with QueryCounter(self.limit, self.repeat_limit,
+                              self.on_violation):
+                return func(*args, **kwargs)
+
+        return _counted
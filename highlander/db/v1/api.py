@@ -29,6 +29,9 @@ LOG = logging.getLogger(__name__)
 def setup_db():
     IMPL.setup_db()
 
+def check_db():
+    IMPL.check_db()
+
 def drop_db():
     IMPL.drop_db()
 
@@ -51,11 +54,24 @@ def transaction():
     with IMPL.transaction():
         yield
 
+@contextlib.contextmanager
+def savepoint():
+    with IMPL.savepoint():
+        yield
+
+def after_commit(callback):
+    IMPL.after_commit(callback)
+
 # Locking.
 
 def acquire_lock(model, id):
     IMPL.acquire_lock(model, id)
 
+# Maintenance.
+
+def purge_soft_deleted(older_than, **kwargs):
+    return IMPL.purge_soft_deleted(older_than, **kwargs)
+
 #
 # Resiliency Group functions
 #
@@ -63,24 +79,27 @@ def acquire_lock(model, id):
 def get_resiliency_group(id):
     return IMPL.get_resiliency_group(id)
 
-def get_resiliency_groups():
-    return IMPL.get_resiliency_groups()
+def get_resiliency_groups(**kwargs):
+    return IMPL.get_resiliency_groups(**kwargs)
 
 def create_resiliency_group(values):
     return IMPL.create_resiliency_group(values)
 
-def update_resiliency_group(id, values):
-    return IMPL.update_resiliency_group(id, values)
+def update_resiliency_group(id, values, expected_version=None):
+    return IMPL.update_resiliency_group(id, values, expected_version)
 
 def create_or_update_resiliency_group(id, values):
     return IMPL.create_or_update_resiliency_group(id, values)
 
 def delete_resiliency_group(id):
-    IMPL.delete_resiliency_group(id)
+    return IMPL.delete_resiliency_group(id)
 
 def delete_resiliency_groups(**kwargs):
     return IMPL.delete_resiliency_groups(**kwargs)
 
+def soft_delete_resiliency_groups(**kwargs):
+    return IMPL.soft_delete_resiliency_groups(**kwargs)
+
 #
 # Resiliency Server functions
 #
@@ -88,24 +107,27 @@ def delete_resiliency_groups(**kwargs):
 def get_resiliency_server_group(id):
     return IMPL.get_resiliency_server_group(id)
 
-def get_resiliency_server_groupss(**kwargs):
-    return IMPL.get_resiliency_server_groupss(**kwargs)
+def get_resiliency_server_groups(**kwargs):
+    return IMPL.get_resiliency_server_groups(**kwargs)
 
 def create_resiliency_server_group(values, session=None):
     return IMPL.create_resiliency_server_group(values)
 
-def update_resiliency_server_group(id, values, session=None):
-    return IMPL.update_resiliency_server_group(id, values)
+def update_resiliency_server_group(id, values, expected_version=None):
+    return IMPL.update_resiliency_server_group(id, values, expected_version)
 
 def create_or_update_resiliency_server_group(id, values):
     return IMPL.create_or_update_resiliency_server_group(id, values)
 
 def delete_resiliency_server_group(id, session=None):
-    IMPL.delete_resiliency_server_group(id)
+    return IMPL.delete_resiliency_server_group(id)
 
 def delete_resiliency_server_groups(**kwargs):
     return IMPL.delete_resiliency_server_groups(**kwargs)
 
+def soft_delete_resiliency_server_groups(**kwargs):
+    return IMPL.soft_delete_resiliency_server_groups(**kwargs)
+
 #
 # Resiliency Server functions
 #
@@ -119,18 +141,21 @@ def get_resiliency_servers(**kwargs):
 def create_resiliency_server(values, session=None):
     return IMPL.create_resiliency_server(values)
 
-def update_resiliency_server(id, values, session=None):
-    return IMPL.update_resiliency_server(id, values)
+def update_resiliency_server(id, values, expected_version=None):
+    return IMPL.update_resiliency_server(id, values, expected_version)
 
 def create_or_update_resiliency_server(id, values):
     return IMPL.create_or_update_resiliency_server(id, values)
 
 def delete_resiliency_server(id, session=None):
-    IMPL.delete_resiliency_server(id)
+    return IMPL.delete_resiliency_server(id)
 
 def delete_resiliency_servers(**kwargs):
     return IMPL.delete_resiliency_servers(**kwargs)
 
+def soft_delete_resiliency_servers(**kwargs):
+    return IMPL.soft_delete_resiliency_servers(**kwargs)
+
 #
 # UFR Resiliency Server functions
 #
@@ -244,8 +269,8 @@ def get_resiliency_disks(**kwargs):
 def create_resiliency_disk(values, session=None):
     return IMPL.create_resiliency_disk(values)
 
-def update_resiliency_disk(id, values, session=None):
-    return IMPL.update_resiliency_disk(id, values)
+def update_resiliency_disk(id, values, expected_version=None):
+    return IMPL.update_resiliency_disk(id, values, expected_version)
 
 def create_or_update_resiliency_disk(id, values):
     return IMPL.create_or_update_resiliency_disk(id, values)
@@ -254,4 +279,146 @@ def delete_resiliency_disk(id, session=None):
     IMPL.delete_resiliency_disk(id)
 
 def delete_resiliency_disks(**kwargs):
-    return IMPL.delete_resiliency_disks(**kwargs)
\ No newline at end of file
+    return IMPL.delete_resiliency_disks(**kwargs)
+
+def soft_delete_resiliency_disks(**kwargs):
+    return IMPL.soft_delete_resiliency_disks(**kwargs)
+
+#
+# Resiliency Disk Logical functions
+#
+
+def create_resiliency_disk_logical(values, session=None):
+    return IMPL.create_resiliency_disk_logical(values)
+
+def delete_resiliency_disk_logicals(**kwargs):
+    return IMPL.delete_resiliency_disk_logicals(**kwargs)
+
+#
+# Resiliency Nic Logical functions
+#
+
+def create_resiliency_nic_logical(values, session=None):
+    return IMPL.create_resiliency_nic_logical(values)
+
+def delete_resiliency_nic_logicals(**kwargs):
+    return IMPL.delete_resiliency_nic_logicals(**kwargs)
+
+#
+# Resiliency Nic functions
+#
+
+def create_resiliency_nic(values, session=None):
+    return IMPL.create_resiliency_nic(values)
+
+def delete_resiliency_nics(**kwargs):
+    return IMPL.delete_resiliency_nics(**kwargs)
+
+#
+# Trust functions
+#
+
+def acquire_trust(scope_key):
+    return IMPL.acquire_trust(scope_key)
+
+def create_trust(values):
+    return IMPL.create_trust(values)
+
+def release_trust(id):
+    return IMPL.release_trust(id)
+
+#
+# Provisioning functions
+#
+
+def get_provisioning_job(id):
+    return IMPL.get_provisioning_job(id)
+
+def create_provisioning_job(values):
+    return IMPL.create_provisioning_job(values)
+
+def update_provisioning_job(id, values):
+    return IMPL.update_provisioning_job(id, values)
+
+def update_provisioning_jobs(ids, states, values):
+    return IMPL.update_provisioning_jobs(ids, states, values)
+
+def get_provisioning_step(job_id, name):
+    return IMPL.get_provisioning_step(job_id, name)
+
+def create_provisioning_step(values):
+    return IMPL.create_provisioning_step(values)
+
+def delete_provisioning_steps(**kwargs):
+    return IMPL.delete_provisioning_steps(**kwargs)
+
+#
+# Async job functions
+#
+
+def get_async_job(id):
+    return IMPL.get_async_job(id)
+
+def get_async_jobs(**kwargs):
+    return IMPL.get_async_jobs(**kwargs)
+
+def create_async_job(values):
+    return IMPL.create_async_job(values)
+
+def update_async_job(id, values):
+    return IMPL.update_async_job(id, values)
+
+def renew_async_jobs(owner, states):
+    return IMPL.renew_async_jobs(owner, states)
+
+def expire_async_jobs(states, older_than, values):
+    return IMPL.expire_async_jobs(states, older_than, values)
+
+#
+# Health functions
+#
+
+def update_resiliency_server_health(states):
+    return IMPL.update_resiliency_server_health(states)
+
+#
+# Recovery functions
+#
+
+def update_resiliency_server_recovery_targets(targets):
+    return IMPL.update_resiliency_server_recovery_targets(targets)
+
+#
+# Topology functions
+#
+
+def get_resiliency_topology():
+    return IMPL.get_resiliency_topology()
+
+def watch_resiliency_topology(callback):
+    IMPL.watch_resiliency_topology(callback)
+
+def unwatch_resiliency_topology(callback):
+    IMPL.unwatch_resiliency_topology(callback)
+
+#
+# Change event functions
+#
+
+def get_change_events(since=0, limit=None):
+    return IMPL.get_change_events(since, limit)
+
+def get_change_event_cursor():
+    return IMPL.get_change_event_cursor()
+
+def get_resiliency_topology_changes(since, limit=None):
+    return IMPL.get_resiliency_topology_changes(since, limit)
+
+def sequence_change_events(**kwargs):
+    return IMPL.sequence_change_events(**kwargs)
+
+def dispatch_change_events(callback, **kwargs):
+    return IMPL.dispatch_change_events(callback, **kwargs)
+
+def purge_change_events(older_than, **kwargs):
+    return IMPL.purge_change_events(older_than, **kwargs)
@@ -14,15 +14,19 @@
 #    limitations under the License.
 
 import contextlib
+import itertools
 import sys
 
 import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.orm import attributes
 from oslo.config import cfg
 from oslo.db import exception as db_exc
 from oslo.utils import timeutils
 
 from highlander import exceptions as exc
 from highlander.db.sqlalchemy import base as b
+from highlander.db.sqlalchemy.migration import schema
 from highlander.db.sqlalchemy import model_base as mb
 from highlander.db.sqlalchemy import sqlite_lock
 from highlander.db.v1.sqlalchemy import models
@@ -32,6 +36,9 @@ from highlander.services import security
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+# Number of rows handled within one transaction by bulk maintenance jobs.
+DEFAULT_BATCH_SIZE = 1000
+
 
 def get_backend():
     """Consumed by openstack common code.
@@ -43,18 +50,39 @@ def get_backend():
 
 
 def setup_db():
+    """Creates the schema in a new database.
+
+    Used by tests and tools/sync_db.py, schemas already managed by
+    highlander-db-manage are left alone.
+    """
     try:
+        with b.get_engine().connect() as conn:
+            if schema.get_current_heads(conn):
+                return
+
+            models.ResiliencyGroup.metadata.create_all(conn)
 
-        models.ResiliencyGroup.metadata.create_all(b.get_engine())
+            schema.stamp_heads(conn)
     except sa.exc.OperationalError as e:
         raise exc.DBException("Failed to setup database: %s" % e)
 
 
+def check_db():
+    with b.get_engine().connect() as conn:
+        schema.check_version(conn)
+
+
 def drop_db():
     global _facade
 
     try:
-        models.ResiliencyGroup.metadata.drop_all(b.get_engine())
+        engine = b.get_engine()
+
+        models.ResiliencyGroup.metadata.drop_all(engine)
+        sa.Table('alembic_version', sa.MetaData()).drop(
+            engine,
+            checkfirst=True
+        )
         _facade = None
     except Exception as e:
         raise exc.DBException("Failed to drop database: %s" % e)
@@ -88,6 +116,83 @@ def transaction():
         end_tx()
 
 
+@contextlib.contextmanager
+def savepoint():
+    """Undoes the changes of a block of a transaction if it fails.
+
+    The rest of the transaction carries on, the session stays usable.
+    Outside of a transaction every DB API call commits or rolls back on
+    its own already and the block just runs.
+    """
+    if not b.in_tx():
+        yield
+
+        return
+
+    nested = b.get_session().begin_nested()
+
+    try:
+        yield
+    except Exception:
+        nested.rollback()
+        raise
+
+    nested.commit()
+
+
+# Key of the callbacks kept in Session.info until the commit.
+_AFTER_COMMIT = 'highlander_after_commit'
+
+
+def after_commit(callback):
+    """Calls 'callback()' once the current transaction commits.
+
+    The callback is dropped if the transaction, or the savepoint it was
+    registered in, rolls back. Outside of a transaction it's called right
+    away.
+    """
+    if not b.in_tx():
+        callback()
+
+        return
+
+    session = b.get_session()
+
+    session.info.setdefault(_AFTER_COMMIT, []).append(
+        (session.transaction, callback)
+    )
+
+
+def _run_after_commit(session):
+    # Savepoints commit into their enclosing transaction.
+    if session.transaction.nested:
+        return
+
+    for _, callback in session.info.pop(_AFTER_COMMIT, []):
+        try:
+            callback()
+        except Exception as e:
+            LOG.exception("Failed to run after commit callback: %s" % e)
+
+
+def _discard_after_commit(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_AFTER_COMMIT, None)
+
+        return
+
+    callbacks = session.info.get(_AFTER_COMMIT)
+
+    if callbacks:
+        callbacks[:] = [
+            (tx, cb) for tx, cb in callbacks if tx is not previous_transaction
+        ]
+
+
+sa.event.listen(orm.Session, 'after_commit', _run_after_commit)
+sa.event.listen(orm.Session, 'after_soft_rollback', _discard_after_commit)
+
+
 @b.session_aware()
 def acquire_lock(model, id, session=None):
     if b.get_driver_name() != 'sqlite':
@@ -104,6 +209,9 @@ def acquire_lock(model, id, session=None):
 def _secure_query(model):
     query = b.model_query(model)
 
+    if issubclass(model, mb.SoftDelete):
+        query = query.filter(model.deleted_at.is_(None))
+
     if issubclass(model, mb.HighlanderSecureModelBase):
         query = query.filter(
             sa.or_(
@@ -115,18 +223,310 @@ def _secure_query(model):
     return query
 
 
+def _secure_list_query(model, criteria=(), with_deleted=False, **kwargs):
+    """Returns a query for all visible objects matching the given filters.
+
+    The visibility condition of _secure_query() is split into a UNION ALL
+    of two disjoint probes, objects of the current project and public
+    objects of other projects, so that each of them is served by its own
+    index instead of scanning the table to evaluate the OR.
+    :param criteria: SQL expressions applied to both probes.
+    :param with_deleted: Whether soft deleted objects are included.
+    """
+    query = b.model_query(model)
+
+    if issubclass(model, mb.SoftDelete) and not with_deleted:
+        query = query.filter(model.deleted_at.is_(None))
+
+    query = query.filter(*criteria).filter_by(**kwargs)
+
+    if not issubclass(model, mb.HighlanderSecureModelBase):
+        return query
+
+    project_id = security.get_project_id()
+
+    own = query.filter(model.project_id == project_id)
+    public = query.filter(
+        model.scope == 'public',
+        model.project_id != project_id
+    )
+
+    return own.union_all(public)
+
+
 def _delete_all(model, session=None, **kwargs):
-    _secure_query(model).filter_by(**kwargs).delete()
+    query = _secure_query(model).filter_by(**kwargs)
+
+    _record_bulk_events(query, 'delete')
+
+    query.delete()
+
+
+def _soft_delete_all(model, batch_size=DEFAULT_BATCH_SIZE, **kwargs):
+    """Soft deletes all visible objects matching the given filters.
+
+    Objects are marked in batches, along with their live descendants.
+    Outside of an explicit transaction each batch is committed on its own
+    so that locks are held only for a short period of time.
+    :return: Number of soft deleted objects, descendants included.
+    """
+    total = 0
+
+    while True:
+        found, count = _soft_delete_batch(model, batch_size, **kwargs)
+
+        total += count
+
+        if found < batch_size:
+            return total
+
+
+@b.session_aware()
+def _soft_delete_batch(model, batch_size, session=None, **kwargs):
+    query = _secure_query(model).filter_by(**kwargs)
+
+    ids = [r.id for r in query.with_entities(model.id).limit(batch_size)]
+
+    if not ids:
+        return 0, 0
+
+    now = timeutils.utcnow()
+    tree = _cascade_tree(model, ids, batch_size, soft=True)
+    count = 0
+
+    for m, m_ids in tree.items():
+        for chunk in _chunks(m_ids, batch_size):
+            query = b.model_query(m).filter(m.id.in_(chunk))
+
+            _record_bulk_events(query, 'delete')
+
+            count += query.update(
+                {
+                    'deleted_at': now,
+                    'updated_at': now,
+                    'live': None,
+                    'version_id': m.version_id + 1
+                },
+                synchronize_session=False
+            )
+
+    return len(ids), count
+
+
+# Soft deletable models ordered so that children go before their parents.
+_SOFT_DELETE_MODELS = [
+    models.ResiliencyNic,
+    models.ResiliencyDisk,
+    models.ResiliencyNicLogical,
+    models.ResiliencyDiskLogical,
+    models.ResiliencyServer,
+    models.ResiliencyServerGroup,
+    models.ResiliencyGroup
+]
+
+
+def purge_soft_deleted(older_than, batch_size=DEFAULT_BATCH_SIZE):
+    """Physically removes objects soft deleted before the given time.
+
+    Objects of all projects are purged in batches, children first. An
+    object that is still referenced by another row is kept until the
+    referencing row is gone.
+    :param older_than: Datetime, only objects deleted earlier are purged.
+    :param batch_size: Maximum number of rows removed per transaction.
+    :return: Number of purged objects.
+    """
+    total = 0
+
+    for model in _SOFT_DELETE_MODELS:
+        while True:
+            count = _purge_batch(model, older_than, batch_size)
+
+            total += count
+
+            if count < batch_size:
+                break
+
+    LOG.info("Purged %s soft deleted objects [older_than=%s]"
+             % (total, older_than))
+
+    return total
+
+
+@b.session_aware()
+def _purge_batch(model, older_than, batch_size, session=None):
+    query = b.model_query(model).filter(model.deleted_at < older_than)
+
+    for criterion in _not_referenced(model):
+        query = query.filter(criterion)
+
+    ids = [r.id for r in query.with_entities(model.id).limit(batch_size)]
+
+    if not ids:
+        return 0
+
+    return b.model_query(model).filter(model.id.in_(ids)).delete(
+        synchronize_session=False
+    )
+
+
+def _not_referenced(model):
+    table = model.__table__
+    criteria = []
+
+    for ref_table in models.ResiliencyGroup.metadata.sorted_tables:
+        for fk in ref_table.foreign_keys:
+            if fk.column.table is not table:
+                continue
+
+            # Aliasing keeps self-referencing tables correlated properly.
+            ref = ref_table.alias()
+
+            criteria.append(
+                ~sa.exists().where(
+                    ref.c[fk.parent.name] == table.c[fk.column.name]
+                )
+            )
+
+    return criteria
+
+
+def _delete_cascades(model):
+    # (child model, foreign key column) of the relationships deleting the
+    # children of an object with it.
+    return [
+        (rel.mapper.class_, rel.local_remote_pairs[0][1])
+        for rel in sa.inspect(model).relationships
+        if rel.cascade.delete
+    ]
+
+
+def _chunks(ids, size):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _cascade_tree(model, ids, batch_size, soft=False):
+    """Returns the ids of objects and, like the ORM cascades, of their
+    descendants by model.
+
+    Rather than loading every object, the ids of every level of the tree
+    are selected by the foreign keys of their parents.
+    :param soft: Whether only the live descendants that can be soft
+        deleted are returned.
+    """
+    tree = {}
+    level = [(model, ids)]
+
+    while level:
+        next_level = []
+
+        for parent, parent_ids in level:
+            tree.setdefault(parent, []).extend(parent_ids)
+
+            for child, fk in _delete_cascades(parent):
+                if soft and not issubclass(child, mb.SoftDelete):
+                    continue
+
+                query = b.model_query(child).with_entities(child.id)
+
+                if soft:
+                    query = query.filter(child.deleted_at.is_(None))
+
+                child_ids = []
+
+                for chunk in _chunks(parent_ids, batch_size):
+                    child_ids.extend(r[0] for r in query.filter(fk.in_(chunk)))
+
+                if child_ids:
+                    next_level.append((child, child_ids))
+
+        level = next_level
+
+    return tree
+
+
+def _delete_cascade(model, ids, batch_size=DEFAULT_BATCH_SIZE):
+    """Deletes objects and, like the ORM cascades, their descendants.
+
+    The rows of the tree of the objects are deleted by DELETE ... WHERE
+    id IN (...) statements of batch_size ids, children first.
+    :return: Dictionary of the number of deleted rows by table.
+    """
+    tree = _cascade_tree(model, ids, batch_size)
+
+    tables = models.ResiliencyGroup.metadata.sorted_tables
+    counts = {}
+
+    for parent in sorted(tree, key=lambda m: -tables.index(m.__table__)):
+        count = 0
+
+        for chunk in _chunks(tree[parent], batch_size):
+            query = b.model_query(parent).filter(parent.id.in_(chunk))
+
+            _record_bulk_events(query, 'delete')
+
+            count += query.delete(synchronize_session=False)
+
+        counts[parent.__tablename__] = count
+
+    return counts
 
 
 def _get_collection_sorted_by_name(model, **kwargs):
-    return _secure_query(model).filter_by(**kwargs).order_by(model.name).all()
+    query = _secure_list_query(model, **kwargs)
+
+    return query.order_by(model.name).all()
+
+
+def _get_collection_changed_since(model, changes_since, **kwargs):
+    """Returns visible objects changed at or after the given time.
+
+    Soft deleted objects are included so that clients see deletions,
+    objects are ordered by the time of their last change.
+    """
+    query = _secure_list_query(
+        model,
+        criteria=[model.updated_at >= changes_since],
+        with_deleted=True,
+        **kwargs
+    )
+
+    return query.order_by(model.updated_at, model.id).all()
 
 
 def _get_collection_sorted_by_time(model, **kwargs):
-    query = _secure_query(model)
+    query = _secure_list_query(model, **kwargs)
+
+    return query.order_by(model.created_at).all()
+
+
+def _update_versioned(db_obj, values, expected_version, session):
+    """Updates an object unless it was changed since it was read.
+
+    The UPDATE statement matches the version the object was loaded at,
+    it fails if another transaction updated the row in the meantime.
+    :param expected_version: Version the caller read the object at, e.g.
+        in an earlier transaction. None to only detect updates made after
+        the object was loaded by this one.
+    """
+    if expected_version is not None and db_obj.version_id != expected_version:
+        raise exc.ConcurrentUpdateException(
+            "%s was changed by another update [id=%s, version_id=%s]"
+            % (db_obj.__class__.__name__, db_obj.id, db_obj.version_id)
+        )
+
+    db_obj.update(dict((k, v) for k, v in values.items() if k != 'version_id'))
 
-    return query.filter_by(**kwargs).order_by(model.created_at).all()
+    # The object can't be read anymore once the flush failed.
+    id = db_obj.id
+
+    try:
+        session.flush()
+    except orm.exc.StaleDataError:
+        raise exc.ConcurrentUpdateException(
+            "%s was changed by another update [id=%s]"
+            % (db_obj.__class__.__name__, id)
+        )
 
 
 def _get_db_object_by_name(model, name):
@@ -151,7 +551,14 @@ def get_resiliency_group(id):
     return rg
 
 
-def get_resiliency_groups(**kwargs):
+def get_resiliency_groups(changes_since=None, **kwargs):
+    if changes_since:
+        return _get_collection_changed_since(
+            models.ResiliencyGroup,
+            changes_since,
+            **kwargs
+        )
+
     return _get_collection_sorted_by_name(models.ResiliencyGroup, **kwargs)
 
 
@@ -172,14 +579,14 @@ def create_resiliency_group(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_group(id, values, session=None):
+def update_resiliency_group(id, values, expected_version=None, session=None):
     rg = _get_resiliency_group(id)
 
     if not rg:
         raise exc.NotFoundException(
             "Resiliency Group not found [id=%s]" % id)
 
-    rg.update(values.copy())
+    _update_versioned(rg, values, expected_version, session)
 
     return rg
 
@@ -200,7 +607,7 @@ def delete_resiliency_group(id, session=None):
         raise exc.NotFoundException(
             "Resiliency Group not found [id=%s]" % id)
 
-    session.delete(rg)
+    return _delete_cascade(models.ResiliencyGroup, [rg.id])
 
 
 def _get_resiliency_group(id):
@@ -212,6 +619,10 @@ def delete_resiliency_groups(**kwargs):
     return _delete_all(models.ResiliencyGroup, **kwargs)
 
 
+def soft_delete_resiliency_groups(**kwargs):
+    return _soft_delete_all(models.ResiliencyGroup, **kwargs)
+
+
 #
 # Resiliency Server Group functions
 #
@@ -226,7 +637,14 @@ def get_resiliency_server_group(id):
     return rg
 
 
-def get_resiliency_server_groups(**kwargs):
+def get_resiliency_server_groups(changes_since=None, **kwargs):
+    if changes_since:
+        return _get_collection_changed_since(
+            models.ResiliencyServerGroup,
+            changes_since,
+            **kwargs
+        )
+
     return _get_collection_sorted_by_name(models.ResiliencyServerGroup, **kwargs)
 
 
@@ -247,14 +665,15 @@ def create_resiliency_server_group(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_server_group(id, values, session=None):
+def update_resiliency_server_group(id, values, expected_version=None,
+                                   session=None):
     rg = _get_resiliency_server_group(id)
 
     if not rg:
         raise exc.NotFoundException(
             "Resiliency ServerGroup not found [id=%s]" % id)
 
-    rg.update(values.copy())
+    _update_versioned(rg, values, expected_version, session)
 
     return rg
 
@@ -275,7 +694,7 @@ def delete_resiliency_server_group(id, session=None):
         raise exc.NotFoundException(
             "Resiliency ServerGroup not found [id=%s]" % id)
 
-    session.delete(rg)
+    return _delete_cascade(models.ResiliencyServerGroup, [rg.id])
 
 
 def _get_resiliency_server_group(id):
@@ -287,6 +706,10 @@ def delete_resiliency_server_groups(**kwargs):
     return _delete_all(models.ResiliencyServerGroup, **kwargs)
 
 
+def soft_delete_resiliency_server_groups(**kwargs):
+    return _soft_delete_all(models.ResiliencyServerGroup, **kwargs)
+
+
 #
 # Generic Resiliency Server functions
 #
@@ -301,7 +724,14 @@ def get_resiliency_server(id):
     return rs
 
 
-def get_resiliency_servers(**kwargs):
+def get_resiliency_servers(changes_since=None, **kwargs):
+    if changes_since:
+        return _get_collection_changed_since(
+            models.ResiliencyServer,
+            changes_since,
+            **kwargs
+        )
+
     return _get_collection_sorted_by_name(models.ResiliencyServer, **kwargs)
 
 
@@ -324,14 +754,14 @@ def create_resiliency_server(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_server(id, values, session=None):
+def update_resiliency_server(id, values, expected_version=None, session=None):
     rs = _get_resiliency_server(id)
 
     if not rs:
         raise exc.NotFoundException(
             "Resiliency Server not found [id=%s]" % id)
 
-    rs.update(values.copy())
+    _update_versioned(rs, values, expected_version, session)
 
     return rs
 
@@ -352,7 +782,7 @@ def delete_resiliency_server(id, session=None):
         raise exc.NotFoundException(
             "Resiliency Server not found [id=%s]" % id)
 
-    session.delete(rs)
+    return _delete_cascade(models.ResiliencyServer, [rs.id])
 
 
 def _get_resiliency_server(id):
@@ -364,6 +794,10 @@ def delete_resiliency_servers(**kwargs):
     return _delete_all(models.ResiliencyServer, **kwargs)
 
 
+def soft_delete_resiliency_servers(**kwargs):
+    return _soft_delete_all(models.ResiliencyServer, **kwargs)
+
+
 #
 # Resiliency Disk Logical functions
 #
@@ -399,14 +833,15 @@ def create_resiliency_disk_logical(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_disk_logical(id, values, session=None):
+def update_resiliency_disk_logical(id, values, expected_version=None,
+                                   session=None):
     rs = _get_resiliency_disk_logical(id)
 
     if not rs:
         raise exc.NotFoundException(
             "Resiliency DiskLogical not found [id=%s]" % id)
 
-    rs.update(values.copy())
+    _update_versioned(rs, values, expected_version, session)
 
     return rs
 
@@ -439,6 +874,10 @@ def delete_resiliency_disk_logicals(**kwargs):
     return _delete_all(models.ResiliencyDiskLogical, **kwargs)
 
 
+def soft_delete_resiliency_disk_logicals(**kwargs):
+    return _soft_delete_all(models.ResiliencyDiskLogical, **kwargs)
+
+
 #
 # Resiliency Disk functions
 #
@@ -474,14 +913,14 @@ def create_resiliency_disk(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_disk(id, values, session=None):
+def update_resiliency_disk(id, values, expected_version=None, session=None):
     rs = _get_resiliency_disk(id)
 
     if not rs:
         raise exc.NotFoundException(
             "Resiliency Disk not found [id=%s]" % id)
 
-    rs.update(values.copy())
+    _update_versioned(rs, values, expected_version, session)
 
     return rs
 
@@ -514,6 +953,10 @@ def delete_resiliency_disks(**kwargs):
     return _delete_all(models.ResiliencyDisk, **kwargs)
 
 
+def soft_delete_resiliency_disks(**kwargs):
+    return _soft_delete_all(models.ResiliencyDisk, **kwargs)
+
+
 #
 # Resiliency NicLogical functions
 #
@@ -549,14 +992,15 @@ def create_resiliency_nic_logical(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_nic_logical(id, values, session=None):
+def update_resiliency_nic_logical(id, values, expected_version=None,
+                                  session=None):
     rs = _get_resiliency_nic_logical(id)
 
     if not rs:
         raise exc.NotFoundException(
             "Resiliency Nic Logical not found [id=%s]" % id)
 
-    rs.update(values.copy())
+    _update_versioned(rs, values, expected_version, session)
 
     return rs
 
@@ -589,6 +1033,10 @@ def delete_resiliency_nic_logicals(**kwargs):
     return _delete_all(models.ResiliencyNicLogical, **kwargs)
 
 
+def soft_delete_resiliency_nic_logicals(**kwargs):
+    return _soft_delete_all(models.ResiliencyNicLogical, **kwargs)
+
+
 #
 # Resiliency Nic functions
 #
@@ -624,14 +1072,14 @@ def create_resiliency_nic(values, session=None):
 
 
 @b.session_aware()
-def update_resiliency_nic(id, values, session=None):
+def update_resiliency_nic(id, values, expected_version=None, session=None):
     rs = _get_resiliency_nic(id)
 
     if not rs:
         raise exc.NotFoundException(
             "Resiliency Nic not found [id=%s]" % id)
 
-    rs.update(values.copy())
+    _update_versioned(rs, values, expected_version, session)
 
     return rs
 
@@ -662,3 +1110,811 @@ def _get_resiliency_nic(id):
 @b.session_aware()
 def delete_resiliency_nics(**kwargs):
     return _delete_all(models.ResiliencyNic, **kwargs)
+
+
+def soft_delete_resiliency_nics(**kwargs):
+    return _soft_delete_all(models.ResiliencyNic, **kwargs)
+
+
+#
+# Trust functions
+#
+
+@b.session_aware()
+def acquire_trust(scope_key, session=None):
+    """Takes a reference on the trust shared under the given scope key.
+
+    :return: Trust id or None if there's no such trust.
+    """
+    trust = b.model_query(models.Trust).filter_by(scope_key=scope_key).first()
+
+    if not trust:
+        return None
+
+    # The row may be released and deleted concurrently.
+    updated = b.model_query(models.Trust).filter_by(id=trust.id).update(
+        {'ref_count': models.Trust.ref_count + 1},
+        synchronize_session=False
+    )
+
+    return trust.id if updated else None
+
+
+@b.session_aware()
+def create_trust(values, session=None):
+    trust = models.Trust()
+
+    trust.update(values)
+
+    try:
+        trust.save(session=session)
+    except db_exc.DBDuplicateEntry as e:
+        raise exc.DBDuplicateEntry(
+            "Duplicate entry for Trust: %s" % e.columns
+        )
+
+    return trust
+
+
+@b.session_aware()
+def release_trust(id, session=None):
+    """Drops a reference on a trust.
+
+    :return: True if the trust is not referenced anymore and can be
+        deleted in keystone.
+    """
+    query = b.model_query(models.Trust).filter_by(id=id)
+
+    updated = query.filter(models.Trust.ref_count > 1).update(
+        {'ref_count': models.Trust.ref_count - 1},
+        synchronize_session=False
+    )
+
+    if updated:
+        return False
+
+    deleted = query.filter(models.Trust.ref_count <= 1).delete(
+        synchronize_session=False
+    )
+
+    # Nothing deleted means either that the trust was acquired again in
+    # the meantime or that it has never been shared.
+    return bool(deleted) or not query.first()
+
+
+#
+# Provisioning functions
+#
+
+def get_provisioning_job(id):
+    job = _get_db_object_by_id(models.ProvisioningJob, id)
+
+    if not job:
+        raise exc.NotFoundException(
+            "Provisioning Job not found [id=%s]" % id)
+
+    return job
+
+
+@b.session_aware()
+def create_provisioning_job(values, session=None):
+    job = models.ProvisioningJob()
+
+    job.update(values.copy())
+    job.save(session=session)
+
+    return job
+
+
+@b.session_aware()
+def update_provisioning_job(id, values, session=None):
+    job = get_provisioning_job(id)
+
+    job.update(values.copy())
+
+    return job
+
+
+@b.session_aware()
+def update_provisioning_jobs(ids, states, values, session=None):
+    """Updates provisioning jobs of all projects.
+
+    :param ids: Ids of the jobs.
+    :param states: Only jobs in these states are updated.
+    :return: Number of updated jobs.
+    """
+    model = models.ProvisioningJob
+
+    updated = 0
+
+    for chunk in _chunks(ids, DEFAULT_BATCH_SIZE):
+        updated += b.model_query(model).filter(
+            model.id.in_(chunk),
+            model.state.in_(states)
+        ).update(values, synchronize_session=False)
+
+    return updated
+
+
+def get_provisioning_step(job_id, name):
+    """Returns the finished step of a job or None if it hasn't finished."""
+    return b.model_query(models.ProvisioningStep).filter_by(
+        job_id=job_id,
+        name=name
+    ).first()
+
+
+@b.session_aware()
+def create_provisioning_step(values, session=None):
+    step = models.ProvisioningStep()
+
+    step.update(values.copy())
+
+    try:
+        step.save(session=session)
+    except db_exc.DBDuplicateEntry as e:
+        raise exc.DBDuplicateEntry(
+            "Duplicate entry for ProvisioningStep: %s" % e.columns
+        )
+
+    return step
+
+
+@b.session_aware()
+def delete_provisioning_steps(session=None, **kwargs):
+    b.model_query(models.ProvisioningStep).filter_by(**kwargs).delete()
+
+
+#
+# Async job functions
+#
+
+def get_async_job(id):
+    job = _get_db_object_by_id(models.AsyncJob, id)
+
+    if not job:
+        raise exc.NotFoundException("Job not found [id=%s]" % id)
+
+    return job
+
+
+def get_async_jobs(**kwargs):
+    return _get_collection_sorted_by_time(models.AsyncJob, **kwargs)
+
+
+@b.session_aware()
+def create_async_job(values, session=None):
+    job = models.AsyncJob()
+
+    job.update(values.copy())
+    job.save(session=session)
+
+    return job
+
+
+@b.session_aware()
+def update_async_job(id, values, session=None):
+    job = get_async_job(id)
+
+    job.update(values.copy())
+
+    return job
+
+
+@b.session_aware()
+def renew_async_jobs(owner, states, session=None):
+    """Renews the heartbeats of the unfinished jobs of an API process.
+
+    :param owner: 'host:pid' of the process.
+    :param states: States of unfinished jobs.
+    :return: Number of renewed jobs.
+    """
+    model = models.AsyncJob
+
+    return b.model_query(model).filter(
+        model.owner == owner,
+        model.state.in_(states)
+    ).update(
+        {'heartbeat_at': timeutils.utcnow()},
+        synchronize_session=False
+    )
+
+
+@b.session_aware()
+def expire_async_jobs(states, older_than, values, session=None):
+    """Updates unfinished jobs of all projects left by dead processes.
+
+    :param states: States of unfinished jobs.
+    :param older_than: Jobs whose heartbeat is older, or missing, are
+        expired.
+    :param values: Values of the expired jobs, e.g. their error.
+    :return: Ids of the expired jobs.
+    """
+    model = models.AsyncJob
+
+    query = b.model_query(model).with_entities(model.id).filter(
+        model.state.in_(states),
+        sa.or_(
+            model.heartbeat_at.is_(None),
+            model.heartbeat_at < older_than
+        )
+    )
+
+    ids = [row[0] for row in query.with_for_update()]
+
+    for chunk in _chunks(ids, DEFAULT_BATCH_SIZE):
+        b.model_query(model).filter(model.id.in_(chunk)).update(
+            values,
+            synchronize_session=False
+        )
+
+    return ids
+
+
+#
+# Health functions
+#
+
+@b.session_aware()
+def update_resiliency_server_health(states, batch_size=DEFAULT_BATCH_SIZE,
+                                    session=None):
+    """Stores health states of servers of all projects.
+
+    Servers in the same state are updated by one statement per batch,
+    'updated_at' is left alone since the health state isn't user data,
+    'version_id' is incremented so that updates of stale copies fail.
+    :param states: Dictionary of server id to health state.
+    :return: Number of updated servers.
+    """
+    model = models.ResiliencyServer
+    now = timeutils.utcnow()
+
+    by_state = {}
+
+    for id, state in states.items():
+        by_state.setdefault(state, []).append(id)
+
+    updated = 0
+
+    for state, ids in sorted(by_state.items()):
+        for i in range(0, len(ids), batch_size):
+            query = b.model_query(model).filter(
+                model.id.in_(ids[i:i + batch_size])
+            )
+
+            _record_bulk_events(query, 'update')
+
+            updated += query.update(
+                {
+                    'health_state': state,
+                    'health_changed_at': now,
+                    'version_id': model.version_id + 1
+                },
+                synchronize_session=False
+            )
+
+    return updated
+
+
+#
+# Recovery functions
+#
+
+@b.session_aware()
+def update_resiliency_server_recovery_targets(targets,
+                                              batch_size=DEFAULT_BATCH_SIZE,
+                                              session=None):
+    """Stores the target hypervisors of servers of all projects.
+
+    Servers going to the same hypervisor are updated by one statement per
+    batch, like update_resiliency_server_health(). Deleted servers are
+    skipped.
+    :param targets: Dictionary of server id to target hypervisor id.
+    :return: Set of the ids of the updated servers.
+    """
+    model = models.ResiliencyServer
+    now = timeutils.utcnow()
+
+    by_target = {}
+
+    for id, hypervisor_id in targets.items():
+        by_target.setdefault(hypervisor_id, []).append(id)
+
+    updated = set()
+
+    for hypervisor_id, ids in sorted(by_target.items()):
+        for chunk in _chunks(ids, batch_size):
+            query = b.model_query(model).filter(
+                model.id.in_(chunk),
+                model.deleted_at.is_(None)
+            )
+
+            chunk_ids = [r[0] for r in query.with_entities(model.id)]
+
+            if not chunk_ids:
+                continue
+
+            query = b.model_query(model).filter(model.id.in_(chunk_ids))
+
+            _record_bulk_events(query, 'update')
+
+            query.update(
+                {
+                    'target_recovery_hypervisor_id': hypervisor_id,
+                    'updated_at': now,
+                    'version_id': model.version_id + 1
+                },
+                synchronize_session=False
+            )
+
+            updated.update(chunk_ids)
+
+    return updated
+
+
+#
+# Topology functions
+#
+
+_TOPOLOGY_COLUMNS = {
+    'server_groups': (
+        models.ResiliencyServerGroup,
+        ('id', 'resiliency_group_id', 'resiliency_strategy_type')
+    ),
+    'servers': (
+        models.ResiliencyServer,
+        ('id', 'resiliency_server_group_id', 'resiliency_id', 'instance_id',
+         'hypervisor_id', 'affinity', 'replacement_resiliency_server_id')
+    )
+}
+
+
+def get_resiliency_topology():
+    """Returns placement columns of live objects of all projects.
+
+    Rows are read as plain tuples, no models are built.
+    :return: Dictionary with 'server_groups' and 'servers' lists of dicts.
+    """
+    topology = {}
+
+    for key, (model, columns) in _TOPOLOGY_COLUMNS.items():
+        query = b.model_query(model).with_entities(
+            *[getattr(model, c) for c in columns]
+        ).filter(model.deleted_at.is_(None))
+
+        topology[key] = [dict(zip(columns, row)) for row in query]
+
+    return topology
+
+
+# Key of the changes collected in Session.info until the commit.
+_TOPOLOGY_CHANGES = 'highlander_topology_changes'
+
+_TOPOLOGY_WATCHERS = []
+
+
+def _topology_key(cls):
+    for key, (model, _) in _TOPOLOGY_COLUMNS.items():
+        if issubclass(cls, model):
+            return key
+
+    return None
+
+
+def _collect_topology_changes(session, flush_context):
+    changes = session.info.setdefault(_TOPOLOGY_CHANGES, [])
+
+    for obj in itertools.chain(session.new, session.dirty):
+        key = _topology_key(type(obj))
+
+        if key:
+            columns = _TOPOLOGY_COLUMNS[key][1]
+            values = None if obj.deleted_at else dict(
+                (c, getattr(obj, c)) for c in columns
+            )
+
+            changes.append((key, obj.id, values))
+
+    for obj in session.deleted:
+        key = _topology_key(type(obj))
+
+        if key:
+            changes.append((key, obj.id, None))
+
+
+def _collect_topology_bulk_change(context):
+    entity = context.query.column_descriptions[0]['type']
+    key = _topology_key(entity) if isinstance(entity, type) else None
+
+    if not key:
+        return
+
+    # Updates of other columns, e.g. health states, don't matter.
+    if hasattr(context, 'values'):
+        columns = set(_TOPOLOGY_COLUMNS[key][1]) | set(['deleted_at'])
+        changed = set(getattr(c, 'key', c) for c in context.values)
+
+        if not changed & columns:
+            return
+
+    # Rows changed by a bulk statement aren't known, see
+    # watch_resiliency_topology().
+    context.session.info.setdefault(_TOPOLOGY_CHANGES, []).append(None)
+
+
+def _publish_topology_changes(session):
+    changes = session.info.pop(_TOPOLOGY_CHANGES, None)
+
+    if not changes:
+        return
+
+    if None in changes:
+        changes = None
+
+    for callback in list(_TOPOLOGY_WATCHERS):
+        callback(changes)
+
+
+def _discard_topology_changes(session, previous_transaction):
+    if not session.info.get(_TOPOLOGY_CHANGES):
+        return
+
+    if previous_transaction.nested:
+        # Changes of the outer transaction are mixed with the rolled back
+        # ones, all of them are reported as unknown once it commits.
+        session.info[_TOPOLOGY_CHANGES] = [None]
+    else:
+        del session.info[_TOPOLOGY_CHANGES]
+
+
+_TOPOLOGY_EVENTS = (
+    ('after_flush', _collect_topology_changes),
+    ('after_bulk_update', _collect_topology_bulk_change),
+    ('after_bulk_delete', _collect_topology_bulk_change),
+    ('after_commit', _publish_topology_changes),
+    ('after_soft_rollback', _discard_topology_changes)
+)
+
+
+def watch_resiliency_topology(callback):
+    """Reports committed changes of server groups and servers.
+
+    'callback(changes)' is called after every commit changing them with a
+    list of (key, id, values) tuples, 'key' and 'values' as returned by
+    get_resiliency_topology() and values None for deleted objects.
+    Changes made by bulk statements are reported as changes=None, the
+    topology has to be read again.
+    """
+    if not _TOPOLOGY_WATCHERS:
+        for name, fn in _TOPOLOGY_EVENTS:
+            sa.event.listen(orm.Session, name, fn)
+
+    _TOPOLOGY_WATCHERS.append(callback)
+
+
+def unwatch_resiliency_topology(callback):
+    _TOPOLOGY_WATCHERS.remove(callback)
+
+    if not _TOPOLOGY_WATCHERS:
+        for name, fn in _TOPOLOGY_EVENTS:
+            sa.event.remove(orm.Session, name, fn)
+
+
+#
+# Change event functions
+#
+
+# Objects whose changes are recorded as change events.
+_EVENT_MODELS = (models.ResiliencyBase, models.FTBase)
+
+_EVENT_COLUMNS = (
+    'entity_type', 'entity_id', 'action', 'project_id', 'scope',
+    'dispatched', 'created_at'
+)
+
+
+def _event_action(session, obj):
+    if obj in session.new:
+        return 'create'
+
+    if obj in session.deleted:
+        return 'delete'
+
+    if not session.is_modified(obj, include_collections=False):
+        return None
+
+    if (isinstance(obj, mb.SoftDelete) and obj.deleted_at and
+            attributes.get_history(obj, 'deleted_at').added):
+        return 'delete'
+
+    return 'update'
+
+
+def _record_flush_events(session, flush_context):
+    now = timeutils.utcnow()
+    rows = []
+
+    objs = itertools.chain(session.new, session.dirty, session.deleted)
+
+    for obj in objs:
+        if not isinstance(obj, _EVENT_MODELS):
+            continue
+
+        action = _event_action(session, obj)
+
+        if action:
+            rows.append(dict(zip(_EVENT_COLUMNS, (
+                obj.__tablename__, obj.id, action, obj.project_id,
+                obj.scope, False, now
+            ))))
+
+    if rows:
+        session.execute(models.ChangeEvent.__table__.insert(), rows)
+
+
+def _record_bulk_events(query, action):
+    """Records an event for every row a bulk statement is about to change.
+
+    Must run before the statement, with the query it is built from. The
+    events are copied from the rows by a single INSERT ... SELECT.
+    """
+    model = query.column_descriptions[0]['type']
+
+    select = query.with_entities(
+        sa.literal(model.__tablename__),
+        model.id,
+        sa.literal(action),
+        model.project_id,
+        model.scope,
+        sa.literal(False),
+        sa.literal(timeutils.utcnow())
+    ).statement
+
+    query.session.execute(
+        models.ChangeEvent.__table__.insert().from_select(
+            _EVENT_COLUMNS,
+            select
+        )
+    )
+
+
+# ORM changes of all sessions are recorded, see _record_bulk_events() for
+# bulk statements.
+sa.event.listen(orm.Session, 'after_flush', _record_flush_events)
+
+
+def get_change_events(since=0, limit=None):
+    """Returns events visible to the current project after a cursor.
+
+    Only numbered events are returned, see sequence_change_events().
+    :param since: Sequence number of the last event the caller has seen,
+        0 for all.
+    :param limit: Maximum number of returned events.
+    :return: Events ordered by sequence number.
+    """
+    model = models.ChangeEvent
+
+    _check_event_cursor(since)
+
+    query = b.model_query(model).filter(model.seq > since).filter(
+        sa.or_(
+            model.project_id == security.get_project_id(),
+            model.scope == 'public'
+        )
+    ).order_by(model.seq)
+
+    if limit:
+        query = query.limit(limit)
+
+    return query.all()
+
+
+def _check_event_cursor(since):
+    model = models.ChangeEvent
+
+    oldest = b.model_query(model).with_entities(
+        sa.func.min(model.seq)
+    ).scalar()
+
+    # Purged events can't be replayed, the caller has to start over.
+    # Sequence numbers have no gaps and are purged oldest first, the
+    # events up to oldest - 1 are the purged ones.
+    if since and oldest and since < oldest - 1:
+        raise exc.EventCursorExpiredException(
+            "Change events after %s are not available anymore, the oldest "
+            "one is %s" % (since, oldest)
+        )
+
+
+def get_change_event_cursor():
+    """Returns the sequence number of the last numbered event, 0 if none."""
+    model = models.ChangeEvent
+
+    return b.model_query(model).with_entities(
+        sa.func.max(model.seq)
+    ).scalar() or 0
+
+
+def get_resiliency_topology_changes(since, limit=None):
+    """Returns topology changes of all projects after an event cursor.
+
+    Unlike watch_resiliency_topology(), which only sees the commits of
+    this process, changes made by any process are returned. Objects are
+    read again for the numbered events after the cursor.
+    :param since: Sequence number of the last event already applied.
+    :param limit: Maximum number of events read.
+    :return: Tuple of the new cursor and a list of (key, id, values)
+        tuples as reported by watch_resiliency_topology(), values None
+        for deleted objects.
+    """
+    model = models.ChangeEvent
+
+    _check_event_cursor(since)
+
+    query = b.model_query(model).with_entities(
+        model.seq,
+        model.entity_type,
+        model.entity_id
+    ).filter(model.seq > since).order_by(model.seq)
+
+    if limit:
+        query = query.limit(limit)
+
+    events = query.all()
+
+    if not events:
+        return since, []
+
+    changes = []
+
+    for key, (obj_model, columns) in sorted(_TOPOLOGY_COLUMNS.items()):
+        ids = []
+        seen = set()
+
+        for _, entity_type, entity_id in events:
+            if (entity_type == obj_model.__tablename__ and
+                    entity_id not in seen):
+                ids.append(entity_id)
+                seen.add(entity_id)
+
+        found = {}
+
+        for chunk in _chunks(ids, DEFAULT_BATCH_SIZE):
+            rows = b.model_query(obj_model).with_entities(
+                *[getattr(obj_model, c) for c in columns]
+            ).filter(
+                obj_model.id.in_(chunk),
+                obj_model.deleted_at.is_(None)
+            )
+
+            for row in rows:
+                found[row[0]] = dict(zip(columns, row))
+
+        changes.extend((key, id, found.get(id)) for id in ids)
+
+    return events[-1][0], changes
+
+
+@b.session_aware()
+def sequence_change_events(batch_size=DEFAULT_BATCH_SIZE, session=None):
+    """Numbers committed events, readers follow the numbers.
+
+    Ids are taken when events are recorded but transactions commit in any
+    order: a reader could get past id 11 while the transaction of id 10
+    is still running, and never see 10. Sequence numbers are assigned to
+    committed events by one transaction at a time instead: each one locks
+    the last numbered event, the unique index of 'seq' fails the others.
+    A later event always gets a greater number and there are no gaps.
+    :return: Number of numbered events.
+    """
+    model = models.ChangeEvent
+
+    last = b.model_query(model).filter(
+        model.seq.isnot(None)
+    ).order_by(model.seq.desc()).limit(1).with_for_update().first()
+
+    events = b.model_query(model).filter(
+        model.seq.is_(None)
+    ).order_by(model.id).limit(batch_size).all()
+
+    seq = last.seq if last else 0
+
+    for e in events:
+        seq += 1
+        e.seq = seq
+
+    return len(events)
+
+
+@b.session_aware()
+def dispatch_change_events(callback, batch_size=DEFAULT_BATCH_SIZE,
+                           session=None):
+    """Passes the oldest undispatched events of all projects to a callback.
+
+    Only numbered events are passed, in the order of their numbers. The
+    events are locked until the transaction ends and marked as dispatched
+    if the callback succeeds, concurrent dispatchers never pass the same
+    events.
+    :param callback: Called with the list of events.
+    :return: Number of dispatched events.
+    """
+    model = models.ChangeEvent
+
+    events = b.model_query(model).filter(
+        model.dispatched == sa.false(),
+        model.seq.isnot(None)
+    ).order_by(model.seq).limit(batch_size).with_for_update().all()
+
+    if not events:
+        return 0
+
+    callback(events)
+
+    b.model_query(model).filter(
+        model.id.in_([e.id for e in events])
+    ).update({'dispatched': True}, synchronize_session=False)
+
+    return len(events)
+
+
+def purge_change_events(older_than, batch_size=DEFAULT_BATCH_SIZE):
+    """Removes dispatched events created before the given time.
+
+    Events are removed in the order of their sequence numbers, up to the
+    first one that has to be kept. Clients whose cursor points before the
+    remaining events have to read everything again, see
+    get_change_events().
+    :return: Number of removed events.
+    """
+    total = 0
+
+    while True:
+        count = _purge_change_events_batch(older_than, batch_size)
+
+        total += count
+
+        if count < batch_size:
+            return total
+
+
+@b.session_aware()
+def _purge_change_events_batch(older_than, batch_size, session=None):
+    model = models.ChangeEvent
+
+    # The newest event is kept, some databases hand out ids again once
+    # the highest one is gone. So is the last numbered one, the next
+    # numbers follow it.
+    newest_id, newest_seq = b.model_query(model).with_entities(
+        sa.func.max(model.id),
+        sa.func.max(model.seq)
+    ).first()
+
+    if newest_seq is None:
+        return 0
+
+    # The first event that has to be kept, the following ones are kept too.
+    kept = b.model_query(model).with_entities(
+        sa.func.min(model.seq)
+    ).filter(
+        model.seq.isnot(None),
+        sa.or_(
+            model.dispatched == sa.false(),
+            model.created_at >= older_than,
+            model.id == newest_id
+        )
+    ).scalar()
+
+    limit = newest_seq if kept is None else min(kept, newest_seq)
+
+    ids = [
+        r.id for r in b.model_query(model).with_entities(model.id).filter(
+            model.seq < limit
+        ).order_by(model.seq).limit(batch_size)
+    ]
+
+    if not ids:
+        return 0
+
+    return b.model_query(model).filter(model.id.in_(ids)).delete(
+        synchronize_session=False
+    )
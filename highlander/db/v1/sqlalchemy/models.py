@@ -13,6 +13,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from oslo.utils import timeutils
 import sqlalchemy as sa
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import backref
@@ -34,13 +35,79 @@ def id_column_with_fk(fk):
     )
 
 
+def _secure_list_indexes(table_name):
+    # Secured list queries probe live rows of the current project and live
+    # public rows separately and read them in name order, so each probe has
+    # its own (..., deleted_at, name) index and skips tombstones and sorting
+    # by walking it. The purge job only ever looks at tombstones so on
+    # PostgreSQL its index is partial and stays small.
+    return (
+        sa.Index(
+            'ix_%s_project_id_deleted_at_name' % table_name,
+            'project_id', 'deleted_at', 'name'
+        ),
+        sa.Index(
+            'ix_%s_scope_deleted_at_name' % table_name,
+            'scope', 'deleted_at', 'name'
+        ),
+        sa.Index(
+            'ix_%s_deleted_at' % table_name,
+            'deleted_at',
+            postgresql_where=sa.text('deleted_at IS NOT NULL')
+        ),
+    )
+
+
+def _live_name_index(table_name):
+    # Names are unique among the live objects of a project, a soft deleted
+    # name can be used again.
+    return sa.Index(
+        'ix_%s_project_id_name_live' % table_name,
+        'project_id', 'name', 'live',
+        unique=True
+    )
+
+
+def _changes_since_indexes(table_name):
+    # 'changes-since' queries probe the objects of the current project and
+    # public objects separately, tombstones included, in change order.
+    return (
+        sa.Index(
+            'ix_%s_project_id_updated_at' % table_name,
+            'project_id', 'updated_at'
+        ),
+        sa.Index(
+            'ix_%s_scope_updated_at' % table_name,
+            'scope', 'updated_at'
+        ),
+    )
+
+
 class ResiliencyBase(mb.HighlanderSecureModelBase, mb.SoftDelete):
     __abstract__ = True
 
+    # Set on creation as well so that it always tells when the object last
+    # changed.
+    updated_at = sa.Column(
+        sa.DateTime,
+        default=lambda: timeutils.utcnow(),
+        onupdate=lambda: timeutils.utcnow()
+    )
+
     id = mb.id_column()
     name = sa.Column(sa.String(80))
     desc = sa.Column(sa.String(255))
 
+    # Incremented by every update. An update of a copy loaded before
+    # another update fails with StaleDataError instead of overwriting it.
+    version_id = mb.version_column()
+
+    # Subclasses with mapper arguments of their own need to set
+    # 'version_id_col' too.
+    @declared_attr
+    def __mapper_args__(cls):
+        return {'version_id_col': cls.version_id}
+
 
 #
 # Represents a grouping of server groups (pairs for UFR/FT, clusters for NM)
@@ -50,7 +117,9 @@ class ResiliencyGroup(ResiliencyBase):
     __tablename__ = 'resiliency_group'
 
     __table_args__ = (
-        sa.UniqueConstraint('name', 'project_id'),
+        _live_name_index(__tablename__),
+    ) + _secure_list_indexes(__tablename__) + (
+        _changes_since_indexes(__tablename__)
     )
 
     resiliency_strategy_type = sa.Column(RESILIENCY_STRATEGY_TYPES, nullable=False)
@@ -67,7 +136,9 @@ class ResiliencyServerGroup(ResiliencyBase):
     __tablename__ = 'resiliency_server_group'
 
     __table_args__ = (
-        sa.UniqueConstraint('name', 'project_id'),
+        _live_name_index(__tablename__),
+    ) + _secure_list_indexes(__tablename__) + (
+        _changes_since_indexes(__tablename__)
     )
 
     resiliency_strategy_type = sa.Column(RESILIENCY_STRATEGY_TYPES, nullable=False)
@@ -76,7 +147,8 @@ class ResiliencyServerGroup(ResiliencyBase):
 ResiliencyServerGroup.resiliency_group_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyGroup.id),
-    nullable=True
+    nullable=True,
+    index=True
 )
 
 ResiliencyGroup.resiliency_server_groups = relationship(
@@ -101,14 +173,19 @@ class ResiliencyServer(ResiliencyBase):
     resiliency_strategy_type = sa.Column(RESILIENCY_STRATEGY_TYPES, nullable=False)
 
     __table_args__ = (
-        sa.UniqueConstraint('name', 'project_id'),
+        _live_name_index(__tablename__),
+    ) + _secure_list_indexes(__tablename__) + (
+        _changes_since_indexes(__tablename__)
     )
 
     # Not making instance_id a foreign key to the associated Nova table for now,
     # because I don't believe cross-database references are possible.  Neutron
     # seems to do this with "device_id" on ports, which is a UUID of a Nova
     # instance
-    instance_id = sa.Column(sa.String(36))
+    instance_id = sa.Column(sa.String(36), index=True)
+
+    # Where am I running?
+    hypervisor_id = sa.Column(sa.String(255), index=True)
 
     # Which side am I? (1 or 2 for UFR/FT, 1 to N for NM)
     resiliency_id = sa.Column(sa.Integer)
@@ -123,7 +200,12 @@ class ResiliencyServer(ResiliencyBase):
     # Am I affinitized?  If so, to what grouping?
     affinity = sa.Column(sa.String(80))
 
+    # Am I alive? Set by the health monitor when it changes.
+    health_state = sa.Column(sa.String(20))
+    health_changed_at = sa.Column(sa.DateTime)
+
     __mapper_args__ = {
+        'version_id_col': ResiliencyBase.version_id,
         'polymorphic_identity': 'resiliency_server',
         'polymorphic_on': resiliency_strategy_type
     }
@@ -133,13 +215,15 @@ class ResiliencyServer(ResiliencyBase):
 ResiliencyServer.replacement_resiliency_server_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyServer.id),
-    nullable=True
+    nullable=True,
+    index=True
 )
 
 ResiliencyServer.resiliency_server_group_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyServerGroup.id),
-    nullable=True
+    nullable=True,
+    index=True
 )
 
 ResiliencyServerGroup.resiliency_servers = relationship(
@@ -161,12 +245,15 @@ class ResiliencyDiskLogical(ResiliencyBase):
 
     __tablename__ = 'resiliency_disk_logical'
 
+    __table_args__ = _secure_list_indexes(__tablename__)
+
     # Which disk am I? (1, 2, 3, etc...)
     disk_id = sa.Column(sa.Integer)
     disk_size = sa.Column(sa.String(40))
     type = sa.Column(sa.String(40))
 
     __mapper_args__ = {
+        'version_id_col': ResiliencyBase.version_id,
         'polymorphic_identity': 'resiliency_disk_logical',
         'polymorphic_on': type
     }
@@ -175,7 +262,8 @@ class ResiliencyDiskLogical(ResiliencyBase):
 ResiliencyDiskLogical.resiliency_server_group_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyServerGroup.id),
-    nullable=False
+    nullable=False,
+    index=True
 )
 
 ResiliencyServerGroup.resiliency_disk_logicals = relationship(
@@ -197,12 +285,15 @@ class ResiliencyDisk(ResiliencyBase):
 
     __tablename__ = 'resiliency_disk'
 
+    __table_args__ = _secure_list_indexes(__tablename__)
+
     disk_size = sa.Column(sa.String(40))
     type = sa.Column(sa.String(40))
     volume_id = sa.Column(sa.String(36))
     resiliency_id = sa.Column(sa.Integer)
 
     __mapper_args__ = {
+        'version_id_col': ResiliencyBase.version_id,
         'polymorphic_identity': 'resiliency_disk',
         'polymorphic_on': type
     }
@@ -211,7 +302,8 @@ class ResiliencyDisk(ResiliencyBase):
 ResiliencyDisk.resiliency_server_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyServer.id),
-    nullable=False
+    nullable=False,
+    index=True
 )
 
 ResiliencyServer.resiliency_disks = relationship(
@@ -234,6 +326,8 @@ class ResiliencyNicLogical(ResiliencyBase):
 
     __tablename__ = 'resiliency_nic_logical'
 
+    __table_args__ = _secure_list_indexes(__tablename__)
+
     type = sa.Column(sa.String(40))
     # Which nic am I (1, 2, 3, etc...)?
     nic_id = sa.Column(sa.Integer)
@@ -241,6 +335,7 @@ class ResiliencyNicLogical(ResiliencyBase):
     port_id = sa.Column(sa.String(36))
 
     __mapper_args__ = {
+        'version_id_col': ResiliencyBase.version_id,
         'polymorphic_identity': 'resiliency_nic',
         'polymorphic_on': type
     }
@@ -249,7 +344,8 @@ class ResiliencyNicLogical(ResiliencyBase):
 ResiliencyNicLogical.resiliency_server_group_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyServerGroup.id),
-    nullable=False
+    nullable=False,
+    index=True
 )
 
 ResiliencyServerGroup.resiliency_nic_logicals = relationship(
@@ -271,9 +367,12 @@ class ResiliencyNic(ResiliencyBase):
 
     __tablename__ = 'resiliency_nic'
 
+    __table_args__ = _secure_list_indexes(__tablename__)
+
     port_id = sa.Column(sa.String(36))
 
     __mapper_args__ = {
+        'version_id_col': ResiliencyBase.version_id,
         'polymorphic_identity': 'resiliency_nic_port',
     }
 
@@ -281,7 +380,8 @@ class ResiliencyNic(ResiliencyBase):
 ResiliencyNic.resiliency_server_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyServer.id),
-    nullable=False
+    nullable=False,
+    index=True
 )
 
 ResiliencyServer.resiliency_nics = relationship(
@@ -305,9 +405,23 @@ class FTBase(mb.HighlanderSecureModelBase):
     id = mb.id_column()
     state = sa.Column(st.JsonDictType())
 
+    # See ResiliencyBase.version_id.
+    version_id = mb.version_column()
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {'version_id_col': cls.version_id}
+
+    # NOTE: 'id' alone is the primary key because other FT tables reference
+    # it, a composite key would make those foreign keys invalid.
     @declared_attr
     def resiliency_server_id(self):
-        return sa.Column(sa.String(36), sa.ForeignKey(ResiliencyServer.id), primary_key=True)
+        return sa.Column(
+            sa.String(36),
+            sa.ForeignKey(ResiliencyServer.id),
+            nullable=False,
+            index=True
+        )
 
 
 #
@@ -349,7 +463,7 @@ class FTPvmChildBase(FTBase):
 
     @declared_attr
     def ft_pvm_id(self):
-        return sa.Column(sa.String(36), sa.ForeignKey(FTPvm.id))
+        return sa.Column(sa.String(36), sa.ForeignKey(FTPvm.id), index=True)
 
 
 class FTGuestOs(FTPvmChildBase):
@@ -371,7 +485,11 @@ class FTGuestOsChildBase(FTPvmChildBase):
 
     @declared_attr
     def ft_guest_os_id(self):
-        return sa.Column(sa.String(36), sa.ForeignKey(FTGuestOs.id))
+        return sa.Column(
+            sa.String(36),
+            sa.ForeignKey(FTGuestOs.id),
+            index=True
+        )
 
     pci_bus = sa.Column(sa.String(20))
     pci_domain = sa.Column(sa.String(20))
@@ -401,7 +519,8 @@ class FTLDisk(FTGuestOsChildBase):
 FTLDisk.resiliency_disk_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyDisk.id),
-    nullable=True
+    nullable=True,
+    index=True
 )
 
 
@@ -418,7 +537,8 @@ class FTLNic(FTGuestOsChildBase):
 FTLNic.resiliency_nic_id = sa.Column(
     sa.String(36),
     sa.ForeignKey(ResiliencyNic.id),
-    nullable=True
+    nullable=True,
+    index=True
 )
 
 
@@ -435,7 +555,7 @@ class FTALinkChildBase(FTPvmChildBase):
 
     @declared_attr
     def ft_alink_id(self):
-        return sa.Column(sa.String(36), sa.ForeignKey(FTALink.id))
+        return sa.Column(sa.String(36), sa.ForeignKey(FTALink.id), index=True)
 
 
 class FTPath(FTALinkChildBase):
@@ -475,7 +595,11 @@ class FTQuorumChildBase(FTPvmChildBase):
 
     @declared_attr
     def ft_quorum_id(self):
-        return sa.Column(sa.String(36), sa.ForeignKey(FTQuorum.id))
+        return sa.Column(
+            sa.String(36),
+            sa.ForeignKey(FTQuorum.id),
+            index=True
+        )
 
 
 class FTQLink(FTQuorumChildBase):
@@ -509,7 +633,7 @@ class FTAx(FTBase):
     scrub_switch = sa.Column(sa.Boolean)
     sw_revision = sa.Column(sa.String(20))
 
-    ft_pvm_id = sa.Column(sa.String(36), sa.ForeignKey(FTPvm.id))
+    ft_pvm_id = sa.Column(sa.String(36), sa.ForeignKey(FTPvm.id), index=True)
 
 
 class FTAxChildBase(FTBase):
@@ -519,7 +643,7 @@ class FTAxChildBase(FTBase):
 
     @declared_attr
     def ft_ax_id(self):
-        return sa.Column(sa.String(36), sa.ForeignKey(FTAx.id))
+        return sa.Column(sa.String(36), sa.ForeignKey(FTAx.id), index=True)
 
 
 class FTGuest(FTAxChildBase):
@@ -551,7 +675,11 @@ class FTDisk(FTAxChildBase):
     type = sa.Column(sa.String(20))
     previous_state_change_date_time = sa.Column(sa.DateTime)
 
-    ft_ldisk_id = sa.Column(sa.String(36), sa.ForeignKey(FTLDisk.id))
+    ft_ldisk_id = sa.Column(
+        sa.String(36),
+        sa.ForeignKey(FTLDisk.id),
+        index=True
+    )
 
 
 class FTNic(FTAxChildBase):
@@ -566,7 +694,7 @@ class FTNic(FTAxChildBase):
     mac = sa.Column(sa.String(17))
     network_bridge = sa.Column(sa.String(255))
 
-    ft_lnic_id = sa.Column(sa.String(36), sa.ForeignKey(FTLNic.id))
+    ft_lnic_id = sa.Column(sa.String(36), sa.ForeignKey(FTLNic.id), index=True)
 
 
 class FTLinkA(FTAxChildBase):
@@ -580,5 +708,127 @@ class FTLinkA(FTAxChildBase):
     ft_remote_ip_config = sa.Column(st.JsonDictType())
 
 
+class Trust(mb.HighlanderModelBase):
+    """Keystone trust shared by the secure objects of a user.
+
+    All objects created by the same user in the same project with the same
+    roles delegate through a single trust, 'ref_count' tells how many of
+    them still do.
+    """
+
+    __tablename__ = 'trust'
+
+    # Trust id as given by keystone.
+    id = sa.Column(sa.String(64), primary_key=True)
+
+    # Digest of (user_id, project_id, roles) identifying shareable trusts.
+    scope_key = sa.Column(sa.String(40), nullable=False, unique=True)
+    user_id = sa.Column(sa.String(64), nullable=False)
+    project_id = sa.Column(sa.String(80), nullable=False)
+    roles = sa.Column(st.JsonListType())
+    ref_count = sa.Column(sa.Integer, nullable=False, default=0)
+
+
+class ProvisioningJob(mb.HighlanderSecureModelBase):
+    """Provisioning of a resiliency group, see highlander.taskflows."""
+
+    __tablename__ = 'provisioning_job'
+
+    id = mb.id_column()
+    spec = sa.Column(st.JsonDictType())
+    state = sa.Column(sa.String(20))
+    resiliency_group_id = sa.Column(sa.String(36))
+
+
+class ProvisioningStep(mb.HighlanderModelBase):
+    """Result of a finished task of a provisioning job."""
+
+    __tablename__ = 'provisioning_step'
+
+    __table_args__ = (
+        sa.UniqueConstraint('job_id', 'name'),
+    )
+
+    id = mb.id_column()
+    job_id = sa.Column(
+        sa.String(36),
+        sa.ForeignKey(ProvisioningJob.id, ondelete='CASCADE'),
+        nullable=False
+    )
+    name = sa.Column(sa.String(255), nullable=False)
+    result = sa.Column(st.JsonDictType())
+
+
+class ChangeEvent(mb.HighlanderModelBase):
+    """Change of a resiliency or FT object.
+
+    Events are appended within the transaction making the change. 'id'
+    only grows but transactions commit in any order, 'seq' is assigned
+    once events are committed, in the order they are numbered, and is the
+    cursor consumers read from.
+    """
+
+    __tablename__ = 'change_event'
+
+    __table_args__ = (
+        sa.Index('ix_change_event_dispatched_id', 'dispatched', 'id'),
+        sa.Index('ix_change_event_seq', 'seq', unique=True),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    entity_type = sa.Column(sa.String(40), nullable=False)
+    entity_id = sa.Column(sa.String(36), nullable=False)
+
+    # 'create', 'update' or 'delete'.
+    action = sa.Column(sa.String(8), nullable=False)
+
+    # Visibility of the changed object.
+    project_id = sa.Column(sa.String(80))
+    scope = sa.Column(sa.String(8))
+
+    # Sent as a notification already.
+    dispatched = sa.Column(sa.Boolean, nullable=False, default=False)
+
+    # None until the event is numbered, see sequence_change_events().
+    seq = sa.Column(sa.BigInteger)
+
+
+class AsyncJob(mb.HighlanderSecureModelBase):
+    """Operation run in the background, see highlander.services.jobs."""
+
+    __tablename__ = 'async_job'
+
+    __table_args__ = (
+        sa.Index('ix_async_job_project_id_created_at',
+                 'project_id', 'created_at'),
+        sa.Index('ix_async_job_state_heartbeat_at', 'state', 'heartbeat_at'),
+    )
+
+    id = mb.id_column()
+    type = sa.Column(sa.String(80), nullable=False)
+    params = sa.Column(st.JsonDictType())
+
+    # 'PENDING', 'RUNNING', 'SUCCESS' or 'ERROR'.
+    state = sa.Column(sa.String(20), nullable=False)
+    result = sa.Column(st.JsonDictType())
+    error = sa.Column(sa.Text())
+    started_at = sa.Column(sa.DateTime)
+    finished_at = sa.Column(sa.DateTime)
+
+    # 'host:pid' of the API process the job is queued in, which renews
+    # 'heartbeat_at' while the job is PENDING or RUNNING.
+    owner = sa.Column(sa.String(255))
+    heartbeat_at = sa.Column(sa.DateTime)
+
+    def to_dict(self):
+        d = super(AsyncJob, self).to_dict()
+
+        mb.datetime_to_str(d, 'started_at')
+        mb.datetime_to_str(d, 'finished_at')
+        mb.datetime_to_str(d, 'heartbeat_at')
+
+        return d
+
+
 # register all hooks related to secure models
 mb.register_secure_model_hooks()
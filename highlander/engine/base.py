@@ -16,6 +16,8 @@
 
 
 import abc
+import collections
+
 import jsonschema
 import six
 
@@ -27,6 +29,62 @@ from highlander.utils import inspect_utils
 @six.add_metaclass(abc.ABCMeta)
 class Engine(object):
     """Engine interface."""
-    pass
+
+    @abc.abstractmethod
+    def update_states(self, changes):
+        """Applies state changes reported for resiliency objects.
+
+        :param changes: List of dicts with 'type', 'id' and 'values' keys,
+            'type' is one of STATE_RESOURCE_TYPES.
+        :return: Number of objects updated.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def recover_hypervisors(self, failed_hypervisors, hypervisors=None):
+        """Plans the recovery of all servers on failed hypervisors.
+
+        The target hypervisor of every replacement is recorded as the
+        'target_recovery_hypervisor_id' of the failed server.
+        :param failed_hypervisors: Ids of the failed hypervisors.
+        :param hypervisors: Ids of the hypervisors replacements may go to,
+            by default all known hypervisors that haven't failed.
+        :return: Dict with the 'placements' that were stored, the ids of
+            the servers no hypervisor was found for, 'unplaced', and the
+            ids of the servers deleted meanwhile, 'missing'.
+        """
+        raise NotImplementedError
+
+
+# Resiliency objects which state can be reported to the engine.
+STATE_RESOURCE_TYPES = (
+    'resiliency_group',
+    'resiliency_server_group',
+    'resiliency_server',
+    'resiliency_disk'
+)
+
+
+def coalesce_state_changes(changes):
+    """Merges state changes reported for the same object.
+
+    Values of later changes win, the order of first occurrence is kept.
+    """
+    merged = collections.OrderedDict()
+
+    for change in changes:
+        if change['type'] not in STATE_RESOURCE_TYPES:
+            raise exc.EngineException(
+                "Unknown resource type [type=%s]" % change['type']
+            )
+
+        key = (change['type'], change['id'])
+
+        merged.setdefault(key, {}).update(change['values'])
+
+    return [
+        {'type': t, 'id': id, 'values': values}
+        for (t, id), values in six.iteritems(merged)
+    ]
 
   
\ No newline at end of file
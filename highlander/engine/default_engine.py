@@ -14,15 +14,18 @@
 #    limitations under the License.
 
 
+from highlander.db.v1 import api as db_api
 from highlander.engine import base
-
+from highlander.engine import recovery
+from highlander import exceptions as exc
 from highlander.openstack.common import log as logging
 
 
-
-
 LOG = logging.getLogger(__name__)
 
+# Times a state change is tried when other updates change the object.
+_MAX_ATTEMPTS = 3
+
 # Submodules of highlander.engine will throw NoSuchOptError if configuration
 # options required at top level of this  __init__.py are not imported before
 # the submodules are referenced.
@@ -32,5 +35,71 @@ class DefaultEngine(base.Engine):
     def __init__(self, engine_client):
         self._engine_client = engine_client
 
-   
-   
+    def _apply(self, change):
+        """Applies one state change, retrying it after conflicts.
+
+        :return: Whether the object was updated.
+        """
+        update = getattr(db_api, 'update_%s' % change['type'])
+
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                # A failed update leaves the rest of the batch alone.
+                with db_api.savepoint():
+                    update(change['id'], change['values'])
+
+                return True
+            except exc.NotFoundException:
+                # The object has been deleted meanwhile.
+                LOG.warning(
+                    "State change for a missing object is ignored "
+                    "[type=%s, id=%s]" % (change['type'], change['id'])
+                )
+
+                return False
+            except exc.ConcurrentUpdateException:
+                # E.g. a health state stored since the object was read,
+                # the next attempt reads it again.
+                LOG.debug(
+                    "State change conflicts with another update [type=%s, "
+                    "id=%s, attempt=%s]"
+                    % (change['type'], change['id'], attempt + 1)
+                )
+
+        LOG.warning(
+            "State change is ignored after %s conflicting updates "
+            "[type=%s, id=%s]" % (_MAX_ATTEMPTS, change['type'], change['id'])
+        )
+
+        return False
+
+    def update_states(self, changes):
+        changes = base.coalesce_state_changes(changes)
+
+        updated = 0
+
+        # One transaction for the whole batch rather than one per change.
+        with db_api.transaction():
+            for change in changes:
+                if self._apply(change):
+                    updated += 1
+
+        return updated
+
+    def recover_hypervisors(self, failed_hypervisors, hypervisors=None):
+        plan = recovery.plan_recovery(failed_hypervisors, hypervisors)
+
+        if plan.placements:
+            # Servers of all projects, the plan covers every one of them.
+            with db_api.transaction():
+                applied = db_api.update_resiliency_server_recovery_targets(
+                    plan.targets()
+                )
+
+            plan.retain(applied)
+
+            if plan.missing:
+                LOG.warning("Servers deleted before their recovery was "
+                            "planned are skipped [ids=%s]" % plan.missing)
+
+        return plan.to_dict()
@@ -13,13 +13,285 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-from highlander.db.v1 import api as db_api
-from highlander.engine import base
-from highlander.engine import rpc
+"""Runtime of task policies.
 
+Waits and retry delays are hub timers and tasks waiting for a concurrency
+slot are queued callbacks, so a task only holds a green thread while it
+actually runs and any number of tasks can wait at the same time.
+"""
 
+import collections
+import weakref
 
-_ENGINE_CLIENT_PATH = 'highlander.engine.rpc.get_engine_client'
+import eventlet
+from eventlet import event
+from eventlet import hubs
+import six
 
+from highlander import exceptions as exc
+from highlander import expressions as expr
+from highlander.openstack.common import log as logging
 
 
+LOG = logging.getLogger(__name__)
+
+_Policies = collections.namedtuple(
+    '_Policies',
+    ['wait_before', 'wait_after', 'timeout', 'pause_before', 'retry_count',
+     'retry_delay', 'break_on']
+)
+
+
+def _evaluate_policies(spec, data_context):
+    def evaluate(value):
+        return expr.evaluate(value, data_context)
+
+    if not spec:
+        return _Policies(0, 0, 0, False, 0, 0, None)
+
+    retry = spec.get_retry()
+
+    return _Policies(
+        wait_before=evaluate(spec.get_wait_before()),
+        wait_after=evaluate(spec.get_wait_after()),
+        timeout=evaluate(spec.get_timeout()),
+        pause_before=bool(evaluate(spec.get_pause_before())),
+        retry_count=evaluate(retry.get_count()) if retry else 0,
+        retry_delay=evaluate(retry.get_delay()) if retry else 0,
+        break_on=retry.get_break_on() if retry else None
+    )
+
+
+class _Limiter(object):
+    """Semaphore queueing callbacks instead of blocking green threads.
+
+    A limit of 0 means no limit.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.running = 0
+
+        self._waiting = collections.deque()
+
+    def acquire(self, callback):
+        """Calls back once a slot is free."""
+        if not self.limit or self.running < self.limit:
+            self.running += 1
+
+            callback()
+        else:
+            self._waiting.append(callback)
+
+    def release(self):
+        if self._waiting:
+            # The slot goes straight to the next waiter.
+            self._waiting.popleft()()
+        else:
+            self.running -= 1
+
+
+class PolicyCall(object):
+    """Task run under policies, see PolicyRuntime.submit()."""
+
+    def __init__(self, limiter, policies, data_context, func, args, kwargs):
+        self.attempts = 0
+
+        self._limiter = limiter
+        self._policies = policies
+        self._data_context = data_context
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+        self._result = event.Event()
+        self._paused = policies.pause_before
+        self._timer = None
+        self._deadline = None
+        self._thread = None
+        self._running = False
+
+        if not self._paused:
+            self._schedule(policies.wait_before, self._enqueue)
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def done(self):
+        return self._result.ready()
+
+    def wait(self):
+        """Returns the result of the task or raises its error."""
+        return self._result.wait()
+
+    def resume(self):
+        """Lets a task paused by 'pause-before' go on."""
+        if self._paused:
+            self._paused = False
+
+            self._schedule(self._policies.wait_before, self._enqueue)
+
+    def _schedule(self, seconds, callback, *args):
+        if seconds:
+            self._timer = hubs.get_hub().schedule_call_global(
+                seconds,
+                callback,
+                *args
+            )
+        else:
+            callback(*args)
+
+    def _enqueue(self):
+        self._timer = None
+
+        self._limiter.acquire(self._start)
+
+    def _start(self):
+        timeout = self._policies.timeout
+
+        # The timeout covers all attempts and the delays between them.
+        if timeout and not self._deadline:
+            self._deadline = hubs.get_hub().schedule_call_global(
+                timeout,
+                self._expire
+            )
+
+        self.attempts += 1
+        self._thread = eventlet.spawn(self._run)
+
+    def _run(self):
+        # Timed out before this green thread got a chance to run.
+        if self.done():
+            self._thread = None
+            self._limiter.release()
+
+            return
+
+        self._running = True
+
+        error = None
+
+        try:
+            result = self._func(*self._args, **self._kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            self._running = False
+            self._thread = None
+            self._limiter.release()
+
+        if self.done():
+            return
+
+        try:
+            if error is None:
+                if self._deadline:
+                    self._deadline.cancel()
+
+                self._schedule(
+                    self._policies.wait_after,
+                    self._finish,
+                    result
+                )
+            elif self._should_retry(error):
+                LOG.debug(
+                    "Retrying task [attempt=%s]: %s" % (self.attempts, error)
+                )
+
+                self._schedule(self._policies.retry_delay, self._enqueue)
+            else:
+                self._finish(error=error)
+        except Exception as e:
+            # E.g. 'break-on' failed to evaluate. Nothing would send the
+            # result otherwise and the caller would wait forever.
+            LOG.exception("Failed to apply task policies: %s" % e)
+
+            self._finish(error=e)
+
+    def _should_retry(self, error):
+        if self.attempts > self._policies.retry_count:
+            return False
+
+        break_on = self._policies.break_on
+
+        if not break_on:
+            return True
+
+        context = dict(self._data_context or {})
+        context['__error'] = six.text_type(error)
+
+        return not expr.evaluate(break_on, context)
+
+    def _expire(self):
+        self._finish(error=exc.TaskTimeoutException(
+            "Task timed out after %s seconds." % self._policies.timeout
+        ))
+
+        # Raises GreenletExit in the task, green I/O it waits for is
+        # abandoned and its concurrency slot is released.
+        if self._running:
+            self._thread.kill()
+
+    def _finish(self, result=None, error=None):
+        if self.done():
+            return
+
+        for timer in (self._timer, self._deadline):
+            if timer:
+                timer.cancel()
+
+        if error is None:
+            self._result.send(result)
+        else:
+            self._result.send_exception(error)
+
+
+class PolicyRuntime(object):
+    """Enforces a PoliciesSpec on the tasks submitted to it.
+
+    All tasks of one runtime share its 'concurrency' limit. The limit is
+    evaluated once, other policies are evaluated for every task against
+    the data context of the task.
+    """
+
+    def __init__(self, spec, data_context=None):
+        self.spec = spec
+
+        concurrency = spec.get_concurrency() if spec else 0
+
+        self._limiter = _Limiter(
+            int(expr.evaluate(concurrency, data_context) or 0)
+        )
+
+    def submit(self, data_context, func, *args, **kwargs):
+        """Runs func(*args, **kwargs) under the policies.
+
+        Never blocks, the returned PolicyCall gives the result.
+        'break-on' of the retry policy is evaluated against the data
+        context with the failure message added as '__error'.
+        """
+        return PolicyCall(
+            self._limiter,
+            _evaluate_policies(self.spec, data_context),
+            data_context,
+            func,
+            args,
+            kwargs
+        )
+
+    def run(self, data_context, func, *args, **kwargs):
+        return self.submit(data_context, func, *args, **kwargs).wait()
+
+
+_RUNTIMES = weakref.WeakKeyDictionary()
+
+
+def get_runtime(spec, data_context=None):
+    """Returns the runtime of the spec, created on first use."""
+    runtime = _RUNTIMES.get(spec)
+
+    if not runtime:
+        runtime = _RUNTIMES[spec] = PolicyRuntime(spec, data_context)
+
+    return runtime
@@ -0,0 +1,382 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Recovery planning.
+
+The placement of all resiliency servers is kept in memory and follows the
+committed DB changes of all processes, so a plan for any number of failed
+hypervisors is computed in one pass without querying the database.
+
+Rules a plan follows:
+- The servers of a UFR or FT pair never share a hypervisor.
+- The servers of an NM cluster are spread over different hypervisors when
+  there are enough of them.
+- Servers with the same 'affinity' are placed together, unless that breaks
+  the pair rule.
+- Otherwise the least loaded hypervisor wins.
+"""
+
+import collections
+import heapq
+
+from highlander.db.v1 import api as db_api
+from highlander.openstack.common import log as logging
+from highlander.services import events
+
+
+LOG = logging.getLogger(__name__)
+
+# Strategies whose servers must never share a hypervisor.
+STRICT_STRATEGY_TYPES = ('ufr', 'ft')
+
+Placement = collections.namedtuple(
+    'Placement',
+    ['server_id', 'server_group_id', 'resiliency_group_id', 'hypervisor_id']
+)
+
+
+class RecoveryPlan(object):
+    """Hypervisors the replacements of failed servers go to."""
+
+    def __init__(self):
+        self.placements = []
+
+        # Ids of the servers no hypervisor could be found for.
+        self.unplaced = []
+
+        # Ids of the placed servers deleted before the plan was applied.
+        self.missing = []
+
+    def state_changes(self):
+        """Records the targets, see Engine.update_states()."""
+        return [
+            {
+                'type': 'resiliency_server',
+                'id': p.server_id,
+                'values': {'target_recovery_hypervisor_id': p.hypervisor_id}
+            }
+            for p in self.placements
+        ]
+
+    def targets(self):
+        """Returns the target hypervisor of every placed server."""
+        return dict((p.server_id, p.hypervisor_id) for p in self.placements)
+
+    def retain(self, applied):
+        """Keeps the placements of the servers that were updated only.
+
+        :param applied: Ids of the servers whose target was stored.
+        """
+        self.missing.extend(
+            p.server_id for p in self.placements if p.server_id not in applied
+        )
+        self.placements = [
+            p for p in self.placements if p.server_id in applied
+        ]
+
+    def to_dict(self):
+        return {
+            'placements': [p._asdict() for p in self.placements],
+            'unplaced': self.unplaced,
+            'missing': self.missing
+        }
+
+
+class _Server(object):
+    __slots__ = ('id', 'server_group_id', 'resiliency_id', 'hypervisor_id',
+                 'affinity')
+
+    def __init__(self, values):
+        self.id = values['id']
+        self.server_group_id = values['resiliency_server_group_id']
+        self.resiliency_id = values['resiliency_id']
+        self.hypervisor_id = values['hypervisor_id']
+        self.affinity = values['affinity']
+
+
+class TopologyIndex(object):
+    """Server groups, servers and hypervisors of all resiliency groups.
+
+    :param feed: Optional events.TopologyFeed the index catches up with
+        before each plan.
+    """
+
+    def __init__(self, feed=None):
+        self._feed = feed
+        self._stale = True
+
+        self.server_groups = {}
+        self.servers = {}
+
+        # Ids of live servers by server group, hypervisor and affinity.
+        self.members = collections.defaultdict(set)
+        self.hypervisors = collections.defaultdict(set)
+        self.affinities = collections.defaultdict(set)
+
+    def invalidate(self):
+        """Makes the next use read the whole topology again."""
+        self._stale = True
+
+    def load(self):
+        if self._feed:
+            self._feed.reset()
+
+        topology = db_api.get_resiliency_topology()
+
+        self.server_groups.clear()
+        self.servers.clear()
+        self.members.clear()
+        self.hypervisors.clear()
+        self.affinities.clear()
+
+        for values in topology['server_groups']:
+            self.server_groups[values['id']] = values
+
+        for values in topology['servers']:
+            self._put_server(values)
+
+        self._stale = False
+
+        LOG.debug("Loaded resiliency topology [server_groups=%s, servers=%s]"
+                  % (len(self.server_groups), len(self.servers)))
+
+    def ensure_loaded(self):
+        if self._feed and not self._stale:
+            self.apply(self._feed.poll())
+
+        if self._stale:
+            self.load()
+
+    def apply(self, changes):
+        """Applies changes reported by db_api.watch_resiliency_topology()."""
+        if changes is None:
+            self.invalidate()
+
+        if self._stale:
+            return
+
+        for key, id, values in changes:
+            if key == 'servers':
+                self._remove_server(id)
+
+                if values:
+                    self._put_server(values)
+            elif values:
+                self.server_groups[id] = values
+            else:
+                self.server_groups.pop(id, None)
+
+    @staticmethod
+    def _index(index, key, server_id, add):
+        if key is None:
+            return
+
+        if add:
+            index[key].add(server_id)
+        else:
+            ids = index.get(key)
+
+            if ids is not None:
+                ids.discard(server_id)
+
+                if not ids:
+                    del index[key]
+
+    def _put_server(self, values):
+        # Replaced servers are gone for good.
+        if values.get('replacement_resiliency_server_id'):
+            return
+
+        server = _Server(values)
+
+        self.servers[server.id] = server
+
+        self._index(self.members, server.server_group_id, server.id, True)
+        self._index(self.hypervisors, server.hypervisor_id, server.id, True)
+        self._index(self.affinities, server.affinity, server.id, True)
+
+    def _remove_server(self, id):
+        server = self.servers.pop(id, None)
+
+        if server:
+            self._index(self.members, server.server_group_id, id, False)
+            self._index(self.hypervisors, server.hypervisor_id, id, False)
+            self._index(self.affinities, server.affinity, id, False)
+
+    def plan(self, failed_hypervisors, hypervisors=None):
+        """Places replacements of all servers on the failed hypervisors.
+
+        :param failed_hypervisors: Ids of the failed hypervisors.
+        :param hypervisors: Ids of the hypervisors replacements may go to,
+            by default all known hypervisors that haven't failed.
+        :return: RecoveryPlan.
+        """
+        self.ensure_loaded()
+
+        return _Planner(self, set(failed_hypervisors), hypervisors).plan()
+
+
+class _Planner(object):
+    def __init__(self, index, failed, hypervisors):
+        self.index = index
+        self.failed = failed
+
+        if hypervisors is None:
+            hypervisors = index.hypervisors.keys()
+
+        self.load = dict(
+            (hv, len(index.hypervisors.get(hv, ())))
+            for hv in hypervisors if hv not in failed
+        )
+
+        # Entries are (load, hypervisor), ones not matching self.load are
+        # outdated and skipped.
+        self.heap = [(n, hv) for hv, n in self.load.items()]
+
+        heapq.heapify(self.heap)
+
+        self.affinity_targets = {}
+
+    def _least_loaded(self, excluded):
+        skipped = []
+        found = None
+
+        while self.heap:
+            n, hv = heapq.heappop(self.heap)
+
+            if self.load[hv] != n:
+                continue
+
+            if hv in excluded:
+                skipped.append((n, hv))
+            else:
+                found = hv
+                break
+
+        for entry in skipped:
+            heapq.heappush(self.heap, entry)
+
+        return found
+
+    def _assign(self, hv):
+        self.load[hv] += 1
+
+        heapq.heappush(self.heap, (self.load[hv], hv))
+
+    def _affinity_target(self, affinity):
+        if affinity not in self.affinity_targets:
+            # The hypervisor most of the surviving servers are on.
+            counts = collections.Counter(
+                self.index.servers[id].hypervisor_id
+                for id in self.index.affinities.get(affinity, ())
+            )
+
+            target = None
+
+            for hv, _ in counts.most_common():
+                if hv in self.load:
+                    target = hv
+                    break
+
+            self.affinity_targets[affinity] = target
+
+        return self.affinity_targets[affinity]
+
+    def plan(self):
+        index = self.index
+        plan = RecoveryPlan()
+
+        affected = collections.defaultdict(list)
+
+        for hv in self.failed:
+            for id in index.hypervisors.get(hv, ()):
+                server = index.servers[id]
+
+                affected[server.server_group_id].append(server)
+
+        for sg_id in sorted(affected, key=lambda id: id or ''):
+            server_group = index.server_groups.get(sg_id) or {}
+            strict = (server_group.get('resiliency_strategy_type') in
+                      STRICT_STRATEGY_TYPES)
+
+            # Hypervisors of the surviving servers of the group.
+            used = set(
+                index.servers[id].hypervisor_id
+                for id in index.members.get(sg_id, ())
+                if index.servers[id].hypervisor_id not in self.failed
+            )
+
+            for server in sorted(affected[sg_id],
+                                 key=lambda s: s.resiliency_id):
+                hv = None
+
+                if server.affinity:
+                    hv = self._affinity_target(server.affinity)
+
+                    if strict and hv in used:
+                        hv = None
+
+                if hv is None:
+                    hv = self._least_loaded(used)
+
+                if hv is None and not strict:
+                    hv = self._least_loaded(())
+
+                if hv is None:
+                    plan.unplaced.append(server.id)
+
+                    continue
+
+                if server.affinity and not self.affinity_targets.get(
+                        server.affinity):
+                    self.affinity_targets[server.affinity] = hv
+
+                used.add(hv)
+                self._assign(hv)
+
+                plan.placements.append(Placement(
+                    server.id,
+                    sg_id,
+                    server_group.get('resiliency_group_id'),
+                    hv
+                ))
+
+        if plan.unplaced:
+            LOG.warning("No hypervisor found for %s servers [failed=%s]"
+                        % (len(plan.unplaced), sorted(self.failed)))
+
+        return plan
+
+
+_INDEX = None
+
+
+def get_index():
+    """Returns the index of this process, following all DB changes.
+
+    Changes of this process are applied as they are committed, the ones
+    of other processes, e.g. API servers, before each plan.
+    """
+    global _INDEX
+
+    if _INDEX is None:
+        _INDEX = TopologyIndex(events.TopologyFeed())
+
+        db_api.watch_resiliency_topology(_INDEX.apply)
+
+    return _INDEX
+
+
+def plan_recovery(failed_hypervisors, hypervisors=None):
+    return get_index().plan(failed_hypervisors, hypervisors)
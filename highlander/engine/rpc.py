@@ -14,13 +14,19 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
+
+import eventlet
+from eventlet import semaphore
 from oslo.config import cfg
 from oslo import messaging
 from oslo.messaging.rpc import client
+import six
 
 from highlander import context as auth_ctx
 from highlander.engine import base
 from highlander import exceptions as exc
+from highlander.openstack.common import jsonutils
 from highlander.openstack.common import log as logging
 
 
@@ -54,8 +60,64 @@ def get_transport():
     return _TRANSPORT
 
 
+def get_engine_client():
+    global _ENGINE_CLIENT
+
+    if not _ENGINE_CLIENT:
+        _ENGINE_CLIENT = EngineClient(get_transport())
+
+    return _ENGINE_CLIENT
+
+
+class JsonPayloadSerializer(messaging.NoOpSerializer):
+    @staticmethod
+    def serialize_entity(context, entity):
+        return jsonutils.to_primitive(entity, convert_instances=True)
+
+
+class RpcContextSerializer(messaging.Serializer):
+    def __init__(self, base=None):
+        self._base = base or messaging.NoOpSerializer()
+
+    def serialize_entity(self, context, entity):
+        if not self._base:
+            return entity
+
+        return self._base.serialize_entity(context, entity)
+
+    def deserialize_entity(self, context, entity):
+        if not self._base:
+            return entity
+
+        return self._base.deserialize_entity(context, entity)
+
+    def serialize_context(self, context):
+        return context.to_dict()
+
+    def deserialize_context(self, context):
+        ctx = auth_ctx.HighlanderContext(**context)
+        auth_ctx.set_ctx(ctx)
+
+        return ctx
+
+
+def _get_serializer():
+    return RpcContextSerializer(JsonPayloadSerializer())
+
 
+def get_engine_server(transport, engine, executor='eventlet'):
+    target = messaging.Target(
+        topic=cfg.CONF.engine.topic,
+        server=cfg.CONF.engine.host
+    )
 
+    return messaging.get_rpc_server(
+        transport,
+        target,
+        [EngineServer(engine)],
+        executor=executor,
+        serializer=_get_serializer()
+    )
 
 
 def wrap_messaging_exception(method):
@@ -80,5 +142,226 @@ def wrap_messaging_exception(method):
     return decorator
 
 
+class EngineServer(object):
+    """RPC Engine server."""
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def update_states(self, rpc_ctx, changes):
+        """Receives calls over RPC to update states of resiliency objects.
+
+        :param rpc_ctx: RPC request context.
+        :param changes: List of state changes.
+        :return: Number of objects updated.
+        """
+        LOG.debug(
+            "Received RPC request 'update_states'[rpc_ctx=%s, changes=%s]"
+            % (rpc_ctx, len(changes))
+        )
+
+        return self._engine.update_states(changes)
+
+    def recover_hypervisors(self, rpc_ctx, failed_hypervisors,
+                            hypervisors=None):
+        """Receives calls over RPC to plan the recovery of hypervisors.
+
+        :param rpc_ctx: RPC request context.
+        :param failed_hypervisors: Ids of the failed hypervisors.
+        :param hypervisors: Ids of the hypervisors replacements may go to.
+        :return: Dict with 'placements' and 'unplaced' server ids.
+        """
+        LOG.info(
+            "Received RPC request 'recover_hypervisors'[rpc_ctx=%s, "
+            "failed_hypervisors=%s]" % (rpc_ctx, failed_hypervisors)
+        )
+
+        return self._engine.recover_hypervisors(
+            failed_hypervisors,
+            hypervisors
+        )
+
+
+class EngineClient(base.Engine):
+    """RPC Engine client.
+
+    State change notifications are buffered and coalesced per object, a
+    burst of them results in one cast per 'batch_size' changes rather than
+    one RPC message per change. At most 'max_in_flight' messages are sent
+    concurrently, further callers block until one of them completes.
+    """
+
+    def __init__(self, transport):
+        """Constructs an RPC client for engine.
+
+        :param transport: Messaging transport.
+        """
+        self._client = messaging.RPCClient(
+            transport,
+            messaging.Target(topic=cfg.CONF.engine.topic),
+            serializer=_get_serializer()
+        )
+
+        self._window = semaphore.Semaphore(cfg.CONF.engine.max_in_flight)
+
+        # Buffered changes grouped by the requester, see _requester_key().
+        self._pending = collections.OrderedDict()
+        self._pending_count = 0
+        self._flush_timer = None
+
+    @staticmethod
+    def _requester_key(ctx):
+        return ctx.project_id, ctx.user_id, ctx.is_admin
+
+    @wrap_messaging_exception
+    def _send(self, ctx, method, sync, **kwargs):
+        with self._window:
+            if sync:
+                return self._client.call(ctx, method, **kwargs)
+
+            self._client.cast(ctx, method, **kwargs)
+
+    def update_states(self, changes):
+        """Applies state changes and waits for the engine to finish.
+
+        :param changes: List of dicts with 'type', 'id' and 'values' keys.
+        :return: Number of objects updated.
+        """
+        return self._send(
+            auth_ctx.ctx(),
+            'update_states',
+            True,
+            changes=base.coalesce_state_changes(changes)
+        )
+
+    def recover_hypervisors(self, failed_hypervisors, hypervisors=None):
+        """Plans the recovery of failed hypervisors on the engine.
+
+        :param failed_hypervisors: Ids of the failed hypervisors.
+        :param hypervisors: Ids of the hypervisors replacements may go to.
+        :return: Dict with 'placements' and 'unplaced' server ids.
+        """
+        return self._send(
+            auth_ctx.ctx(),
+            'recover_hypervisors',
+            True,
+            failed_hypervisors=list(failed_hypervisors),
+            hypervisors=None if hypervisors is None else list(hypervisors)
+        )
+
+    def notify_state_change(self, resource_type, resource_id, values):
+        """Reports a state change without waiting for the engine.
+
+        The change is sent along with others within 'batch_interval'
+        seconds, or right away once 'batch_size' changes are buffered.
+        """
+        change = base.coalesce_state_changes([{
+            'type': resource_type,
+            'id': resource_id,
+            'values': values
+        }])[0]
+
+        ctx = auth_ctx.ctx()
+
+        ctx_changes = self._pending.setdefault(
+            self._requester_key(ctx),
+            [ctx, collections.OrderedDict()]
+        )
+
+        # The most recent context is used to send the batch.
+        ctx_changes[0] = ctx
+
+        key = (resource_type, resource_id)
+
+        if key in ctx_changes[1]:
+            ctx_changes[1][key]['values'].update(change['values'])
+        else:
+            ctx_changes[1][key] = change
+
+            self._pending_count += 1
+
+        if self._pending_count >= cfg.CONF.engine.batch_size:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_timer:
+            self._flush_timer = eventlet.spawn_after(
+                cfg.CONF.engine.batch_interval,
+                self._flush_later
+            )
+
+    def _flush_later(self):
+        try:
+            self.flush()
+        except Exception as e:
+            LOG.exception("Failed to send state changes: %s" % e)
+
+    def _requeue(self, requester, ctx, changes):
+        """Buffers again changes that failed to be sent.
+
+        Changes buffered since the flush are newer, their values win.
+        """
+        requeued = collections.OrderedDict(
+            ((c['type'], c['id']), c) for c in changes
+        )
+
+        self._pending_count += len(requeued)
+
+        newer = self._pending.get(requester)
+
+        if newer:
+            ctx = newer[0]
+
+            for key, change in six.iteritems(newer[1]):
+                if key in requeued:
+                    requeued[key]['values'].update(change['values'])
+
+                    self._pending_count -= 1
+                else:
+                    requeued[key] = change
+
+        self._pending[requester] = [ctx, requeued]
+
+    def flush(self):
+        """Sends all buffered state changes.
+
+        Changes of a requester failing to be sent are buffered again and
+        sent by the next flush, those of other requesters are still sent.
+        The first error is raised once all requesters were tried.
+        """
+        if self._flush_timer:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        pending = self._pending
+
+        self._pending = collections.OrderedDict()
+        self._pending_count = 0
+
+        batch_size = cfg.CONF.engine.batch_size
+        error = None
+
+        for requester, (ctx, changes) in six.iteritems(pending):
+            changes = list(six.itervalues(changes))
+
+            for i in six.moves.range(0, len(changes), batch_size):
+                try:
+                    self._send(
+                        ctx,
+                        'update_states',
+                        False,
+                        changes=changes[i:i + batch_size]
+                    )
+                except Exception as e:
+                    self._requeue(requester, ctx, changes[i:])
+
+                    error = error or e
+
+                    break
 
+        if error:
+            self._schedule_flush()
 
+            raise error
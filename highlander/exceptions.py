@@ -64,6 +64,36 @@ class DBDuplicateEntry(HighlanderException):
     message = "Database object already exists"
 
 
+class ConcurrentUpdateException(HighlanderException):
+    http_code = 409
+    message = "Object was changed by another update"
+
+
+class PreconditionFailedException(ConcurrentUpdateException):
+    http_code = 412
+    message = "Object doesn't match the precondition of the request"
+
+
+class EventCursorExpiredException(HighlanderException):
+    http_code = 410
+    message = "Change events after the cursor are not available anymore"
+
+
+class NotAllowedException(HighlanderException):
+    http_code = 403
+    message = "Operation not allowed"
+
+
+class ProfilerBusyException(HighlanderException):
+    http_code = 409
+    message = "A profile is already being recorded"
+
+
+class JobQueueFullException(HighlanderException):
+    http_code = 503
+    message = "Too many jobs are pending, retry later"
+
+
 class ActionException(HighlanderException):
     http_code = 400
 
@@ -80,6 +110,10 @@ class EngineException(HighlanderException):
     http_code = 500
 
 
+class TaskTimeoutException(EngineException):
+    message = "Task timed out"
+
+
 class WorkflowException(HighlanderException):
     http_code = 400
 
@@ -102,6 +136,11 @@ class YaqlEvaluationException(DSLParsingException):
     message = "Can not evaluate YAQL expression"
 
 
+class JavaScriptEvaluationException(HighlanderException):
+    http_code = 400
+    message = "Can not evaluate JavaScript"
+
+
 class InvalidModelException(DSLParsingException):
     http_code = 400
     message = "Wrong entity definition"
@@ -18,17 +18,24 @@ import copy
 import inspect
 import re
 
+from oslo.config import cfg
 import six
 import yaql
 from yaql import exceptions as yaql_exc
 
 from highlander import exceptions as exc
 from highlander.openstack.common import log as logging
+from highlander.utils import cache
 from highlander import yaql_utils
 
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_group('engine', 'highlander.config')
+
+_COMPILED = None
+
 
 class Evaluator(object):
     """Expression evaluator interface.
@@ -69,13 +76,27 @@ class Evaluator(object):
         pass
 
 
+def _compile(expression):
+    global _COMPILED
+
+    if _COMPILED is None:
+        _COMPILED = cache.TTLCache(
+            CONF.engine.expression_cache_size,
+            float('inf')
+        )
+
+    # Parsed expressions are immutable and can be evaluated any number of
+    # times against different data.
+    return _COMPILED.get_or_create(expression, lambda: yaql.parse(expression))
+
+
 class YAQLEvaluator(Evaluator):
     @classmethod
     def validate(cls, expression):
         LOG.debug("Validating YAQL expression [expression='%s']", expression)
 
         try:
-            yaql.parse(expression)
+            _compile(expression)
         except (yaql_exc.YaqlException, KeyError, ValueError, TypeError) as e:
             raise exc.YaqlEvaluationException(e.message)
 
@@ -85,7 +106,7 @@ class YAQLEvaluator(Evaluator):
                   % (expression, data_context))
 
         try:
-            result = yaql.parse(expression).evaluate(
+            result = _compile(expression).evaluate(
                 data=data_context,
                 context=yaql_utils.create_yaql_context()
             )
@@ -0,0 +1,331 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import heapq
+import itertools
+import random
+import time
+
+import eventlet
+from eventlet import event
+from oslo.config import cfg
+
+from highlander.db.v1 import api as db_api
+from highlander.health import probes
+from highlander.openstack.common import importutils
+from highlander.openstack.common import log as logging
+from highlander.services import events
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('health', 'highlander.config')
+
+
+class _Target(object):
+    __slots__ = ('server', 'state', 'generation')
+
+    def __init__(self, server):
+        self.server = server
+        self.state = None
+        self.generation = None
+
+
+class HealthMonitor(object):
+    """Checks the liveness of all resiliency servers periodically.
+
+    Upcoming checks are kept in a heap ordered by time, the monitor only
+    wakes up when a check is due and the cost of scheduling a check grows
+    logarithmically with the number of servers. Servers that aren't
+    healthy are checked every [health] degraded_interval seconds instead
+    of every [health] interval seconds. Changes of health states are
+    buffered and written in batches. Servers created, moved or deleted by
+    other services are read every [health] changes_interval seconds.
+    """
+
+    def __init__(self, probe=None, timer=time.time):
+        self.probe = probe or importutils.import_object(CONF.health.probe)
+
+        self._timer = timer
+        self._generations = itertools.count()
+
+        # Entries are (due time, generation, server id). Entries which
+        # generation doesn't match the one of the target are outdated.
+        self._heap = []
+        self._targets = {}
+
+        self._pool = eventlet.GreenPool(CONF.health.concurrency)
+        self._pending = {}
+        self._last_flush = timer()
+        self._feed = events.TopologyFeed()
+        self._last_poll = timer()
+        self._thread = None
+        self._running = False
+        self._stale = False
+
+        # Sent to wake the sleeping loop up when a check gets due earlier
+        # than it expects.
+        self._wakeup = event.Event()
+        self._wake_at = None
+
+    def __len__(self):
+        return len(self._targets)
+
+    def _schedule(self, target, due):
+        target.generation = next(self._generations)
+
+        heapq.heappush(
+            self._heap,
+            (due, target.generation, target.server['id'])
+        )
+
+        if self._wake_at is not None and due < self._wake_at:
+            self._wake()
+
+    def _wake(self):
+        if not self._wakeup.ready():
+            self._wakeup.send()
+
+    def add(self, server):
+        """Starts monitoring a server or updates what is known about it.
+
+        :param server: Dict with 'id', 'instance_id' and 'hypervisor_id'.
+        """
+        if not server.get('instance_id'):
+            # Nothing to check before the instance exists.
+            self.remove(server['id'])
+
+            return
+
+        target = self._targets.get(server['id'])
+
+        if target:
+            target.server = server
+
+            return
+
+        target = self._targets[server['id']] = _Target(server)
+
+        # First checks are spread over an interval so that servers loaded
+        # at the same time aren't checked all at once.
+        self._schedule(
+            target,
+            self._timer() + random.uniform(0, CONF.health.interval)
+        )
+
+    def remove(self, server_id):
+        self._targets.pop(server_id, None)
+
+    def load(self):
+        """Monitors all live servers."""
+        self._feed.reset()
+
+        servers = db_api.get_resiliency_topology()['servers']
+        ids = set(s['id'] for s in servers)
+
+        for id in [id for id in self._targets if id not in ids]:
+            self.remove(id)
+
+        for server in servers:
+            self.add(server)
+
+    def _on_changes(self, changes):
+        if changes is None:
+            # May be called while a transaction finishes, the loop reads the
+            # servers again.
+            self._stale = True
+            self._wake()
+
+            return
+
+        for key, id, values in changes:
+            if key != 'servers':
+                continue
+
+            if values is None or values['replacement_resiliency_server_id']:
+                self.remove(id)
+            else:
+                self.add(values)
+
+    def poll(self):
+        """Applies the changes of servers committed since the last poll."""
+        self._last_poll = self._timer()
+
+        self._on_changes(self._feed.poll())
+
+    def run_due(self):
+        """Starts the checks that are due, blocks while none can start.
+
+        :return: Number of started checks.
+        """
+        started = 0
+
+        # Checks getting due while this one waits for the pool are left to
+        # the next round, servers failing faster than they are checked
+        # can't keep it busy forever.
+        now = self._timer()
+
+        while self._running and self._heap and self._heap[0][0] <= now:
+            _, generation, id = heapq.heappop(self._heap)
+
+            target = self._targets.get(id)
+
+            if not target or target.generation != generation:
+                continue
+
+            self._pool.spawn_n(self._check, target)
+
+            started += 1
+
+        return started
+
+    def _check(self, target):
+        try:
+            with eventlet.Timeout(CONF.health.probe_timeout):
+                state = self.probe.check(target.server)
+        except (Exception, eventlet.Timeout) as e:
+            LOG.debug("Health check failed [server_id=%s]: %s"
+                      % (target.server['id'], e))
+
+            state = probes.UNKNOWN
+
+        id = target.server['id']
+
+        # Removed while it was checked.
+        if self._targets.get(id) is not target:
+            return
+
+        if state != target.state:
+            target.state = state
+            self._pending[id] = state
+
+        if state == probes.HEALTHY:
+            interval = CONF.health.interval
+        else:
+            interval = CONF.health.degraded_interval
+
+        self._schedule(target, self._timer() + interval)
+
+    def get_state(self, server_id):
+        target = self._targets.get(server_id)
+
+        return target.state if target else None
+
+    def flush(self):
+        """Writes buffered state changes.
+
+        :return: Number of written changes.
+        """
+        self._last_flush = self._timer()
+
+        if not self._pending:
+            return 0
+
+        states, self._pending = self._pending, {}
+
+        try:
+            with db_api.transaction():
+                db_api.update_resiliency_server_health(states)
+        except Exception as e:
+            LOG.error("Failed to store health states, they are retried "
+                      "with the next batch: %s" % e)
+
+            for id, state in states.items():
+                self._pending.setdefault(id, state)
+
+            return 0
+
+        return len(states)
+
+    def _flush_due(self):
+        return (len(self._pending) >= CONF.health.batch_size or
+                self._timer() - self._last_flush >= CONF.health.batch_interval)
+
+    def _poll_due(self):
+        return (self._timer() - self._last_poll >=
+                CONF.health.changes_interval)
+
+    def _sleep_time(self):
+        now = self._timer()
+
+        until = min(
+            self._last_flush + CONF.health.batch_interval,
+            self._last_poll + CONF.health.changes_interval
+        )
+
+        if self._heap:
+            until = min(until, self._heap[0][0])
+
+        return max(until - now, 0)
+
+    def _sleep(self, seconds):
+        self._wake_at = self._timer() + seconds
+
+        with eventlet.Timeout(seconds, False):
+            self._wakeup.wait()
+
+        self._wake_at = None
+        self._wakeup = event.Event()
+
+    def _run(self):
+        while self._running:
+            if self._stale:
+                try:
+                    self.load()
+                    self._stale = False
+                except Exception as e:
+                    LOG.error("Failed to load resiliency servers: %s" % e)
+            elif self._poll_due():
+                try:
+                    self.poll()
+                except Exception as e:
+                    LOG.error("Failed to read changed resiliency servers: "
+                              "%s" % e)
+
+            self.run_due()
+
+            if self._flush_due():
+                self.flush()
+
+            self._sleep(self._sleep_time())
+
+        # Checks still running report their results before the last write.
+        self._pool.waitall()
+
+        self.flush()
+
+    def start(self):
+        self.load()
+
+        db_api.watch_resiliency_topology(self._on_changes)
+
+        self._running = True
+        self._thread = eventlet.spawn(self._run)
+
+    def stop(self):
+        """Stops checking servers once the running checks are finished."""
+        if not self._thread:
+            return
+
+        db_api.unwatch_resiliency_topology(self._on_changes)
+
+        self._running = False
+        self._wake()
+
+        self._thread.wait()
+        self._thread = None
+
+    def wait(self):
+        self._thread.wait()
@@ -0,0 +1,167 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import abc
+import collections
+import pipes
+
+import eventlet
+from oslo.config import cfg
+import six
+
+from highlander import exceptions as exc
+from highlander.openstack.common import importutils
+from highlander.openstack.common import log as logging
+from highlander.utils import ssh_utils
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('health', 'highlander.config')
+
+_NOVA = importutils.try_import('novaclient.client')
+_NOVA_EXC = importutils.try_import('novaclient.exceptions')
+
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+FAILED = 'failed'
+
+# The server couldn't be checked.
+UNKNOWN = 'unknown'
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Probe(object):
+    """Checks the liveness of resiliency servers."""
+
+    @abc.abstractmethod
+    def check(self, server):
+        """Checks one server.
+
+        :param server: Dict with 'id', 'instance_id' and 'hypervisor_id'.
+        :return: HEALTHY, DEGRADED or FAILED. An exception means that the
+            state is UNKNOWN.
+        """
+        raise NotImplementedError
+
+
+class FakeProbe(Probe):
+    """Answers from a local table, for tests and development.
+
+    Servers missing from 'states' are healthy, an exception as the state
+    is raised.
+    """
+
+    def __init__(self, states=None, delay=0):
+        self.states = states or {}
+        self.delay = delay
+        self.checks = collections.Counter()
+
+    def check(self, server):
+        self.checks[server['id']] += 1
+
+        if self.delay:
+            eventlet.sleep(self.delay)
+
+        state = self.states.get(server['id'], HEALTHY)
+
+        if isinstance(state, Exception):
+            raise state
+
+        return state
+
+
+_NOVA_STATES = {
+    'ACTIVE': HEALTHY,
+    'ERROR': FAILED,
+    'SHUTOFF': FAILED,
+    'DELETED': FAILED,
+    'SOFT_DELETED': FAILED
+}
+
+
+class NovaProbe(Probe):
+    """Maps the Nova status of the instance of a server."""
+
+    def __init__(self):
+        if not _NOVA:
+            raise exc.HighlanderException(
+                "novaclient module is not available. Please install "
+                "python-novaclient."
+            )
+
+        # Imports keystonemiddleware, needed by this probe only.
+        CONF.import_group('keystone_authtoken',
+                          'keystonemiddleware.auth_token')
+
+        self._client = None
+
+    def _get_client(self):
+        if not self._client:
+            auth = CONF.keystone_authtoken
+
+            self._client = _NOVA.Client(
+                '2',
+                auth.admin_user,
+                auth.admin_password,
+                auth.admin_tenant_name,
+                auth.auth_uri
+            )
+
+        return self._client
+
+    def check(self, server):
+        try:
+            instance = self._get_client().servers.get(server['instance_id'])
+        except _NOVA_EXC.NotFound:
+            return FAILED
+
+        return _NOVA_STATES.get(instance.status, DEGRADED)
+
+
+_DOMAIN_STATES = {
+    'running': HEALTHY,
+    'shut off': FAILED,
+    'crashed': FAILED
+}
+
+
+class SSHProbe(Probe):
+    """Asks the hypervisor of a server for the state of its instance.
+
+    'hypervisor_id' of servers is the host name SSH connects to, the
+    output of [health] ssh_command is the state of the instance. Values of
+    the server are quoted for the shell before they are interpolated, they
+    come from users.
+    """
+
+    def check(self, server):
+        command = CONF.health.ssh_command % dict(
+            (k, pipes.quote(six.text_type(v))) for k, v in server.items()
+        )
+
+        ret_code, stdout = ssh_utils.execute_command(
+            command,
+            server['hypervisor_id'],
+            CONF.health.ssh_username,
+            CONF.health.ssh_password,
+            raise_when_error=False
+        )
+
+        # The hypervisor doesn't know the instance.
+        if ret_code:
+            return FAILED
+
+        return _DOMAIN_STATES.get(stdout.strip().lower(), DEGRADED)
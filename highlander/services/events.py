@@ -0,0 +1,221 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Change events of resiliency and FT objects.
+
+Every change is recorded as an event in the transaction making it (see
+db_api.get_change_events()). The dispatcher numbers them once they are
+committed and sends them as notifications, API clients read them
+incrementally from GET /v1/events, the number is their cursor.
+"""
+
+import datetime
+import time
+
+import eventlet
+from oslo.config import cfg
+from oslo.utils import timeutils
+
+from highlander.db.v1 import api as db_api
+from highlander import exceptions as exc
+from highlander.openstack.common import log as logging
+from highlander import utils
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('events', 'highlander.config')
+
+# Only the services dispatching events need it.
+messaging = utils.lazy_import('oslo.messaging')
+
+PUBLISHER_ID = 'highlander.events'
+
+# Seconds between two purges of old events.
+_PURGE_INTERVAL = 60
+
+
+def to_dict(event):
+    return {
+        'id': event.seq,
+        'entity_type': event.entity_type,
+        'entity_id': event.entity_id,
+        'action': event.action,
+        'created_at': event.created_at.isoformat(' ')
+    }
+
+
+def get_events_v1(since=0, limit=None, timeout=0):
+    """Returns the events after a cursor, waits for them if there are none.
+
+    :param since: Sequence number of the last event the caller has seen.
+    :param limit: Maximum number of returned events.
+    :param timeout: Seconds to wait for new events, at most
+        [events] max_poll_timeout.
+    """
+    deadline = time.time() + min(timeout, CONF.events.max_poll_timeout)
+
+    while True:
+        with db_api.transaction():
+            events = db_api.get_change_events(since, limit)
+
+        if events or time.time() >= deadline:
+            return events
+
+        eventlet.sleep(CONF.events.poll_interval)
+
+
+def _sequence():
+    # Events are numbered by the dispatcher too, followers don't depend on
+    # it running.
+    while True:
+        with db_api.transaction():
+            count = db_api.sequence_change_events(
+                batch_size=CONF.events.batch_size
+            )
+
+        if count < CONF.events.batch_size:
+            return
+
+
+class TopologyFeed(object):
+    """Follows the changes of server groups and servers of all processes.
+
+    The changes are read from the change events, so services running
+    apart from the API see the objects it creates, moves and deletes.
+    """
+
+    def __init__(self):
+        self.cursor = None
+
+    def reset(self):
+        """Starts following at the last committed change.
+
+        Must be called before the topology is read, changes committed
+        meanwhile are returned again by the next poll().
+        """
+        _sequence()
+
+        with db_api.transaction():
+            self.cursor = db_api.get_change_event_cursor()
+
+    def poll(self):
+        """Returns the changes committed since the last poll.
+
+        :return: List of (key, id, values) tuples as reported by
+            db_api.watch_resiliency_topology(), None if they aren't known
+            anymore and the topology has to be read again.
+        """
+        if self.cursor is None:
+            return None
+
+        _sequence()
+
+        changes = []
+
+        while True:
+            try:
+                with db_api.transaction():
+                    cursor, batch = db_api.get_resiliency_topology_changes(
+                        self.cursor,
+                        limit=CONF.events.batch_size
+                    )
+            except exc.EventCursorExpiredException as e:
+                LOG.warning("Missed topology changes: %s" % e)
+
+                self.cursor = None
+
+                return None
+
+            if cursor == self.cursor:
+                return changes
+
+            self.cursor = cursor
+
+            changes.extend(batch)
+
+
+class EventDispatcher(object):
+    """Sends change events as notifications in the order they happened.
+
+    Each event is sent at least once, purges events older than
+    [events] retention once they have been sent.
+    """
+
+    def __init__(self, transport):
+        self._notifier = messaging.Notifier(
+            transport,
+            publisher_id=PUBLISHER_ID
+        )
+
+        self._thread = None
+
+    def _notify(self, events):
+        for e in events:
+            self._notifier.info(
+                {},
+                'highlander.%s.%s' % (e.entity_type, e.action),
+                dict(to_dict(e), project_id=e.project_id)
+            )
+
+    def dispatch(self):
+        """Numbers new events and sends one batch of events.
+
+        Events are numbered in a transaction of its own, clients can read
+        them even if notifications can't be sent.
+        :return: Number of sent events.
+        """
+        with db_api.transaction():
+            db_api.sequence_change_events(batch_size=CONF.events.batch_size)
+
+        with db_api.transaction():
+            return db_api.dispatch_change_events(
+                self._notify,
+                batch_size=CONF.events.batch_size
+            )
+
+    def purge(self):
+        older_than = timeutils.utcnow() - datetime.timedelta(
+            seconds=CONF.events.retention
+        )
+
+        return db_api.purge_change_events(older_than)
+
+    def _run(self):
+        last_purge = 0
+
+        while True:
+            try:
+                count = self.dispatch()
+
+                if time.time() - last_purge >= _PURGE_INTERVAL:
+                    self.purge()
+
+                    last_purge = time.time()
+            except Exception as e:
+                LOG.error("Failed to dispatch change events: %s" % e)
+
+                count = 0
+
+            if count < CONF.events.batch_size:
+                eventlet.sleep(CONF.events.dispatch_interval)
+
+    def start(self):
+        self._thread = eventlet.spawn(self._run)
+
+    def stop(self):
+        if self._thread:
+            self._thread.kill()
+            self._thread = None
@@ -0,0 +1,260 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Long running operations of the API, run in the background.
+
+A job is saved as PENDING when it is submitted, the API answers with its
+id right away and clients poll it until it is SUCCESS or ERROR. A fixed
+number of worker greenthreads of the API process, see [jobs], run the
+jobs in the security context of the requests that submitted them.
+
+The process a job is queued in, its owner, renews a heartbeat of the job
+until it is finished. Jobs whose heartbeat stopped, since their process
+died, are failed when an API process starts and periodically after that.
+"""
+
+import datetime
+import os
+import socket
+
+import eventlet
+from eventlet import queue
+from oslo.config import cfg
+from oslo.utils import timeutils
+import six
+
+from highlander import context as auth_ctx
+from highlander.db.v1 import api as db_api
+from highlander import exceptions as exc
+from highlander.openstack.common import log as logging
+from highlander import utils
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('jobs', 'highlander.config')
+
+# Imports taskflow, needed by provisioning jobs only.
+provisioning = utils.lazy_import('highlander.taskflows.resiliency_group')
+
+PENDING = 'PENDING'
+RUNNING = 'RUNNING'
+SUCCESS = 'SUCCESS'
+ERROR = 'ERROR'
+
+_queue = None
+
+
+def _delete_resiliency_group(job_id, params):
+    with db_api.transaction():
+        deleted = db_api.delete_resiliency_group(params['id'])
+
+    return {'deleted': deleted}
+
+
+def _provision_resiliency_group(job_id, params):
+    # The provisioning job gets the id of this job so that it can be failed
+    # with it, see expire().
+    provisioning.provision(params['spec'], job_id=job_id)
+
+    with db_api.transaction():
+        job = db_api.get_provisioning_job(job_id)
+
+    return {
+        'provisioning_job_id': job_id,
+        'resiliency_group_id': job.resiliency_group_id
+    }
+
+
+# Functions running the jobs of every type, called with the id and the
+# parameters of a job they return its result.
+JOB_TYPES = {
+    'delete_resiliency_group': _delete_resiliency_group,
+    'provision_resiliency_group': _provision_resiliency_group
+}
+
+
+def _owner():
+    # The process id changes when API workers are forked.
+    return '%s:%s' % (socket.gethostname(), os.getpid())
+
+
+def _get_queue():
+    global _queue
+
+    if _queue is None:
+        _queue = queue.LightQueue(max(CONF.jobs.max_pending, 1))
+
+        for _ in range(CONF.jobs.workers):
+            eventlet.spawn_n(_work, _queue)
+
+        eventlet.spawn_n(_keep_alive)
+
+    return _queue
+
+
+def _keep_alive():
+    while True:
+        eventlet.sleep(CONF.jobs.heartbeat_interval)
+
+        try:
+            with db_api.transaction():
+                db_api.renew_async_jobs(_owner(), [PENDING, RUNNING])
+
+            expire()
+        except Exception as e:
+            LOG.exception("Failed to renew jobs: %s" % e)
+
+
+def _work(jobs):
+    while True:
+        job_id, context = jobs.get()
+
+        auth_ctx.set_ctx(context)
+
+        try:
+            run(job_id)
+        except Exception as e:
+            LOG.exception("Failed to run job [id=%s]: %s" % (job_id, e))
+        finally:
+            auth_ctx.set_ctx(None)
+
+
+def run(job_id):
+    """Runs a pending job and saves its result or error."""
+    with db_api.transaction():
+        job = db_api.get_async_job(job_id)
+
+        if job.state != PENDING:
+            # Expired while it was waiting for a worker.
+            LOG.warning(
+                "Job is not pending anymore [id=%s, state=%s]"
+                % (job_id, job.state)
+            )
+
+            return job
+
+        job = db_api.update_async_job(job_id, {
+            'state': RUNNING,
+            'started_at': timeutils.utcnow()
+        })
+
+        job_type = job.type
+        params = job.params
+
+    LOG.info("Run job [id=%s, type=%s]" % (job_id, job_type))
+
+    try:
+        values = {
+            'state': SUCCESS,
+            'result': JOB_TYPES[job_type](job_id, params)
+        }
+    except Exception as e:
+        LOG.error("Job failed [id=%s, type=%s]: %s" % (job_id, job_type, e))
+
+        values = {'state': ERROR, 'error': six.text_type(e)}
+
+    values['finished_at'] = timeutils.utcnow()
+
+    with db_api.transaction():
+        return db_api.update_async_job(job_id, values)
+
+
+def submit(job_type, params):
+    """Saves a job and queues it for the workers.
+
+    :return: The job, PENDING.
+    """
+    if job_type not in JOB_TYPES:
+        raise exc.InputException("Unknown job type: %s" % job_type)
+
+    jobs = _get_queue()
+
+    if jobs.full():
+        raise exc.JobQueueFullException()
+
+    with db_api.transaction():
+        job = db_api.create_async_job({
+            'type': job_type,
+            'params': params,
+            'state': PENDING,
+            'owner': _owner(),
+            'heartbeat_at': timeutils.utcnow()
+        })
+
+    context = None
+
+    if auth_ctx.has_ctx():
+        context = auth_ctx.HighlanderContext(auth_ctx.ctx())
+
+    try:
+        jobs.put_nowait((job.id, context))
+    except queue.Full:
+        with db_api.transaction():
+            db_api.update_async_job(job.id, {
+                'state': ERROR,
+                'error': exc.JobQueueFullException.message,
+                'finished_at': timeutils.utcnow()
+            })
+
+        raise exc.JobQueueFullException()
+
+    return job
+
+
+def expire():
+    """Fails the unfinished jobs of dead API processes.
+
+    The provisioning jobs they were running fail with them, objects they
+    created are left to provisioning.resume().
+    :return: Number of failed jobs.
+    """
+    now = timeutils.utcnow()
+
+    with db_api.transaction():
+        expired = db_api.expire_async_jobs(
+            [PENDING, RUNNING],
+            now - datetime.timedelta(seconds=CONF.jobs.lease_timeout),
+            {
+                'state': ERROR,
+                'error': 'The API process running the job stopped.',
+                'finished_at': now
+            }
+        )
+
+        # Provisioning jobs have the same states.
+        db_api.update_provisioning_jobs(expired, [RUNNING], {'state': ERROR})
+
+    if expired:
+        LOG.warning("Failed %s jobs of stopped API processes" % len(expired))
+
+    return len(expired)
+
+
+def start():
+    """Starts the workers of this API process."""
+    expire()
+
+    _get_queue()
+
+
+def get_job(id):
+    with db_api.transaction():
+        return db_api.get_async_job(id)
+
+
+def list_jobs():
+    with db_api.transaction():
+        return db_api.get_async_jobs()
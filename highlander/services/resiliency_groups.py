@@ -14,10 +14,10 @@
 
 from highlander.db.v1 import api as db_api_v1
 
-def list_resiliency_groups_v1():
+def list_resiliency_groups_v1(changes_since=None):
 
     with db_api_v1.transaction():
-        rg_db = db_api_v1.get_resiliency_groups()
+        rg_db = db_api_v1.get_resiliency_groups(changes_since=changes_since)
 
     return rg_db
 
@@ -35,9 +35,16 @@ def create_resiliency_group_v1(data):
 
     return rg_db
 
-def update_resiliency_group_v1(data):
+def update_resiliency_group_v1(data, precondition=None):
+    """Updates a resiliency group.
 
+    :param precondition: Called with the current object before it is
+        updated, e.g. rest_utils.check_if_match().
+    """
     with db_api_v1.transaction():
+        if precondition:
+            precondition(db_api_v1.get_resiliency_group(data['id']))
+
         rg_db = db_api_v1.update_resiliency_group(data['id'], data)
 
     return rg_db
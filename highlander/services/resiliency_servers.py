@@ -21,17 +21,24 @@ def create_resiliency_server_v1(data):
 
     return rg_db
 
-def update_resiliency_server_v1(data):
+def update_resiliency_server_v1(data, precondition=None):
+    """Updates a resiliency server.
 
+    :param precondition: Called with the current object before it is
+        updated, e.g. rest_utils.check_if_match().
+    """
     with db_api_v1.transaction():
-        rg_db = db_api_v1.update_resiliency_server(data)
+        if precondition:
+            precondition(db_api_v1.get_resiliency_server(data['id']))
+
+        rg_db = db_api_v1.update_resiliency_server(data['id'], data)
 
     return rg_db
 
-def list_resiliency_servers_v1():
+def list_resiliency_servers_v1(changes_since=None):
 
     with db_api_v1.transaction():
-        rg_db = db_api_v1.get_resiliency_servers()
+        rg_db = db_api_v1.get_resiliency_servers(changes_since=changes_since)
 
     return rg_db
 
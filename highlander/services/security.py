@@ -14,17 +14,27 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
+import hashlib
+import threading
+
+import eventlet
 from oslo.config import cfg
 
 from highlander import context as auth_ctx
+from highlander import exceptions as exc
+from highlander.openstack.common import log as logging
 from highlander.utils.openstack import keystone
 
 
+LOG = logging.getLogger(__name__)
+
 CONF = cfg.CONF
 
 # Make sure to import 'auth_enable' option before using it.
 # TODO(rakhmerov): Try to find a better solution.
 CONF.import_opt('auth_enable', 'highlander.config', group='pecan')
+CONF.import_group('trusts', 'highlander.config')
 
 
 DEFAULT_PROJECT_ID = "<default-project>"
@@ -37,17 +47,27 @@ def get_project_id():
         return DEFAULT_PROJECT_ID
 
 
+_trustee_id = None
+
+
+def _get_trustee_id():
+    global _trustee_id
+
+    if _trustee_id is None:
+        _trustee_id = keystone.client_for_admin(
+            keystone.authtoken_conf().admin_tenant_name).user_id
+
+    return _trustee_id
+
+
 def create_trust():
     client = keystone.client()
 
     ctx = auth_ctx.ctx()
 
-    trustee_id = keystone.client_for_admin(
-        CONF.keystone_authtoken.admin_tenant_name).user_id
-
     return client.trusts.create(
         trustor_user=client.user_id,
-        trustee_user=trustee_id,
+        trustee_user=_get_trustee_id(),
         impersonation=True,
         role_names=ctx.roles,
         project=ctx.project_id
@@ -86,12 +106,140 @@ def delete_trust(maccleod):
     if not maccleod.trust_id:
         return
 
-    keystone_client = keystone.client_for_trusts(maccleod.trust_id)
-    keystone_client.trusts.delete(maccleod.trust_id)
+    get_trust_manager().release(maccleod.trust_id)
 
 
 def add_trust_id(secure_object_values):
     if cfg.CONF.pecan.auth_enable:
         secure_object_values.update({
-            'trust_id': create_trust().id
+            'trust_id': get_trust_manager().acquire()
         })
+
+
+def _delete_trust(trust_id):
+    try:
+        keystone_client = keystone.client_for_trusts(trust_id)
+        keystone_client.trusts.delete(trust_id)
+    except Exception as e:
+        LOG.warning("Failed to delete trust [id=%s]: %s" % (trust_id, e))
+    finally:
+        keystone.forget_trust(trust_id)
+
+
+class TrustManager(object):
+    """Shares trusts between secure objects and deletes unused ones.
+
+    Objects created by the same user in the same project with the same
+    roles all use one trust. Reference counts are kept in the database so
+    that all API and engine processes share them. Trusts that are no longer
+    referenced are deleted in the background, a batch at a time.
+    """
+
+    def __init__(self):
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self._deleter = None
+
+    @staticmethod
+    def _scope_key(ctx, roles):
+        key = '\n'.join([ctx.user_id or '', ctx.project_id or ''] + roles)
+
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def acquire(self):
+        """Returns the id of a trust for the current user, creating one in
+        keystone only if it doesn't exist yet.
+        """
+        # Imported here since the DB models depend on this module.
+        from highlander.db.v1 import api as db_api
+
+        ctx = auth_ctx.ctx()
+        roles = sorted(r for r in ctx.roles or [] if r)
+        scope_key = self._scope_key(ctx, roles)
+
+        trust_id = db_api.acquire_trust(scope_key)
+
+        if trust_id:
+            return trust_id
+
+        trust_id = create_trust().id
+
+        try:
+            # The failed insert mustn't roll back the caller's transaction.
+            with db_api.savepoint():
+                db_api.create_trust({
+                    'id': trust_id,
+                    'scope_key': scope_key,
+                    'user_id': ctx.user_id,
+                    'project_id': ctx.project_id,
+                    'roles': roles,
+                    'ref_count': 1
+                })
+        except exc.DBDuplicateEntry:
+            # A concurrent request has created a trust for the same scope.
+            self._schedule_delete(trust_id)
+
+            return self.acquire()
+
+        return trust_id
+
+    def release(self, trust_id):
+        from highlander.db.v1 import api as db_api
+
+        if db_api.release_trust(trust_id):
+            # Until the release commits the trust may still be in use,
+            # e.g. if the transaction rolls back.
+            db_api.after_commit(lambda: self._schedule_delete(trust_id))
+
+    def _schedule_delete(self, trust_id):
+        with self._lock:
+            self._pending.append(trust_id)
+
+            if not self._deleter:
+                self._deleter = eventlet.spawn(self._delete_pending)
+
+    def _next_batch(self):
+        with self._lock:
+            batch = []
+
+            while self._pending and len(batch) < CONF.trusts.delete_batch_size:
+                batch.append(self._pending.popleft())
+
+            return batch
+
+    def _delete_pending(self):
+        while True:
+            eventlet.sleep(CONF.trusts.delete_interval)
+
+            batch = self._next_batch()
+
+            if not batch:
+                with self._lock:
+                    if not self._pending:
+                        self._deleter = None
+
+                        return
+
+                continue
+
+            pool = eventlet.GreenPool(len(batch))
+
+            for _ in pool.imap(_delete_trust, batch):
+                pass
+
+    def flush(self):
+        """Deletes all pending trusts right away."""
+        batch = self._next_batch()
+
+        while batch:
+            for trust_id in batch:
+                _delete_trust(trust_id)
+
+            batch = self._next_batch()
+
+
+_trust_manager = TrustManager()
+
+
+def get_trust_manager():
+    return _trust_manager
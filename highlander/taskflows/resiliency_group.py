@@ -0,0 +1,287 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Provisioning of resiliency groups.
+
+A resiliency group is described by a spec, a dict of the group values
+with nested lists of children:
+
+    {
+        'name': 'rg', 'resiliency_strategy_type': 'ufr',
+        'server_groups': [{
+            'name': 'pair-1',
+            'servers': [{'name': 'vm-1', 'disks': [...], 'nics': [...]}],
+            'disk_logicals': [...],
+            'nic_logicals': [...]
+        }]
+    }
+
+Every object is created by its own task once its parent exists. Siblings
+don't depend on each other so all server groups, and all servers, disks
+and NICs of a server group, are created concurrently.
+
+The spec may also have 'policies' of the DSL, e.g.
+
+    'policies': {'retry': {'count': 3, 'delay': 5}, 'concurrency': 10}
+
+which are enforced on the driver calls creating cloud resources, against
+the values of the object being created. 'pause-before' isn't supported,
+nothing would resume the calls.
+"""
+
+from oslo.config import cfg
+from taskflow import engines
+from taskflow.patterns import linear_flow as lf
+from taskflow.patterns import unordered_flow as uf
+from taskflow.types import futures
+
+from highlander import context as auth_ctx
+from highlander.db.v1 import api as db_api
+from highlander.engine import policies
+from highlander import exceptions as exc
+from highlander.maccleod.v1 import policies as policies_spec
+from highlander.openstack.common import importutils
+from highlander.openstack.common import log as logging
+from highlander.tasks import resiliency as tasks
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('provisioning', 'highlander.config')
+
+RUNNING = 'RUNNING'
+SUCCESS = 'SUCCESS'
+ERROR = 'ERROR'
+
+_CHILDREN = ('server_groups', 'servers', 'disks', 'nics', 'disk_logicals',
+             'nic_logicals')
+
+
+def _values(spec, **defaults):
+    values = dict(defaults)
+
+    values.update(
+        (k, v) for k, v in spec.items()
+        if k not in _CHILDREN and k != 'policies'
+    )
+
+    return values
+
+
+class _PolicyDriver(object):
+    """Driver running the calls creating cloud resources under policies."""
+
+    def __init__(self, driver, runtime):
+        self._driver = driver
+        self._runtime = runtime
+
+    def __getattr__(self, name):
+        method = getattr(self._driver, name)
+
+        if not name.startswith('create_'):
+            return method
+
+        def _create(values):
+            return self._runtime.run(values, method, values)
+
+        return _create
+
+
+def _apply_policies(spec, driver):
+    if not spec.get('policies'):
+        return driver
+
+    policies_data = spec['policies']
+
+    if policies_data.get('pause-before'):
+        raise exc.InvalidModelException(
+            "'pause-before' isn't supported by provisioning."
+        )
+
+    runtime = policies.PolicyRuntime(
+        policies_spec.PoliciesSpec(policies_data),
+        _values(spec)
+    )
+
+    return _PolicyDriver(driver, runtime)
+
+
+def _server_flow(name, spec, driver, parent, strategy_type, index):
+    server = tasks.CreateResiliencyServer(
+        name,
+        _values(
+            spec,
+            resiliency_strategy_type=strategy_type,
+            resiliency_id=index + 1
+        ),
+        driver,
+        parent=parent
+    )
+
+    children = uf.Flow('%s:children' % name)
+
+    for i, disk in enumerate(spec.get('disks', [])):
+        children.add(tasks.CreateResiliencyDisk(
+            '%s:disk:%s' % (name, i),
+            _values(disk, resiliency_id=index + 1),
+            driver,
+            parent=name
+        ))
+
+    for i, nic in enumerate(spec.get('nics', [])):
+        children.add(tasks.CreateResiliencyNic(
+            '%s:nic:%s' % (name, i),
+            _values(nic),
+            driver,
+            parent=name
+        ))
+
+    return lf.Flow('%s:flow' % name).add(server, children)
+
+
+def _server_group_flow(name, spec, driver, strategy_type):
+    strategy_type = spec.get('resiliency_strategy_type', strategy_type)
+
+    server_group = tasks.CreateResiliencyServerGroup(
+        name,
+        _values(spec, resiliency_strategy_type=strategy_type),
+        driver,
+        parent='resiliency_group'
+    )
+
+    children = uf.Flow('%s:children' % name)
+
+    for i, server in enumerate(spec.get('servers', [])):
+        children.add(_server_flow(
+            '%s:server:%s' % (name, i),
+            server,
+            driver,
+            name,
+            strategy_type,
+            i
+        ))
+
+    for i, disk in enumerate(spec.get('disk_logicals', [])):
+        children.add(tasks.CreateResiliencyDiskLogical(
+            '%s:disk_logical:%s' % (name, i),
+            _values(disk, disk_id=i + 1),
+            driver,
+            parent=name
+        ))
+
+    for i, nic in enumerate(spec.get('nic_logicals', [])):
+        children.add(tasks.CreateResiliencyNicLogical(
+            '%s:nic_logical:%s' % (name, i),
+            _values(nic, nic_id=i + 1),
+            driver,
+            parent=name
+        ))
+
+    return lf.Flow('%s:flow' % name).add(server_group, children)
+
+
+def create_flow(spec, driver):
+    """Builds the flow provisioning the resiliency group of the spec.
+
+    Results are stored under the task names, the group is
+    'resiliency_group', its server groups 'server_group:<i>', their
+    servers 'server_group:<i>:server:<j>' and so on.
+    """
+    server_groups = uf.Flow('server_groups')
+
+    for i, sg in enumerate(spec.get('server_groups', [])):
+        server_groups.add(_server_group_flow(
+            'server_group:%s' % i,
+            sg,
+            driver,
+            spec['resiliency_strategy_type']
+        ))
+
+    return lf.Flow('resiliency_group_provisioning').add(
+        tasks.CreateResiliencyGroup('resiliency_group', _values(spec), driver),
+        server_groups
+    )
+
+
+def _get_driver():
+    return importutils.import_object(CONF.provisioning.driver)
+
+
+def provision(spec, driver=None, job_id=None):
+    """Provisions a resiliency group.
+
+    :param job_id: Id of the provisioning job, generated by default.
+    :return: Id of the provisioning job, see resume().
+    """
+    driver = _apply_policies(spec, driver or _get_driver())
+
+    values = {'spec': spec, 'state': RUNNING}
+
+    if job_id:
+        values['id'] = job_id
+
+    with db_api.transaction():
+        job = db_api.create_provisioning_job(values)
+
+    _run(job.id, spec, driver)
+
+    return job.id
+
+
+def resume(job_id, driver=None):
+    """Finishes a job interrupted by a restart or retries a failed one.
+
+    Objects created by the job before are reused, nothing is done twice.
+    """
+    with db_api.transaction():
+        job = db_api.get_provisioning_job(job_id)
+
+        spec = job.spec
+
+        db_api.update_provisioning_job(job_id, {'state': RUNNING})
+
+    _run(job_id, spec, _apply_policies(spec, driver or _get_driver()))
+
+
+def _run(job_id, spec, driver):
+    executor = futures.GreenThreadPoolExecutor(CONF.provisioning.max_workers)
+
+    engine = engines.load(
+        create_flow(spec, driver),
+        store={'context': auth_ctx.ctx(), 'job_id': job_id},
+        engine='parallel',
+        executor=executor
+    )
+
+    try:
+        engine.run()
+    except Exception as e:
+        LOG.error("Provisioning failed, created objects have been deleted "
+                  "[job_id=%s]: %s" % (job_id, e))
+
+        with db_api.transaction():
+            db_api.update_provisioning_job(job_id, {'state': ERROR})
+
+        raise
+    finally:
+        executor.shutdown()
+
+    rg_id = engine.storage.fetch('resiliency_group')['id']
+
+    with db_api.transaction():
+        db_api.update_provisioning_job(job_id, {
+            'state': SUCCESS,
+            'resiliency_group_id': rg_id
+        })
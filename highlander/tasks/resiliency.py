@@ -0,0 +1,204 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import contextlib
+
+from taskflow import task
+
+from highlander import context as auth_ctx
+from highlander.db.v1 import api as db_api
+from highlander.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def _context(context):
+    previous = auth_ctx.ctx() if auth_ctx.has_ctx() else None
+
+    auth_ctx.set_ctx(context)
+
+    try:
+        yield
+    finally:
+        auth_ctx.set_ctx(previous)
+
+
+class NoopDriver(object):
+    """Driver creating the cloud resources of resiliency objects.
+
+    This one creates nothing, only database objects are provisioned.
+    Methods creating resources return an id the resource can be deleted
+    by, or None.
+    """
+
+    def create_server(self, values):
+        return None
+
+    def delete_server(self, resource_id):
+        pass
+
+    def create_disk(self, values):
+        return None
+
+    def delete_disk(self, resource_id):
+        pass
+
+    def create_nic(self, values):
+        return None
+
+    def delete_nic(self, resource_id):
+        pass
+
+
+class ProvisioningTask(task.Task):
+    """Creates one resiliency object of a provisioning job.
+
+    The result is stored in the DB along with the object so that a resumed
+    job never creates the object twice. Reverting deletes only what the
+    task has created. The result is a dict with the 'id' of the object and
+    the 'resource_id' returned by the driver.
+    """
+
+    # Suffix of the db_api functions creating and deleting the object.
+    resource = None
+
+    # Column referencing the parent object.
+    parent_key = None
+
+    # Column holding the id of the cloud resource.
+    resource_key = None
+
+    def __init__(self, name, values, driver, parent=None):
+        super(ProvisioningTask, self).__init__(
+            name=name,
+            provides=name,
+            rebind={'parent': parent} if parent else None
+        )
+
+        self._values = values
+        self._driver = driver
+
+    def _create_resource(self, values):
+        return None
+
+    def _delete_resource(self, resource_id):
+        pass
+
+    def execute(self, context, job_id, parent=None):
+        with _context(context):
+            return self._execute(job_id, parent)
+
+    def _execute(self, job_id, parent):
+        with db_api.transaction():
+            step = db_api.get_provisioning_step(job_id, self.name)
+
+            if step:
+                LOG.debug("Step is already done [job_id=%s, name=%s]" %
+                          (job_id, self.name))
+
+                return step.result
+
+        values = dict(self._values)
+
+        if parent:
+            values[self.parent_key] = parent['id']
+
+        # Cloud resources are created outside of the transaction, they
+        # leak if the process dies before the step is recorded.
+        resource_id = self._create_resource(values)
+
+        if self.resource_key:
+            values[self.resource_key] = resource_id
+
+        with db_api.transaction():
+            obj = getattr(db_api, 'create_%s' % self.resource)(values)
+
+            result = {'id': obj.id, 'resource_id': resource_id}
+
+            db_api.create_provisioning_step({
+                'job_id': job_id,
+                'name': self.name,
+                'result': result
+            })
+
+        return result
+
+    def revert(self, context, job_id, result, **kwargs):
+        # Nothing has been created if the task itself failed.
+        if not isinstance(result, dict):
+            return
+
+        with _context(context), db_api.transaction():
+            getattr(db_api, 'delete_%ss' % self.resource)(id=result['id'])
+            db_api.delete_provisioning_steps(job_id=job_id, name=self.name)
+
+        if result['resource_id']:
+            self._delete_resource(result['resource_id'])
+
+
+class CreateResiliencyGroup(ProvisioningTask):
+    resource = 'resiliency_group'
+
+
+class CreateResiliencyServerGroup(ProvisioningTask):
+    resource = 'resiliency_server_group'
+    parent_key = 'resiliency_group_id'
+
+
+class CreateResiliencyServer(ProvisioningTask):
+    resource = 'resiliency_server'
+    parent_key = 'resiliency_server_group_id'
+    resource_key = 'instance_id'
+
+    def _create_resource(self, values):
+        return self._driver.create_server(values)
+
+    def _delete_resource(self, resource_id):
+        self._driver.delete_server(resource_id)
+
+
+class CreateResiliencyDisk(ProvisioningTask):
+    resource = 'resiliency_disk'
+    parent_key = 'resiliency_server_id'
+    resource_key = 'volume_id'
+
+    def _create_resource(self, values):
+        return self._driver.create_disk(values)
+
+    def _delete_resource(self, resource_id):
+        self._driver.delete_disk(resource_id)
+
+
+class CreateResiliencyNic(ProvisioningTask):
+    resource = 'resiliency_nic'
+    parent_key = 'resiliency_server_id'
+    resource_key = 'port_id'
+
+    def _create_resource(self, values):
+        return self._driver.create_nic(values)
+
+    def _delete_resource(self, resource_id):
+        self._driver.delete_nic(resource_id)
+
+
+class CreateResiliencyDiskLogical(ProvisioningTask):
+    resource = 'resiliency_disk_logical'
+    parent_key = 'resiliency_server_group_id'
+
+
+class CreateResiliencyNicLogical(ProvisioningTask):
+    resource = 'resiliency_nic_logical'
+    parent_key = 'resiliency_server_group_id'
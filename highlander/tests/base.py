@@ -23,9 +23,10 @@ from oslotest import base
 import testtools.matchers as ttm
 from highlander import context as auth_context
 from highlander.db.sqlalchemy import base as db_sa_base
+from highlander.db.sqlalchemy import query_counter
 from highlander.db.sqlalchemy import sqlite_lock
-from highlander.db.v1.resiliencegroups import api as db_rgroups_api
-from highlander.db.v1.resilienceservers import api as db_rservers_api
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import models as db_models
 from highlander.openstack.common import log as logging
 from highlander import version
 
@@ -164,14 +165,17 @@ class DbTestCase(BaseTest):
         cfg.CONF.set_default('max_overflow', -1, group='database')
         cfg.CONF.set_default('max_pool_size', 1000, group='database')
 
-        db_rgroups_api.setup_db()
-
-     
+        db_api.setup_db()
 
     def _clean_db(self):
-        with db_rgroups_api.transaction():
-            db_rgroups_api.delete_resiliencegroups()
-          
+        # Soft deleted rows are invisible to the DB API so the tables are
+        # wiped directly, children first.
+        metadata = db_models.ResiliencyGroup.metadata
+
+        with db_sa_base.get_engine().begin() as conn:
+            for table in reversed(metadata.sorted_tables):
+                conn.execute(table.delete())
+
         sqlite_lock.cleanup()
 
     def setUp(self):
@@ -192,5 +196,19 @@ class DbTestCase(BaseTest):
         self.addCleanup(auth_context.set_ctx, None)
         self.addCleanup(self._clean_db)
 
+        # Statements executed by the test itself.
+        self.queries = query_counter.QueryCounter().start()
+
+        self.addCleanup(self.queries.stop)
+
+    def assertMaxQueries(self, limit=None, repeat_limit=None):
+        """Fails if the block executes too many statements.
+
+        :param limit: Maximum number of statements.
+        :param repeat_limit: Maximum number of executions of the same
+            SELECT statement, parameters aside.
+        """
+        return query_counter.QueryCounter(limit, repeat_limit)
+
     def is_db_session_open(self):
         return db_sa_base._get_thread_local_session() is not None
@@ -0,0 +1,261 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Operations measured by the benchmark runner.
+
+A benchmark is a function of the Suite it runs in, executed once per
+iteration. Benchmarks are registered in the order they run: the ones
+creating objects run last so that the fleet is the same size for the
+others.
+"""
+
+import itertools
+import json
+
+import webob
+
+from highlander import context as auth_context
+from highlander.db.v1 import api as db_api
+from highlander import expressions
+from highlander.maccleod.v1 import policies
+from highlander.services import parser
+
+
+BENCHMARKS = []
+
+SPEC = """
+---
+version: '1.0'
+name: recovery
+description: Recovery of the servers of a resiliency group.
+policies:
+  retry:
+    count: 5
+    delay: 10
+    break-on: <% $.servers.where($.health_state = 'failed').len() = 0 %>
+  wait-before: 1
+  timeout: <% $.servers.len() * 30 %>
+  concurrency: 4
+"""
+
+
+def benchmark(name):
+    def _register(func):
+        BENCHMARKS.append((name, func))
+
+        return func
+
+    return _register
+
+
+class Suite(object):
+    """What benchmarks share: the fleet, the context and the API."""
+
+    def __init__(self, fleet, ctx):
+        self.fleet = fleet
+        self.ctx = ctx
+        self.counter = itertools.count()
+        self.etags = {}
+
+        self._app = None
+        self._servers = None
+
+    @property
+    def app(self):
+        if self._app is None:
+            # Imported late, building the application reads the options
+            # the runner sets.
+            from highlander.api import app
+
+            self._app = app.setup_app()
+
+        return self._app
+
+    @property
+    def servers(self):
+        """Servers of the fleet as plain data, like YAQL contexts hold."""
+        if self._servers is None:
+            self._servers = [
+                dict(s, health_state='failed' if i % 10 == 0 else 'ok')
+                for i, s in enumerate(
+                    db_api.get_resiliency_topology()['servers']
+                )
+            ]
+
+        return self._servers
+
+    def request(self, path, method='GET', body=None, **headers):
+        headers.update({
+            'X-User-Id': self.ctx.user_id,
+            'X-Project-Id': self.ctx.project_id
+        })
+
+        request = webob.Request.blank(path, method=method, headers=headers)
+
+        if body is not None:
+            request.content_type = 'application/json'
+            request.body = json.dumps(body)
+
+        try:
+            response = request.get_response(self.app)
+        finally:
+            # The API clears the context of the thread it runs in.
+            auth_context.set_ctx(self.ctx)
+
+        if response.status_int >= 400:
+            raise RuntimeError(
+                "%s %s failed: %s" % (method, path, response.status)
+            )
+
+        return response
+
+
+@benchmark('db.group.get')
+def get_group(suite):
+    with db_api.transaction():
+        db_api.get_resiliency_group(suite.fleet.groups[0])
+
+
+@benchmark('db.groups.list')
+def list_groups(suite):
+    with db_api.transaction():
+        db_api.get_resiliency_groups()
+
+
+@benchmark('db.server_groups.list')
+def list_server_groups(suite):
+    with db_api.transaction():
+        db_api.get_resiliency_server_groups()
+
+
+@benchmark('db.group.tree')
+def fetch_tree(suite):
+    with db_api.transaction():
+        group = db_api.get_resiliency_group(suite.fleet.groups[0])
+
+        for server_group in group.resiliency_server_groups:
+            list(server_group.resiliency_disk_logicals)
+            list(server_group.resiliency_nic_logicals)
+
+
+@benchmark('db.topology')
+def fetch_topology(suite):
+    db_api.get_resiliency_topology()
+
+
+@benchmark('db.group.update')
+def update_group(suite):
+    with db_api.transaction():
+        group = db_api.get_resiliency_group(suite.fleet.groups[0])
+
+        db_api.update_resiliency_group(
+            group.id,
+            {'desc': 'update %s' % next(suite.counter)},
+            expected_version=group.version_id
+        )
+
+
+@benchmark('db.servers.health')
+def update_health(suite):
+    state = 'failed' if next(suite.counter) % 2 else 'ok'
+
+    db_api.update_resiliency_server_health(
+        dict((id, state) for id in suite.fleet.servers)
+    )
+
+
+@benchmark('yaql.evaluate')
+def evaluate_yaql(suite):
+    expressions.evaluate(
+        "$.servers.where($.health_state = 'failed').select($.id)",
+        {'servers': suite.servers}
+    )
+
+
+@benchmark('yaql.inline')
+def evaluate_inline_yaql(suite):
+    expressions.evaluate(
+        "<% $.servers.len() %> servers, <% $.servers.where("
+        "$.health_state = 'failed').len() %> failed",
+        {'servers': suite.servers}
+    )
+
+
+@benchmark('spec.parse')
+def parse_spec(suite):
+    spec = parser.parse_yaml(SPEC)
+
+    parser.get_spec_version(spec)
+    policies.PoliciesSpec(spec['policies'])
+
+
+@benchmark('rest.group.get')
+def rest_get_group(suite):
+    suite.request('/v1/resiliencygroups/%s' % suite.fleet.groups[0])
+
+
+@benchmark('rest.group.not_modified')
+def rest_get_group_not_modified(suite):
+    path = '/v1/resiliencygroups/%s' % suite.fleet.groups[0]
+
+    if path not in suite.etags:
+        suite.etags[path] = suite.request(path).headers['ETag']
+
+    etag = suite.etags[path]
+
+    if suite.request(path, **{'If-None-Match': etag}).status_int != 304:
+        raise RuntimeError("GET %s with a current ETag wasn't a 304" % path)
+
+
+@benchmark('rest.groups.list')
+def rest_list_groups(suite):
+    suite.request('/v1/resiliencygroups')
+
+
+@benchmark('rest.server_groups.list')
+def rest_list_server_groups(suite):
+    suite.request('/v1/resiliencyservergroups')
+
+
+@benchmark('rest.group.update')
+def rest_update_group(suite):
+    suite.request(
+        '/v1/resiliencygroups',
+        method='PUT',
+        body={
+            'id': suite.fleet.groups[0],
+            'desc': 'update %s' % next(suite.counter)
+        }
+    )
+
+
+@benchmark('db.group.create')
+def create_group(suite):
+    with db_api.transaction():
+        db_api.create_resiliency_group({
+            'name': 'created-%s' % next(suite.counter),
+            'resiliency_strategy_type': 'ufr'
+        })
+
+
+@benchmark('rest.group.create')
+def rest_create_group(suite):
+    suite.request(
+        '/v1/resiliencygroups',
+        method='POST',
+        body={
+            'name': 'posted-%s' % next(suite.counter),
+            'resiliency_strategy_type': 'ufr'
+        }
+    )
@@ -0,0 +1,139 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Synthetic fleets the benchmarks run against."""
+
+from highlander.db.sqlalchemy import base as db_sa_base
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import models
+
+DISKS_PER_SERVER = 2
+NICS_PER_SERVER = 2
+
+
+class Fleet(object):
+    """Ids of the objects of a generated fleet."""
+
+    def __init__(self):
+        self.groups = []
+        self.server_groups = []
+        self.servers = []
+        self.disks = []
+        self.nics = []
+        self.pvms = []
+
+    def sizes(self):
+        return dict(
+            (name, len(getattr(self, name)))
+            for name in ('groups', 'server_groups', 'servers', 'disks',
+                         'nics', 'pvms')
+        )
+
+
+def _create_server(fleet, server_group_id, name, resiliency_id):
+    server = db_api.create_resiliency_server({
+        'name': name,
+        'resiliency_strategy_type': 'ufr',
+        'resiliency_server_group_id': server_group_id,
+        'resiliency_id': resiliency_id,
+        'instance_id': '%s-instance' % name,
+        'hypervisor_id': 'hypervisor-%s' % (resiliency_id % 8),
+        'health_state': 'ok'
+    })
+
+    fleet.servers.append(server.id)
+
+    for i in range(DISKS_PER_SERVER):
+        fleet.disks.append(db_api.create_resiliency_disk({
+            'name': '%s-disk-%s' % (name, i),
+            'resiliency_server_id': server.id,
+            'disk_size': '20',
+            'volume_id': '%s-volume-%s' % (name, i)
+        }).id)
+
+    for i in range(NICS_PER_SERVER):
+        fleet.nics.append(db_api.create_resiliency_nic({
+            'name': '%s-nic-%s' % (name, i),
+            'resiliency_server_id': server.id,
+            'port_id': '%s-port-%s' % (name, i)
+        }).id)
+
+    pvm = models.FTPvm(
+        resiliency_server_id=server.id,
+        name=name,
+        ft_protected=True,
+        protection_mode='ft',
+        state={'state': 'running', 'resiliency_id': resiliency_id}
+    )
+    pvm.save(db_sa_base.get_session())
+
+    fleet.pvms.append(pvm.id)
+
+
+def generate(groups, server_groups, servers):
+    """Creates groups x server groups x servers with their devices.
+
+    Every server gets disks, NICs and the FT state of its PVM, every
+    server group the logical disks and NICs of its servers. A transaction
+    is committed per resiliency group.
+
+    :return: Fleet.
+    """
+    fleet = Fleet()
+    resiliency_id = 0
+
+    for g in range(groups):
+        with db_api.transaction():
+            group = db_api.create_resiliency_group({
+                'name': 'rg-%s' % g,
+                'resiliency_strategy_type': 'ufr'
+            })
+
+            fleet.groups.append(group.id)
+
+            for sg in range(server_groups):
+                server_group = db_api.create_resiliency_server_group({
+                    'name': 'rg-%s-sg-%s' % (g, sg),
+                    'resiliency_strategy_type': 'ufr',
+                    'resiliency_group_id': group.id
+                })
+
+                fleet.server_groups.append(server_group.id)
+
+                for i in range(DISKS_PER_SERVER):
+                    db_api.create_resiliency_disk_logical({
+                        'name': '%s-disk-%s' % (server_group.name, i),
+                        'resiliency_server_group_id': server_group.id,
+                        'disk_id': i,
+                        'disk_size': '20'
+                    })
+
+                for i in range(NICS_PER_SERVER):
+                    db_api.create_resiliency_nic_logical({
+                        'name': '%s-nic-%s' % (server_group.name, i),
+                        'resiliency_server_group_id': server_group.id,
+                        'nic_id': i
+                    })
+
+                for s in range(servers):
+                    resiliency_id += 1
+
+                    _create_server(
+                        fleet,
+                        server_group.id,
+                        '%s-vm-%s' % (server_group.name, s),
+                        resiliency_id
+                    )
+
+    return fleet
@@ -0,0 +1,291 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Runs the benchmarks and compares their results with a baseline.
+
+    python -m highlander.tests.perf [--connection URL] [--baseline FILE]
+
+An in-memory SQLite database is used by default, any other database is
+emptied before and after the run: point --connection at a scratch one.
+Results are written as JSON, the run fails (exit status 1) when the
+median of a benchmark is slower than the one of the baseline by more than
+the tolerance. Baselines depend on the machine, record one per machine
+with --save-baseline.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import time
+import timeit
+
+from oslo.config import cfg
+import six
+from six.moves.urllib import parse as urlparse
+
+from highlander import context as auth_context
+from highlander.db.sqlalchemy import base as db_sa_base
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import models as db_models
+from highlander.tests.perf import benchmarks
+from highlander.tests.perf import fleet as fleet_gen
+
+
+CONF = cfg.CONF
+CONF.import_group('pecan', 'highlander.config')
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+FORMAT_VERSION = 1
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m highlander.tests.perf',
+        description='Highlander API and database benchmarks.'
+    )
+
+    parser.add_argument('--connection', default='sqlite://',
+                        help='SQLAlchemy URL of the database.')
+    parser.add_argument('--groups', type=int, default=5,
+                        help='Resiliency groups of the fleet.')
+    parser.add_argument('--server-groups', type=int, default=4,
+                        help='Server groups per resiliency group.')
+    parser.add_argument('--servers', type=int, default=10,
+                        help='Servers per server group.')
+    parser.add_argument('--iterations', type=int, default=50,
+                        help='Measured runs of every benchmark.')
+    parser.add_argument('--warmup', type=int, default=3,
+                        help='Runs of every benchmark before measuring.')
+    parser.add_argument('--only', metavar='REGEX',
+                        help='Runs the benchmarks matching a regex only.')
+    parser.add_argument('--output', default='perf-results.json',
+                        help='File the results are written to.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Results to compare with.')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Saves the results as the baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Slowdown of a median considered a '
+                             'regression, 0.25 is 25%%.')
+
+    return parser.parse_args(argv)
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(timings):
+    """Returns statistics of durations in seconds, in milliseconds."""
+    ordered = sorted(timings)
+    median = _percentile(ordered, 0.5)
+
+    return {
+        'iterations': len(ordered),
+        'min_ms': ordered[0] * 1000,
+        'median_ms': median * 1000,
+        'p95_ms': _percentile(ordered, 0.95) * 1000,
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'ops_per_sec': 1 / median if median else None
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Compares medians with the ones of a baseline.
+
+    :return: Dictionary of the ratio of every benchmark of both runs and
+        list of the names of regressed benchmarks.
+    """
+    ratios = {}
+    regressions = []
+
+    for name, stats in sorted(results.items()):
+        base = baseline.get(name)
+
+        if not base or not base['median_ms']:
+            continue
+
+        ratio = stats['median_ms'] / base['median_ms']
+        ratios[name] = ratio
+
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+
+    return ratios, regressions
+
+
+def _clean_db():
+    metadata = db_models.ResiliencyGroup.metadata
+
+    with db_sa_base.get_engine().begin() as conn:
+        for table in reversed(metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+def _setup(args):
+    CONF.set_override('connection', args.connection, group='database')
+    CONF.set_override('auth_enable', False, group='pecan')
+
+    db_api.setup_db()
+    _clean_db()
+
+    ctx = auth_context.HighlanderContext(
+        user_id='perf-user',
+        project_id='perf-project',
+        user_name='perf-user',
+        project_name='perf-project',
+        is_admin=False
+    )
+
+    auth_context.set_ctx(ctx)
+
+    return ctx
+
+
+def run(suite, iterations, warmup, only=None):
+    results = {}
+
+    for name, func in benchmarks.BENCHMARKS:
+        if only and not re.search(only, name):
+            continue
+
+        for _ in range(warmup):
+            func(suite)
+
+        timings = []
+
+        for _ in range(iterations):
+            started = timeit.default_timer()
+
+            func(suite)
+
+            timings.append(timeit.default_timer() - started)
+
+        results[name] = summarize(timings)
+
+        print('%-28s median %8.3f ms  p95 %8.3f ms' % (
+            name,
+            results[name]['median_ms'],
+            results[name]['p95_ms']
+        ))
+
+    return results
+
+
+def _meta(args, fleet):
+    return {
+        'format': FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        # Only the kind of database, URLs may hold credentials.
+        'database': urlparse.urlparse(args.connection).scheme,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fleet': fleet.sizes(),
+        'iterations': args.iterations
+    }
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _dump(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    ctx = _setup(args)
+
+    try:
+        started = time.time()
+
+        fleet = fleet_gen.generate(
+            args.groups,
+            args.server_groups,
+            args.servers
+        )
+
+        print('Fleet of %s generated in %.1f s' % (
+            ', '.join('%s %s' % (v, k) for k, v in
+                      sorted(fleet.sizes().items())),
+            time.time() - started
+        ))
+
+        results = run(
+            benchmarks.Suite(fleet, ctx),
+            args.iterations,
+            args.warmup,
+            args.only
+        )
+    finally:
+        _clean_db()
+        auth_context.set_ctx(None)
+
+    report = {'meta': _meta(args, fleet), 'results': results}
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        baseline = _load(args.baseline)
+
+        if baseline['meta']['fleet'] != report['meta']['fleet']:
+            print('Baseline was recorded with another fleet: %s' %
+                  baseline['meta']['fleet'])
+
+        ratios, regressions = compare(
+            results,
+            baseline['results'],
+            args.tolerance
+        )
+
+        report['baseline'] = {
+            'path': args.baseline,
+            'created_at': baseline['meta']['created_at'],
+            'ratios': ratios,
+            'regressions': regressions
+        }
+
+        for name, ratio in sorted(six.iteritems(ratios)):
+            print('%-28s %+7.1f%%%s' % (
+                name,
+                (ratio - 1) * 100,
+                '  REGRESSION' if name in regressions else ''
+            ))
+
+        if regressions:
+            print('%s benchmark(s) slower than the baseline by more than '
+                  '%d%%' % (len(regressions), args.tolerance * 100))
+    else:
+        regressions = []
+
+    _dump(args.output, report)
+
+    print('Results written to %s' % args.output)
+
+    if args.save_baseline:
+        _dump(args.baseline, report)
+
+        print('Baseline written to %s' % args.baseline)
+
+    return 1 if regressions else 0
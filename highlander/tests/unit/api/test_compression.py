@@ -0,0 +1,83 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import zlib
+
+import webob
+
+from highlander.api import compression
+from highlander.tests import base
+
+BODY = '{"resiliency_groups": [%s]}' % ', '.join(
+    '{"id": "%s", "name": "group-%s"}' % (i, i) for i in range(100)
+)
+
+
+def _app(chunks, content_type='application/json', status='200 OK'):
+    def app(environ, start_response):
+        start_response(status, [('Content-Type', content_type)])
+
+        for chunk in chunks:
+            yield chunk
+
+    return compression.CompressionMiddleware(app)
+
+
+def _get(app, accept_encoding=None):
+    headers = {}
+
+    if accept_encoding:
+        headers['Accept-Encoding'] = accept_encoding
+
+    return webob.Request.blank('/', headers=headers).get_response(app)
+
+
+class CompressionTest(base.BaseTest):
+    def test_negotiation(self):
+        chunks = [BODY[i:i + 100] for i in range(0, len(BODY), 100)]
+
+        resp = _get(_app(chunks), 'gzip, deflate')
+
+        self.assertEqual('gzip', resp.headers['Content-Encoding'])
+        self.assertEqual('Accept-Encoding', resp.headers['Vary'])
+        self.assertLess(len(resp.body), len(BODY) / 5)
+        self.assertEqual(BODY, zlib.decompress(resp.body, 16 + zlib.MAX_WBITS))
+
+        resp = _get(_app(chunks), 'gzip;q=0.5, deflate')
+
+        self.assertEqual('deflate', resp.headers['Content-Encoding'])
+        self.assertEqual(BODY, zlib.decompress(resp.body))
+
+        for accept_encoding in [None, 'identity', 'gzip;q=0']:
+            resp = _get(_app(chunks), accept_encoding)
+
+            self.assertNotIn('Content-Encoding', resp.headers)
+            self.assertEqual(BODY, resp.body)
+
+    def test_not_compressed(self):
+        resp = _get(_app(['{"small": true}']), 'gzip')
+
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual('Accept-Encoding', resp.headers['Vary'])
+        self.assertEqual('{"small": true}', resp.body)
+
+        resp = _get(_app([BODY], content_type='image/png'), 'gzip')
+
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(BODY, resp.body)
+
+        resp = _get(_app([], status='304 Not Modified'), 'gzip')
+
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(304, resp.status_int)
@@ -0,0 +1,139 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo.config import cfg
+import webob
+
+from highlander.api import app
+from highlander.api.controllers.v1 import event
+from highlander.api.hooks import rate_limit
+from highlander import context as auth_context
+from highlander.tests import base
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MemoryBackendTest(base.BaseTest):
+    def test_token_bucket(self):
+        timer = FakeTimer()
+        backend = rate_limit.MemoryBackend(timer=timer)
+
+        self.assertEqual(0, backend.take('p1', 1.0, 2))
+        self.assertEqual(0, backend.take('p1', 1.0, 2))
+        self.assertEqual(1.0, backend.take('p1', 1.0, 2))
+
+        # Buckets of projects are independent.
+        self.assertEqual(0, backend.take('p2', 1.0, 2))
+
+        timer.now += 0.5
+
+        self.assertEqual(0.5, backend.take('p1', 1.0, 2))
+
+        timer.now += 0.5
+
+        self.assertEqual(0, backend.take('p1', 1.0, 2))
+
+
+def get_all():
+    pass
+
+
+def get():
+    pass
+
+
+class _State(object):
+    def __init__(self, controller):
+        self.controller = controller
+        self.request = webob.Request.blank('/')
+
+
+class RateLimitHookTest(base.DbTestCase):
+    def _override(self, name, value, group):
+        cfg.CONF.set_override(name, value, group=group)
+        self.addCleanup(cfg.CONF.clear_override, name, group)
+
+    def _get(self, application, project_id):
+        try:
+            return webob.Request.blank(
+                '/v1/resiliencygroups',
+                headers={'X-Project-Id': project_id}
+            ).get_response(application)
+        finally:
+            # The API clears the context of the thread it runs in.
+            auth_context.set_ctx(self.ctx)
+
+    def test_rate_limit(self):
+        self._override('auth_enable', False, 'pecan')
+        self._override('enabled', True, 'rate_limit')
+        self._override('rate', 0.1, 'rate_limit')
+        self._override('burst', 2, 'rate_limit')
+
+        application = app.setup_app()
+
+        self.assertEqual(200, self._get(application, 'p1').status_int)
+        self.assertEqual(200, self._get(application, 'p1').status_int)
+
+        resp = self._get(application, 'p1')
+
+        self.assertEqual(429, resp.status_int)
+        self.assertEqual('10', resp.headers['Retry-After'])
+
+    def test_max_in_flight(self):
+        self._override('rate', 0, 'rate_limit')
+        self._override('max_in_flight', {'list': '1'}, 'rate_limit')
+
+        hook = rate_limit.RateLimitHook()
+
+        first, second = _State(get_all), _State(get_all)
+
+        hook.before(first)
+
+        self.assertRaises(webob.exc.HTTPTooManyRequests, hook.before, second)
+
+        hook.after(second)
+        hook.after(first)
+
+        hook.before(second)
+
+        # Reads aren't limited.
+        hook.before(_State(get))
+
+    def test_events_long_polls_have_a_route_class_of_their_own(self):
+        self._override('rate', 0, 'rate_limit')
+        self._override('max_in_flight', {'list': '1', 'watch': '1'},
+                       'rate_limit')
+
+        hook = rate_limit.RateLimitHook()
+
+        poll = _State(event.EventsController().get_all)
+
+        hook.before(_State(get_all))
+        hook.before(poll)
+
+        self.assertEqual(
+            'watch',
+            poll.request.environ[rate_limit._ENVIRON_KEY]
+        )
+        self.assertRaises(
+            webob.exc.HTTPTooManyRequests,
+            hook.before,
+            _State(event.EventsController().get_all)
+        )
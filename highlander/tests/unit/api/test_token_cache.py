@@ -0,0 +1,65 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo.config import cfg
+
+from highlander.api import access_control
+from highlander.api import token_cache
+from highlander.tests import base
+from highlander.utils import metrics
+
+
+def _lookups(result):
+    return metrics.TOKEN_CACHE_LOOKUPS._values.get((result,), 0)
+
+
+class TokenCacheTest(base.BaseTest):
+    def test_lookups(self):
+        cache = token_cache.TokenCache()
+
+        hits, misses, invalid = map(_lookups, ['hit', 'miss', 'invalid'])
+
+        cache.set('good', '[{"token": {}}, "2015-01-01T00:00:00Z"]', 300)
+        cache.set('bad', token_cache.INVALID, 300)
+
+        self.assertIsNotNone(cache.get('good'))
+        self.assertEqual(token_cache.INVALID, cache.get('bad'))
+        self.assertIsNone(cache.get('unknown'))
+
+        self.assertEqual(hits + 1, _lookups('hit'))
+        self.assertEqual(misses + 1, _lookups('miss'))
+        self.assertEqual(invalid + 1, _lookups('invalid'))
+
+    def test_invalid_tokens_expire_first(self):
+        cfg.CONF.set_override('invalid_token_cache_ttl', 0, group='keystone')
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'invalid_token_cache_ttl',
+            'keystone'
+        )
+
+        cache = token_cache.TokenCache()
+
+        cache.set('bad', token_cache.INVALID, 300)
+
+        self.assertIsNone(cache.get('bad'))
+
+    def test_auth_token_uses_cache(self):
+        cfg.CONF.set_override('auth_enable', True, group='pecan')
+        self.addCleanup(cfg.CONF.clear_override, 'auth_enable', 'pecan')
+
+        app = access_control.setup(lambda environ, start_response: [])
+
+        self.assertIsInstance(app, token_cache.TokenCacheMiddleware)
+        self.assertIsInstance(app.token_cache, token_cache.TokenCache)
@@ -0,0 +1,131 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import os
+import tempfile
+
+from alembic import autogenerate
+from alembic import command as alembic_cmd
+from alembic import migration as alembic_migration
+from alembic import operations
+from alembic import script as alembic_script
+from oslo.config import cfg
+import sqlalchemy as sa
+from sqlalchemy import sql
+
+from highlander.db.sqlalchemy.migration import cli
+from highlander.db.sqlalchemy.migration import online
+from highlander.db.sqlalchemy.migration import schema
+from highlander.db.v1.sqlalchemy import models
+from highlander import exceptions as exc
+from highlander.tests import base as test_base
+
+
+class MigrationTest(test_base.BaseTest):
+    def setUp(self):
+        super(MigrationTest, self).setUp()
+
+        fd, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        self.engine = sa.create_engine('sqlite:///%s' % path)
+        self.conn = self.engine.connect()
+        self.addCleanup(self.conn.close)
+
+        self.config = cli.get_alembic_config()
+        self.config.attributes['connection'] = self.conn
+        self.config.attributes['configure_logger'] = False
+
+        self.override_config('backfill_sleep', 0, group='migration')
+
+    def override_config(self, name, override, group=None):
+        cfg.CONF.set_override(name, override, group)
+        self.addCleanup(cfg.CONF.clear_override, name, group)
+
+    def _migration_context(self):
+        return alembic_migration.MigrationContext.configure(self.conn)
+
+    def test_upgrade_matches_models(self):
+        alembic_cmd.upgrade(self.config, 'heads')
+
+        diff = autogenerate.compare_metadata(
+            self._migration_context(),
+            models.ResiliencyGroup.metadata
+        )
+
+        self.assertEqual([], diff)
+
+        alembic_cmd.downgrade(self.config, 'base')
+
+        self.assertEqual(
+            ['alembic_version'],
+            self.engine.table_names()
+        )
+
+    def test_check_version_follows_dependencies(self):
+        # 003_contract depends on 016_expand, which isn't recorded as a
+        # head then.
+        alembic_cmd.upgrade(self.config, '003_contract')
+
+        heads = schema.get_current_heads(self.conn)
+        script = alembic_script.ScriptDirectory.from_config(self.config)
+
+        self.assertEqual(('003_contract',), heads)
+        self.assertIn('016_expand', schema._applied_revisions(script, heads))
+        self.assertRaises(exc.DBException, schema.check_version, self.conn)
+
+        alembic_cmd.upgrade(self.config, 'expand@head')
+
+        schema.check_version(self.conn)
+
+    def test_backfill_in_batches(self):
+        alembic_cmd.upgrade(self.config, 'heads')
+
+        rg = sql.table(
+            'resiliency_group',
+            sql.column('id'),
+            sql.column('name'),
+            sql.column('resiliency_strategy_type'),
+            sql.column('stack_id')
+        )
+
+        self.conn.execute(rg.insert(), [
+            {'id': str(i), 'name': 'rg%s' % i,
+             'resiliency_strategy_type': 'ufr'}
+            for i in range(5)
+        ])
+
+        with operations.Operations.context(self._migration_context()):
+            updated = online.backfill(
+                rg,
+                {'stack_id': rg.c.name},
+                where=rg.c.stack_id.is_(None),
+                batch_size=2
+            )
+
+            self.assertEqual(5, updated)
+            self.assertEqual(
+                [(5, online.BACKFILL)],
+                [(rows, kind) for _, kind, rows, _ in online.estimate(
+                    self.conn, {'resiliency_group': online.BACKFILL}
+                )]
+            )
+
+        self.assertEqual(
+            [('rg%s' % i,) for i in range(5)],
+            self.conn.execute(
+                sa.select([rg.c.stack_id]).order_by(rg.c.id)
+            ).fetchall()
+        )
@@ -0,0 +1,270 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+from oslo.utils import timeutils
+
+from highlander import context as auth_context
+from highlander.db.sqlalchemy import base as sa_base
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import api as sa_api
+from highlander.db.v1.sqlalchemy import models
+from highlander import exceptions as exc
+from highlander.tests import base as test_base
+
+
+def _group_values(name):
+    return {'name': name, 'resiliency_strategy_type': 'ufr'}
+
+
+class ChangeEventsTest(test_base.DbTestCase):
+    def _cursor(self):
+        # Numbers the committed events, like the dispatcher.
+        with db_api.transaction():
+            db_api.sequence_change_events()
+
+            return db_api.get_change_events()[-1].seq
+
+    def _events(self, since=0):
+        with db_api.transaction():
+            db_api.sequence_change_events()
+
+            return [
+                (e.entity_type, e.entity_id, e.action)
+                for e in db_api.get_change_events(since)
+            ]
+
+    def test_changes_are_recorded_in_order(self):
+        with db_api.transaction():
+            rg = db_api.create_resiliency_group(_group_values('rg'))
+
+        with db_api.transaction():
+            db_api.update_resiliency_group(rg.id, {'desc': 'changed'})
+
+        with db_api.transaction():
+            db_api.get_resiliency_group(rg.id).soft_delete()
+
+        self.assertEqual(
+            [
+                ('resiliency_group', rg.id, 'create'),
+                ('resiliency_group', rg.id, 'update'),
+                ('resiliency_group', rg.id, 'delete')
+            ],
+            self._events()
+        )
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        try:
+            with db_api.transaction():
+                db_api.create_resiliency_group(_group_values('rg'))
+
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+
+        self.assertEqual([], self._events())
+
+    def test_bulk_statements(self):
+        with db_api.transaction():
+            ids = [
+                db_api.create_resiliency_server({
+                    'name': 'vm-%s' % i,
+                    'resiliency_strategy_type': 'ufr'
+                }).id
+                for i in range(3)
+            ]
+
+        cursor = self._cursor()
+
+        db_api.update_resiliency_server_health({ids[0]: 'failed'})
+        sa_api.soft_delete_resiliency_servers(id=ids[1])
+
+        with db_api.transaction():
+            db_api.delete_resiliency_servers(id=ids[2])
+
+        self.assertEqual(
+            [
+                ('resiliency_server', ids[0], 'update'),
+                ('resiliency_server', ids[1], 'delete'),
+                ('resiliency_server', ids[2], 'delete')
+            ],
+            self._events(cursor)
+        )
+
+    def test_events_of_other_projects_are_hidden(self):
+        with db_api.transaction():
+            db_api.create_resiliency_group(_group_values('private'))
+            public = db_api.create_resiliency_group(
+                dict(_group_values('public'), scope='public')
+            )
+
+        auth_context.set_ctx(auth_context.HighlanderContext(
+            user_id='1-2-3-4',
+            project_id='<another-project>',
+            is_admin=False
+        ))
+
+        self.assertEqual(
+            [('resiliency_group', public.id, 'create')],
+            self._events()
+        )
+
+    def test_events_committed_out_of_order(self):
+        table = models.ChangeEvent.__table__
+
+        def _commit_event(id, entity_id):
+            with db_api.transaction():
+                sa_base.get_session().execute(table.insert(), [{
+                    'id': id,
+                    'entity_type': 'resiliency_group',
+                    'entity_id': entity_id,
+                    'action': 'create',
+                    'project_id': self.ctx.project_id,
+                    'scope': 'private',
+                    'dispatched': False
+                }])
+
+        # The transaction of event 10 commits after the one of event 11.
+        _commit_event(11, 'rg-11')
+
+        cursor = self._cursor()
+
+        _commit_event(10, 'rg-10')
+
+        self.assertEqual(
+            [('resiliency_group', 'rg-10', 'create')],
+            self._events(cursor)
+        )
+
+    def test_dispatch_and_purge(self):
+        with db_api.transaction():
+            for i in range(3):
+                db_api.create_resiliency_group(_group_values('rg%s' % i))
+
+        with db_api.transaction():
+            self.assertEqual(
+                0,
+                db_api.dispatch_change_events(lambda events: None)
+            )
+            self.assertEqual(3, db_api.sequence_change_events())
+
+        def _fail(events):
+            raise RuntimeError()
+
+        with db_api.transaction():
+            self.assertRaises(
+                RuntimeError,
+                db_api.dispatch_change_events,
+                _fail
+            )
+
+        dispatched = []
+
+        for _ in range(3):
+            with db_api.transaction():
+                db_api.dispatch_change_events(
+                    lambda events: dispatched.append(
+                        [e.seq for e in events]
+                    ),
+                    batch_size=2
+                )
+
+        with db_api.transaction():
+            ids = [e.seq for e in db_api.get_change_events()]
+
+        # Nothing is lost when the callback fails.
+        self.assertEqual([ids[:2], ids[2:]], dispatched)
+
+        future = timeutils.utcnow() + datetime.timedelta(seconds=1)
+
+        self.assertEqual(
+            2,
+            db_api.purge_change_events(future, batch_size=1)
+        )
+
+        with db_api.transaction():
+            db_api.create_resiliency_group(_group_values('rg'))
+            db_api.sequence_change_events()
+
+            # Up to date clients carry on, others have to start over.
+            self.assertEqual(2, len(db_api.get_change_events(ids[1])))
+            self.assertEqual(1, len(db_api.get_change_events(ids[-1])))
+            self.assertRaises(
+                exc.EventCursorExpiredException,
+                db_api.get_change_events,
+                ids[0]
+            )
+
+    def test_cascading_delete(self):
+        with db_api.transaction():
+            rg = db_api.create_resiliency_group(_group_values('rg'))
+            sg = db_api.create_resiliency_server_group(
+                dict(_group_values('sg'), resiliency_group_id=rg.id)
+            )
+            vm = db_api.create_resiliency_server(
+                dict(_group_values('vm'), resiliency_server_group_id=sg.id)
+            )
+            disk = db_api.create_resiliency_disk(
+                dict(_group_values('disk'), resiliency_server_id=vm.id)
+            )
+            nic_logical = db_api.create_resiliency_nic_logical(
+                dict(_group_values('nic'), resiliency_server_group_id=sg.id)
+            )
+
+        cursor = self._cursor()
+
+        with db_api.transaction():
+            deleted = sa_api._delete_cascade(
+                sa_api.models.ResiliencyGroup,
+                [rg.id],
+                batch_size=1
+            )
+
+        self.assertEqual(
+            {
+                'resiliency_group': 1,
+                'resiliency_server_group': 1,
+                'resiliency_server': 1,
+                'resiliency_disk': 1,
+                'resiliency_nic_logical': 1
+            },
+            dict((k, v) for k, v in deleted.items() if v)
+        )
+
+        events = self._events(cursor)
+
+        self.assertEqual(
+            set([
+                ('resiliency_group', rg.id, 'delete'),
+                ('resiliency_server_group', sg.id, 'delete'),
+                ('resiliency_server', vm.id, 'delete'),
+                ('resiliency_disk', disk.id, 'delete'),
+                ('resiliency_nic_logical', nic_logical.id, 'delete')
+            ]),
+            set(events)
+        )
+
+        # Children are deleted before their parents.
+        order = [e[0] for e in events]
+
+        self.assertLess(
+            order.index('resiliency_disk'),
+            order.index('resiliency_server')
+        )
+        self.assertLess(
+            order.index('resiliency_server'),
+            order.index('resiliency_server_group')
+        )
+        self.assertEqual('resiliency_group', order[-1])
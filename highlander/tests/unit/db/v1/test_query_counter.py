@@ -0,0 +1,74 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from highlander.db.sqlalchemy import query_counter
+from highlander.db.v1 import api as db_api
+from highlander.tests import base as test_base
+
+
+class QueryCounterTest(test_base.DbTestCase):
+    def setUp(self):
+        super(QueryCounterTest, self).setUp()
+
+        with db_api.transaction():
+            for i in range(3):
+                rg = db_api.create_resiliency_group({
+                    'name': 'rg%s' % i,
+                    'resiliency_strategy_type': 'ufr'
+                })
+
+                db_api.create_resiliency_server_group({
+                    'name': 'rsg%s' % i,
+                    'resiliency_strategy_type': 'ufr',
+                    'resiliency_group_id': rg.id
+                })
+
+    def _read_server_groups_one_by_one(self):
+        with db_api.transaction():
+            for rg in db_api.get_resiliency_groups():
+                # Lazy loaded, one SELECT per group.
+                rg.resiliency_server_groups
+
+    def test_repeated_selects_are_detected(self):
+        with self.assertMaxQueries(limit=10) as queries:
+            self._read_server_groups_one_by_one()
+
+        [(table, _, count)] = queries.repeated_selects()
+
+        self.assertEqual('resiliency_server_group', table)
+        self.assertEqual(3, count)
+
+        self.assertRaises(
+            query_counter.QueryBudgetExceeded,
+            self.assertMaxQueries(repeat_limit=2)(
+                self._read_server_groups_one_by_one
+            )
+        )
+
+        # The test itself counts everything.
+        self.assertGreaterEqual(self.queries.count, 2 * queries.count)
+
+    def test_budget_violations_are_reported_as_they_happen(self):
+        violations = []
+
+        counter = query_counter.QueryCounter(
+            limit=1,
+            on_violation=violations.append
+        )
+
+        with counter:
+            self._read_server_groups_one_by_one()
+
+        self.assertEqual(1, len(violations))
+        self.assertIn('More than 1 statements', violations[0])
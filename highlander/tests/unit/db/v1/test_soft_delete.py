@@ -0,0 +1,162 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+from oslo.utils import timeutils
+
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import api as sa_api
+from highlander import exceptions as exc
+from highlander.tests import base as test_base
+
+
+def _group_values(name):
+    return {'name': name, 'resiliency_strategy_type': 'ufr'}
+
+
+class SoftDeleteTest(test_base.DbTestCase):
+    def test_soft_deleted_group_is_hidden(self):
+        with db_api.transaction():
+            created = db_api.create_resiliency_group(_group_values('rg1'))
+
+        with db_api.transaction():
+            db_api.get_resiliency_group(created.id).soft_delete()
+
+        with db_api.transaction():
+            self.assertEqual([], db_api.get_resiliency_groups())
+            self.assertRaises(
+                exc.NotFoundException,
+                db_api.get_resiliency_group,
+                created.id
+            )
+
+    def test_bulk_soft_delete_in_batches(self):
+        with db_api.transaction():
+            for i in range(5):
+                db_api.create_resiliency_group(_group_values('rg%s' % i))
+
+        count = sa_api.soft_delete_resiliency_groups(batch_size=2)
+
+        self.assertEqual(5, count)
+
+        with db_api.transaction():
+            self.assertEqual([], db_api.get_resiliency_groups())
+
+    def test_purge_keeps_referenced_tombstones(self):
+        with db_api.transaction():
+            vm1 = db_api.create_resiliency_server({
+                'name': 'vm1',
+                'resiliency_strategy_type': 'ufr'
+            })
+            db_api.create_resiliency_server({
+                'name': 'vm2',
+                'resiliency_strategy_type': 'ufr',
+                'replacement_resiliency_server_id': vm1.id
+            })
+
+        sa_api.soft_delete_resiliency_servers(name='vm1')
+
+        future = timeutils.utcnow() + datetime.timedelta(seconds=1)
+
+        # 'vm1' is still referenced by the live 'vm2'.
+        self.assertEqual(0, db_api.purge_soft_deleted(future, batch_size=1))
+
+        sa_api.soft_delete_resiliency_servers()
+
+        # 'vm2' goes first, then 'vm1' by the next batch.
+        self.assertEqual(2, db_api.purge_soft_deleted(future, batch_size=1))
+
+    def test_soft_delete_cascades_to_live_children(self):
+        with db_api.transaction():
+            rg = db_api.create_resiliency_group(_group_values('rg1'))
+
+            for i in range(3):
+                db_api.create_resiliency_server_group({
+                    'name': 'sg%s' % i,
+                    'resiliency_strategy_type': 'ufr',
+                    'resiliency_group_id': rg.id
+                })
+
+            db_api.create_resiliency_group(_group_values('rg2'))
+
+        self.assertEqual(1, sa_api.soft_delete_resiliency_server_groups(
+            name='sg0'
+        ))
+        self.assertEqual(
+            3,
+            sa_api.soft_delete_resiliency_groups(name='rg1', batch_size=2)
+        )
+
+        with db_api.transaction():
+            self.assertEqual(
+                ['rg2'],
+                [g.name for g in db_api.get_resiliency_groups()]
+            )
+            self.assertEqual([], db_api.get_resiliency_server_groups())
+
+    def test_soft_deleted_names_can_be_used_again(self):
+        with db_api.transaction():
+            rg = db_api.create_resiliency_group(_group_values('rg1'))
+            db_api.create_resiliency_server_group({
+                'name': 'sg1',
+                'resiliency_strategy_type': 'ufr',
+                'resiliency_group_id': rg.id
+            })
+
+        for _ in range(2):
+            sa_api.soft_delete_resiliency_groups()
+
+            with db_api.transaction():
+                rg = db_api.create_resiliency_group(_group_values('rg1'))
+                db_api.create_resiliency_server_group({
+                    'name': 'sg1',
+                    'resiliency_strategy_type': 'ufr',
+                    'resiliency_group_id': rg.id
+                })
+
+        with db_api.transaction():
+            self.assertEqual(
+                [rg.id],
+                [g.id for g in db_api.get_resiliency_groups()]
+            )
+
+        # Names stay unique among the live objects.
+        self.assertRaises(
+            exc.DBDuplicateEntry,
+            db_api.create_resiliency_group,
+            _group_values('rg1')
+        )
+
+    def test_changes_since_include_deleted_groups(self):
+        with db_api.transaction():
+            rg1 = db_api.create_resiliency_group(_group_values('rg1'))
+            rg2 = db_api.create_resiliency_group(_group_values('rg2'))
+
+        since = timeutils.utcnow()
+
+        with db_api.transaction():
+            db_api.get_resiliency_group(rg1.id).soft_delete()
+
+            self.assertIsNotNone(rg2.updated_at)
+
+        with db_api.transaction():
+            changed = db_api.get_resiliency_groups(changes_since=since)
+
+            self.assertEqual([rg1.id], [rg.id for rg in changed])
+            self.assertIsNotNone(changed[0].deleted_at)
+            self.assertEqual(
+                [],
+                db_api.get_resiliency_groups(changes_since=timeutils.utcnow())
+            )
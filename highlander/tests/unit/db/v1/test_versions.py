@@ -0,0 +1,85 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import eventlet
+
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import api as sa_api
+from highlander import exceptions as exc
+from highlander.tests import base as test_base
+
+
+class VersionsTest(test_base.DbTestCase):
+    def setUp(self):
+        super(VersionsTest, self).setUp()
+
+        with db_api.transaction():
+            self.rg = db_api.create_resiliency_group({
+                'name': 'rg',
+                'resiliency_strategy_type': 'ufr'
+            })
+
+    def _update(self, values, expected_version=None):
+        with db_api.transaction():
+            return db_api.update_resiliency_group(
+                self.rg.id,
+                values,
+                expected_version
+            )
+
+    def test_every_update_increments_the_version(self):
+        self.assertEqual(1, self.rg.version_id)
+
+        self.assertEqual(2, self._update({'desc': 'a'}).version_id)
+
+        sa_api.soft_delete_resiliency_groups(id=self.rg.id)
+
+        with db_api.transaction():
+            self.assertEqual(
+                3,
+                db_api.get_resiliency_groups(
+                    changes_since=self.rg.created_at
+                )[0].version_id
+            )
+
+    def test_update_of_an_outdated_version_fails(self):
+        self._update({'desc': 'a'}, expected_version=1)
+
+        self.assertRaises(
+            exc.ConcurrentUpdateException,
+            self._update,
+            {'desc': 'b'},
+            expected_version=1
+        )
+
+        with db_api.transaction():
+            self.assertEqual('a', db_api.get_resiliency_group(self.rg.id).desc)
+
+    def test_concurrent_update_fails(self):
+        def _update_stale_copy():
+            with db_api.transaction():
+                rg = db_api.get_resiliency_group(self.rg.id)
+
+                # The row changes after this transaction loaded it.
+                eventlet.spawn(self._update, {'desc': 'other'}).wait()
+
+                db_api.update_resiliency_group(rg.id, {'desc': 'mine'})
+
+        self.assertRaises(exc.ConcurrentUpdateException, _update_stale_copy)
+
+        with db_api.transaction():
+            self.assertEqual(
+                'other',
+                db_api.get_resiliency_group(self.rg.id).desc
+            )
@@ -0,0 +1,113 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+
+from highlander.db.sqlalchemy import base as b
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import api as sa_api
+from highlander.db.v1.sqlalchemy import models
+from highlander.engine import default_engine
+from highlander.tests import base
+
+
+def _change(rg_id, stack_id):
+    return {
+        'type': 'resiliency_group',
+        'id': rg_id,
+        'values': {'stack_id': stack_id}
+    }
+
+
+class UpdateStatesTest(base.DbTestCase):
+    def setUp(self):
+        super(UpdateStatesTest, self).setUp()
+
+        self.engine = default_engine.DefaultEngine(None)
+
+        with db_api.transaction():
+            self.rg1 = db_api.create_resiliency_group(
+                {'name': 'rg1', 'resiliency_strategy_type': 'ufr'}
+            ).id
+            self.rg2 = db_api.create_resiliency_group(
+                {'name': 'rg2', 'resiliency_strategy_type': 'ufr'}
+            ).id
+
+    def _race(self, times):
+        """Updates rg1 behind the back of its next engine updates.
+
+        The bulk update runs between the read and the flush of the engine
+        update, as if another transaction committed it meanwhile.
+        """
+        update = sa_api._update_versioned
+        races = []
+
+        def _update_versioned(db_obj, values, expected_version, session):
+            if db_obj.id == self.rg1 and len(races) < times:
+                races.append(db_obj.version_id)
+
+                model = models.ResiliencyGroup
+
+                b.model_query(model).filter_by(id=self.rg1).update(
+                    {'version_id': model.version_id + 1},
+                    synchronize_session=False
+                )
+
+            return update(db_obj, values, expected_version, session)
+
+        patcher = mock.patch.object(
+            sa_api,
+            '_update_versioned',
+            _update_versioned
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        return races
+
+    def _stack_ids(self):
+        with db_api.transaction():
+            return dict(
+                (rg.id, rg.stack_id) for rg in db_api.get_resiliency_groups()
+            )
+
+    def test_conflicting_change_is_retried(self):
+        races = self._race(1)
+
+        updated = self.engine.update_states(
+            [_change(self.rg1, 's1'), _change(self.rg2, 's2')]
+        )
+
+        self.assertEqual(1, len(races))
+        self.assertEqual(2, updated)
+        self.assertEqual(
+            {self.rg1: 's1', self.rg2: 's2'},
+            self._stack_ids()
+        )
+
+    def test_change_conflicting_on_every_attempt_is_skipped(self):
+        races = self._race(default_engine._MAX_ATTEMPTS)
+
+        updated = self.engine.update_states(
+            [_change(self.rg1, 's1'), _change(self.rg2, 's2')]
+        )
+
+        self.assertEqual(default_engine._MAX_ATTEMPTS, len(races))
+
+        # Only the conflicting change is lost, not the whole batch.
+        self.assertEqual(1, updated)
+        self.assertEqual(
+            {self.rg1: None, self.rg2: 's2'},
+            self._stack_ids()
+        )
@@ -0,0 +1,169 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+import eventlet
+
+from highlander.engine import policies
+from highlander import exceptions as exc
+from highlander.maccleod.v1 import policies as policies_spec
+from highlander.tests import base
+
+
+# Delays are given as expressions since the DSL only accepts whole seconds.
+CONTEXT = {'delay': 0.05}
+
+
+def _runtime(**spec):
+    return policies.PolicyRuntime(policies_spec.PoliciesSpec(spec), CONTEXT)
+
+
+class _Flaky(object):
+    def __init__(self, failures, error='temporary'):
+        self.calls = 0
+        self.failures = failures
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+
+        if self.calls <= self.failures:
+            raise RuntimeError(self.error)
+
+        return self.calls
+
+
+class PolicyRuntimeTest(base.BaseTest):
+    def test_no_policies(self):
+        runtime = policies.PolicyRuntime(None)
+
+        self.assertEqual(3, runtime.run(None, lambda a, b: a + b, 1, b=2))
+
+    def test_retry(self):
+        runtime = _runtime(retry={'count': 3, 'delay': '<% $.delay %>'})
+        task = _Flaky(2)
+
+        call = runtime.submit(CONTEXT, task)
+
+        self.assertEqual(3, call.wait())
+        self.assertEqual(3, call.attempts)
+
+    def test_retry_count_exhausted(self):
+        runtime = _runtime(retry={'count': 1, 'delay': 0})
+        task = _Flaky(5)
+
+        self.assertRaises(RuntimeError, runtime.run, CONTEXT, task)
+        self.assertEqual(2, task.calls)
+
+    def test_break_on(self):
+        runtime = _runtime(retry={
+            'count': 5,
+            'delay': 0,
+            'break-on': "<% $.__error = 'fatal' %>"
+        })
+        task = _Flaky(5, error='fatal')
+
+        self.assertRaises(RuntimeError, runtime.run, CONTEXT, task)
+        self.assertEqual(1, task.calls)
+
+    def test_failing_break_on(self):
+        runtime = _runtime(retry={
+            'count': 5,
+            'delay': 0,
+            'break-on': '<% $.__error + 1 %>'
+        })
+        task = _Flaky(5)
+
+        call = runtime.submit(CONTEXT, task)
+
+        with eventlet.Timeout(5):
+            self.assertRaises(TypeError, call.wait)
+
+        self.assertTrue(call.done())
+        self.assertEqual(1, task.calls)
+
+    def test_concurrency(self):
+        runtime = _runtime(concurrency=2)
+        running = []
+        peak = []
+
+        def task():
+            running.append(1)
+            peak.append(len(running))
+
+            eventlet.sleep(0.01)
+
+            running.pop()
+
+        calls = [runtime.submit(CONTEXT, task) for _ in range(10)]
+
+        for call in calls:
+            call.wait()
+
+        self.assertEqual(2, max(peak))
+
+    def test_timeout_cancels_task(self):
+        runtime = _runtime(timeout='<% $.delay %>', concurrency=1)
+        finished = []
+
+        def slow():
+            eventlet.sleep(10)
+
+            finished.append(True)
+
+        call = runtime.submit(CONTEXT, slow)
+
+        self.assertRaises(exc.TaskTimeoutException, call.wait)
+
+        # The concurrency slot of the cancelled task is free again.
+        self.assertEqual(1, runtime.run(CONTEXT, lambda: 1))
+        self.assertEqual([], finished)
+
+    def test_waits_hold_no_green_threads(self):
+        runtime = _runtime(
+            **{'wait-before': '<% $.delay %>', 'wait-after': '<% $.delay %>'}
+        )
+
+        started = time.time()
+
+        calls = [runtime.submit(CONTEXT, lambda: 1) for _ in range(2000)]
+
+        # Waiting tasks are timers, nothing is spawned until they run.
+        self.assertEqual(0, sum(1 for c in calls if c.attempts))
+
+        self.assertEqual(2000, sum(c.wait() for c in calls))
+        self.assertLess(time.time() - started, 5)
+
+    def test_pause_before(self):
+        runtime = _runtime(**{'pause-before': True})
+
+        call = runtime.submit(CONTEXT, lambda: 'done')
+
+        eventlet.sleep(0.05)
+
+        self.assertTrue(call.paused)
+        self.assertFalse(call.done())
+
+        call.resume()
+
+        self.assertEqual('done', call.wait())
+
+    def test_runtime_per_spec(self):
+        spec = policies_spec.PoliciesSpec({'concurrency': 1})
+
+        self.assertIs(
+            policies.get_runtime(spec),
+            policies.get_runtime(spec)
+        )
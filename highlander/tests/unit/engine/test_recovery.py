@@ -0,0 +1,364 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+import mock
+
+from highlander import context as auth_context
+from highlander.db.sqlalchemy import base as db_base
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import api as sa_api
+from highlander.db.v1.sqlalchemy import models
+from highlander.engine import default_engine
+from highlander.engine import recovery
+from highlander.services import events
+from highlander.tests import base
+
+
+def _server(id, sg_id, resiliency_id, hv, affinity=None):
+    return {
+        'id': id,
+        'resiliency_server_group_id': sg_id,
+        'resiliency_id': resiliency_id,
+        'hypervisor_id': hv,
+        'affinity': affinity,
+        'replacement_resiliency_server_id': None
+    }
+
+
+class TopologyIndexTest(base.BaseTest):
+    def _pairs(self, count, strategy='ufr', hypervisors=10):
+        server_groups = []
+        servers = []
+
+        for i in range(count):
+            sg_id = 'sg-%s' % i
+
+            server_groups.append({
+                'id': sg_id,
+                'resiliency_group_id': 'rg',
+                'resiliency_strategy_type': strategy
+            })
+
+            for side in (0, 1):
+                servers.append(_server(
+                    'vm-%s-%s' % (i, side),
+                    sg_id,
+                    side + 1,
+                    'hv-%s' % ((i + side) % hypervisors)
+                ))
+
+        return server_groups, servers
+
+    def _loaded(self, server_groups, servers):
+        # Built from changes only, never read from the DB.
+        index = recovery.TopologyIndex()
+        index._stale = False
+
+        index.apply(
+            [('server_groups', sg['id'], sg) for sg in server_groups] +
+            [('servers', s['id'], s) for s in servers]
+        )
+
+        return index
+
+    def _hypervisors(self, index, plan):
+        placed = dict((p.server_id, p.hypervisor_id) for p in plan.placements)
+
+        return lambda id: placed.get(id, index.servers[id].hypervisor_id)
+
+    def test_pairs_never_share_a_hypervisor(self):
+        index = self._loaded(*self._pairs(100))
+
+        plan = index.plan(['hv-3'])
+
+        self.assertEqual(20, len(plan.placements))
+        self.assertEqual([], plan.unplaced)
+
+        hv_of = self._hypervisors(index, plan)
+
+        for p in plan.placements:
+            self.assertNotEqual('hv-3', p.hypervisor_id)
+            self.assertEqual('rg', p.resiliency_group_id)
+
+            i = p.server_group_id.split('-')[1]
+
+            self.assertNotEqual(hv_of('vm-%s-0' % i), hv_of('vm-%s-1' % i))
+
+        self.assertEqual(
+            {
+                'type': 'resiliency_server',
+                'id': plan.placements[0].server_id,
+                'values': {
+                    'target_recovery_hypervisor_id':
+                        plan.placements[0].hypervisor_id
+                }
+            },
+            plan.state_changes()[0]
+        )
+
+    def test_pair_without_a_free_hypervisor(self):
+        index = self._loaded(*self._pairs(1, hypervisors=2))
+
+        plan = index.plan(['hv-0'])
+
+        self.assertEqual([], plan.placements)
+        self.assertEqual(['vm-0-0'], plan.unplaced)
+
+        # An NM cluster may share a hypervisor if there is no other choice.
+        index = self._loaded(*self._pairs(1, strategy='nm', hypervisors=2))
+
+        self.assertEqual('hv-1', index.plan(['hv-0']).placements[0][3])
+
+    def test_affinity(self):
+        server_groups, servers = self._pairs(3, hypervisors=3)
+
+        servers.append(_server('other', None, 1, 'hv-2', affinity='db'))
+
+        for s in servers:
+            if s['hypervisor_id'] == 'hv-0':
+                s['affinity'] = 'db'
+
+        index = self._loaded(server_groups, servers)
+
+        plan = index.plan(['hv-0'], hypervisors=['hv-1', 'hv-2', 'hv-3'])
+
+        # Joins the surviving server of the affinity group unless its pair
+        # partner is there already.
+        self.assertEqual(
+            {'vm-0-0': 'hv-2', 'vm-2-1': 'hv-3'},
+            dict((p.server_id, p.hypervisor_id) for p in plan.placements)
+        )
+
+    def test_rack_failure_single_pass(self):
+        index = self._loaded(*self._pairs(5000, hypervisors=200))
+
+        failed = ['hv-%s' % i for i in range(20)]
+
+        started = time.time()
+
+        plan = index.plan(failed)
+
+        elapsed = time.time() - started
+
+        self.assertEqual(1000, len(plan.placements))
+        self.assertEqual([], plan.unplaced)
+        self.assertLess(elapsed, 0.5)
+
+    def test_stale_index_ignores_changes(self):
+        index = recovery.TopologyIndex()
+
+        index.apply([('servers', 'vm', _server('vm', 'sg', 1, 'hv'))])
+
+        self.assertEqual({}, index.servers)
+
+
+class TopologyIndexDbTest(base.DbTestCase):
+    def setUp(self):
+        super(TopologyIndexDbTest, self).setUp()
+
+        self.index = recovery.TopologyIndex()
+
+        db_api.watch_resiliency_topology(self.index.apply)
+        self.addCleanup(
+            db_api.unwatch_resiliency_topology,
+            self.index.apply
+        )
+
+    def _create(self, name, sg_id, hv):
+        with db_api.transaction():
+            return db_api.create_resiliency_server({
+                'name': name,
+                'resiliency_strategy_type': 'ufr',
+                'resiliency_server_group_id': sg_id,
+                'resiliency_id': 1,
+                'hypervisor_id': hv
+            })
+
+    def test_follows_committed_changes(self):
+        with db_api.transaction():
+            sg = db_api.create_resiliency_server_group(
+                {'name': 'sg', 'resiliency_strategy_type': 'ufr'}
+            )
+
+        vm1 = self._create('vm-1', sg.id, 'hv-1')
+
+        self.index.load()
+
+        self.assertEqual(['hv-1'], list(self.index.hypervisors))
+
+        vm2 = self._create('vm-2', sg.id, 'hv-2')
+
+        self.assertFalse(self.index._stale)
+        self.assertEqual(
+            set([vm1.id, vm2.id]),
+            self.index.members[sg.id]
+        )
+        self.assertEqual(
+            'ufr',
+            self.index.server_groups[sg.id]['resiliency_strategy_type']
+        )
+
+        # Rolled back changes are never seen.
+        try:
+            with db_api.transaction():
+                db_api.create_resiliency_server({
+                    'name': 'vm-3',
+                    'resiliency_strategy_type': 'ufr',
+                    'hypervisor_id': 'hv-3'
+                })
+
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+
+        self.assertEqual(['hv-1', 'hv-2'], sorted(self.index.hypervisors))
+
+        # Bulk statements make the index read the topology again.
+        with db_api.transaction():
+            db_api.delete_resiliency_servers(id=vm1.id)
+
+        self.assertTrue(self.index._stale)
+
+        plan = self.index.plan(['hv-2'], hypervisors=['hv-1'])
+
+        self.assertEqual([vm2.id], [p.server_id for p in plan.placements])
+        self.assertEqual('hv-1', plan.placements[0].hypervisor_id)
+
+    def test_follows_changes_of_other_processes(self):
+        # Not watching the commits, as if the changes were made by an API
+        # server.
+        index = recovery.TopologyIndex(events.TopologyFeed())
+
+        with db_api.transaction():
+            sg = db_api.create_resiliency_server_group(
+                {'name': 'sg', 'resiliency_strategy_type': 'ufr'}
+            )
+
+        vm1 = self._create('vm-1', sg.id, 'hv-1')
+
+        index.load()
+
+        vm2 = self._create('vm-2', sg.id, 'hv-2')
+
+        # Servers of other strategies than 'resiliency_server' can't be
+        # loaded by the ORM here.
+        with db_api.transaction():
+            query = db_base.model_query(models.ResiliencyServer).filter_by(
+                id=vm1.id
+            )
+
+            sa_api._record_bulk_events(query, 'update')
+
+            query.update({'hypervisor_id': 'hv-3'}, synchronize_session=False)
+
+        plan = index.plan(['hv-2'], hypervisors=['hv-3', 'hv-4'])
+
+        self.assertFalse(index._stale)
+        self.assertEqual(set([vm1.id, vm2.id]), index.members[sg.id])
+
+        # The pair rule knows vm-1 moved to hv-3.
+        self.assertEqual({vm2.id: 'hv-4'}, plan.targets())
+
+        with db_api.transaction():
+            db_api.delete_resiliency_servers(id=vm1.id)
+
+        plan = index.plan(['hv-2'], hypervisors=['hv-3'])
+
+        self.assertEqual({vm2.id: 'hv-3'}, plan.targets())
+        self.assertNotIn(vm1.id, index.servers)
+
+    def test_reloads_when_changes_are_purged(self):
+        index = recovery.TopologyIndex(events.TopologyFeed())
+
+        with db_api.transaction():
+            sg = db_api.create_resiliency_server_group(
+                {'name': 'sg', 'resiliency_strategy_type': 'ufr'}
+            )
+
+        index.load()
+
+        vm1 = self._create('vm-1', sg.id, 'hv-1')
+        vm2 = self._create('vm-2', sg.id, 'hv-1')
+
+        events._sequence()
+
+        # Only the last event is left.
+        db_base.get_engine().execute(
+            'DELETE FROM change_event WHERE seq < (SELECT MAX(seq) FROM '
+            'change_event)'
+        )
+
+        with mock.patch.object(index, 'load', wraps=index.load) as load:
+            index.plan([])
+
+        self.assertEqual(1, load.call_count)
+        self.assertEqual(set([vm1.id, vm2.id]), set(index.servers))
+
+    def test_recovery_of_servers_of_all_projects(self):
+        with db_api.transaction():
+            sg = db_api.create_resiliency_server_group(
+                {'name': 'sg', 'resiliency_strategy_type': 'ufr'}
+            )
+
+        vm1 = self._create('vm-1', sg.id, 'hv-1')
+
+        auth_context.set_ctx(auth_context.HighlanderContext(
+            user_id='1-2-3-4',
+            project_id='<another-project>',
+            is_admin=False
+        ))
+
+        vm2 = self._create('vm-2', sg.id, 'hv-1')
+
+        auth_context.set_ctx(self.ctx)
+
+        self.index.load()
+
+        with mock.patch.object(recovery, '_INDEX', self.index):
+            result = default_engine.DefaultEngine(None).recover_hypervisors(
+                ['hv-1'],
+                hypervisors=['hv-2', 'hv-3']
+            )
+
+        targets = dict(
+            (p['server_id'], p['hypervisor_id'])
+            for p in result['placements']
+        )
+
+        self.assertEqual(set([vm1.id, vm2.id]), set(targets))
+        self.assertEqual([], result['missing'])
+
+        model = models.ResiliencyServer
+
+        with db_api.transaction():
+            self.assertEqual(
+                targets,
+                dict(
+                    db_base.model_query(model).with_entities(
+                        model.id,
+                        model.target_recovery_hypervisor_id
+                    )
+                )
+            )
+
+        # Deleted servers are reported as not updated.
+        with db_api.transaction():
+            self.assertEqual(
+                set([vm2.id]),
+                db_api.update_resiliency_server_recovery_targets(
+                    {vm2.id: 'hv-4', 'deleted': 'hv-4'}
+                )
+            )
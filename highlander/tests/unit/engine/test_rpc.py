@@ -0,0 +1,211 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import threading
+
+import eventlet
+import mock
+from oslo.config import cfg
+from oslo import messaging
+from six.moves import queue
+
+from highlander.db.v1 import api as db_api
+from highlander.engine import default_engine
+from highlander.engine import rpc
+from highlander import exceptions as exc
+from highlander.tests import base
+
+
+def _change(rg_id, stack_id):
+    return {
+        'type': 'resiliency_group',
+        'id': rg_id,
+        'values': {'stack_id': stack_id}
+    }
+
+
+class _Engine(default_engine.DefaultEngine):
+    def __init__(self):
+        super(_Engine, self).__init__(None)
+
+        self.processed = queue.Queue()
+
+    def update_states(self, changes):
+        try:
+            return super(_Engine, self).update_states(changes)
+        finally:
+            self.processed.put(changes)
+
+
+class EngineRpcTest(base.DbTestCase):
+    def setUp(self):
+        super(EngineRpcTest, self).setUp()
+
+        transport = messaging.get_transport(cfg.CONF, 'fake:/')
+
+        self.engine = _Engine()
+
+        # The blocking executor runs the server in its own thread, tests
+        # aren't monkey patched by eventlet.
+        server = rpc.get_engine_server(
+            transport,
+            self.engine,
+            executor='blocking'
+        )
+
+        thread = threading.Thread(target=server.start)
+        thread.daemon = True
+        thread.start()
+
+        self.addCleanup(self._stop_server, server, thread)
+
+        self.client = rpc.EngineClient(transport)
+        self.cast = mock.Mock(wraps=self.client._client.cast)
+        self.client._client.cast = self.cast
+
+        with db_api.transaction():
+            self.rg1 = db_api.create_resiliency_group(
+                {'name': 'rg1', 'resiliency_strategy_type': 'ufr'}
+            )
+            self.rg2 = db_api.create_resiliency_group(
+                {'name': 'rg2', 'resiliency_strategy_type': 'ufr'}
+            )
+
+    @staticmethod
+    def _stop_server(server, thread):
+        # stop() is a no-op until the thread has started polling.
+        while thread.is_alive():
+            server.stop()
+            thread.join(0.1)
+
+    def _stack_id(self, rg_id):
+        with db_api.transaction():
+            return db_api.get_resiliency_group(rg_id).stack_id
+
+    def test_update_states(self):
+        updated = self.client.update_states([
+            _change(self.rg1.id, 'stack-1'),
+            _change(self.rg1.id, 'stack-2'),
+            _change('missing', 'stack-3')
+        ])
+
+        self.assertEqual(1, updated)
+        self.assertEqual('stack-2', self._stack_id(self.rg1.id))
+
+    def test_unknown_resource_type(self):
+        self.assertRaises(
+            exc.EngineException,
+            self.client.notify_state_change,
+            'workflow',
+            self.rg1.id,
+            {}
+        )
+
+    def test_notifications_are_coalesced(self):
+        for i in range(5):
+            self.client.notify_state_change(
+                'resiliency_group',
+                self.rg1.id,
+                {'stack_id': 'stack-%s' % i}
+            )
+
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg2.id,
+            {'stack_id': 'other'}
+        )
+
+        self.client.flush()
+
+        self.assertEqual(1, self.cast.call_count)
+        self.assertEqual(2, len(self.cast.call_args[1]['changes']))
+
+        # The in-memory database must not be used by both threads at once.
+        self.engine.processed.get(timeout=5)
+
+        self.assertEqual('stack-4', self._stack_id(self.rg1.id))
+        self.assertEqual('other', self._stack_id(self.rg2.id))
+
+    def test_batch_size_triggers_send(self):
+        cfg.CONF.set_override('batch_size', 2, group='engine')
+        self.addCleanup(cfg.CONF.clear_override, 'batch_size', 'engine')
+
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg1.id,
+            {'stack_id': 'stack-1'}
+        )
+
+        self.assertEqual(0, self.cast.call_count)
+
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg2.id,
+            {'stack_id': 'stack-2'}
+        )
+
+        self.assertEqual(1, self.cast.call_count)
+        self.assertEqual(2, len(self.engine.processed.get(timeout=5)))
+
+    def test_changes_failing_to_be_sent_are_kept(self):
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg1.id,
+            {'stack_id': 'stack-1'}
+        )
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg2.id,
+            {'stack_id': 'other'}
+        )
+
+        self.cast.side_effect = messaging.MessagingTimeout()
+
+        self.assertRaises(messaging.MessagingTimeout, self.client.flush)
+
+        self.cast.side_effect = None
+
+        # A newer change of the same object is merged with the unsent one.
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg1.id,
+            {'stack_id': 'stack-2'}
+        )
+
+        self.client.flush()
+
+        self.assertEqual(2, self.cast.call_count)
+        self.assertEqual(2, len(self.cast.call_args[1]['changes']))
+
+        self.engine.processed.get(timeout=5)
+
+        self.assertEqual('stack-2', self._stack_id(self.rg1.id))
+        self.assertEqual('other', self._stack_id(self.rg2.id))
+
+    def test_buffered_changes_are_sent_after_interval(self):
+        self.client.notify_state_change(
+            'resiliency_group',
+            self.rg1.id,
+            {'stack_id': 'stack-1'}
+        )
+
+        self.assertEqual(0, self.cast.call_count)
+
+        eventlet.sleep(cfg.CONF.engine.batch_interval * 2)
+
+        self.assertEqual(1, self.cast.call_count)
+
+        self.engine.processed.get(timeout=5)
+
+        self.assertEqual('stack-1', self._stack_id(self.rg1.id))
@@ -0,0 +1,205 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import eventlet
+from oslo.config import cfg
+
+from highlander.db.sqlalchemy import base as db_sa_base
+from highlander.db.v1 import api as db_api
+from highlander.health import monitor
+from highlander.health import probes
+from highlander.tests import base
+
+
+class _CountingProbe(probes.FakeProbe):
+    def __init__(self, *args, **kwargs):
+        super(_CountingProbe, self).__init__(*args, **kwargs)
+
+        self.running = 0
+        self.peak = 0
+
+    def check(self, server):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+
+        try:
+            return super(_CountingProbe, self).check(server)
+        finally:
+            self.running -= 1
+
+
+class HealthMonitorTest(base.DbTestCase):
+    def setUp(self):
+        super(HealthMonitorTest, self).setUp()
+
+        self._override(interval=0.05, degraded_interval=0.01,
+                       batch_interval=0.05)
+
+    def _override(self, **opts):
+        for name, value in opts.items():
+            cfg.CONF.set_override(name, value, group='health')
+            self.addCleanup(cfg.CONF.clear_override, name, 'health')
+
+    def _create(self, name, instance_id='instance'):
+        with db_api.transaction():
+            return db_api.create_resiliency_server({
+                'name': name,
+                'resiliency_strategy_type': 'ufr',
+                'instance_id': instance_id
+            }).id
+
+    def _stored_states(self):
+        rows = db_sa_base.get_engine().execute(
+            'SELECT id, health_state FROM resiliency_server'
+        )
+
+        return dict((id, state) for id, state in rows if state)
+
+    def _run(self, health_monitor, seconds):
+        health_monitor.start()
+
+        try:
+            eventlet.sleep(seconds)
+        finally:
+            health_monitor.stop()
+
+    def test_state_changes_are_stored(self):
+        ok = self._create('ok')
+        failed = self._create('failed')
+        broken = self._create('broken')
+
+        self._create('not-provisioned', instance_id=None)
+
+        probe = probes.FakeProbe({
+            failed: probes.FAILED,
+            broken: RuntimeError('Nova is down')
+        })
+
+        self._run(monitor.HealthMonitor(probe), 0.2)
+
+        self.assertEqual(
+            {
+                ok: probes.HEALTHY,
+                failed: probes.FAILED,
+                broken: probes.UNKNOWN
+            },
+            self._stored_states()
+        )
+
+    def test_degraded_servers_are_checked_more_often(self):
+        self._override(interval=10)
+
+        failed = self._create('failed')
+
+        probe = probes.FakeProbe({failed: probes.FAILED})
+        health_monitor = monitor.HealthMonitor(probe)
+
+        health_monitor.load()
+
+        # The first check of all servers is due within the interval.
+        health_monitor._heap = [(0, e[1], e[2]) for e in health_monitor._heap]
+
+        self._run(health_monitor, 0.2)
+
+        self.assertGreater(probe.checks[failed], 5)
+
+        probe.states.clear()
+
+        self._run(health_monitor, 0.2)
+
+        self.assertEqual(probes.HEALTHY, health_monitor.get_state(failed))
+
+        checks = probe.checks[failed]
+
+        self._run(health_monitor, 0.2)
+
+        self.assertEqual(checks, probe.checks[failed])
+
+    def test_concurrency_and_timeout(self):
+        self._override(concurrency=3, probe_timeout=0.02)
+
+        ids = [self._create('vm-%s' % i) for i in range(10)]
+
+        probe = _CountingProbe(delay=0.05)
+
+        self._run(monitor.HealthMonitor(probe), 0.3)
+
+        self.assertEqual(3, probe.peak)
+        self.assertEqual(
+            dict((id, probes.UNKNOWN) for id in ids),
+            self._stored_states()
+        )
+
+    def test_follows_db_changes(self):
+        health_monitor = monitor.HealthMonitor(probes.FakeProbe())
+
+        health_monitor.start()
+        self.addCleanup(health_monitor.stop)
+
+        id = self._create('vm')
+
+        self.assertEqual(1, len(health_monitor))
+
+        with db_api.transaction():
+            db_api.delete_resiliency_servers(id=id)
+
+        # Bulk deletes make it read all servers again.
+        eventlet.sleep(0.05)
+
+        self.assertEqual(0, len(health_monitor))
+
+    def test_follows_changes_of_other_processes(self):
+        self._override(changes_interval=0.01)
+
+        health_monitor = monitor.HealthMonitor(probes.FakeProbe())
+
+        health_monitor.start()
+        self.addCleanup(health_monitor.stop)
+
+        # Not watching the commits, as if the changes were made by an API
+        # server.
+        db_api.unwatch_resiliency_topology(health_monitor._on_changes)
+        self.addCleanup(
+            db_api.watch_resiliency_topology,
+            health_monitor._on_changes
+        )
+
+        id = self._create('vm')
+
+        eventlet.sleep(0.05)
+
+        self.assertEqual(1, len(health_monitor))
+
+        with db_api.transaction():
+            db_api.delete_resiliency_servers(id=id)
+
+        eventlet.sleep(0.05)
+
+        self.assertEqual(0, len(health_monitor))
+
+    def test_scheduling_cost_does_not_grow_with_fleet(self):
+        health_monitor = monitor.HealthMonitor(probes.FakeProbe())
+
+        for i in range(20000):
+            health_monitor.add({
+                'id': 'vm-%s' % i,
+                'instance_id': 'instance-%s' % i,
+                'hypervisor_id': 'hv'
+            })
+
+        # Nothing is due yet, only the head of the heap is looked at.
+        health_monitor._timer = lambda: 0
+
+        self.assertEqual(0, health_monitor.run_due())
+        self.assertEqual(20000, len(health_monitor._heap))
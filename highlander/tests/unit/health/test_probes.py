@@ -0,0 +1,49 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+
+from highlander.health import probes
+from highlander.tests import base
+
+
+class SSHProbeTest(base.BaseTest):
+    def _check(self, server, ret_code=0, stdout='running\n'):
+        with mock.patch.object(
+            probes.ssh_utils,
+            'execute_command',
+            return_value=(ret_code, stdout)
+        ) as execute:
+            state = probes.SSHProbe().check(server)
+
+        return state, execute.call_args[0][0]
+
+    def test_values_are_quoted(self):
+        state, command = self._check({
+            'id': '1',
+            'instance_id': 'x;reboot',
+            'hypervisor_id': 'host-1'
+        })
+
+        self.assertEqual(probes.HEALTHY, state)
+        self.assertEqual("virsh domstate 'x;reboot'", command)
+
+    def test_unknown_instance(self):
+        state, _ = self._check(
+            {'id': '1', 'instance_id': 'i-1', 'hypervisor_id': 'host-1'},
+            ret_code=1,
+            stdout=''
+        )
+
+        self.assertEqual(probes.FAILED, state)
@@ -0,0 +1,53 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from oslo.config import cfg
+
+from highlander.tests import base
+from highlander.tests.perf import benchmarks
+from highlander.tests.perf import fleet as fleet_gen
+from highlander.tests.perf import runner
+
+
+class BenchmarksTest(base.DbTestCase):
+    def test_benchmarks_run(self):
+        cfg.CONF.set_override('auth_enable', False, group='pecan')
+        self.addCleanup(cfg.CONF.clear_override, 'auth_enable', 'pecan')
+
+        fleet = fleet_gen.generate(1, 2, 2)
+
+        self.assertEqual(4, len(fleet.servers))
+        self.assertEqual(4 * fleet_gen.DISKS_PER_SERVER, len(fleet.disks))
+
+        results = runner.run(benchmarks.Suite(fleet, self.ctx), 2, 1)
+
+        self.assertEqual(len(benchmarks.BENCHMARKS), len(results))
+
+    def test_compare(self):
+        results = {
+            'a': runner.summarize([0.010, 0.012, 0.011]),
+            'b': runner.summarize([0.020, 0.020, 0.030]),
+            'new': runner.summarize([0.001])
+        }
+        baseline = {
+            'a': runner.summarize([0.010]),
+            'b': runner.summarize([0.010])
+        }
+
+        self.assertEqual(11.0, results['a']['median_ms'])
+
+        ratios, regressions = runner.compare(results, baseline, 0.25)
+
+        self.assertEqual(['a', 'b'], sorted(ratios))
+        self.assertEqual(['b'], regressions)
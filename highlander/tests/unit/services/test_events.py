@@ -0,0 +1,87 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+import eventlet
+from oslo.config import cfg
+from oslo import messaging
+from oslo_messaging.notify import _impl_test
+
+from highlander.db.v1 import api as db_api
+from highlander.services import events
+from highlander.tests import base
+
+
+class EventsTest(base.DbTestCase):
+    def _create(self, name):
+        with db_api.transaction():
+            return db_api.create_resiliency_group({
+                'name': name,
+                'resiliency_strategy_type': 'ufr'
+            }).id
+
+    def test_dispatcher_sends_notifications(self):
+        transport = messaging.get_transport(cfg.CONF, 'fake:/')
+
+        dispatcher = events.EventDispatcher(transport)
+        dispatcher._notifier = messaging.Notifier(
+            transport,
+            publisher_id=events.PUBLISHER_ID,
+            driver='test'
+        )
+
+        _impl_test.reset()
+        self.addCleanup(_impl_test.reset)
+
+        id = self._create('rg')
+
+        self.assertEqual(1, dispatcher.dispatch())
+        self.assertEqual(0, dispatcher.dispatch())
+
+        self.assertEqual(1, len(_impl_test.NOTIFICATIONS))
+
+        _, message, priority, _ = _impl_test.NOTIFICATIONS[0]
+
+        self.assertEqual('INFO', priority)
+        self.assertEqual('highlander.events', message['publisher_id'])
+        self.assertEqual(
+            'highlander.resiliency_group.create',
+            message['event_type']
+        )
+        self.assertEqual(id, message['payload']['entity_id'])
+
+    def test_long_poll_returns_new_events(self):
+        cfg.CONF.set_override('poll_interval', 0.01, group='events')
+        self.addCleanup(cfg.CONF.clear_override, 'poll_interval', 'events')
+
+        with db_api.transaction():
+            self.assertEqual([], db_api.get_change_events())
+
+        self.assertEqual([], events.get_events_v1(timeout=0))
+
+        def _create_and_sequence():
+            self._create('rg')
+
+            with db_api.transaction():
+                db_api.sequence_change_events()
+
+        eventlet.spawn_after(0.05, _create_and_sequence)
+
+        started = time.time()
+
+        found = events.get_events_v1(timeout=5)
+
+        self.assertEqual(1, len(found))
+        self.assertLess(time.time() - started, 1)
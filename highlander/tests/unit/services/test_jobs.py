@@ -0,0 +1,198 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+import eventlet
+import mock
+from oslo.config import cfg
+from oslo.utils import timeutils
+
+from highlander.db.v1 import api as db_api
+from highlander import exceptions as exc
+from highlander.services import jobs
+from highlander.tests import base
+
+
+class JobsTest(base.DbTestCase):
+    def setUp(self):
+        super(JobsTest, self).setUp()
+
+        # Every test starts workers of its own.
+        patcher = mock.patch.object(jobs, '_queue', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _override(self, name, value):
+        cfg.CONF.set_override(name, value, group='jobs')
+        self.addCleanup(cfg.CONF.clear_override, name, group='jobs')
+
+    def _wait(self, job_id):
+        for _ in range(100):
+            job = jobs.get_job(job_id)
+
+            if job.state in (jobs.SUCCESS, jobs.ERROR):
+                return job
+
+            eventlet.sleep(0.01)
+
+        self.fail("Job is still %s" % job.state)
+
+    def _ago(self, seconds):
+        return timeutils.utcnow() - datetime.timedelta(seconds=seconds)
+
+    def _create_group(self):
+        with db_api.transaction():
+            rg = db_api.create_resiliency_group({
+                'name': 'rg',
+                'resiliency_strategy_type': 'ufr'
+            })
+            db_api.create_resiliency_server_group({
+                'name': 'sg',
+                'resiliency_strategy_type': 'ufr',
+                'resiliency_group_id': rg.id
+            })
+
+        return rg.id
+
+    def test_job_runs_in_background(self):
+        rg_id = self._create_group()
+
+        job = jobs.submit('delete_resiliency_group', {'id': rg_id})
+
+        self.assertEqual(jobs.PENDING, job.state)
+
+        job = self._wait(job.id)
+
+        self.assertEqual(jobs.SUCCESS, job.state)
+        self.assertEqual(
+            {'resiliency_group': 1, 'resiliency_server_group': 1},
+            dict((k, v) for k, v in job.result['deleted'].items() if v)
+        )
+        self.assertIsNotNone(job.started_at)
+        self.assertIsNotNone(job.finished_at)
+
+        with db_api.transaction():
+            self.assertEqual([], db_api.get_resiliency_groups())
+
+    def test_failed_job(self):
+        job = self._wait(
+            jobs.submit('delete_resiliency_group', {'id': 'nope'}).id
+        )
+
+        self.assertEqual(jobs.ERROR, job.state)
+        self.assertIn('nope', job.error)
+        self.assertIsNone(job.result)
+
+    def test_jobs_over_max_pending_are_rejected(self):
+        self._override('workers', 0)
+        self._override('max_pending', 1)
+
+        job = jobs.submit('delete_resiliency_group', {'id': 'nope'})
+
+        self.assertRaises(
+            exc.JobQueueFullException,
+            jobs.submit,
+            'delete_resiliency_group',
+            {'id': 'nope'}
+        )
+
+        self.assertEqual([job.id], [j.id for j in jobs.list_jobs()])
+
+    def test_unknown_type(self):
+        self.assertRaises(exc.InputException, jobs.submit, 'foo', {})
+
+    def test_jobs_of_stopped_processes_expire(self):
+        with db_api.transaction():
+            lost = db_api.create_async_job({
+                'type': 'delete_resiliency_group',
+                'state': jobs.RUNNING,
+                'owner': 'host-1:1',
+                'heartbeat_at': self._ago(120)
+            }).id
+            alive = db_api.create_async_job({
+                'type': 'delete_resiliency_group',
+                'state': jobs.PENDING,
+                'owner': 'host-2:1',
+                'heartbeat_at': self._ago(5)
+            }).id
+            done = db_api.create_async_job({
+                'type': 'delete_resiliency_group',
+                'state': jobs.SUCCESS,
+                'owner': 'host-1:1',
+                'heartbeat_at': self._ago(120)
+            }).id
+
+        self.assertEqual(1, jobs.expire())
+
+        self.assertEqual(jobs.ERROR, jobs.get_job(lost).state)
+        self.assertIsNotNone(jobs.get_job(lost).finished_at)
+        self.assertEqual(jobs.PENDING, jobs.get_job(alive).state)
+        self.assertEqual(jobs.SUCCESS, jobs.get_job(done).state)
+
+    def test_provisioning_job_fails_with_expired_job(self):
+        with db_api.transaction():
+            job_id = db_api.create_async_job({
+                'type': 'provision_resiliency_group',
+                'state': jobs.RUNNING,
+                'owner': 'host-1:1',
+                'heartbeat_at': self._ago(120)
+            }).id
+            db_api.create_provisioning_job({
+                'id': job_id,
+                'spec': {},
+                'state': jobs.RUNNING
+            })
+
+        self.assertEqual(1, jobs.expire())
+
+        with db_api.transaction():
+            job = db_api.get_provisioning_job(job_id)
+
+            self.assertEqual(jobs.ERROR, job.state)
+
+    def test_expired_job_is_not_run(self):
+        self._override('workers', 0)
+
+        job = jobs.submit('delete_resiliency_group', {'id': 'nope'})
+
+        with db_api.transaction():
+            db_api.update_async_job(job.id, {'heartbeat_at': self._ago(120)})
+
+        self.assertEqual(1, jobs.expire())
+
+        job = jobs.run(job.id)
+
+        self.assertEqual(jobs.ERROR, job.state)
+        self.assertIsNone(job.started_at)
+
+    def test_heartbeats_of_queued_jobs(self):
+        self._override('workers', 0)
+        self._override('heartbeat_interval', 0)
+
+        job = jobs.submit('delete_resiliency_group', {'id': 'nope'})
+
+        self.assertIsNotNone(job.owner)
+
+        past = self._ago(30)
+
+        with db_api.transaction():
+            db_api.update_async_job(job.id, {'heartbeat_at': past})
+
+        eventlet.sleep(0.01)
+
+        job = jobs.get_job(job.id)
+
+        self.assertEqual(jobs.PENDING, job.state)
+        self.assertTrue(job.heartbeat_at > past)
@@ -0,0 +1,213 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import eventlet
+import mock
+from oslo.config import cfg
+
+from highlander.db.v1 import api as db_api
+from highlander.services import security
+from highlander.tests import base
+from highlander.utils.openstack import keystone
+
+
+class FakeTrusts(object):
+    def __init__(self, keystone):
+        self._keystone = keystone
+
+    def create(self, trustor_user, trustee_user, impersonation, role_names,
+               project):
+        self._keystone.created += 1
+
+        trust = mock.Mock(id='trust-%s' % self._keystone.created)
+
+        self._keystone.trusts[trust.id] = (trustor_user, trustee_user)
+
+        return trust
+
+    def delete(self, trust_id):
+        del self._keystone.trusts[trust_id]
+
+
+class FakeKeystone(object):
+    """In memory keystone counting the clients it hands out."""
+
+    def __init__(self):
+        self.trusts = {}
+        self.created = 0
+        self.admin_clients = 0
+
+    def client(self):
+        return mock.Mock(user_id='user', trusts=FakeTrusts(self))
+
+    def client_for_admin(self, project_name):
+        self.admin_clients += 1
+
+        return mock.Mock(user_id='highlander')
+
+    def client_for_trusts(self, trust_id):
+        return mock.Mock(trusts=FakeTrusts(self))
+
+
+class TrustManagerTest(base.DbTestCase):
+    def setUp(self):
+        super(TrustManagerTest, self).setUp()
+
+        cfg.CONF.set_override('auth_enable', True, group='pecan')
+        self.addCleanup(cfg.CONF.clear_override, 'auth_enable', group='pecan')
+
+        self.ctx.user_id = 'user'
+        self.ctx.roles = ['admin', 'member']
+
+        self.keystone = FakeKeystone()
+
+        for name in ('client', 'client_for_admin', 'client_for_trusts'):
+            patcher = mock.patch.object(
+                keystone,
+                name,
+                getattr(self.keystone, name)
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(security, '_trustee_id', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.manager = security.TrustManager()
+
+        patcher = mock.patch.object(security, '_trust_manager', self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _secure_object(self):
+        values = {}
+
+        security.add_trust_id(values)
+
+        return mock.Mock(trust_id=values['trust_id'])
+
+    def test_trust_is_shared(self):
+        objects = [self._secure_object() for _ in range(3)]
+
+        self.assertEqual(set(['trust-1']), set(o.trust_id for o in objects))
+        self.assertEqual(1, self.keystone.created)
+        self.assertEqual(1, self.keystone.admin_clients)
+
+    def test_trust_per_roles(self):
+        obj1 = self._secure_object()
+
+        self.ctx.roles = ['member']
+
+        obj2 = self._secure_object()
+
+        self.assertNotEqual(obj1.trust_id, obj2.trust_id)
+        self.assertEqual(1, self.keystone.admin_clients)
+
+    def test_unused_trust_is_deleted(self):
+        obj1 = self._secure_object()
+        obj2 = self._secure_object()
+
+        security.delete_trust(obj1)
+        self.manager.flush()
+
+        self.assertIn(obj1.trust_id, self.keystone.trusts)
+
+        security.delete_trust(obj2)
+        self.manager.flush()
+
+        self.assertEqual({}, self.keystone.trusts)
+
+        # A new object gets a new trust.
+        self.assertEqual('trust-2', self._secure_object().trust_id)
+
+    def test_trusts_are_deleted_in_background(self):
+        cfg.CONF.set_override('delete_interval', 0, group='trusts')
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'delete_interval',
+            group='trusts'
+        )
+
+        security.delete_trust(self._secure_object())
+
+        # Let the deleting green thread run.
+        for _ in range(100):
+            if not self.keystone.trusts:
+                break
+
+            eventlet.sleep(0.01)
+
+        self.assertEqual({}, self.keystone.trusts)
+
+    def test_concurrently_created_trust_is_used(self):
+        existing = self._secure_object().trust_id
+
+        acquire_trust = db_api.acquire_trust
+        calls = []
+
+        def _acquire_trust(scope_key):
+            # The first lookup misses the trust of a concurrent request.
+            calls.append(scope_key)
+
+            return acquire_trust(scope_key) if len(calls) > 1 else None
+
+        with mock.patch.object(db_api, 'acquire_trust', _acquire_trust):
+            with db_api.transaction():
+                rg = db_api.create_resiliency_group(
+                    {'name': 'rg', 'resiliency_strategy_type': 'ufr'}
+                )
+
+                values = {}
+
+                security.add_trust_id(values)
+
+        self.assertEqual(existing, values['trust_id'])
+        self.assertEqual(2, len(calls))
+
+        # The transaction survived the failed insert.
+        self.assertEqual(rg.id, db_api.get_resiliency_group(rg.id).id)
+
+        self.manager.flush()
+
+        self.assertEqual([existing], list(self.keystone.trusts))
+
+    def test_trust_is_deleted_after_commit(self):
+        obj = self._secure_object()
+
+        with db_api.transaction():
+            security.delete_trust(obj)
+
+            self.manager.flush()
+
+            self.assertIn(obj.trust_id, self.keystone.trusts)
+
+        self.manager.flush()
+
+        self.assertEqual({}, self.keystone.trusts)
+
+    def test_trust_is_kept_on_rollback(self):
+        obj = self._secure_object()
+
+        with db_api.transaction():
+            security.delete_trust(obj)
+
+            db_api.rollback_tx()
+
+        self.manager.flush()
+
+        self.assertIn(obj.trust_id, self.keystone.trusts)
+
+        # The reference wasn't dropped either.
+        self.assertEqual(obj.trust_id, self._secure_object().trust_id)
@@ -0,0 +1,225 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+import eventlet
+
+from highlander.db.sqlalchemy import base as db_sa_base
+from highlander.db.v1 import api as db_api
+from highlander import exceptions as exc
+from highlander.taskflows import resiliency_group as rg_flow
+from highlander.tasks import resiliency as tasks
+from highlander.tests import base
+
+
+def _spec(pairs):
+    return {
+        'name': 'rg',
+        'resiliency_strategy_type': 'ufr',
+        'server_groups': [
+            {
+                'name': 'pair-%s' % i,
+                'servers': [
+                    {
+                        'name': 'vm-%s-%s' % (i, j),
+                        'disks': [{'name': 'disk', 'disk_size': '10'}],
+                        'nics': [{'name': 'nic-%s-%s' % (i, j)}]
+                    }
+                    for j in range(2)
+                ],
+                'disk_logicals': [{'name': 'ldisk', 'disk_size': '10'}],
+                'nic_logicals': [{'name': 'lnic'}]
+            }
+            for i in range(pairs)
+        ]
+    }
+
+
+class _Driver(tasks.NoopDriver):
+    def __init__(self, delay=0, fail_on=None, failures=0):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.failures = failures
+        self.servers = []
+        self.deleted = []
+        self.running = 0
+        self.max_running = 0
+
+    def create_server(self, values):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+        try:
+            eventlet.sleep(self.delay)
+        finally:
+            self.running -= 1
+
+        if self.failures:
+            self.failures -= 1
+
+            raise RuntimeError('Nova is busy')
+
+        self.servers.append(values['name'])
+
+        return 'instance-%s' % values['name']
+
+    def delete_server(self, resource_id):
+        self.deleted.append(resource_id)
+
+    def create_nic(self, values):
+        if values['name'] == self.fail_on:
+            raise RuntimeError('Port quota exceeded')
+
+
+class ResiliencyGroupFlowTest(base.DbTestCase):
+    def _count(self, table):
+        return db_sa_base.get_engine().execute(
+            'SELECT COUNT(*) FROM %s' % table
+        ).scalar()
+
+    def _counts(self):
+        return [
+            self._count(t) for t in (
+                'resiliency_group',
+                'resiliency_server_group',
+                'resiliency_server',
+                'resiliency_disk',
+                'resiliency_nic',
+                'resiliency_disk_logical',
+                'resiliency_nic_logical'
+            )
+        ]
+
+    def _job(self, job_id):
+        with db_api.transaction():
+            return db_api.get_provisioning_job(job_id)
+
+    def test_provision(self):
+        job_id = rg_flow.provision(_spec(2), _Driver())
+
+        job = self._job(job_id)
+
+        self.assertEqual(rg_flow.SUCCESS, job.state)
+        self.assertEqual([1, 2, 4, 4, 4, 2, 2], self._counts())
+
+        with db_api.transaction():
+            rg = db_api.get_resiliency_group(job.resiliency_group_id)
+
+            self.assertEqual(
+                ['pair-0', 'pair-1'],
+                sorted(sg.name for sg in rg.resiliency_server_groups)
+            )
+
+    def test_pairs_are_created_concurrently(self):
+        driver = _Driver(delay=0.2)
+
+        start = time.time()
+
+        rg_flow.provision(_spec(8), driver)
+
+        # 16 servers one after another would take 3.2 seconds.
+        self.assertLess(time.time() - start, 1.5)
+        self.assertEqual(16, len(driver.servers))
+
+    def test_failure_reverts_created_objects(self):
+        driver = _Driver(fail_on='nic-1-1')
+
+        self.assertRaises(
+            RuntimeError,
+            rg_flow.provision,
+            _spec(2),
+            driver
+        )
+
+        self.assertEqual([0] * 7, self._counts())
+        self.assertEqual(
+            sorted('instance-%s' % s for s in driver.servers),
+            sorted(driver.deleted)
+        )
+        self.assertEqual(0, self._count('provisioning_step'))
+
+    def test_resume_skips_finished_steps(self):
+        spec = _spec(2)
+        driver = _Driver()
+
+        with db_api.transaction():
+            job = db_api.create_provisioning_job(
+                {'spec': spec, 'state': rg_flow.RUNNING}
+            )
+
+        # The process died after the group, one pair and one of its
+        # servers were created.
+        rg = tasks.CreateResiliencyGroup(
+            'resiliency_group',
+            rg_flow._values(spec),
+            driver
+        ).execute(self.ctx, job.id)
+        sg = tasks.CreateResiliencyServerGroup(
+            'server_group:0',
+            rg_flow._values(
+                spec['server_groups'][0],
+                resiliency_strategy_type='ufr'
+            ),
+            driver
+        ).execute(self.ctx, job.id, rg)
+        tasks.CreateResiliencyServer(
+            'server_group:0:server:0',
+            rg_flow._values(
+                spec['server_groups'][0]['servers'][0],
+                resiliency_strategy_type='ufr'
+            ),
+            driver
+        ).execute(self.ctx, job.id, sg)
+
+        rg_flow.resume(job.id, driver)
+
+        self.assertEqual(rg_flow.SUCCESS, self._job(job.id).state)
+        self.assertEqual([1, 2, 4, 4, 4, 2, 2], self._counts())
+        self.assertEqual(4, len(driver.servers))
+
+    def test_failed_driver_calls_are_retried(self):
+        spec = _spec(1)
+        spec['policies'] = {'retry': {'count': 3, 'delay': 0}}
+
+        driver = _Driver(failures=3)
+
+        job_id = rg_flow.provision(spec, driver)
+
+        self.assertEqual(rg_flow.SUCCESS, self._job(job_id).state)
+        self.assertEqual(2, len(driver.servers))
+
+    def test_concurrency_of_driver_calls(self):
+        spec = _spec(4)
+        spec['policies'] = {'concurrency': 2}
+
+        driver = _Driver(delay=0.05)
+
+        rg_flow.provision(spec, driver)
+
+        self.assertEqual(8, len(driver.servers))
+        self.assertEqual(2, driver.max_running)
+
+    def test_pause_before_is_rejected(self):
+        spec = _spec(1)
+        spec['policies'] = {'pause-before': True}
+
+        self.assertRaises(
+            exc.InvalidModelException,
+            rg_flow.provision,
+            spec,
+            _Driver()
+        )
+
+        self.assertEqual(0, self._count('provisioning_job'))
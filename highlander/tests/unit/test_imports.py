@@ -0,0 +1,81 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import json
+import subprocess
+import sys
+
+from highlander.tests import base
+
+# Modules the API and the launcher load on first use only.
+LAZY_MODULES = [
+    'keystoneclient',
+    'keystonemiddleware',
+    'novaclient',
+    'oslo.messaging',
+    'paramiko',
+    'taskflow',
+    'yaql'
+]
+
+# Seconds, several times the time it takes on a developer laptop.
+IMPORT_BUDGET = 3.0
+
+_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.time()
+import %s
+elapsed = time.time() - start
+
+print(json.dumps({
+    'elapsed': elapsed,
+    'modules': sorted(m for m, module in sys.modules.items() if module)
+}))
+"""
+
+
+def _import(module):
+    # A fresh interpreter, the test runner imported everything already.
+    output = subprocess.check_output(
+        [sys.executable, '-c', _SCRIPT % module]
+    )
+
+    return json.loads(output.splitlines()[-1])
+
+
+class ImportTimeTest(base.BaseTest):
+    def _check(self, module):
+        result = _import(module)
+
+        self.assertEqual(
+            [],
+            [m for m in LAZY_MODULES if m in result['modules']]
+        )
+        self.assertLess(result['elapsed'], IMPORT_BUDGET)
+
+    def test_api_app(self):
+        self._check('highlander.api.app')
+
+    def test_launch(self):
+        self._check('highlander.cmd.launch')
+
+    def test_health_probes(self):
+        # Needed by the Nova probe only.
+        self.assertNotIn(
+            'keystonemiddleware',
+            _import('highlander.health.probes')['modules']
+        )
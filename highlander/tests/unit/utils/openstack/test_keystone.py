@@ -0,0 +1,109 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+import mock
+from oslo.utils import timeutils
+
+from highlander import context as auth_context
+from highlander.tests import base
+from highlander.utils.openstack import keystone
+
+
+def _fake_client(expires_in=3600):
+    cl = mock.MagicMock()
+    cl.auth_ref.expires = (
+        timeutils.utcnow() + datetime.timedelta(seconds=expires_in)
+    )
+
+    return cl
+
+
+class KeystoneCacheTest(base.BaseTest):
+    def setUp(self):
+        super(KeystoneCacheTest, self).setUp()
+
+        keystone.clear_cache()
+        self.addCleanup(keystone.clear_cache)
+
+        patcher = mock.patch.object(keystone.ks_client, 'Client')
+        self.ks_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.ks_client.side_effect = lambda **kw: _fake_client()
+
+    def test_trust_client_is_reused(self):
+        cl = keystone.client_for_trusts('trust-1')
+
+        self.assertIs(cl, keystone.client_for_trusts('trust-1'))
+        self.assertIsNot(cl, keystone.client_for_trusts('trust-2'))
+        self.assertEqual(2, self.ks_client.call_count)
+
+        keystone.forget_trust('trust-1')
+
+        self.assertIsNot(cl, keystone.client_for_trusts('trust-1'))
+
+    def test_client_about_to_expire_is_not_reused(self):
+        self.ks_client.side_effect = lambda **kw: _fake_client(expires_in=30)
+
+        keystone.client_for_trusts('trust-1')
+        keystone.client_for_trusts('trust-1')
+
+        self.assertEqual(2, self.ks_client.call_count)
+
+    def test_user_client_is_keyed_by_token(self):
+        auth_context.set_ctx(auth_context.HighlanderContext(
+            user_id='user', project_id='project', auth_token='token-1'
+        ))
+        self.addCleanup(auth_context.set_ctx, None)
+
+        cl = keystone.client()
+
+        self.assertIs(cl, keystone.client())
+
+        auth_context.ctx().auth_token = 'token-2'
+
+        self.assertIsNot(cl, keystone.client())
+
+    def test_endpoint_is_cached(self):
+        cl = _fake_client()
+        self.ks_client.side_effect = lambda **kw: cl
+
+        service = mock.Mock(id='1', type='compute')
+        service.name = 'nova'
+        cl.services.list.return_value = [service]
+        cl.endpoints.list.return_value = ['endpoint']
+
+        for _ in range(3):
+            self.assertEqual(
+                'endpoint',
+                keystone.get_endpoint_for_project('nova')
+            )
+
+        self.assertEqual(1, cl.services.list.call_count)
+        self.assertEqual(1, cl.endpoints.list.call_count)
+
+    def test_token_validation_is_cached(self):
+        cl = _fake_client()
+        self.ks_client.side_effect = lambda **kw: cl
+
+        token_info = mock.MagicMock(expires=cl.auth_ref.expires)
+        token_info.__contains__.return_value = True
+        cl.tokens.validate.return_value = token_info
+
+        self.assertTrue(keystone.is_token_trust_scoped('token'))
+        self.assertTrue(keystone.is_token_trust_scoped('token'))
+
+        self.assertEqual(1, cl.tokens.validate.call_count)
@@ -0,0 +1,64 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from highlander.tests import base
+from highlander.utils import cache
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TTLCacheTest(base.BaseTest):
+    def setUp(self):
+        super(TTLCacheTest, self).setUp()
+
+        self.timer = FakeTimer()
+        self.cache = cache.TTLCache(2, 10, timer=self.timer)
+
+    def test_entries_expire(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2, ttl=20)
+
+        self.timer.now = 10
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(2, self.cache.get('b'))
+        self.assertEqual(1, len(self.cache))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+
+        self.cache.get('a')
+        self.cache.put('c', 3)
+
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+
+    def test_get_or_create(self):
+        calls = []
+
+        def _create():
+            calls.append(1)
+            return 'value'
+
+        self.assertEqual('value', self.cache.get_or_create('a', _create))
+        self.assertEqual('value', self.cache.get_or_create('a', _create))
+        self.assertEqual(1, len(calls))
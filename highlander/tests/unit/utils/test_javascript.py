@@ -0,0 +1,152 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from distutils import spawn
+import json
+
+from oslo.config import cfg
+import testtools
+
+from highlander import exceptions as exc
+from highlander.tests import base
+from highlander.utils import javascript
+
+
+NODE = spawn.find_executable('node')
+
+
+class ContextStateTest(base.BaseTest):
+    def test_only_changed_keys_are_sent(self):
+        state = javascript._ContextState()
+
+        first = json.loads(state.update({'a': 1, 'b': {'c': 2}}))
+        second = json.loads(state.update({'a': 1, 'b': {'c': 3}}))
+        third = json.loads(state.update({'b': {'c': 3}}))
+
+        self.assertEqual({'a': 1, 'b': {'c': 2}}, first['set'])
+        self.assertEqual({'b': {'c': 3}}, second['set'])
+        self.assertEqual({}, third['set'])
+        self.assertEqual(['a'], third['del'])
+
+    def test_non_dict_context_is_replaced(self):
+        state = javascript._ContextState()
+
+        state.update({'a': 1})
+
+        self.assertEqual(
+            {'replace': [1, 2]},
+            json.loads(state.update([1, 2]))
+        )
+        self.assertEqual(
+            {'a': 1},
+            json.loads(state.update({'a': 1}))['set']
+        )
+
+
+@testtools.skipUnless(NODE, 'Node.js is not installed.')
+class NodeEvaluatorTest(base.BaseTest):
+    def setUp(self):
+        super(NodeEvaluatorTest, self).setUp()
+
+        cfg.CONF.set_override('evaluator', 'nodejs', group='javascript')
+        cfg.CONF.set_override('node_executable', NODE, group='javascript')
+
+        self.addCleanup(javascript.close_contexts)
+        self.addCleanup(cfg.CONF.clear_override, 'evaluator', 'javascript')
+        self.addCleanup(
+            cfg.CONF.clear_override,
+            'node_executable',
+            'javascript'
+        )
+
+    def _pool(self):
+        return javascript._POOLS['nodejs']
+
+    def test_evaluate(self):
+        self.assertEqual(
+            {'sum': 3},
+            javascript.evaluate('({sum: $.a + $.b})', {'a': 1, 'b': 2})
+        )
+        self.assertIsNone(javascript.evaluate('undefined', {}))
+
+    def test_context_is_reused(self):
+        script = 'let keys = Object.keys($).sort(); keys.join(",")'
+
+        self.assertEqual('a,b', javascript.evaluate(script, {'a': 1, 'b': 2}))
+        self.assertEqual('b,c', javascript.evaluate(script, {'b': 2, 'c': 3}))
+        self.assertEqual([1, 2], javascript.evaluate('$', [1, 2]))
+        self.assertEqual('a', javascript.evaluate(script, {'a': 1}))
+
+        self.assertEqual(1, len(self._pool()._idle))
+
+    def test_scripts_cannot_change_next_context(self):
+        context = {'x': 1, 'y': {'z': 1}}
+
+        javascript.evaluate('$.x = 5; $.y.z = 5; $.w = 5', context)
+
+        self.assertEqual(
+            [1, 1, False],
+            javascript.evaluate('[$.x, $.y.z, "w" in $]', context)
+        )
+
+    def test_evaluate_many(self):
+        self.assertEqual(
+            [2, 4, 6],
+            javascript.evaluate_many('$.n * 2', ({'n': n} for n in (1, 2, 3)))
+        )
+
+    def test_script_error_keeps_worker(self):
+        self.assertRaises(
+            exc.JavaScriptEvaluationException,
+            javascript.evaluate,
+            '$.a.b.c',
+            {'a': 1}
+        )
+        self.assertRaises(
+            exc.JavaScriptEvaluationException,
+            javascript.evaluate,
+            'var',
+            {'a': 1}
+        )
+
+        self.assertEqual(1, len(self._pool()._idle))
+        self.assertEqual(2, javascript.evaluate('$.a + 1', {'a': 1}))
+
+    def test_timeout_kills_worker(self):
+        cfg.CONF.set_override('timeout', 1, group='javascript')
+        self.addCleanup(cfg.CONF.clear_override, 'timeout', 'javascript')
+
+        self.assertRaises(
+            exc.JavaScriptEvaluationException,
+            javascript.evaluate,
+            'while (true) {}',
+            {}
+        )
+
+        self.assertEqual([], self._pool()._idle)
+        self.assertEqual(1, javascript.evaluate('$.a', {'a': 1}))
+
+    def test_missing_executable(self):
+        cfg.CONF.set_override(
+            'node_executable',
+            '/nonexistent/node',
+            group='javascript'
+        )
+
+        self.assertRaises(
+            exc.JavaScriptEvaluationException,
+            javascript.evaluate,
+            '1',
+            {}
+        )
@@ -0,0 +1,71 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import sqlalchemy as sa
+
+from highlander.tests import base
+from highlander.utils import metrics
+
+
+class MetricsTest(base.BaseTest):
+    def test_histogram(self):
+        histogram = metrics.Histogram(
+            'test_seconds',
+            'Test "histogram".',
+            ('route',),
+            buckets=(1, 2)
+        )
+
+        self.addCleanup(metrics._registry.remove, histogram)
+
+        for value in (0.5, 2, 3):
+            histogram.observe(value, 'Controller.get')
+
+        rendered = metrics.render()
+
+        self.assertIn('# TYPE test_seconds histogram\n', rendered)
+
+        for line in ('test_seconds_bucket{route="Controller.get",le="1"} 1',
+                     'test_seconds_bucket{route="Controller.get",le="2"} 2',
+                     'test_seconds_bucket{route="Controller.get",le="+Inf"} 3',
+                     'test_seconds_sum{route="Controller.get"} 5.5',
+                     'test_seconds_count{route="Controller.get"} 3'):
+            self.assertIn(line + '\n', rendered)
+
+    def test_statements_of_a_request(self):
+        engine = sa.create_engine('sqlite://')
+
+        metrics.instrument_engine(engine)
+
+        errors = metrics.STATEMENT_ERRORS._values.get((), 0)
+
+        request_metrics = metrics.start_request()
+        self.addCleanup(metrics.end_request)
+
+        engine.execute('SELECT 1')
+        engine.execute('SELECT 2')
+
+        self.assertRaises(sa.exc.OperationalError, engine.execute, 'SELEC')
+
+        metrics.end_request()
+
+        engine.execute('SELECT 3')
+
+        self.assertEqual(2, request_metrics.statements)
+        self.assertGreater(request_metrics.db_time, 0)
+        self.assertGreater(request_metrics.pool_wait, 0)
+        self.assertEqual(
+            errors + 1,
+            metrics.STATEMENT_ERRORS._values.get((), 0)
+        )
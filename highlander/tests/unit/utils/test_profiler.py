@@ -0,0 +1,54 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import time
+
+import eventlet
+
+from highlander import exceptions as exc
+from highlander.tests import base
+from highlander.utils import profiler
+
+
+def _busy_greenlet(seconds):
+    deadline = time.time() + seconds
+
+    while time.time() < deadline:
+        pass
+
+
+class SamplingProfilerTest(base.BaseTest):
+    def test_greenlets_are_sampled(self):
+        eventlet.spawn(_busy_greenlet, 0.2)
+
+        result = profiler.profile(0.3)
+
+        self.assertGreater(result.samples, 0)
+        self.assertIn('_busy_greenlet (', result.collapsed())
+
+        for line in result.collapsed().splitlines():
+            stack, count = line.rsplit(' ', 1)
+
+            self.assertGreater(int(count), 0)
+
+    def test_one_profile_at_a_time(self):
+        sampler = profiler.SamplingProfiler(0.01).start()
+
+        try:
+            self.assertRaises(
+                exc.ProfilerBusyException,
+                profiler.SamplingProfiler().start
+            )
+        finally:
+            sampler.stop()
@@ -0,0 +1,88 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import json
+
+import mock
+
+from highlander.api.controllers.v1 import resiliencygroup
+from highlander.api.controllers.v1 import resiliencyserver
+from highlander.db.v1 import api as db_api
+from highlander import exceptions as exc
+from highlander.tests import base
+from highlander.utils import rest_utils
+
+
+class RestUtilsTest(base.DbTestCase):
+    def test_to_json(self):
+        with db_api.transaction():
+            group = db_api.create_resiliency_group({
+                'name': 'group',
+                'resiliency_strategy_type': 'ufr'
+            })
+
+        resource_cls = resiliencygroup.ResiliencyGroup
+
+        self.assertEqual(
+            json.loads(resource_cls.from_dict(group.to_dict()).to_string()),
+            json.loads(rest_utils.to_json(group, resource_cls))
+        )
+
+    def test_schema(self):
+        schema = resiliencygroup.UPDATE_SCHEMA
+
+        schema.validate({'id': '123', 'resiliency_strategy_type': 'ft'})
+
+        for body in [{'name': 'no id'},
+                     {'id': '123', 'resiliency_strategy_type': 'raid'},
+                     {'id': '123', 'name': 'x' * 81},
+                     ['123']]:
+            self.assertRaises(exc.InputException, schema.validate, body)
+
+    def test_instance_id_is_a_uuid(self):
+        schema = resiliencyserver.CREATE_SCHEMA
+
+        schema.validate({
+            'instance_id': '123e4567-e89b-12d3-a456-426655440000'
+        })
+        schema.validate({'instance_id': None})
+
+        self.assertRaises(
+            exc.InputException,
+            schema.validate,
+            {'instance_id': 'x;reboot'}
+        )
+
+    @mock.patch.object(rest_utils, 'pecan')
+    def test_if_match_fails_with_precondition_failed(self, pecan):
+        with db_api.transaction():
+            group = db_api.create_resiliency_group({
+                'name': 'group',
+                'resiliency_strategy_type': 'ufr'
+            })
+
+        pecan.request.if_match = [rest_utils.etag([group])]
+
+        rest_utils.check_if_match(group)
+
+        pecan.request.if_match = ['stale']
+
+        e = self.assertRaises(
+            exc.ConcurrentUpdateException,
+            rest_utils.check_if_match,
+            group
+        )
+
+        self.assertEqual(412, e.http_code)
+        self.assertEqual(409, exc.ConcurrentUpdateException.http_code)
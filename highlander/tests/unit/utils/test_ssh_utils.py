@@ -0,0 +1,228 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import socket
+import subprocess
+import threading
+import time
+
+from oslo.config import cfg
+import paramiko
+
+from highlander.tests import base
+from highlander.utils import ssh_utils
+
+
+_HOST_KEY = paramiko.RSAKey.generate(1024)
+
+
+class _StubServer(paramiko.ServerInterface):
+    """Accepts 'user'/'secret' and runs exec requests with the local shell."""
+
+    def __init__(self, stub):
+        self.stub = stub
+
+    def check_auth_password(self, username, password):
+        if (username, password) == ('user', 'secret'):
+            return paramiko.AUTH_SUCCESSFUL
+
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        self.stub.commands.append(command)
+
+        t = threading.Thread(target=self._execute, args=(channel, command))
+        t.daemon = True
+        t.start()
+
+        return True
+
+    @staticmethod
+    def _execute(channel, command):
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        def _pump(stream, send):
+            for chunk in iter(lambda: stream.read(4096), ''):
+                send(chunk)
+
+        err = threading.Thread(
+            target=_pump,
+            args=(proc.stderr, channel.sendall_stderr)
+        )
+        err.start()
+
+        _pump(proc.stdout, channel.sendall)
+        err.join()
+
+        channel.send_exit_status(proc.wait())
+        channel.shutdown_write()
+        channel.close()
+
+
+class SSHStub(object):
+    def __init__(self):
+        self.commands = []
+        self.connections = 0
+        self.transports = []
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(10)
+
+        self.port = self.sock.getsockname()[1]
+
+        t = threading.Thread(target=self._serve)
+        t.daemon = True
+        t.start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except socket.error:
+                return
+
+            self.connections += 1
+
+            transport = paramiko.Transport(client)
+            transport.add_server_key(_HOST_KEY)
+            transport.start_server(server=_StubServer(self))
+
+            self.transports.append(transport)
+
+    def stop(self):
+        self.sock.close()
+
+        for t in self.transports:
+            t.close()
+
+
+class SSHUtilsTest(base.BaseTest):
+    def setUp(self):
+        super(SSHUtilsTest, self).setUp()
+
+        self.stub = SSHStub()
+        self.addCleanup(self.stub.stop)
+        self.addCleanup(ssh_utils.close_connections)
+
+        self.host = '127.0.0.1'
+
+        # Connections go to the default SSH port, redirect them to the stub.
+        connect = ssh_utils.paramiko.SSHClient.connect
+        port = self.stub.port
+
+        def _connect(client, hostname, **kwargs):
+            kwargs['port'] = port
+
+            return connect(client, hostname, **kwargs)
+
+        self.patch(ssh_utils.paramiko.SSHClient, 'connect', _connect)
+
+    def _override(self, name, value):
+        cfg.CONF.set_override(name, value, group='ssh')
+        self.addCleanup(cfg.CONF.clear_override, name, group='ssh')
+
+    def _execute(self, cmd, **kwargs):
+        return ssh_utils.execute_command(
+            cmd, self.host, 'user', 'secret', **kwargs
+        )
+
+    def test_connection_is_reused(self):
+        self.assertEqual((0, 'one\n'), self._execute('echo one'))
+        self.assertEqual((0, 'two\n'), self._execute('echo two'))
+
+        self.assertEqual(1, self.stub.connections)
+
+    def test_large_stderr_does_not_hang(self):
+        # Well above the SSH window size of both streams.
+        cmd = ('head -c 4000000 /dev/zero >&2; '
+               'head -c 3000000 /dev/zero; echo done >&2')
+
+        ret_code, stdout, stderr = self._execute(cmd, get_stderr=True)
+
+        self.assertEqual(0, ret_code)
+        self.assertEqual(3000000, len(stdout))
+        self.assertEqual(4000005, len(stderr))
+
+    def test_stderr_output_wakes_up_the_reader(self):
+        # Only a missed wakeup would wait for the poll interval.
+        self.patch(ssh_utils, '_POLL_INTERVAL', 30)
+
+        start = time.time()
+
+        ret_code, stdout, stderr = self._execute(
+            'echo a >&2; sleep 0.2; echo b >&2; sleep 0.2; echo c >&2',
+            get_stderr=True
+        )
+
+        self.assertEqual((0, '', 'a\nb\nc\n'), (ret_code, stdout, stderr))
+        self.assertLess(time.time() - start, 10)
+
+    def test_busy_connections_time_out(self):
+        self._override('max_connections_per_host', 1)
+        self._override('max_channels_per_connection', 1)
+        self._override('acquire_timeout', 0)
+
+        key = (self.host, 'user')
+        conn = ssh_utils._pool.acquire(self.host, 'user', 'secret')
+
+        try:
+            self.assertRaises(RuntimeError, self._execute, 'true')
+        finally:
+            ssh_utils._pool.release(key, conn)
+
+        self.assertEqual((0, 'ok\n'), self._execute('echo ok'))
+
+    def test_error_code(self):
+        self.assertRaises(RuntimeError, self._execute, 'exit 3')
+        self.assertEqual(
+            (3, ''),
+            self._execute('exit 3', raise_when_error=False)
+        )
+
+    def test_broken_connection_is_replaced(self):
+        self._execute('true')
+
+        for t in self.stub.transports:
+            t.close()
+
+        self.assertEqual((0, 'ok\n'), self._execute('echo ok'))
+        self.assertEqual(2, self.stub.connections)
+
+    def test_execute_many(self):
+        self._override('max_channels_per_connection', 2)
+
+        results = ssh_utils.execute_many(
+            'echo hi',
+            [self.host, 'localhost'],
+            'user',
+            'secret',
+            concurrency=2
+        )
+
+        self.assertEqual(
+            {self.host: (0, 'hi\n'), 'localhost': (0, 'hi\n')},
+            results
+        )
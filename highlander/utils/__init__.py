@@ -16,6 +16,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import importlib
 import logging
 import os
 from os import path
@@ -183,6 +184,31 @@ def iter_subclasses(cls, _seen=None):
                 yield _sub
 
 
+class LazyModule(object):
+    """Module imported when one of its attributes is used for the first time.
+
+    Keeps modules that are slow to import, or only needed by some of the
+    services, out of the startup of the others.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, name):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, name)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self._name
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
 def random_sleep(limit=1):
     """Sleeps for a random period of time not exceeding the given limit.
 
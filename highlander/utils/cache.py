@@ -0,0 +1,102 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import collections
+import threading
+import time
+
+
+_MISSING = object()
+
+
+class TTLCache(object):
+    """Size bounded LRU cache with expiring entries.
+
+    Every entry lives for 'ttl' seconds unless a different time to live is
+    given when it's put into the cache. Least recently used entries are
+    evicted once the cache holds 'maxsize' entries.
+    """
+
+    def __init__(self, maxsize, ttl, timer=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._timer = timer
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            self._expire()
+
+            return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is None or entry[1] <= self._timer():
+                return default
+
+            # Re-insert to mark the entry as the most recently used one.
+            self._entries[key] = entry
+
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.ttl
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+            if ttl <= 0 or self.maxsize <= 0:
+                return
+
+            self._entries[key] = (value, self._timer() + ttl)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, key, factory, ttl=None):
+        """Returns the cached value or caches the one built by factory().
+
+        The factory is called outside of the cache lock so concurrent
+        callers may build the value more than once, the last one wins.
+        """
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            value = factory()
+
+            self.put(key, value, ttl=ttl)
+
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _expire(self):
+        now = self._timer()
+
+        for key in [k for k, e in self._entries.items() if e[1] <= now]:
+            del self._entries[key]
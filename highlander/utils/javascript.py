@@ -13,41 +13,437 @@
 #    limitations under the License.
 
 import abc
+import contextlib
 import json
 
+import eventlet
+from eventlet.green import subprocess
+from eventlet import semaphore
+from oslo.config import cfg
+import six
+
 from highlander import exceptions as exc
 from highlander.openstack.common import importutils
+from highlander.openstack.common import log as logging
+from highlander.utils import cache
+
 
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('javascript', 'highlander.config')
 
 _PYV8 = importutils.try_import('PyV8')
 
+# Loaded into every warm context. '__highlander.apply()' turns the data
+# context held by the JavaScript context into the next one and exposes it
+# as '$'. Values are frozen so that a script can't change what the next
+# script sees, '$' itself is a fresh shallow copy for every evaluation.
+_PRELUDE = """
+var $;
+var __highlander = (function () {
+    var base = {};
+
+    function isObject(v) {
+        return v !== null && typeof v === 'object' && !Array.isArray(v);
+    }
+
+    function freeze(v) {
+        if (v !== null && typeof v === 'object' && !Object.isFrozen(v)) {
+            Object.freeze(v);
+            Object.keys(v).forEach(function (k) { freeze(v[k]); });
+        }
+
+        return v;
+    }
+
+    return {
+        apply: function (update) {
+            if ('replace' in update) {
+                base = freeze(update.replace);
+            } else {
+                if (!isObject(base)) {
+                    base = {};
+                }
+
+                update.del.forEach(function (k) { delete base[k]; });
+                Object.keys(update.set).forEach(function (k) {
+                    base[k] = freeze(update.set[k]);
+                });
+            }
+
+            if (isObject(base)) {
+                $ = {};
+                Object.keys(base).forEach(function (k) { $[k] = base[k]; });
+            } else {
+                $ = base;
+            }
+        }
+    };
+})();
+"""
+
+# Node.js worker reading one JSON request per line from stdin and writing
+# one JSON response per line to stdout. Arguments: prelude, cache size.
+_NODE_WORKER = """
+'use strict';
+var vm = require('vm');
+var readline = require('readline');
+
+var sandbox = vm.createContext({});
+vm.runInContext(process.argv[1], sandbox);
+
+var apply = vm.runInContext('__highlander.apply', sandbox);
+var cacheSize = parseInt(process.argv[2], 10);
+var scripts = new Map();
+
+function compile(source) {
+    var script = scripts.get(source);
+
+    if (script === undefined) {
+        script = new vm.Script('{\\n' + source + '\\n}');
+    } else {
+        scripts.delete(source);
+    }
+
+    scripts.set(source, script);
+
+    if (scripts.size > cacheSize) {
+        scripts.delete(scripts.keys().next().value);
+    }
+
+    return script;
+}
+
+function run(request) {
+    var script, compileError;
+
+    try {
+        script = compile(request.script);
+    } catch (e) {
+        compileError = String(e);
+    }
+
+    // Updates are applied even if the script is broken, the caller
+    // assumes this worker holds the last context it has sent.
+    return request.updates.map(function (update) {
+        apply(update);
+
+        if (compileError !== undefined) {
+            return {error: compileError};
+        }
+
+        try {
+            var value = script.runInContext(sandbox);
+
+            return {value: value === undefined ? null : value};
+        } catch (e) {
+            return {error: String(e)};
+        }
+    });
+}
+
+readline.createInterface({input: process.stdin}).on('line', function (line) {
+    var response;
+
+    try {
+        response = JSON.stringify({results: run(JSON.parse(line))});
+    } catch (e) {
+        response = JSON.stringify({error: String(e)});
+    }
+
+    process.stdout.write(response + '\\n');
+});
+"""
+
+
+def _wrap(script):
+    # A block keeps 'let' and 'const' declarations of a script from
+    # clashing with the ones of scripts run earlier in the same context.
+    return '{\n%s\n}' % script
+
+
+class _ContextState(object):
+    """Data context currently held by a warm JavaScript context.
+
+    Top level keys are serialized separately and only the ones that changed
+    since the previous evaluation are sent to JavaScript, so the context
+    isn't parsed and rebuilt from scratch on every call.
+    """
+
+    def __init__(self):
+        self._keys = {}
+
+    def update(self, context):
+        """Returns JSON of the update turning the held context into given."""
+        if not isinstance(context, dict):
+            self._keys = {}
+
+            return '{"replace": %s}' % json.dumps(context)
+
+        keys = dict(
+            (six.text_type(k), json.dumps(v))
+            for k, v in six.iteritems(context)
+        )
+
+        changed = [
+            '%s: %s' % (json.dumps(k), v)
+            for k, v in six.iteritems(keys) if self._keys.get(k) != v
+        ]
+        deleted = [k for k in self._keys if k not in keys]
+
+        self._keys = keys
+
+        return '{"set": {%s}, "del": %s}' % (
+            ', '.join(changed),
+            json.dumps(deleted)
+        )
+
+
+def _results(response):
+    results = []
+
+    for result in response:
+        if 'error' in result:
+            raise exc.JavaScriptEvaluationException(result['error'])
+
+        results.append(result['value'])
+
+    return results
+
+
+class _V8Context(object):
+    """Warm PyV8 context with its own cache of compiled scripts."""
+
+    def __init__(self):
+        self.closed = False
+
+        self._ctx = _PYV8.JSContext()
+        self._state = _ContextState()
+        self._scripts = cache.TTLCache(
+            CONF.javascript.script_cache_size,
+            float('inf')
+        )
+
+        with self._ctx:
+            self._ctx.eval(_PRELUDE)
+
+    def _compile(self, script):
+        with _PYV8.JSEngine() as engine:
+            return engine.compile(_wrap(script))
+
+    def evaluate_many(self, script, contexts):
+        results = []
+
+        try:
+            with self._ctx:
+                try:
+                    compiled = self._scripts.get_or_create(
+                        script,
+                        lambda: self._compile(script)
+                    )
+                except Exception as e:
+                    raise exc.JavaScriptEvaluationException(str(e))
+
+                for context in contexts:
+                    self._ctx.eval(
+                        '__highlander.apply(%s)' % self._state.update(context)
+                    )
+
+                    try:
+                        results.append(compiled.run())
+                    except Exception as e:
+                        raise exc.JavaScriptEvaluationException(str(e))
+        except exc.JavaScriptEvaluationException:
+            raise
+        except BaseException:
+            self.close()
+            raise
+
+        return results
+
+    def close(self):
+        self.closed = True
+
+
+class _NodeWorker(object):
+    """Node.js process keeping a warm context between evaluations."""
+
+    def __init__(self):
+        self.closed = False
+
+        self._state = _ContextState()
+
+        try:
+            self._proc = subprocess.Popen(
+                [
+                    CONF.javascript.node_executable,
+                    '-e', _NODE_WORKER,
+                    _PRELUDE,
+                    str(CONF.javascript.script_cache_size)
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                close_fds=True
+            )
+        except OSError as e:
+            raise exc.JavaScriptEvaluationException(
+                "Failed to start Node.js [executable=%s]: %s" %
+                (CONF.javascript.node_executable, e)
+            )
+
+    def _call(self, script, contexts):
+        request = '{"script": %s, "updates": [%s]}\n' % (
+            json.dumps(script),
+            ', '.join([self._state.update(c) for c in contexts])
+        )
+
+        timeout = eventlet.Timeout(
+            CONF.javascript.timeout,
+            exc.JavaScriptEvaluationException(
+                "JavaScript evaluation timed out after %s seconds." %
+                CONF.javascript.timeout
+            )
+        )
+
+        with timeout:
+            self._proc.stdin.write(request.encode('utf-8'))
+            self._proc.stdin.flush()
+
+            line = self._proc.stdout.readline()
+
+        if not line:
+            raise exc.JavaScriptEvaluationException(
+                "Node.js worker exited unexpectedly."
+            )
+
+        response = json.loads(line.decode('utf-8'))
+
+        if 'error' in response:
+            raise exc.JavaScriptEvaluationException(response['error'])
+
+        return response['results']
+
+    def evaluate_many(self, script, contexts):
+        try:
+            response = self._call(script, contexts)
+        except BaseException:
+            # The worker state is unknown now, it's never reused.
+            self.close()
+            raise
+
+        return _results(response)
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+
+        try:
+            self._proc.kill()
+            self._proc.wait()
+        except OSError:
+            pass
+
+
+class _Pool(object):
+    """Bounded pool of warm JavaScript contexts."""
+
+    def __init__(self, factory, size):
+        self._factory = factory
+        self._idle = []
+        self._semaphore = semaphore.Semaphore(size)
+
+    @contextlib.contextmanager
+    def get(self):
+        with self._semaphore:
+            item = self._idle.pop() if self._idle else self._factory()
+
+            try:
+                yield item
+            finally:
+                if not item.closed:
+                    self._idle.append(item)
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+_POOLS = {}
+
+
+def _get_pool(name, factory):
+    pool = _POOLS.get(name)
+
+    if not pool:
+        pool = _POOLS[name] = _Pool(factory, CONF.javascript.pool_size)
+
+    return pool
+
+
+def close_contexts():
+    """Releases all warm JavaScript contexts."""
+    while _POOLS:
+        _POOLS.popitem()[1].close()
+
 
 class JSEvaluator(object):
     @classmethod
     @abc.abstractmethod
+    def evaluate_many(cls, script, contexts):
+        """Executes given JavaScript once per each data context.
+
+        Returns the list of results in the order of contexts.
+        """
+        pass
+
+    @classmethod
     def evaluate(cls, script, context):
         """Executes given JavaScript.
         """
-        pass
+        return cls.evaluate_many(script, [context])[0]
 
 
 class V8Evaluator(JSEvaluator):
     @classmethod
-    def evaluate(cls, script, context):
+    def evaluate_many(cls, script, contexts):
         if not _PYV8:
             raise exc.HighlanderException(
                 "PyV8 module is not available. Please install PyV8."
             )
 
-        with _PYV8.JSContext() as ctx:
-            # Prepare data context and way for interaction with it.
-            ctx.eval('$ = %s' % json.dumps(context))
+        with _get_pool('pyv8', _V8Context).get() as ctx:
+            return ctx.evaluate_many(script, contexts)
+
+
+class NodeEvaluator(JSEvaluator):
+    @classmethod
+    def evaluate_many(cls, script, contexts):
+        with _get_pool('nodejs', _NodeWorker).get() as worker:
+            return worker.evaluate_many(script, contexts)
 
-            return ctx.eval(script)
 
-# TODO(nmakhotkin) Make it configurable.
-EVALUATOR = V8Evaluator
+_EVALUATORS = {
+    'pyv8': V8Evaluator,
+    'nodejs': NodeEvaluator
+}
+
+
+def get_evaluator():
+    name = CONF.javascript.evaluator
+
+    if name == 'auto':
+        name = 'pyv8' if _PYV8 else 'nodejs'
+
+    return _EVALUATORS[name]
 
 
 def evaluate(script, context):
-    return EVALUATOR.evaluate(script, context)
+    return get_evaluator().evaluate(script, context)
+
+
+def evaluate_many(script, contexts):
+    """Evaluates one script against many data contexts in one session."""
+    return get_evaluator().evaluate_many(script, list(contexts))
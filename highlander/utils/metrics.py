@@ -0,0 +1,318 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Latency and database metrics in the Prometheus text format.
+
+Nothing is measured unless [metrics] enabled is set: the API then adds
+its timing hook (see highlander.api.hooks.timing) and the database engine
+gets the listeners of instrument_engine().
+"""
+
+import bisect
+import time
+
+from oslo.config import cfg
+from sqlalchemy import event
+
+from highlander import utils
+
+
+CONF = cfg.CONF
+CONF.import_group('metrics', 'highlander.config')
+
+_REQUEST_THREAD_LOCAL_NAME = 'highlander_request_metrics'
+
+# Upper bounds of the buckets of latency histograms, in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the buckets of statements per request histograms.
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_registry = []
+
+
+class _Series(object):
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram(object):
+    """Distribution of observed values, per combination of labels."""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+
+        self._series = {}
+
+        _registry.append(self)
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+
+        if series is None:
+            # The last count is the one of the +Inf bucket.
+            series = self._series[label_values] = _Series(
+                len(self.buckets) + 1
+            )
+
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def samples(self):
+        for label_values, series in sorted(self._series.items()):
+            labels = list(zip(self.labels, label_values))
+            total = 0
+
+            for bound, count in zip(self.buckets + ('+Inf',), series.counts):
+                total += count
+
+                yield ('_bucket', labels + [('le', bound)], total)
+
+            yield ('_sum', labels, series.sum)
+            yield ('_count', labels, total)
+
+
+class Counter(object):
+    """Value that only goes up, per combination of labels."""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+        self._values = {}
+
+        _registry.append(self)
+
+    def inc(self, amount=1, *label_values):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        if not self.labels and not self._values:
+            yield ('', [], 0)
+
+        for label_values, value in sorted(self._values.items()):
+            yield ('', list(zip(self.labels, label_values)), value)
+
+
+REQUEST_DURATION = Histogram(
+    'highlander_api_request_duration_seconds',
+    'Time spent handling API requests.',
+    ('method', 'route', 'status')
+)
+
+REQUEST_STATEMENTS = Histogram(
+    'highlander_api_request_db_statements',
+    'Database statements executed by API requests.',
+    ('route',),
+    buckets=COUNT_BUCKETS
+)
+
+REQUEST_DB_DURATION = Histogram(
+    'highlander_api_request_db_seconds',
+    'Time API requests spent executing database statements.',
+    ('route',)
+)
+
+SERIALIZATION_DURATION = Histogram(
+    'highlander_api_serialization_seconds',
+    'Time spent serializing API responses.',
+    ('route',)
+)
+
+STATEMENT_DURATION = Histogram(
+    'highlander_db_statement_duration_seconds',
+    'Time spent executing database statements.'
+)
+
+POOL_WAIT_DURATION = Histogram(
+    'highlander_db_pool_wait_seconds',
+    'Time spent getting a connection from the database pool.'
+)
+
+STATEMENT_ERRORS = Counter(
+    'highlander_db_statement_errors_total',
+    'Database statements that failed.'
+)
+
+REJECTED_REQUESTS = Counter(
+    'highlander_api_rejected_requests_total',
+    'API requests rejected by admission control, by reason: rate (of the '
+    'project) or in_flight (requests of the route class).',
+    ('reason', 'route_class')
+)
+
+TOKEN_CACHE_LOOKUPS = Counter(
+    'highlander_api_token_cache_lookups_total',
+    'Lookups of auth tokens in the token cache, by result: hit, miss or '
+    'invalid (a token keystone rejected).',
+    ('result',)
+)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+
+    return str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+
+    return '{%s}' % ','.join(
+        '%s="%s"' % (
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+                '\n', r'\n'
+            )
+        )
+        for name, value in labels
+    )
+
+
+def render():
+    """Returns all metrics in the Prometheus text exposition format."""
+    lines = []
+
+    for metric in _registry:
+        lines.append('# HELP %s %s' % (metric.name, metric.help))
+        lines.append('# TYPE %s %s' % (metric.name, metric.type))
+
+        for suffix, labels, value in metric.samples():
+            lines.append('%s%s%s %s' % (
+                metric.name,
+                suffix,
+                _format_labels(labels),
+                _format_value(value)
+            ))
+
+    return '\n'.join(lines) + '\n'
+
+
+class RequestMetrics(object):
+    """Time a request spent in its parts, see start_request()."""
+
+    __slots__ = ('started', 'statements', 'db_time', 'pool_wait',
+                 'serialization')
+
+    def __init__(self):
+        self.started = time.time()
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.serialization = 0.0
+
+    def elapsed(self):
+        return time.time() - self.started
+
+
+def start_request():
+    """Starts measuring the request handled by the current thread."""
+    request_metrics = RequestMetrics()
+
+    utils.set_thread_local(_REQUEST_THREAD_LOCAL_NAME, request_metrics)
+
+    return request_metrics
+
+
+def get_request():
+    return utils.get_thread_local(_REQUEST_THREAD_LOCAL_NAME)
+
+
+def end_request():
+    request_metrics = get_request()
+
+    utils.set_thread_local(_REQUEST_THREAD_LOCAL_NAME, None)
+
+    return request_metrics
+
+
+def add_serialization_time(seconds):
+    request_metrics = get_request()
+
+    if request_metrics:
+        request_metrics.serialization += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    conn.info.setdefault('highlander_statement_started', []).append(
+        time.time()
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    started = conn.info['highlander_statement_started'].pop()
+    seconds = time.time() - started
+
+    STATEMENT_DURATION.observe(seconds)
+
+    request_metrics = get_request()
+
+    if request_metrics:
+        request_metrics.statements += 1
+        request_metrics.db_time += seconds
+
+
+def _handle_error(context):
+    STATEMENT_ERRORS.inc()
+
+    started = context.connection.info.get('highlander_statement_started')
+
+    if started:
+        started.pop()
+
+
+def _timed_connect(connect):
+    def _connect():
+        started = time.time()
+
+        try:
+            return connect()
+        finally:
+            seconds = time.time() - started
+
+            POOL_WAIT_DURATION.observe(seconds)
+
+            request_metrics = get_request()
+
+            if request_metrics:
+                request_metrics.pool_wait += seconds
+
+    return _connect
+
+
+def instrument_engine(engine):
+    """Measures the statements and connections of an engine."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+    # The pool has no event telling when a checkout starts, the engine
+    # looks its connect() up on every checkout.
+    engine.pool.connect = _timed_connect(engine.pool.connect)
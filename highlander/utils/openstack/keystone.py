@@ -13,44 +13,138 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from keystoneclient.v3 import client as ks_client
 from oslo.config import cfg
+from oslo.utils import timeutils
 
 from highlander import context
+from highlander import utils
+from highlander.utils import cache
 
 CONF = cfg.CONF
+CONF.import_group('keystone', 'highlander.config')
 
+# Keystone is used through trusts and service catalogs, not by every
+# request: keystoneclient and keystonemiddleware are imported on first use.
+ks_client = utils.lazy_import('keystoneclient.v3.client')
 
-def client():
-    ctx = context.ctx()
-    auth_url = CONF.keystone_authtoken.auth_uri
+# Authenticated clients are reused until their token is about to expire,
+# creating a client costs a round trip to keystone.
+_client_cache = None
+_catalog_cache = None
+_token_cache = None
+
+
+def authtoken_conf():
+    """Returns the [keystone_authtoken] options of keystonemiddleware."""
+    CONF.import_group('keystone_authtoken', 'keystonemiddleware.auth_token')
+
+    return CONF.keystone_authtoken
+
+
+def _clients():
+    global _client_cache
+
+    if _client_cache is None:
+        _client_cache = cache.TTLCache(
+            CONF.keystone.client_cache_size,
+            CONF.keystone.token_cache_ttl
+        )
+
+    return _client_cache
+
+
+def _catalog():
+    global _catalog_cache
+
+    if _catalog_cache is None:
+        _catalog_cache = cache.TTLCache(
+            CONF.keystone.client_cache_size,
+            CONF.keystone.catalog_cache_ttl
+        )
+
+    return _catalog_cache
+
+
+def _tokens():
+    global _token_cache
 
-    cl = ks_client.Client(
-        username=ctx.user_name,
-        token=ctx.auth_token,
-        tenant_id=ctx.project_id,
-        auth_url=auth_url
+    if _token_cache is None:
+        _token_cache = cache.TTLCache(
+            CONF.keystone.client_cache_size * 10,
+            CONF.keystone.token_cache_ttl
+        )
+
+    return _token_cache
+
+
+def clear_cache():
+    """Drops all cached clients, endpoints and token validations."""
+    global _client_cache, _catalog_cache, _token_cache
+
+    _client_cache = None
+    _catalog_cache = None
+    _token_cache = None
+
+
+def _seconds_left(expires):
+    """Returns how long something expiring at 'expires' can be cached."""
+    seconds = timeutils.delta_seconds(
+        timeutils.utcnow(),
+        timeutils.normalize_time(expires)
     )
 
-    cl.management_url = auth_url
+    return seconds - CONF.keystone.token_expiry_margin
+
+
+def _cached_client(key, create):
+    cl = _clients().get(key)
+
+    if cl is None:
+        cl = create()
+
+        _clients().put(key, cl, ttl=_seconds_left(cl.auth_ref.expires))
 
     return cl
 
 
+def client():
+    ctx = context.ctx()
+
+    def _create():
+        auth_url = authtoken_conf().auth_uri
+
+        cl = ks_client.Client(
+            username=ctx.user_name,
+            token=ctx.auth_token,
+            tenant_id=ctx.project_id,
+            auth_url=auth_url
+        )
+
+        cl.management_url = auth_url
+
+        return cl
+
+    return _cached_client(('token', ctx.auth_token, ctx.project_id), _create)
+
+
 def _admin_client(trust_id=None, project_name=None):
-    auth_url = CONF.keystone_authtoken.auth_uri
-
-    cl = ks_client.Client(
-        username=CONF.keystone_authtoken.admin_user,
-        password=CONF.keystone_authtoken.admin_password,
-        project_name=project_name,
-        auth_url=auth_url,
-        trust_id=trust_id
-    )
+    def _create():
+        auth = authtoken_conf()
+        auth_url = auth.auth_uri
+
+        cl = ks_client.Client(
+            username=auth.admin_user,
+            password=auth.admin_password,
+            project_name=project_name,
+            auth_url=auth_url,
+            trust_id=trust_id
+        )
 
-    cl.management_url = auth_url
+        cl.management_url = auth_url
 
-    return cl
+        return cl
+
+    return _cached_client(('admin', trust_id, project_name), _create)
 
 
 def client_for_admin(project_name):
@@ -61,19 +155,41 @@ def client_for_trusts(trust_id):
     return _admin_client(trust_id=trust_id)
 
 
+def forget_trust(trust_id):
+    """Drops the cached client of a trust, e.g. once it's deleted."""
+    _clients().invalidate(('admin', trust_id, None))
+
+
+def _services():
+    def _list():
+        admin_project_name = authtoken_conf().admin_tenant_name
+
+        return _admin_client(project_name=admin_project_name).services.list()
+
+    return _catalog().get_or_create(('services',), _list)
+
+
 def get_endpoint_for_project(service_name=None, service_type=None):
-    admin_project_name = CONF.keystone_authtoken.admin_tenant_name
+    if not service_name and not service_type:
+        raise Exception(
+            "Either 'service_name' or 'service_type' must be provided."
+        )
+
+    return _catalog().get_or_create(
+        ('endpoint', service_name, service_type),
+        lambda: _find_endpoint(service_name, service_type)
+    )
+
+
+def _find_endpoint(service_name, service_type):
+    admin_project_name = authtoken_conf().admin_tenant_name
     keystone_client = _admin_client(project_name=admin_project_name)
-    service_list = keystone_client.services.list()
+    service_list = _services()
 
     if service_name:
         service_id = [s.id for s in service_list if s.name == service_name][0]
-    elif service_type:
-        service_id = [s.id for s in service_list if s.type == service_type][0]
     else:
-        raise Exception(
-            "Either 'service_name' or 'service_type' must be provided."
-        )
+        service_id = [s.id for s in service_list if s.type == service_type][0]
 
     endpoints = keystone_client.endpoints.list(
         service=service_id,
@@ -107,9 +223,25 @@ def format_url(url_template, values):
 
 
 def is_token_trust_scoped(auth_token):
-    admin_project_name = CONF.keystone_authtoken.admin_tenant_name
+    trust_scoped = _tokens().get(auth_token)
+
+    if trust_scoped is not None:
+        return trust_scoped
+
+    admin_project_name = authtoken_conf().admin_tenant_name
     keystone_client = _admin_client(project_name=admin_project_name)
 
     token_info = keystone_client.tokens.validate(auth_token)
 
-    return 'OS-TRUST:trust' in token_info
+    trust_scoped = 'OS-TRUST:trust' in token_info
+
+    _tokens().put(
+        auth_token,
+        trust_scoped,
+        ttl=min(
+            CONF.keystone.token_cache_ttl,
+            _seconds_left(token_info.expires)
+        )
+    )
+
+    return trust_scoped
@@ -0,0 +1,204 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""CPU profiles of running processes.
+
+The sampler is a native thread, even when eventlet monkey patched the
+threading module, reading the frame every other thread is executing at
+regular intervals. For the thread running the eventlet hub it is the frame
+of the running greenlet, so every greenlet using the CPU is sampled while
+the process isn't stopped or slowed down. Profiles are collapsed stacks,
+the input of flamegraph.pl.
+"""
+
+import collections
+import os
+import signal
+import sys
+import tempfile
+import time
+
+import eventlet
+from eventlet import patcher
+from oslo.config import cfg
+
+from highlander import exceptions as exc
+from highlander.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_group('profiler', 'highlander.config')
+
+_threading = patcher.original('threading')
+_time = patcher.original('time')
+
+# One profile at a time, samplers would sample each other.
+_lock = _threading.Lock()
+
+_HUB_DIR = os.path.join('eventlet', 'hubs')
+
+
+def _short_path(path):
+    for prefix in sorted(sys.path, key=len, reverse=True):
+        if prefix and path.startswith(prefix + os.sep):
+            return path[len(prefix) + 1:]
+
+    return path
+
+
+class SamplingProfiler(object):
+    """Counts the stacks threads are executing, see start() and stop().
+
+    Samples of the eventlet hub waiting for events are counted as idle
+    rather than as stacks.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or CONF.profiler.interval
+
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.idle = 0
+
+        self._names = {}
+        self._stopping = False
+        self._thread = None
+
+    def _name(self, code):
+        name = self._names.get(code)
+
+        if name is None:
+            name = self._names[code] = '%s (%s:%s)' % (
+                code.co_name,
+                _short_path(code.co_filename),
+                code.co_firstlineno
+            )
+
+        return name
+
+    def _sample(self, frame):
+        self.samples += 1
+
+        if _HUB_DIR in frame.f_code.co_filename:
+            self.idle += 1
+
+            return
+
+        stack = []
+
+        while frame is not None:
+            stack.append(self._name(frame.f_code))
+            frame = frame.f_back
+
+        stack.reverse()
+
+        self.stacks[';'.join(stack)] += 1
+
+    def _run(self):
+        own_ident = self._thread.ident
+
+        while not self._stopping:
+            for ident, frame in sys._current_frames().items():
+                if ident != own_ident:
+                    self._sample(frame)
+
+            _time.sleep(self.interval)
+
+    def start(self):
+        if not _lock.acquire(False):
+            raise exc.ProfilerBusyException()
+
+        self._thread = _threading.Thread(
+            target=self._run,
+            name='highlander-profiler'
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._thread.join()
+
+        _lock.release()
+
+        return self
+
+    def collapsed(self):
+        """Returns the stacks in the collapsed format, one per line."""
+        return ''.join(
+            '%s %s\n' % (stack, count)
+            for stack, count in sorted(self.stacks.items())
+        )
+
+
+def profile(seconds):
+    """Samples the stacks of the process for a while.
+
+    Only the calling greenlet waits meanwhile.
+    :return: SamplingProfiler.
+    """
+    profiler = SamplingProfiler().start()
+
+    try:
+        eventlet.sleep(min(seconds, CONF.profiler.max_seconds))
+    finally:
+        profiler.stop()
+
+    return profiler
+
+
+def output_path(kind, extension):
+    return os.path.join(
+        CONF.profiler.output_dir or tempfile.gettempdir(),
+        'highlander-%s-%s-%s.%s' % (
+            kind,
+            os.getpid(),
+            time.strftime('%Y%m%d%H%M%S'),
+            extension
+        )
+    )
+
+
+def _profile_to_file(seconds):
+    try:
+        profiler = profile(seconds)
+    except exc.ProfilerBusyException:
+        LOG.warning("A profile is already being recorded, SIGUSR2 ignored.")
+
+        return
+
+    path = output_path('sampled', 'collapsed')
+
+    with open(path, 'w') as f:
+        f.write(profiler.collapsed())
+
+    LOG.info("CPU profile saved [path=%s, samples=%s, idle=%s]"
+             % (path, profiler.samples, profiler.idle))
+
+
+def install_signal_handler(signum=getattr(signal, 'SIGUSR2', None)):
+    """Records a profile in a file whenever the process gets a signal."""
+    if signum is None:
+        return
+
+    def _handler(signum, frame):
+        # Handlers interrupt whatever runs, the profile is recorded by a
+        # greenlet of its own.
+        eventlet.spawn_n(_profile_to_file, CONF.profiler.signal_seconds)
+
+    signal.signal(signum, _handler)
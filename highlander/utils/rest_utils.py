@@ -15,12 +15,20 @@
 #    limitations under the License.
 
 import functools
+import hashlib
+import json
 
+from oslo.utils import timeutils
 import pecan
 import six
+from wsme import api
 from wsme import exc
 
 from highlander import exceptions as ex
+from highlander import utils
+
+# Needed by requests with a body only.
+jsonschema = utils.lazy_import('jsonschema')
 
 
 def wrap_wsme_controller_exception(func):
@@ -50,3 +58,131 @@ def wrap_pecan_controller_exception(func):
             pecan.response.translatable_error = excp
             pecan.abort(excp.http_code, six.text_type(excp))
     return wrapped
+
+
+def _changed_at(db_model):
+    return db_model.updated_at or db_model.created_at
+
+
+def etag(db_models):
+    """Returns an entity tag that changes with any change of the objects.
+
+    It is derived from the versions of the objects, see
+    ResiliencyBase.version_id.
+    """
+    digest = hashlib.sha1()
+
+    for db_model in db_models:
+        digest.update('%s@%s;' % (db_model.id, db_model.version_id))
+
+    return digest.hexdigest()
+
+
+def check_if_match(db_model):
+    """Fails unless the object matches If-Match (any does without it)."""
+    if etag([db_model]) not in pecan.request.if_match:
+        raise ex.PreconditionFailedException(
+            "If-Match doesn't match the current version [id=%s]"
+            % db_model.id
+        )
+
+
+def not_modified(db_models, collection=False):
+    """Sets the validators of a response returning the given objects.
+
+    Last-Modified is only set for single objects, the newest object of a
+    collection doesn't tell when others were removed from it.
+    :return: True if the copy of the client is up to date, the response
+        then is NOT_MODIFIED and the objects don't need to be serialized.
+    """
+    request = pecan.request
+    response = pecan.response
+
+    response.etag = etag(db_models)
+
+    last_modified = None
+
+    if not collection and db_models:
+        last_modified = _changed_at(db_models[0])
+        response.last_modified = last_modified
+
+    # If-None-Match takes precedence, see RFC 7232.
+    if request.if_none_match:
+        return response.etag in request.if_none_match
+
+    if last_modified and request.if_modified_since:
+        since = timeutils.normalize_time(request.if_modified_since)
+
+        # HTTP dates have a resolution of seconds.
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def not_modified_response():
+    return api.Response(None, status_code=304, return_type=None)
+
+
+def parse_changes_since(value):
+    """Parses the ISO 8601 time given as ?changes_since=<time>."""
+    if not value:
+        return None
+
+    try:
+        return timeutils.normalize_time(timeutils.parse_isotime(value))
+    except ValueError as e:
+        raise ex.InputException(
+            "Invalid changes_since [value=%s]: %s" % (value, e)
+        )
+
+
+class JsonSchema(object):
+    """JSON schema of request bodies, compiled on first use only."""
+
+    def __init__(self, schema):
+        self.schema = schema
+
+        self._validator = None
+
+    def validate(self, data):
+        if self._validator is None:
+            validator_cls = jsonschema.validators.validator_for(self.schema)
+            validator_cls.check_schema(self.schema)
+
+            self._validator = validator_cls(self.schema)
+
+        for error in self._validator.iter_errors(data):
+            raise ex.InputException("Invalid request body: %s" % error.message)
+
+
+def load_json_body(schema=None):
+    """Returns the JSON body of the request, validated against a schema.
+
+    The body is decoded from its bytes, not from the text webob decodes
+    first.
+    :param schema: JsonSchema.
+    """
+    try:
+        data = json.loads(pecan.request.body)
+    except ValueError as e:
+        raise ex.InputException("Invalid JSON: %s" % e)
+
+    if schema:
+        schema.validate(data)
+
+    return data
+
+
+def to_json(db_model, resource_cls):
+    """Returns the JSON of a resource straight from its DB model.
+
+    Same as resource_cls.from_dict(db_model.to_dict()).to_string(), without
+    building the WSME object.
+    """
+    d = db_model.to_dict()
+
+    return json.dumps(dict(
+        (attr.name, d[attr.name])
+        for attr in resource_cls._wsme_attributes
+        if attr.name in d
+    ))
@@ -14,6 +14,13 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
+import select
+import threading
+import time
+
+import eventlet
+from oslo.config import cfg
 import paramiko
 
 from highlander.openstack.common import log as logging
@@ -21,51 +28,275 @@ from highlander.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_group('ssh', 'highlander.config')
 
-def _read_paramimko_stream(recv_func):
-    result = ''
-    buf = recv_func(1024)
-    while buf != '':
-        result += buf
-        buf = recv_func(1024)
+_CHUNK_SIZE = 32768
 
-    return result
+# Seconds to wait for output before checking the channel state again, in
+# case a wakeup was missed.
+_POLL_INTERVAL = 1.0
 
 
 def _connect(host, username, password):
     LOG.debug('Creating SSH connection to %s' % host)
     ssh = paramiko.SSHClient()
     ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(host, username=username, password=password)
+    ssh.connect(
+        host,
+        username=username,
+        password=password,
+        timeout=CONF.ssh.connect_timeout
+    )
     return ssh
 
 
-def _cleanup(ssh):
-    ssh.close()
+class _Connection(object):
+    def __init__(self):
+        self.ssh = None
+        self.channels = 0
+        self.last_used = time.time()
+        self.broken = False
+
+    def is_healthy(self):
+        transport = self.ssh.get_transport()
+
+        if not transport or not transport.is_active():
+            return False
+
+        if time.time() - self.last_used > CONF.ssh.health_check_interval:
+            try:
+                transport.send_ignore()
+            except Exception:
+                return False
+
+        return True
+
+
+class ConnectionPool(object):
+    """Pool of SSH connections keyed by (host, username).
+
+    Every connection carries up to 'max_channels_per_connection' commands
+    at a time, each one on its own channel. Connections unused for
+    'idle_timeout' seconds are closed.
+    """
+
+    def __init__(self):
+        self._connections = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(self, host, username, password):
+        """Returns a connection with a channel reserved for a command.
+
+        :raises RuntimeError: If no channel got free within
+            'acquire_timeout' seconds.
+        """
+        key = (host, username)
+        deadline = time.time() + CONF.ssh.acquire_timeout
+
+        while True:
+            conn, stale = self._acquire(key)
+
+            for c in stale:
+                c.ssh.close()
+
+            if conn is None:
+                if time.time() >= deadline:
+                    raise RuntimeError(
+                        "No SSH channel to %s@%s got free within %s seconds"
+                        % (username, host, CONF.ssh.acquire_timeout)
+                    )
+
+                # All connections are busy, wait for a free channel.
+                eventlet.sleep(0.05)
+
+                continue
+
+            if conn.ssh is not None:
+                if conn.is_healthy():
+                    return conn
+
+                conn.broken = True
+                self.release(key, conn)
+
+                continue
+
+            try:
+                conn.ssh = _connect(host, username, password)
+            except Exception:
+                with self._lock:
+                    self._connections[key].remove(conn)
+
+                raise
+
+            return conn
+
+    def _acquire(self, key):
+        now = time.time()
+
+        with self._lock:
+            conns = self._connections[key]
+
+            stale = [
+                c for c in conns
+                if c.ssh and not c.channels and
+                now - c.last_used > CONF.ssh.idle_timeout
+            ]
+
+            for c in stale:
+                conns.remove(c)
+
+            for c in conns:
+                if (not c.broken and c.ssh and
+                        c.channels < CONF.ssh.max_channels_per_connection):
+                    c.channels += 1
+
+                    return c, stale
+
+            if len(conns) < CONF.ssh.max_connections_per_host:
+                # Reserve the slot, the connection itself is established
+                # outside of the lock.
+                c = _Connection()
+                c.channels = 1
+                conns.append(c)
+
+                return c, stale
+
+            return None, stale
+
+    def release(self, key, conn):
+        with self._lock:
+            conn.channels -= 1
+            conn.last_used = time.time()
+
+            if not conn.broken or conn.channels:
+                return
+
+            self._connections[key].remove(conn)
+
+        conn.ssh.close()
+
+    def close_all(self):
+        with self._lock:
+            conns = [c for cs in self._connections.values() for c in cs]
+            self._connections.clear()
+
+        for c in conns:
+            if c.ssh:
+                c.ssh.close()
+
+
+_pool = ConnectionPool()
+
+
+def close_connections():
+    _pool.close_all()
+
+
+def _drain(chan):
+    """Reads stdout and stderr of a channel as data arrives on either one.
+
+    Reading one stream to the end before the other one would hang as soon
+    as the remote side fills the window of the stream not being read.
+    """
+    stdout = bytearray()
+    stderr = bytearray()
+
+    while True:
+        while chan.recv_ready():
+            stdout.extend(chan.recv(_CHUNK_SIZE))
+
+        while chan.recv_stderr_ready():
+            stderr.extend(chan.recv_stderr(_CHUNK_SIZE))
+
+        if ((chan.eof_received or chan.closed) and
+                not chan.recv_ready() and not chan.recv_stderr_ready()):
+            break
+
+        _wait_readable(chan)
+
+    return str(stdout), str(stderr)
+
+
+def _wait_readable(chan):
+    """Waits until stdout or stderr of a channel is readable or at EOF.
+
+    The file descriptor paramiko gives for a channel is signalled by data
+    arriving on either stream, so a single select() covers both of them.
+    """
+    select.select([chan], [], [], _POLL_INTERVAL)
+
+
+def _run(ssh, cmd):
+    chan = ssh.get_transport().open_session()
+
+    try:
+        chan.exec_command(cmd)
+
+        stdout, stderr = _drain(chan)
+
+        return chan.recv_exit_status(), stdout, stderr
+    finally:
+        chan.close()
 
 
 def execute_command(cmd, host, username, password,
                     get_stderr=False, raise_when_error=True):
-    ssh = _connect(host, username, password)
+    key = (host, username)
+    conn = _pool.acquire(host, username, password)
 
     LOG.debug("Executing command %s" % cmd)
 
     try:
-        chan = ssh.get_transport().open_session()
-        chan.exec_command(cmd)
+        ret_code, stdout, stderr = _run(conn.ssh, cmd)
+    except (paramiko.SSHException, EOFError, IOError):
+        conn.broken = True
+        raise
+    finally:
+        _pool.release(key, conn)
 
-        # TODO(nmakhotkin): that could hang if stderr buffer overflows
-        stdout = _read_paramimko_stream(chan.recv)
-        stderr = _read_paramimko_stream(chan.recv_stderr)
+    if ret_code and raise_when_error:
+        raise RuntimeError("Cmd: %s\nReturn code: %s\nstdout: %s"
+                           % (cmd, ret_code, stdout))
+    if get_stderr:
+        return ret_code, stdout, stderr
+    else:
+        return ret_code, stdout
 
-        ret_code = chan.recv_exit_status()
 
-        if ret_code and raise_when_error:
-            raise RuntimeError("Cmd: %s\nReturn code: %s\nstdout: %s"
-                               % (cmd, ret_code, stdout))
-        if get_stderr:
-            return ret_code, stdout, stderr
-        else:
-            return ret_code, stdout
-    finally:
-        _cleanup(ssh)
+def execute_many(cmd, hosts, username, password, concurrency=10,
+                 get_stderr=False, raise_when_error=False):
+    """Runs a command on several hosts, e.g. all servers of a group.
+
+    :param concurrency: Maximum number of hosts the command runs on at
+        the same time.
+    :return: Dictionary of host to the result execute_command() returns
+        for it, or to the exception raised for it.
+    """
+    def _execute(host):
+        try:
+            return host, execute_command(
+                cmd,
+                host,
+                username,
+                password,
+                get_stderr=get_stderr,
+                raise_when_error=raise_when_error
+            )
+        except Exception as e:
+            LOG.warning("Command failed on %s: %s" % (host, e))
+
+            return host, e
+
+    pool = eventlet.GreenPool(concurrency)
+
+    results = dict(pool.imap(_execute, hosts))
+
+    failed = [h for h in hosts if isinstance(results[h], Exception)]
+
+    if failed and raise_when_error:
+        raise RuntimeError(
+            "Cmd: %s\nFailed on hosts: %s" % (cmd, ', '.join(failed))
+        )
+
+    return results
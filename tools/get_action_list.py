@@ -39,6 +39,9 @@ service name. Usage example:
 
   python tools/get_action_list.py nova
 
+The clients of Cinder, Glance and Heat aren't requirements of Highlander,
+they have to be installed to run it.
+
 The result will be simple JSON containing action name as a key and method
 path as a value. For updating mapping.json it is need to copy all keys and
 values of the result to corresponding section of mapping.json:
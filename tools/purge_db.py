@@ -0,0 +1,56 @@
+# Copyright 2015 - Stratus Technologies
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+
+from oslo.config import cfg
+from oslo.utils import timeutils
+
+from highlander.db.v1 import api as db_api
+from highlander.db.v1.sqlalchemy import api as sa_api
+from highlander import config
+from highlander.openstack.common import log as logging
+
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+purge_opts = [
+    cfg.IntOpt('older-than', default=30,
+               help='Purge objects soft deleted more than this number '
+                    'of days ago.'),
+    cfg.IntOpt('batch-size', default=sa_api.DEFAULT_BATCH_SIZE,
+               help='Maximum number of rows removed per transaction.')
+]
+
+CONF.register_cli_opts(purge_opts)
+
+
+def main():
+    config.parse_args()
+
+    if len(CONF.config_file) == 0:
+        print("Usage: purge_db --config-file <path-to-config-file> "
+              "[--older-than <days>] [--batch-size <rows>]")
+        return exit(1)
+
+    logging.setup('Highlander')
+
+    older_than = timeutils.utcnow() - datetime.timedelta(days=CONF.older_than)
+
+    db_api.purge_soft_deleted(older_than, batch_size=CONF.batch_size)
+
+
+if __name__ == '__main__':
+    main()